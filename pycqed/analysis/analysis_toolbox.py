@@ -6,11 +6,14 @@ import os
 import time
 import datetime
 import warnings
+import multiprocessing
 from copy import deepcopy
 from collections import OrderedDict as od
 from matplotlib import colors
 import pandas as pd
 from pycqed.utilities.get_default_datadir import get_default_datadir
+from pycqed.utilities.data_index import get_data_index
+from pycqed.utilities.extraction_cache import get_extraction_cache
 from scipy.interpolate import griddata
 from mpl_toolkits.axes_grid1 import make_axes_locatable
 import h5py
@@ -28,6 +31,11 @@ from matplotlib.colors import LogNorm
 datadir = get_default_datadir()
 print('Data directory set to:', datadir)
 
+# If True, data is looked up using the persistent index of the data
+# directory (see pycqed.utilities.data_index) instead of listing directories.
+# The index is stored in the data directory, it is therefore opt-in.
+use_data_index = False
+
 
 ######################################################################
 #     Filehandling tools
@@ -93,7 +101,24 @@ def is_equal(ts0, ts1, or_equal=False):
     return (dstamp0 + tstamp0) == (dstamp1 + tstamp1)
 
 
+def _index_timestamp(timestamp):
+    """
+    Converts a timestamp to the YYYYMMDDHHMMSS format used in the data index.
+    """
+    if timestamp is None:
+        return None
+    dstamp, tstamp = verify_timestamp(timestamp)
+    return dstamp + tstamp
+
+
 def return_last_n_timestamps(n, contains=''):
+    if use_data_index:
+        rows = get_data_index(datadir).find(
+            contains=contains, limit=n, distinct_timestamps=True)
+        if len(rows) < n:
+            raise Exception('No data found.')
+        return [row[0] for row in rows]
+
     timestamps = []
     for i in range(n):
         if i == 0:
@@ -130,6 +155,53 @@ def latest_data(contains='', older_than=None, newer_than=None, or_equal=False,
     else:
         search_dir = folder
 
+    if use_data_index:
+        index = get_data_index(search_dir)
+        if len(index.daystamps()) == 0:
+            logging.warning('No data found in datadir')
+            return None
+        kw = dict(contains=contains, older_than=_index_timestamp(older_than),
+                  newer_than=_index_timestamp(newer_than), or_equal=or_equal)
+        rows = index.find(limit=1, **kw)
+        if len(rows) > 0:
+            daydir = rows[0][1]
+            if return_all:
+                rows = index.find(daystamp=daydir, **kw)
+            measdirs = sorted(row[2] for row in rows)
+        else:
+            measdirs = []
+    else:
+        measdirs = _latest_measdirs_listdir(
+            search_dir, contains=contains, older_than=older_than,
+            newer_than=newer_than, or_equal=or_equal)
+        if measdirs is None:
+            return None
+        daydir, measdirs = measdirs
+
+    if len(measdirs) == 0:
+        if raise_exc is True:
+            raise Exception('No data found.')
+        else:
+            return False
+    else:
+        measdirs.sort()
+        if return_all:
+            return search_dir, daydir, measdirs
+        measdir = measdirs[-1]
+        if return_timestamp is False:
+            return os.path.join(search_dir, daydir, measdir)
+        else:
+            return str(daydir) + str(measdir[:6]), os.path.join(
+                search_dir, daydir, measdir)
+
+
+def _latest_measdirs_listdir(search_dir, contains='', older_than=None,
+                             newer_than=None, or_equal=False):
+    """
+    Returns the newest day directory with data that fits the requirements
+    of latest_data and the fitting measurement directories of that day,
+    by listing the directories.
+    """
     daydirs = os.listdir(search_dir)
 
     if len(daydirs) == 0:
@@ -139,6 +211,7 @@ def latest_data(contains='', older_than=None, newer_than=None, or_equal=False,
     daydirs.sort()
 
     measdirs = []
+    daydir = None
     i = len(daydirs) - 1
     while len(measdirs) == 0 and i >= 0:
         daydir = daydirs[i]
@@ -170,21 +243,7 @@ def latest_data(contains='', older_than=None, newer_than=None, or_equal=False,
                             continue
                     measdirs.append(d)
         i -= 1
-    if len(measdirs) == 0:
-        if raise_exc is True:
-            raise Exception('No data found.')
-        else:
-            return False
-    else:
-        measdirs.sort()
-        if return_all:
-            return search_dir, daydir, measdirs
-        measdir = measdirs[-1]
-        if return_timestamp is False:
-            return os.path.join(search_dir, daydir, measdir)
-        else:
-            return str(daydir) + str(measdir[:6]), os.path.join(
-                search_dir, daydir, measdir)
+    return daydir, measdirs
 
 
 def data_from_time(timestamp, folder=None):
@@ -194,19 +253,29 @@ def data_from_time(timestamp, folder=None):
     """
     if (folder is None):
         folder = datadir
-    daydirs = os.listdir(folder)
+    daystamp, tstamp = verify_timestamp(timestamp)
 
-    if len(daydirs) == 0:
-        raise Exception('No data in the data directory specified')
+    if use_data_index:
+        index = get_data_index(folder)
+        if len(index.daystamps()) == 0:
+            raise Exception('No data in the data directory specified')
+        measdirs = [row[2] for row in index.find(
+            older_than=daystamp + tstamp, newer_than=daystamp + tstamp,
+            or_equal=True, daystamp=daystamp)]
+        if len(measdirs) == 0 and not os.path.isdir(
+                os.path.join(folder, daystamp)):
+            raise KeyError("Requested day '%s' not found" % daystamp)
+    else:
+        daydirs = os.listdir(folder)
 
-    daydirs.sort()
-    daystamp, tstamp = verify_timestamp(timestamp)
+        if len(daydirs) == 0:
+            raise Exception('No data in the data directory specified')
 
-    if not os.path.isdir(os.path.join(folder, daystamp)):
-        raise KeyError("Requested day '%s' not found" % daystamp)
+        if not os.path.isdir(os.path.join(folder, daystamp)):
+            raise KeyError("Requested day '%s' not found" % daystamp)
 
-    measdirs = [d for d in os.listdir(os.path.join(folder, daystamp))
-                if d[:6] == tstamp]
+        measdirs = [d for d in os.listdir(os.path.join(folder, daystamp))
+                    if d[:6] == tstamp]
     if len(measdirs) == 0:
         raise KeyError("Requested data '%s_%s' not found"
                        % (daystamp, tstamp))
@@ -433,7 +502,7 @@ def get_data_from_ma_v2(ma, param_names, numeric_params=None):
                     if param_end in list(temp.attrs.keys()):
                         data[param] = temp.attrs[param_end]
                     elif param_end in list(temp.keys()):
-                        data[param] = temp[param_end].value
+                        data[param] = temp[param_end][()]
         if numeric_params is not None:
             if param in numeric_params:
                 data[param] = np.double(data[param])
@@ -457,13 +526,322 @@ def append_data_from_ma(ma, param_names, data, data_version=2,
         data[param].append(new_data[param])
 
 
+class MeasurementDataReader(object):
+    """
+    Lightweight, read-only alternative to the MeasurementAnalysis for the
+    extraction of data in get_data_from_timestamp_list.
+
+    Has the attributes that MeasurementAnalysis sets in "load_hdf5data" and
+    "get_naming_and_values", but the naming and values are only read from
+    the file when they are accessed.
+    """
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.h5filepath = measurement_filename(folder)
+        self.data_file = h5py.File(self.h5filepath, 'r')
+        for k in list(self.data_file.keys()):
+            if type(self.data_file[k]) == h5py.Group:
+                self.name = k
+        self.g = self.data_file['Experimental Data']
+        measdir = os.path.split(folder)[1]
+        daydir = os.path.split(os.path.split(folder)[0])[1]
+        self.timestamp = daydir + '/' + measdir[:6]
+        self.timestamp_string = daydir + '_' + measdir[:6]
+        self.measurementstring = measdir[7:]
+        self.default_plot_title = self.measurementstring
+        self._data = None
+
+    def finish(self, **kw):
+        self.data_file.close()
+
+    def get_key(self, key):
+        s = self.g.attrs[key]
+        # converts byte type to string because of h5py datasaving
+        if type(s) == bytes:
+            s = s.decode('utf-8')
+        # If it is an array of value decodes individual entries
+        if type(s) == np.ndarray:
+            s = [s.decode('utf-8') if isinstance(s, bytes) else s for s in s]
+        return s
+
+    def get_values(self, key):
+        names = list(self.g.attrs.get('sweep_parameter_names', []))
+        names += list(self.g.attrs.get('value_names', []))
+        names = [n.decode('utf-8') if isinstance(n, bytes) else n
+                 for n in names]
+        if key in names:
+            values = self.g['Data'][:, names.index(key)]
+        else:
+            values = self.g[key][()]
+        # Makes sure all data is np float64
+        return np.asarray(values, dtype=np.float64)
+
+    @property
+    def datasaving_format(self):
+        if 'datasaving_format' in self.g.attrs:
+            return self.get_key('datasaving_format')
+        return 'Version 1'
+
+    @property
+    def parameter_names(self):
+        if self.datasaving_format == 'Version 1':
+            return [self.sweep_name]
+        return self.get_key('sweep_parameter_names')
+
+    @property
+    def parameter_units(self):
+        if self.datasaving_format == 'Version 1':
+            return [self.get_key('sweep_parameter_unit')]
+        return self.get_key('sweep_parameter_units')
+
+    @property
+    def sweep_name(self):
+        if self.datasaving_format == 'Version 1':
+            return self.get_key('sweep_parameter_name')
+        return self.parameter_names[0]
+
+    @property
+    def sweep_unit(self):
+        if self.datasaving_format == 'Version 1':
+            return self.get_key('sweep_parameter_unit')
+        return self.parameter_units  # for legacy reasons
+
+    @property
+    def value_names(self):
+        return self.get_key('value_names')
+
+    @property
+    def value_units(self):
+        return self.get_key('value_units')
+
+    @property
+    def xlabel(self):
+        return self.parameter_names[0] + ' (' + self.parameter_units[0] + ')'
+
+    @property
+    def ylabels(self):
+        return [a + ' (' + b + ')' for a, b in zip(self.value_names,
+                                                   self.value_units)]
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = self.get_values('Data').transpose()
+        return self._data
+
+    @property
+    def sweep_points(self):
+        if self.datasaving_format == 'Version 1':
+            return self.get_values(self.sweep_name)
+        if len(self.parameter_names) == 1:
+            return self.data[0, :]
+        return self.data[0:len(self.parameter_names), :]
+
+    @property
+    def measured_values(self):
+        if self.datasaving_format == 'Version 1':
+            return [self.get_values(name) for name in self.value_names]
+        return self.data[-len(self.value_names):, :]
+
+
+# Minimum number of files for which the extraction is parallelized if
+# n_workers > 1 is passed to get_data_from_timestamp_list
+min_files_parallel_extraction = 16
+
+# key used in the extraction cache to store if a file has an analysis group
+_has_analysis_key = '__has_analysis__'
+
+
+def _extract_data_from_folder(args):
+    """
+    Extracts the data of a single file using the MeasurementDataReader.
+
+    Returns:
+        data (OrderedDict or None): None if the file should be skipped
+        error (str or None): why the file was skipped
+    """
+    timestamp, folder, param_names, filter_no_analysis = args
+    try:
+        reader = MeasurementDataReader(folder)
+    except Exception as e:
+        return None, str(e)
+    try:
+        if filter_no_analysis and 'Analysis' not in reader.data_file.keys():
+            return None, None
+
+        datasaving_format = reader.datasaving_format
+        if 'datasaving_format' not in reader.g.attrs:
+            # logged instead of printed as this runs once for every file,
+            # possibly in many worker processes
+            logging.debug('{}: using legacy data loading, assuming old '
+                          'formatting'.format(folder))
+        if datasaving_format == 'Version 1':
+            data_version = 1
+        elif datasaving_format == 'Version 2':
+            data_version = 2
+        else:
+            raise ValueError('datasaving_format "%s " not recognized'
+                             % datasaving_format)
+        data = get_data_from_ma(reader, param_names,
+                                data_version=data_version)
+        # datasets can not be used after closing the file
+        for key, val in data.items():
+            if isinstance(val, h5py.Dataset):
+                data[key] = val[()]
+    except Exception as inst:
+        logging.warning('Error "%s" when processing timestamp %s' %
+                        (inst, timestamp))
+        raise
+    finally:
+        reader.finish()
+    return data, None
+
+
 def get_data_from_timestamp_list(timestamps,
                                  param_names,
                                  TwoD=False,
                                  max_files=None,
                                  filter_no_analysis=False,
                                  numeric_params=None,
-                                 ma_type='MeasurementAnalysis'):
+                                 ma_type='MeasurementAnalysis',
+                                 use_ma=False,
+                                 n_workers=None,
+                                 use_cache=False):
+    """
+    Extracts the parameters "param_names" from the data files of a list of
+    timestamps.
+
+    By default the files are opened read-only and only the requested
+    parameters are read (see MeasurementDataReader). The files are read
+    serially unless "n_workers" > 1 is specified, long lists of timestamps
+    are then read in parallel using a pool of "n_workers" processes.
+    If "use_cache" is True, extracted values are stored in and read from
+    the persistent extraction cache (see pycqed.utilities.extraction_cache),
+    such that files are only opened if they changed or if not all
+    parameters are cached.
+    A MeasurementAnalysis is instantiated for every file instead if
+    "use_ma" is True, for 2D data or if another "ma_type" is specified.
+    """
+    if use_ma or TwoD or ma_type != 'MeasurementAnalysis':
+        return _get_data_from_timestamp_list_ma(
+            timestamps, param_names, TwoD=TwoD, max_files=max_files,
+            filter_no_analysis=filter_no_analysis,
+            numeric_params=numeric_params, ma_type=ma_type)
+
+    if type(timestamps) is str:
+        timestamps = [timestamps]
+        single_timestamp = True
+    else:
+        single_timestamp = False
+    if type(param_names) is dict:
+        extract_names = list(param_names.values())
+    else:
+        extract_names = list(param_names)
+    data = od([(param, []) for param in extract_names])
+
+    if max_files is not None:
+        get_timestamps = timestamps[:max_files]
+    else:
+        get_timestamps = timestamps
+
+    cache = get_extraction_cache() if use_cache else None
+    remove_timestamps = []
+    files = []  # (timestamp, cache key, cached values, task) of every file
+    for timestamp in get_timestamps:
+        try:
+            folder = data_from_time(timestamp)
+        except Exception as e:
+            logging.warning(e)
+            remove_timestamps.append(timestamp)
+            continue
+        file_key = None
+        cached = {}
+        if cache is not None:
+            filepath = measurement_filename(folder)
+            if filepath is not None:
+                file_key = cache.file_key(filepath)
+                cached = cache.get(file_key,
+                                   extract_names + [_has_analysis_key])
+        if filter_no_analysis and cached.get(_has_analysis_key) is False:
+            remove_timestamps.append(timestamp)
+            continue
+        missing_names = [param for param in extract_names
+                         if param not in cached]
+        if len(missing_names) > 0 or (filter_no_analysis and
+                                      _has_analysis_key not in cached):
+            task = (timestamp, folder, missing_names, filter_no_analysis)
+        else:
+            task = None
+        files.append((timestamp, file_key, cached, task))
+
+    tasks = [task for _, _, _, task in files if task is not None]
+    if (n_workers is None or n_workers <= 1 or
+            len(tasks) < min_files_parallel_extraction):
+        results = [_extract_data_from_folder(task) for task in tasks]
+    else:
+        with multiprocessing.Pool(n_workers) as pool:
+            results = pool.map(_extract_data_from_folder, tasks)
+    results = iter(results)
+
+    for timestamp, file_key, cached, task in files:
+        file_data = cached
+        if task is not None:
+            file_data, error = next(results)
+            if file_key is not None and file_data is not None:
+                new_values = dict(file_data)
+                if filter_no_analysis:
+                    new_values[_has_analysis_key] = True
+                cache.put(file_key, new_values)
+            elif file_key is not None and error is None:
+                cache.put(file_key, {_has_analysis_key: False})
+            if file_data is None:
+                if error is not None:
+                    logging.warning(error)
+                remove_timestamps.append(timestamp)
+                continue
+            merged_data = od(cached)
+            merged_data.update(file_data)
+            file_data = merged_data
+        file_data = od([(param, file_data[param])
+                        for param in extract_names])
+        if single_timestamp:
+            data = file_data
+        else:
+            for param in extract_names:
+                data[param].append(file_data[param])
+
+    if len(remove_timestamps) > 0:
+        get_timestamps = [timestamp for timestamp in get_timestamps
+                          if timestamp not in remove_timestamps]
+        print('timestamps removed by filtering:', remove_timestamps)
+
+    if type(param_names) is dict:
+        out_data = od([(key, data[val]) for key, val in param_names.items()])
+    else:
+        out_data = data
+
+    if numeric_params is not None:
+        for nparam in numeric_params:
+            if nparam in out_data.keys():
+                try:
+                    out_data[nparam] = np.array(
+                        [np.double(val) for val in out_data[nparam]])
+                except ValueError as instance:
+                    raise (instance)
+
+    out_data['timestamps'] = get_timestamps
+
+    return out_data
+
+
+def _get_data_from_timestamp_list_ma(timestamps,
+                                     param_names,
+                                     TwoD=False,
+                                     max_files=None,
+                                     filter_no_analysis=False,
+                                     numeric_params=None,
+                                     ma_type='MeasurementAnalysis'):
     # dirty import inside this function to prevent circular import
     # FIXME: this function is at the base of the analysis v2 but relies
     # on the old analysis in the most dirty way. Also not completely clear
@@ -717,6 +1095,25 @@ def get_timestamps_in_range(timestamp_start, timestamp_end=None,
         datetime_end = datetime.datetime.today()
     else:
         datetime_end = datetime_from_timestamp(timestamp_end)
+
+    if use_data_index:
+        rows = get_data_index(folder).find(
+            newer_than=_index_timestamp(
+                timestamp_from_datetime(datetime_start)),
+            older_than=_index_timestamp(
+                timestamp_from_datetime(datetime_end)),
+            or_equal=True)
+        all_measdirs = [row[2] for row in rows]
+        if exact_label_match:
+            keep = [label in x for x in all_measdirs]
+        else:
+            keep = [all(each_label in x for each_label in label)
+                    for x in all_measdirs]
+        all_timestamps = ['{}_{}'.format(row[1], row[2][:6])
+                          for row, k in zip(rows, keep) if k]
+        all_timestamps.sort()
+        return all_timestamps
+
     days_delta = (datetime_end.date() - datetime_start.date()).days
     all_timestamps = []
     for day in reversed(list(range(days_delta + 1))):
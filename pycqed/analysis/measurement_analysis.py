@@ -66,6 +66,9 @@ class MeasurementAnalysis(object):
 
     def __init__(self, TwoD=False, folder=None, auto=True,
                  cmap_chosen='viridis', no_of_columns=1, qb_name=None, **kw):
+        # if True, the data is read from the file only when it is accessed
+        # (see get_naming_and_values)
+        self.lazy_data = kw.pop('lazy_data', False)
         if folder is None:
             self.folder = a_tools.get_folder(**kw)
         else:
@@ -275,14 +278,14 @@ class MeasurementAnalysis(object):
             names = self.get_key('sweep_parameter_names')
 
             ind = names.index(key)
-            values = self.g['Data'].value[:, ind]
+            values = self.g['Data'][:, ind]
         elif key in self.get_key('value_names'):
             names = self.get_key('value_names')
             ind = (names.index(key) +
                    len(self.get_key('sweep_parameter_names')))
-            values = self.g['Data'].value[:, ind]
+            values = self.g['Data'][:, ind]
         else:
-            values = self.g[key].value
+            values = self.g[key][()]
         # Makes sure all data is np float64
         return np.asarray(values, dtype=np.float64)
 
@@ -297,7 +300,8 @@ class MeasurementAnalysis(object):
             s = s.decode('utf-8')
         # If it is an array of value decodes individual entries
         if type(s) == np.ndarray:
-            s = [s.decode('utf-8') for s in s]
+            s = [s.decode('utf-8') if isinstance(s, bytes) else s
+                 for s in s]
         return s
 
     def group_values(self, group_name):
@@ -635,7 +639,12 @@ class MeasurementAnalysis(object):
             # data is transposed first to allow the individual parameter or value
             # types to be read out using a single array index (no colons
             # required)
-            self.data = self.get_values('Data').transpose()
+            if getattr(self, 'lazy_data', False):
+                # same indexing, but columns are read (or memory-mapped)
+                # only when they are indexed
+                self.data = h5d.LazyDataView(self.g['Data'])
+            else:
+                self.data = self.get_values('Data').transpose()
             if len(self.parameter_names) == 1:
                 self.sweep_points = self.data[0, :]
             else:
@@ -492,6 +492,77 @@ def get_generation_means(generation_indices, array):
     return means
 
 
+class BinnedStatistics:
+    """
+    Running per-bin mean and variance of data that arrives in chunks of
+    rows, e.g. single-shot data measured with exp_metadata['bins'].
+
+    Row i of the data belongs to bin i % nr_bins, which is the binning of
+    np.reshape(data, (nr_bins, -1), order='F'). NaN values are ignored.
+    Rows that are written again (e.g. when soft averaging) replace their
+    previous values, such that the statistics correspond to the current
+    data and every update only costs the size of the chunk.
+    """
+
+    def __init__(self, nr_bins: int, nr_channels: int):
+        self.nr_bins = nr_bins
+        self.nr_channels = nr_channels
+        self.nr_rows = 0  # rows included in the statistics
+        self.counts = np.zeros((nr_channels, nr_bins))
+        self.sums = np.zeros((nr_channels, nr_bins))
+        self.sums_sq = np.zeros((nr_channels, nr_bins))
+        # incremented on every update, used to detect changes
+        self.version = 0
+
+    def _accumulate(self, start_idx: int, values, sign: int=1):
+        bins = (start_idx + np.arange(len(values))) % self.nr_bins
+        for ch in range(self.nr_channels):
+            vals = values[:, ch]
+            valid = ~np.isnan(vals)
+            self.counts[ch] += sign*np.bincount(
+                bins[valid], minlength=self.nr_bins)
+            self.sums[ch] += sign*np.bincount(
+                bins[valid], weights=vals[valid], minlength=self.nr_bins)
+            self.sums_sq[ch] += sign*np.bincount(
+                bins[valid], weights=vals[valid]**2, minlength=self.nr_bins)
+
+    def update(self, start_idx: int, new_values, old_values=None):
+        """
+        Args:
+            start_idx (int): index of the first row of the chunk
+            new_values (array): values of the chunk, shape
+                (nr_rows, nr_channels)
+            old_values (array): values previously stored in these rows, only
+                used for rows that were already included
+        """
+        new_values = np.reshape(new_values, (-1, self.nr_channels))
+        nr_old_rows = min(self.nr_rows - start_idx, len(new_values))
+        if nr_old_rows > 0 and old_values is not None:
+            old_values = np.reshape(old_values, (-1, self.nr_channels))
+            self._accumulate(start_idx, old_values[:nr_old_rows], sign=-1)
+        self._accumulate(start_idx, new_values)
+        self.nr_rows = max(self.nr_rows, start_idx + len(new_values))
+        self.version += 1
+
+    def mean(self):
+        """
+        Returns the mean per bin, shape (nr_channels, nr_bins). Bins without
+        values are NaN.
+        """
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.counts > 0, self.sums/self.counts, np.nan)
+
+    def variance(self):
+        """
+        Returns the (population) variance per bin, shape
+        (nr_channels, nr_bins).
+        """
+        mean = self.mean()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            var = np.where(self.counts > 0, self.sums_sq/self.counts, np.nan)
+        return np.clip(var - mean**2, 0, None)
+
+
 def filter_resonator_visibility(x, y, z, deg=True, cutoff_factor=0,
                                 sav_windowlen_factor=None,
                                 sav_polorder=4,
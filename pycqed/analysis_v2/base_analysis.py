@@ -118,6 +118,7 @@ class BaseDataAnalysis(object):
                                 -'do_individual_traces'
                                 -'filter_no_analysis'
                                 -'exact_label_match'
+                                -'use_extraction_cache'
         :param extract_only: Should we also do the plots?
         :param do_fitting: Should the run_fitting method be executed?
         '''
@@ -173,6 +174,9 @@ class BaseDataAnalysis(object):
             'filter_no_analysis', False)
         self.exact_label_match = self.options_dict.get(
             'exact_label_match', False)
+        # store and reuse extracted parameters in a persistent cache
+        self.use_extraction_cache = self.options_dict.get(
+            'use_extraction_cache', False)
 
         ########################################
         # These options relate to the plotting #
@@ -292,7 +296,8 @@ class BaseDataAnalysis(object):
             self.timestamps, param_names=self.params_dict,
             ma_type=self.ma_type,
             TwoD=TwoD, numeric_params=self.numeric_params,
-            filter_no_analysis=self.filter_no_analysis)
+            filter_no_analysis=self.filter_no_analysis,
+            use_cache=self.use_extraction_cache)
 
         # Use timestamps to calculate datetimes and add to dictionary
         self.raw_data_dict['datetime'] = [a_tools.datetime_from_timestamp(
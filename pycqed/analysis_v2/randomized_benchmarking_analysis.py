@@ -16,6 +16,30 @@ from sklearn import linear_model
 from matplotlib import colors as c
 
 
+def binned_shots(a, nr_bins: int, nr_channels_checked: int):
+    """
+    Reads the shots of every channel of a (lazily loaded) MeasurementAnalysis
+    and bins them per sequence.
+
+    Shots for which the first "nr_channels_checked" channels are all zero
+    are invalid acquisitions and are set to NaN. The invalid shots are
+    determined streaming through the data in blocks and the channels are
+    read one at a time, such that the full data array is never in memory.
+
+    Yields:
+        val_name (str): name of the channel
+        binned_yvals (array): shape (nr_bins, nr_shots_per_bin)
+    """
+    measured_values = a.measured_values
+    invalid = np.zeros(measured_values.shape[1], dtype=bool)
+    for start, block in measured_values[:nr_channels_checked].iter_blocks():
+        invalid[start:start+block.shape[1]] = np.all(block == 0, axis=0)
+    for i, val_name in enumerate(a.value_names):
+        yvals = measured_values[i]
+        yvals[invalid] = np.nan
+        yield val_name, np.reshape(yvals, (nr_bins, -1), order='F')
+
+
 class RandomizedBenchmarking_SingleQubit_Analysis(ba.BaseDataAnalysis):
     def __init__(self, t_start: str=None, t_stop: str=None, label='',
                  options_dict: dict=None, auto=True, close_figs=True,
@@ -63,11 +87,12 @@ class RandomizedBenchmarking_SingleQubit_Analysis(ba.BaseDataAnalysis):
             label=self.labels)
 
         a = ma_old.MeasurementAnalysis(
-            timestamp=self.timestamps[0], auto=False, close_file=False)
+            timestamp=self.timestamps[0], auto=False, close_file=False,
+            lazy_data=True)
         a.get_naming_and_values()
 
         if 'bins' in a.data_file['Experimental Data']['Experimental Metadata'].keys():
-            bins = a.data_file['Experimental Data']['Experimental Metadata']['bins'].value
+            bins = a.data_file['Experimental Data']['Experimental Metadata']['bins'][()]
             self.raw_data_dict['ncl'] = bins[:-6:2]
             self.raw_data_dict['bins'] = bins
 
@@ -82,15 +107,8 @@ class RandomizedBenchmarking_SingleQubit_Analysis(ba.BaseDataAnalysis):
             self.raw_data_dict['cal_pts_two'] = OrderedDict()
             self.raw_data_dict['measured_values_I'] = OrderedDict()
             self.raw_data_dict['measured_values_X'] = OrderedDict()
-            for i, val_name in enumerate(a.value_names):
-
-                invalid_idxs = np.where((a.measured_values[0] == 0) &
-                                        (a.measured_values[1] == 0))[0]
-                a.measured_values[:, invalid_idxs] = \
-                    np.array([[np.nan]*len(invalid_idxs)]*2)
-
-                binned_yvals = np.reshape(
-                    a.measured_values[i], (len(bins), -1), order='F')
+            for val_name, binned_yvals in binned_shots(
+                    a, nr_bins=len(bins), nr_channels_checked=2):
 
                 self.raw_data_dict['binned_vals'][val_name] = binned_yvals
                 self.raw_data_dict['cal_pts_zero'][val_name] =\
@@ -408,11 +426,12 @@ class RandomizedBenchmarking_TwoQubit_Analysis(
             label=self.labels)
 
         a = ma_old.MeasurementAnalysis(
-            timestamp=self.timestamps[0], auto=False, close_file=False)
+            timestamp=self.timestamps[0], auto=False, close_file=False,
+            lazy_data=True)
         a.get_naming_and_values()
 
         if 'bins' in a.data_file['Experimental Data']['Experimental Metadata'].keys():
-            bins = a.data_file['Experimental Data']['Experimental Metadata']['bins'].value
+            bins = a.data_file['Experimental Data']['Experimental Metadata']['bins'][()]
             self.raw_data_dict['ncl'] = bins[:-7:2]  # 7 calibration points
             self.raw_data_dict['bins'] = bins
 
@@ -432,16 +451,8 @@ class RandomizedBenchmarking_TwoQubit_Analysis(
             self.raw_data_dict['measured_values_I'] = OrderedDict()
             self.raw_data_dict['measured_values_X'] = OrderedDict()
 
-            for i, val_name in enumerate(a.value_names):
-                invalid_idxs = np.where((a.measured_values[0] == 0) &
-                                        (a.measured_values[1] == 0) &
-                                        (a.measured_values[2] == 0) &
-                                        (a.measured_values[3] == 0))[0]
-                a.measured_values[:, invalid_idxs] = \
-                    np.array([[np.nan]*len(invalid_idxs)]*4)
-
-                binned_yvals = np.reshape(
-                    a.measured_values[i], (len(bins), -1), order='F')
+            for val_name, binned_yvals in binned_shots(
+                    a, nr_bins=len(bins), nr_channels_checked=4):
                 self.raw_data_dict['binned_vals'][val_name] = binned_yvals
 
                 # 7 cal points:  [00, 01, 10, 11, 02, 20, 22]
@@ -693,11 +704,12 @@ class UnitarityBenchmarking_TwoQubit_Analysis(
             label=self.labels)
 
         a = ma_old.MeasurementAnalysis(
-            timestamp=self.timestamps[0], auto=False, close_file=False)
+            timestamp=self.timestamps[0], auto=False, close_file=False,
+            lazy_data=True)
         a.get_naming_and_values()
 
         if 'bins' in a.data_file['Experimental Data']['Experimental Metadata'].keys():
-            bins = a.data_file['Experimental Data']['Experimental Metadata']['bins'].value
+            bins = a.data_file['Experimental Data']['Experimental Metadata']['bins'][()]
             self.raw_data_dict['ncl'] = bins[:-7:10]  # 7 calibration points
             self.raw_data_dict['bins'] = bins
 
@@ -725,16 +737,8 @@ class UnitarityBenchmarking_TwoQubit_Analysis(
             self.raw_data_dict['measured_values_YY'] = OrderedDict()
             self.raw_data_dict['measured_values_mZmZ'] = OrderedDict()
 
-            for i, val_name in enumerate(a.value_names):
-                invalid_idxs = np.where((a.measured_values[0] == 0) &
-                                        (a.measured_values[1] == 0) &
-                                        (a.measured_values[2] == 0) &
-                                        (a.measured_values[3] == 0))[0]
-                a.measured_values[:, invalid_idxs] = \
-                    np.array([[np.nan]*len(invalid_idxs)]*4)
-
-                binned_yvals = np.reshape(
-                    a.measured_values[i], (len(bins), -1), order='F')
+            for val_name, binned_yvals in binned_shots(
+                    a, nr_bins=len(bins), nr_channels_checked=4):
                 self.raw_data_dict['binned_vals'][val_name] = binned_yvals
 
                 # 7 cal points:  [00, 01, 10, 11, 02, 20, 22]
@@ -1,3 +1,6 @@
+import hashlib
+import inspect
+import time
 import numpy as np
 import matplotlib.pyplot as plt
 # FIXME: add support for QtPlot render wave
@@ -24,6 +27,8 @@ class Base_LutMan(Instrument):
         - A LutMap, relating waveform names to specific lookuptable indices
         - Methods to upload and regenerate these waveforms.
         - Methods to render waves.
+        - A waveform cache, waveforms are only regenerated if the
+            parameters they depend on changed (see waveform_dependencies).
 
     The Base LutMan does not provide a set of
 
@@ -57,8 +62,18 @@ class Base_LutMan(Instrument):
         self._voltage_min = None
         self._voltage_max = None
 
+        self.add_parameter(
+            'cfg_cache_waveforms', docstring=(
+                'If True, waveforms are only regenerated and processed '
+                'if the parameters they depend on have changed.'),
+            initial_value=True, vals=vals.Bool(),
+            parameter_class=ManualParameter)
+
         # initialize the _wave_dict to an empty dictionary
         self._wave_dict = {}
+        # {cache name: (inputs hash, result, time to compute)}
+        self._wf_cache = {}
+        self._reset_waveform_cache_statistics()
         self.set_default_lutmap()
 
     def time_to_sample(self, time):
@@ -97,6 +112,128 @@ class Base_LutMan(Instrument):
         """
         raise NotImplementedError()
 
+    #################################
+    #  Waveform cache methods       #
+    #################################
+
+    def _get_cached_waveform(self, waveform_name: str):
+        """
+        Returns the waveform generated by "_gen_{waveform_name}", only
+        regenerating it if the dependencies declared using the
+        waveform_dependencies decorator have changed.
+
+        The waveforms it depends on are brought up to date first and stored
+        in self._wave_dict. Keyword arguments of the generating method that
+        start with "regenerate_" are set to False, as regenerating these
+        waveforms is taken care of by the cache.
+        """
+        gen_wf_func = getattr(self, '_gen_{}'.format(waveform_name))
+        dependencies = getattr(gen_wf_func, '_wf_dependencies', None)
+        if dependencies is None:
+            # Dependencies unknown, the waveform can not be cached
+            return gen_wf_func()
+
+        parameters, waveforms = dependencies
+        for dep_wf_name in waveforms:
+            self._wave_dict[dep_wf_name] = self._get_cached_waveform(
+                dep_wf_name)
+        kw = {par: False for par in inspect.signature(gen_wf_func).parameters
+              if par.startswith('regenerate_')}
+        return self._cached(
+            waveform_name, gen_wf_func, dependencies=parameters,
+            inputs=[self._wave_dict[w] for w in waveforms], **kw)
+
+    def _cached(self, name: str, func, dependencies=(), inputs=(), **kw):
+        """
+        Returns func(**kw), memoized on a hash of the values of the
+        dependencies and the inputs.
+
+        Args:
+            name (str)          : name under which the result is cached.
+            func (callable)     : function computing the result.
+            dependencies (list) : names of parameters, methods (without
+                arguments) or attributes of this instrument the result
+                depends on.
+            inputs (list)       : other values the result depends on
+                (e.g., waveforms).
+
+        N.B. The cached result is returned as is, it should not be
+        modified in place.
+        """
+        if not self.cfg_cache_waveforms():
+            return func(**kw)
+
+        key = hash_values([self._get_dependency_value(dep)
+                           for dep in dependencies], inputs, kw)
+        cached = self._wf_cache.get(name, None)
+        if cached is not None and cached[0] == key:
+            self._wf_cache_stats['hits'] += 1
+            self._wf_cache_stats['time_saved'] += cached[2]
+            return cached[1]
+
+        t0 = time.time()
+        result = func(**kw)
+        t_compute = time.time()-t0
+        self._wf_cache[name] = (key, result, t_compute)
+        self._wf_cache_stats['misses'] += 1
+        self._wf_cache_stats['time_spent'] += t_compute
+        return result
+
+    def _get_dependency_value(self, name: str):
+        """
+        Returns the value of a parameter, the result of a method
+        (e.g., a scale factor that is read from the AWG) or the value of
+        another attribute (e.g., a waveform function).
+        """
+        if name in self.parameters:
+            return self.get(name)
+        attr = getattr(self, name)
+        if inspect.ismethod(attr):
+            return attr()
+        return attr
+
+    def _reset_waveform_cache_statistics(self):
+        self._wf_cache_stats = {'hits': 0, 'misses': 0, 'time_saved': 0,
+                                'time_spent': 0, 'uploads': 0,
+                                'uploads_skipped': 0}
+
+    def _update_upload_statistics(self, uploaded: list):
+        """
+        Args:
+            uploaded (list): return values of the AWG upload methods, False
+                indicates the AWG skipped an upload as the waveform in
+                memory was up to date.
+        """
+        for upl in uploaded:
+            if upl is False:
+                self._wf_cache_stats['uploads_skipped'] += 1
+            else:
+                self._wf_cache_stats['uploads'] += 1
+
+    def waveform_cache_statistics(self):
+        """
+        Returns the statistics of the waveform cache since the start of
+        the last call to load_waveforms_onto_AWG_lookuptable.
+
+        Returns:
+            statistics (dict) with keys
+                'hits'            : number of results taken from the cache
+                'misses'          : number of results (re)computed
+                'time_saved' (s)  : time it took to compute the cache hits
+                'time_spent' (s)  : time spent computing the cache misses
+                'uploads'         : number of waveforms uploaded
+                'uploads_skipped' : number of uploads skipped as the
+                                    waveform on the AWG was up to date
+        """
+        return dict(self._wf_cache_stats)
+
+    def clear_waveform_cache(self):
+        """
+        Forgets all cached waveforms, such that all waveforms are
+        regenerated the next time they are loaded.
+        """
+        self._wf_cache = {}
+
     def load_waveforms_onto_AWG_lookuptable(
             self, regenerate_waveforms: bool=True, stop_start: bool = True):
         """
@@ -108,6 +245,7 @@ class Base_LutMan(Instrument):
             stop_start           (bool): if True stops and starts the AWG.
         """
         AWG = self.AWG.get_instr()
+        self._reset_waveform_cache_statistics()
 
         if stop_start:
             AWG.stop()
@@ -198,6 +336,51 @@ class Base_LutMan(Instrument):
 
 
 
+def waveform_dependencies(*parameters, waveforms=()):
+    """
+    Decorator declaring what a "_gen_{waveform_name}" method of a LutMan
+    depends on. The LutMan only regenerates the waveform if one of the
+    dependencies changed (see Base_LutMan._get_cached_waveform).
+
+    Args:
+        parameters (str)  : names of parameters, methods (without
+            arguments) or attributes of the LutMan used to generate the
+            waveform.
+        waveforms (tuple) : names of the waveforms in the LutMan's
+            _wave_dict the waveform is generated from.
+    """
+    def decorator(gen_wf_func):
+        gen_wf_func._wf_dependencies = (parameters, tuple(waveforms))
+        return gen_wf_func
+    return decorator
+
+
+def hash_values(*values):
+    """
+    Returns a hash of (nested) lists, tuples and dicts of values and arrays.
+    """
+    h = hashlib.sha1()
+    _update_hash(h, values)
+    return h.hexdigest()
+
+
+def _update_hash(h, value):
+    if isinstance(value, np.ndarray):
+        h.update('array{}{}'.format(value.dtype.str, value.shape).encode())
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        h.update(b'dict')
+        for key in sorted(value.keys(), key=repr):
+            _update_hash(h, key)
+            _update_hash(h, value[key])
+    elif isinstance(value, (list, tuple)):
+        h.update('seq{}'.format(len(value)).encode())
+        for val in value:
+            _update_hash(h, val)
+    else:
+        h.update(repr(value).encode())
+
+
 def get_redundant_codewords(codeword: int, bit_width: int=4, bit_shift: int=0):
     """
     Takes in a desired codeword and generates the redundant codewords.
@@ -1,4 +1,4 @@
-from .base_lutman import Base_LutMan
+from .base_lutman import Base_LutMan, waveform_dependencies
 import numpy as np
 import logging
 from copy import copy
@@ -317,12 +317,8 @@ class AWG8_Flux_LutMan(Base_Flux_LutMan):
 
                 amp_Volts = amp_dac_val * channel_amp * channel_range
         """
-        # recursive allows dealing with an array of freqs
-        if isinstance(eps, (list, np.ndarray)):
-            return np.array([self.calc_eps_to_amp(
-                eps=e, state_A=state_A, state_B=state_B,
-                positive_branch=positive_branch) for e in eps])
-
+        # the polycoeffs are determined once, an array of eps is converted
+        # in a single vectorized step
         polycoeffs_A = self.get_polycoeffs_state(state=state_A)
         if state_B is not None:
             polycoeffs_B = self.get_polycoeffs_state(state=state_B)
@@ -331,17 +327,8 @@ class AWG8_Flux_LutMan(Base_Flux_LutMan):
             polycoeffs = copy(polycoeffs_A)
             polycoeffs[-1] = 0
 
-        p = np.poly1d(polycoeffs)
-        sols = (p-eps).roots
-
-        # sols returns 2 solutions (for a 2nd order polynomial)
-        if positive_branch:
-            sol = np.max(sols)
-        else:
-            sol = np.min(sols)
-
-        # imaginary part is ignored, instead sticking to closest real value
-        return np.real(sol)
+        return invert_quadratic(polycoeffs, eps,
+                                positive_branch=positive_branch)
 
     def calc_net_zero_length_ratio(self):
         """
@@ -582,34 +569,45 @@ class AWG8_Flux_LutMan(Base_Flux_LutMan):
         self._wave_dict = {}
         # N.B. the  naming convention ._gen_{waveform_name} must be preserved
         # as it is used in the load_waveform_onto_AWG_lookuptable method.
-        self._wave_dict['i'] = self._gen_i()
-        self._wave_dict['square'] = self._gen_square()
-        self._wave_dict['park'] = self._gen_park()
+        # Waveforms are taken from the cache if their dependencies, declared
+        # using the waveform_dependencies decorator, did not change.
+        self._wave_dict['i'] = self._get_cached_waveform('i')
+        self._wave_dict['square'] = self._get_cached_waveform('square')
+        self._wave_dict['park'] = self._get_cached_waveform('park')
 
         # FIXME: reenable this
-        self._wave_dict['cz'] = self._gen_cz()
-        self._wave_dict['cz_z'] = self._gen_cz_z(regenerate_cz=False)
+        self._wave_dict['cz'] = self._get_cached_waveform('cz')
+        self._wave_dict['cz_z'] = self._get_cached_waveform('cz_z')
 
-        self._wave_dict['idle_z'] = self._gen_idle_z()
-        self._wave_dict['custom_wf'] = self._gen_custom_wf()
-        self._wave_dict['multi_square'] = self._gen_multi_square(
-            regenerate_square=False)
+        self._wave_dict['idle_z'] = self._get_cached_waveform('idle_z')
+        self._wave_dict['custom_wf'] = self._get_cached_waveform('custom_wf')
+        self._wave_dict['multi_square'] = self._get_cached_waveform(
+            'multi_square')
         # multi_cz is used because there is no real-time flux correction yet
-        self._wave_dict['multi_cz'] = self._gen_multi_cz(regenerate_cz=False)
-        self._wave_dict['multi_idle_z'] = self._gen_multi_idle_z(
-            regenerate_cz=False)
+        self._wave_dict['multi_cz'] = self._get_cached_waveform('multi_cz')
+        self._wave_dict['multi_idle_z'] = self._get_cached_waveform(
+            'multi_idle_z')
 
+    @waveform_dependencies()
     def _gen_i(self):
         return np.zeros(42)
 
+    @waveform_dependencies('sq_amp', 'sq_length', 'sampling_rate')
     def _gen_square(self):
         return wf.single_channel_block(
             amp=self.sq_amp(), length=self.sq_length(),
             sampling_rate=self.sampling_rate(), delay=0)
 
+    @waveform_dependencies()
     def _gen_park(self):
         return np.zeros(42)
 
+    @waveform_dependencies(
+        'cz_length', 'cz_theta_f', 'cz_lambda_2', 'cz_lambda_3',
+        'czd_double_sided', 'czd_length_ratio', 'czd_theta_f',
+        'czd_lambda_2', 'czd_lambda_3', 'czd_amp_ratio', 'czd_amp_offset',
+        'q_polycoeffs_freq_01_det', 'q_polycoeffs_anharm', 'q_freq_01',
+        'q_freq_10', 'q_J2', 'get_amp_to_dac_val_scalefactor')
     def _gen_cz(self):
         """
         Generates the CZ waveform.
@@ -732,6 +730,10 @@ class AWG8_Flux_LutMan(Base_Flux_LutMan):
         #         [block, -1*block]) + phase_corr_offset
         #     return phase_corr_wf
 
+    @waveform_dependencies(
+        'cz_phase_corr_length', 'cz_phase_corr_amp', 'czd_double_sided',
+        'czd_net_integral', 'disable_cz_only_z', 'sampling_rate',
+        waveforms=('cz',))
     def _gen_cz_z(self, regenerate_cz=True):
         if regenerate_cz:
             self._wave_dict['cz'] = self._gen_cz()
@@ -745,6 +747,9 @@ class AWG8_Flux_LutMan(Base_Flux_LutMan):
 
         return cz_z
 
+    @waveform_dependencies(
+        'mcz_nr_of_repeated_gates', 'mcz_gate_separation',
+        'cfg_max_wf_length', 'sampling_rate', waveforms=('square',))
     def _gen_multi_square(self, regenerate_square=True):
         """
         Composite waveform containing multiple cz gates
@@ -768,6 +773,9 @@ class AWG8_Flux_LutMan(Base_Flux_LutMan):
                 break
         return waveform
 
+    @waveform_dependencies(
+        'mcz_nr_of_repeated_gates', 'mcz_gate_separation',
+        'cfg_max_wf_length', 'sampling_rate', waveforms=('cz_z',))
     def _gen_multi_cz(self, regenerate_cz=True):
         """
         Composite waveform containing multiple cz gates
@@ -793,6 +801,7 @@ class AWG8_Flux_LutMan(Base_Flux_LutMan):
         # CZ with phase correction
         return waveform
 
+    @waveform_dependencies('custom_wf', 'custom_wf_length', 'sampling_rate')
     def _gen_custom_wf(self):
         base_wf = copy(self.custom_wf())
 
@@ -847,12 +856,19 @@ class AWG8_Flux_LutMan(Base_Flux_LutMan):
 
         return waveform
 
+    @waveform_dependencies(
+        'cz_length', 'cz_phase_corr_length', 'cz_phase_corr_amp',
+        'czd_double_sided', 'czd_net_integral', 'disable_cz_only_z',
+        'sampling_rate')
     def _gen_idle_z(self):
         idle_z = self._get_phase_corrected_pulse(
             base_wf=np.zeros(int(self.cz_length()*self.sampling_rate()+1)))
 
         return idle_z
 
+    @waveform_dependencies(
+        'mcz_nr_of_repeated_gates', 'mcz_gate_separation',
+        'cfg_max_wf_length', 'sampling_rate', waveforms=('idle_z',))
     def _gen_multi_idle_z(self, regenerate_cz=False):
         """
         Composite waveform containing multiple cz gates
@@ -1005,21 +1021,14 @@ class AWG8_Flux_LutMan(Base_Flux_LutMan):
         """
         if regenerate_waveforms:
             # only regenerate the one waveform that is desired
-            gen_wf_func = getattr(self, '_gen_{}'.format(waveform_name))
-            self._wave_dict[waveform_name] = gen_wf_func()
+            self._wave_dict[waveform_name] = self._get_cached_waveform(
+                waveform_name)
 
         waveform = self._wave_dict[waveform_name]
         codeword = self.LutMap()[waveform_name]
 
-        if self.cfg_append_compensation():
-            waveform = self.add_compensation_pulses(waveform)
-
-        if self.cfg_distort():
-            waveform = self.distort_waveform(waveform)
-            self._wave_dict_dist[waveform_name] = waveform
-        else:
-            waveform = self._append_zero_samples(waveform)
-            self._wave_dict_dist[waveform_name] = waveform
+        waveform = self._get_processed_waveform(waveform_name, waveform)
+        self._wave_dict_dist[waveform_name] = waveform
 
         self.AWG.get_instr().set(codeword, waveform)
 
@@ -1055,6 +1064,7 @@ class AWG8_Flux_LutMan(Base_Flux_LutMan):
             regenerate_waveforms = False
 
         for lm in lutmans:
+            lm._reset_waveform_cache_statistics()
             if regenerate_waveforms:
                 lm.generate_standard_waveforms()
                 for waveform_name, lookuptable in lm.LutMap().items():
@@ -1085,6 +1095,63 @@ class AWG8_Flux_LutMan(Base_Flux_LutMan):
 
         self._update_expected_program_hash()
 
+    def process_waveforms(self, waveforms):
+        """
+        Applies the compensation pulses, distortions and zero padding that
+        are applied when loading a waveform to a list of waveforms at once.
+
+        Args:
+            waveforms (list): waveforms as generated by the _gen_ methods
+        Returns:
+            waveforms (list): the waveforms as they are uploaded to the AWG
+        """
+        if self.cfg_append_compensation():
+            waveforms = [self.add_compensation_pulses(w) for w in waveforms]
+        if self.cfg_distort():
+            return self.distort_waveforms(waveforms)
+        return [self._append_zero_samples(w) for w in waveforms]
+
+    def _process_waveform(self, waveform):
+        """
+        Applies the compensation pulses, distortions and zero padding that
+        are applied when loading a waveform.
+        """
+        if self.cfg_append_compensation():
+            waveform = self.add_compensation_pulses(waveform)
+        if self.cfg_distort():
+            return self.distort_waveform(waveform)
+        return self._append_zero_samples(waveform)
+
+    def _get_processed_waveform(self, waveform_name: str, waveform):
+        """
+        Returns the waveform as it is uploaded to the AWG, see
+        _process_waveform. The waveform is only processed again if the
+        waveform, the relevant parameters or the distortion kernel changed.
+        """
+        if self.cfg_distort() and not hasattr(
+                self.instr_distortion_kernel.get_instr(),
+                '_filter_models_key'):
+            # The state of old kernel objects can not be determined
+            return self._process_waveform(waveform)
+        return self._cached(
+            '{}_processed'.format(waveform_name), self._process_waveform,
+            dependencies=('cfg_append_compensation', 'cfg_compensation_delay',
+                          'cfg_distort', 'cfg_pre_pulse_delay',
+                          'cfg_max_wf_length', 'sampling_rate',
+                          '_get_distortion_kernel_state'),
+            waveform=waveform)
+
+    def _get_distortion_kernel_state(self):
+        """
+        Returns the settings of the distortion kernel that determine the
+        distorted waveforms.
+        """
+        if not self.cfg_distort():
+            return None
+        k = self.instr_distortion_kernel.get_instr()
+        return (k.name, k._filter_models_key(inverse=False),
+                k.cfg_gain_correction())
+
     def _generate_single_cw_program(self, cw_idx):
         devname = self.AWG.get_instr()._devname
         ch = self.cfg_awg_channel() - (self.cfg_awg_channel()+1) % 2
@@ -1170,15 +1237,8 @@ class AWG8_Flux_LutMan(Base_Flux_LutMan):
         codeword = 'wave_ch{}_cw{:03}'.format(self.cfg_awg_channel(),
                                               codeword)
 
-        if self.cfg_append_compensation():
-            waveform = self.add_compensation_pulses(waveform)
-
-        if self.cfg_distort():
-            waveform = self.distort_waveform(waveform)
-            self._wave_dict_dist[waveform_name] = waveform
-        else:
-            waveform = self._append_zero_samples(waveform)
-            self._wave_dict_dist[waveform_name] = waveform
+        waveform = self._get_processed_waveform(waveform_name, waveform)
+        self._wave_dict_dist[waveform_name] = waveform
 
         self.AWG.get_instr().set(codeword, waveform)
 
@@ -1198,16 +1258,8 @@ class AWG8_Flux_LutMan(Base_Flux_LutMan):
             wf_nr = int(self.LutMap()[waveform_name][-3:])
 
         if regenerate_waveforms:
-            gen_wf_func = getattr(self, '_gen_{}'.format(waveform_name))
-            waveform = gen_wf_func()
-            if self.cfg_append_compensation():
-                waveform = self.add_compensation_pulses(waveform)
-            if self.cfg_distort():
-                waveform = self.distort_waveform(waveform)
-                self._wave_dict_dist[waveform_name] = waveform
-            else:
-                waveform = self._append_zero_samples(waveform)
-                self._wave_dict_dist[waveform_name] = waveform
+            self._wave_dict_dist[waveform_name] = self._get_processed_waveform(
+                waveform_name, self._get_cached_waveform(waveform_name))
 
         waveform = self._wave_dict_dist[waveform_name]
         codeword = self.LutMap()[waveform_name]
@@ -1220,16 +1272,10 @@ class AWG8_Flux_LutMan(Base_Flux_LutMan):
             partner_lm = self.instr_partner_lutman.get_instr()
             prtnr_wf_name = partner_lm._get_wf_name_from_cw(codeword=wf_nr)
             if regenerate_waveforms:
-                gen_wf_func = getattr(partner_lm,
-                                      '_gen_{}'.format(prtnr_wf_name))
-                prtnr_wf = gen_wf_func()
-
-                if partner_lm.cfg_append_compensation():
-                    prtnr_wf = partner_lm.add_compensation_pulses(prtnr_wf)
-
-                if partner_lm.cfg_distort():
-                    prtnr_wf = partner_lm.distort_waveform(prtnr_wf)
-                    partner_lm._wave_dict_dist[prtnr_wf_name] = prtnr_wf
+                partner_lm._wave_dict_dist[prtnr_wf_name] = \
+                    partner_lm._get_processed_waveform(
+                        prtnr_wf_name,
+                        partner_lm._get_cached_waveform(prtnr_wf_name))
 
             other_waveform = partner_lm._wave_dict_dist[prtnr_wf_name]
 
@@ -1250,8 +1296,9 @@ class AWG8_Flux_LutMan(Base_Flux_LutMan):
         else:
             waveforms = (other_waveform, waveform)
 
-        self.AWG.get_instr().upload_waveform_realtime(
+        uploaded = self.AWG.get_instr().upload_waveform_realtime(
             w0=waveforms[0], w1=waveforms[1], awg_nr=awg_nr, wf_nr=wf_nr)
+        self._update_upload_statistics([uploaded])
 
     def add_compensation_pulses(self, waveform):
         """
@@ -1292,6 +1339,24 @@ class AWG8_Flux_LutMan(Base_Flux_LutMan):
                                    self.sampling_rate()))
         return distorted_waveform
 
+    def distort_waveforms(self, waveforms, inverse=False):
+        """
+        Distorts a list of waveforms, see distort_waveform. If the kernel
+        object supports it, all waveforms are distorted in a single pass.
+        """
+        k = self.instr_distortion_kernel.get_instr()
+        if not hasattr(k, 'distort_waveforms'):
+            return [self.distort_waveform(w, inverse=inverse)
+                    for w in waveforms]
+
+        delay_samples = int(self.cfg_pre_pulse_delay()*self.sampling_rate())
+        waveforms = [np.pad(w, (delay_samples, 0), 'constant')
+                     for w in waveforms]
+        return k.distort_waveforms(
+            waveforms,
+            length_samples=int(self.cfg_max_wf_length()*self.sampling_rate()),
+            inverse=inverse)
+
     #################################
     #  Plotting methods            #
     #################################
@@ -1440,8 +1505,8 @@ class QWG_Flux_LutMan(AWG8_Flux_LutMan):
         """
         if regenerate_waveforms:
             # only regenerate the one waveform that is desired
-            gen_wf_func = getattr(self, '_gen_{}'.format(waveform_name))
-            self._wave_dict[waveform_name] = gen_wf_func()
+            self._wave_dict[waveform_name] = self._get_cached_waveform(
+                waveform_name)
 
         waveform = self._wave_dict[waveform_name]
         codeword = self.LutMap()[waveform_name]
@@ -1494,6 +1559,12 @@ class QWG_Flux_LutMan(AWG8_Flux_LutMan):
 
         return distorted_waveform
 
+    def distort_waveforms(self, waveforms):
+        """
+        Distorts a list of waveforms one by one, see distort_waveform.
+        """
+        return [self.distort_waveform(w) for w in waveforms]
+
     def convolve_kernel(self, kernel_list, length_samples=None):
         """
         kernel_list : (list of arrays)
@@ -1527,6 +1598,47 @@ class QWG_Flux_LutMan(AWG8_Flux_LutMan):
 #########################################################################
 
 
+def invert_quadratic(polycoeffs, y, positive_branch: bool=True):
+    """
+    Solves p(x) = y for a polynomial p of (at most) second order.
+
+    Args:
+        polycoeffs (array): coefficients [a, b, c] of p(x) = a x^2 + b x + c
+        y (float or array): value(s) of the polynomial
+        positive_branch (bool): if True returns the largest solution,
+            else the smallest.
+
+    Returns:
+        x (float or array): solution(s) with the shape of y. If there is no
+            real solution, the real part of the complex solutions (the
+            location of the extremum) is returned.
+    """
+    a, b, c = polycoeffs
+    y = np.asarray(y, dtype=float)
+    if a == 0:
+        if b == 0:
+            raise ValueError('Polynomial {} cannot be inverted'.format(
+                polycoeffs))
+        x = (y-c)/b
+    else:
+        discriminant = b**2 - 4*a*(c-y)
+        sqrt_disc = np.sqrt(np.maximum(discriminant, 0))
+        # numerically stable form of the two solutions
+        sign_b = 1 if b >= 0 else -1
+        q = -0.5*(b + sign_b*sqrt_disc)
+        x_1 = q/a
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_2 = np.where(q != 0, (c-y)/q, x_1)
+        if positive_branch:
+            x = np.maximum(x_1, x_2)
+        else:
+            x = np.minimum(x_1, x_2)
+        x = np.where(discriminant < 0, -b/(2*a), x)
+    if x.ndim == 0:
+        return float(x)
+    return x
+
+
 def phase_corr_triangle(int_val, nr_samples):
     """
     Creates an offset triangle with desired integrated value
@@ -1,4 +1,5 @@
-from .base_lutman import Base_LutMan, get_redundant_codewords
+from .base_lutman import Base_LutMan, get_redundant_codewords, \
+    waveform_dependencies
 import numpy as np
 from collections import Iterable, OrderedDict
 from qcodes.instrument.parameter import ManualParameter
@@ -106,77 +107,97 @@ class Base_MW_LutMan(Base_LutMan):
 
     def generate_standard_waveforms(self,
                                     apply_predistortion_matrix: bool=True):
-        self._wave_dict = OrderedDict()
+        # The waveforms are only regenerated if one of the parameters they
+        # depend on changed, the copy keeps the cached dict unmodified.
+        self._wave_dict = OrderedDict(
+            self._get_cached_waveform('standard_waveforms'))
+
+        if (self.mixer_apply_predistortion_matrix()
+                and apply_predistortion_matrix):
+            self._wave_dict = self.apply_mixer_predistortion_corrections(
+                self._wave_dict)
+        return self._wave_dict
+
+    @waveform_dependencies(
+        'wf_func', 'spec_func', 'cfg_sideband_mode', 'mw_modulation',
+        'mw_amp180', 'mw_amp90_scale', 'mw_motzoi', 'mw_gauss_width',
+        'mw_phi', 'spec_length', 'spec_amp', 'mw_ef_modulation',
+        'mw_ef_amp180', 'sampling_rate')
+    def _gen_standard_waveforms(self):
+        """
+        Generates the standard waveforms without mixer predistortion.
+        """
+        wave_dict = OrderedDict()
         if self.cfg_sideband_mode() == 'static':
             f_modulation = self.mw_modulation()
         else:
             f_modulation = 0
 
-        self._wave_dict['I'] = self.wf_func(
+        wave_dict['I'] = self.wf_func(
             amp=0, sigma_length=self.mw_gauss_width(),
             f_modulation=f_modulation,
             sampling_rate=self.sampling_rate(), phase=0,
             motzoi=0)
-        self._wave_dict['rX180'] = self.wf_func(
+        wave_dict['rX180'] = self.wf_func(
             amp=self.mw_amp180(), sigma_length=self.mw_gauss_width(),
             f_modulation=f_modulation,
             sampling_rate=self.sampling_rate(), phase=0,
             motzoi=self.mw_motzoi())
-        self._wave_dict['rY180'] = self.wf_func(
+        wave_dict['rY180'] = self.wf_func(
             amp=self.mw_amp180(), sigma_length=self.mw_gauss_width(),
             f_modulation=f_modulation,
             sampling_rate=self.sampling_rate(), phase=90,
             motzoi=self.mw_motzoi())
-        self._wave_dict['rX90'] = self.wf_func(
+        wave_dict['rX90'] = self.wf_func(
             amp=self.mw_amp180()*self.mw_amp90_scale(),
             sigma_length=self.mw_gauss_width(),
             f_modulation=f_modulation,
             sampling_rate=self.sampling_rate(), phase=0,
             motzoi=self.mw_motzoi())
-        self._wave_dict['rY90'] = self.wf_func(
+        wave_dict['rY90'] = self.wf_func(
             amp=self.mw_amp180()*self.mw_amp90_scale(),
             sigma_length=self.mw_gauss_width(),
             f_modulation=f_modulation,
             sampling_rate=self.sampling_rate(), phase=90,
             motzoi=self.mw_motzoi())
-        self._wave_dict['rXm90'] = self.wf_func(
+        wave_dict['rXm90'] = self.wf_func(
             amp=-1*self.mw_amp180()*self.mw_amp90_scale(),
             sigma_length=self.mw_gauss_width(),
             f_modulation=f_modulation,
             sampling_rate=self.sampling_rate(), phase=0,
             motzoi=self.mw_motzoi())
-        self._wave_dict['rYm90'] = self.wf_func(
+        wave_dict['rYm90'] = self.wf_func(
             amp=-1*self.mw_amp180()*self.mw_amp90_scale(),
             sigma_length=self.mw_gauss_width(),
             f_modulation=f_modulation,
             sampling_rate=self.sampling_rate(), phase=90,
             motzoi=self.mw_motzoi())
 
-        self._wave_dict['rPhi180'] = self.wf_func(
+        wave_dict['rPhi180'] = self.wf_func(
             amp=self.mw_amp180(), sigma_length=self.mw_gauss_width(),
             f_modulation=f_modulation,
             sampling_rate=self.sampling_rate(), phase=self.mw_phi(),
             motzoi=self.mw_motzoi())
-        self._wave_dict['rPhi90'] = self.wf_func(
+        wave_dict['rPhi90'] = self.wf_func(
             amp=self.mw_amp180()*self.mw_amp90_scale(),
             sigma_length=self.mw_gauss_width(),
             f_modulation=f_modulation,
             sampling_rate=self.sampling_rate(), phase=self.mw_phi(),
             motzoi=self.mw_motzoi())
-        self._wave_dict['rPhim90'] = self.wf_func(
+        wave_dict['rPhim90'] = self.wf_func(
             amp=-1*self.mw_amp180()*self.mw_amp90_scale(),
             sigma_length=self.mw_gauss_width(),
             f_modulation=f_modulation,
             sampling_rate=self.sampling_rate(), phase=self.mw_phi(),
             motzoi=self.mw_motzoi())
-        self._wave_dict['spec'] = self.spec_func(
+        wave_dict['spec'] = self.spec_func(
             amp=self.spec_amp(),
             length=self.spec_length(),
             sampling_rate=self.sampling_rate(),
             delay=0,
             phase=0)
 
-        self._wave_dict['rX12'] = self.wf_func(
+        wave_dict['rX12'] = self.wf_func(
             amp=self.mw_ef_amp180(),
             sigma_length=self.mw_gauss_width(),
             f_modulation=self.mw_ef_modulation(),
@@ -186,18 +207,14 @@ class Base_MW_LutMan(Base_LutMan):
 
         for i in range(18):
             angle = i * 20
-            self._wave_dict['r{}_90'.format(angle)] = self.wf_func(
+            wave_dict['r{}_90'.format(angle)] = self.wf_func(
                 amp=self.mw_amp180()*self.mw_amp90_scale(),
                 sigma_length=self.mw_gauss_width(),
                 f_modulation=f_modulation,
                 sampling_rate=self.sampling_rate(), phase=angle,
                 motzoi=self.mw_motzoi())
 
-        if (self.mixer_apply_predistortion_matrix()
-                and apply_predistortion_matrix):
-            self._wave_dict = self.apply_mixer_predistortion_corrections(
-                self._wave_dict)
-        return self._wave_dict
+        return wave_dict
 
     def apply_mixer_predistortion_corrections(self, wave_dict):
         M = wf.mixer_predistortion_matrix(self.mixer_alpha(),
@@ -466,7 +483,8 @@ class AWG8_MW_LutMan(Base_MW_LutMan):
         AWG = self.AWG.get_instr()
 
         awg_nr = self.channel_I()//2
-        AWG.upload_waveform_realtime(I, Q, awg_nr, wf_nr=wf_nr)
+        uploaded = AWG.upload_waveform_realtime(I, Q, awg_nr, wf_nr=wf_nr)
+        self._update_upload_statistics([uploaded])
 
     def _program_hash_differs(self)-> bool:
         """
@@ -623,8 +641,10 @@ class AWG8_VSM_MW_LutMan(AWG8_MW_LutMan):
 
         awg_nr_G = self.channel_GI()//2
         awg_nr_D = self.channel_DI()//2
-        AWG.upload_waveform_realtime(GI, GQ, awg_nr_G, wf_nr=wf_nr)
-        AWG.upload_waveform_realtime(DI, DQ, awg_nr_D, wf_nr=wf_nr)
+        uploaded = [
+            AWG.upload_waveform_realtime(GI, GQ, awg_nr_G, wf_nr=wf_nr),
+            AWG.upload_waveform_realtime(DI, DQ, awg_nr_D, wf_nr=wf_nr)]
+        self._update_upload_statistics(uploaded)
 
     def _set_channel_amp(self, val):
         AWG = self.AWG.get_instr()
@@ -1333,7 +1333,18 @@ class DeviceCCL(Instrument):
             nr_cliffords=np.array([1.,  2.,  3.,  4.,  5.,  6.,  7.,  9., 12.,
                                    15., 20., 25., 30., 50.]), nr_seeds=100,
             interleaving_cliffords=[None], label='TwoQubit_RB_{}seeds_{}_{}',
-            recompile: bool ='as needed', cal_points=True):
+            recompile: bool ='as needed', cal_points=True,
+            seed_offset: int=0):
+        """
+        Measures two qubit randomized benchmarking on "qubits".
+
+        The Clifford sequences are generated with the random seeds
+        seed_offset, ..., seed_offset+nr_seeds-1. The sequences are therefore
+        reproducible: repeating the measurement with the same seed_offset
+        measures the same sequences (and reuses the compiled programs from
+        the program cache), use a different seed_offset to measure new
+        random sequences.
+        """
 
         # Settings that have to be preserved, change is required for
         # 2-state readout and postprocessing
@@ -1356,40 +1367,34 @@ class DeviceCCL(Instrument):
 
         MC.soft_avg(1)
 
-        programs = []
-        t0 = time.time()
         print('Generating {} RB programs'.format(nr_seeds))
         qubit_idxs = [self.find_instrument(q).cfg_qubit_nr() for q in qubits]
-        for i in range(nr_seeds):
-            # check for keyboard interrupt q because generating can be slow
-            check_keyboard_interrupt()
-            sweep_points = np.concatenate(
+        net_cliffords = [0, 3*24+3]
+        # Programs are compiled in parallel (or taken from the program
+        # cache), the measurement starts while later seeds are compiling.
+        seeds = range(seed_offset, seed_offset+nr_seeds)
+        programs = oqh.compile_programs(
+            cl_oql.randomized_benchmarking,
+            [dict(qubits=qubit_idxs,
+                  nr_cliffords=nr_cliffords,
+                  nr_seeds=1,
+                  seed=seed,
+                  platf_cfg=self.cfg_openql_platform_fn(),
+                  program_name='TwoQ_RB_int_cl_s{}_ncl{}_icl{}_netcl{}_{}_{}_double'.format(
+                      seed,
+                      list(map(int, nr_cliffords)),
+                      interleaving_cliffords,
+                      list(map(int, net_cliffords)),
+                      qubits[0], qubits[1]),
+                  interleaving_cliffords=interleaving_cliffords,
+                  cal_points=cal_points,
+                  net_cliffords=net_cliffords,  # measures with and without inverting
+                  f_state_cal_pts=True,
+                  recompile=recompile) for seed in seeds])
+        for p in programs:
+            p.sweep_points = np.concatenate(
                 [nr_cliffords, [nr_cliffords[-1]+.5]*4])
 
-            net_cliffords = [0, 3*24+3]
-            p = cl_oql.randomized_benchmarking(
-                qubits=qubit_idxs,
-                nr_cliffords=nr_cliffords,
-                nr_seeds=1,
-                platf_cfg=self.cfg_openql_platform_fn(),
-                program_name='TwoQ_RB_int_cl_s{}_ncl{}_icl{}_netcl{}_{}_{}_double'.format(
-                    i,
-                    list(map(int, nr_cliffords)),
-                    interleaving_cliffords,
-                    list(map(int, net_cliffords)),
-                    qubits[0], qubits[1]),
-                interleaving_cliffords=interleaving_cliffords,
-                cal_points=cal_points,
-                net_cliffords=net_cliffords,  # measures with and without inverting
-                f_state_cal_pts=True,
-                recompile=recompile)
-            p.sweep_points = sweep_points
-            programs.append(p)
-            print('Generated {} RB programs in {:.1f}s'.format(
-                i+1, time.time()-t0), end='\r')
-        print('Succesfully generated {} RB programs in {:.1f}s'.format(
-            nr_seeds, time.time()-t0))
-
         # to include calibration points
         if cal_points:
             sweep_points = np.append(
@@ -1420,8 +1425,9 @@ class DeviceCCL(Instrument):
         MC.set_sweep_points(np.tile(sweep_points, reps_per_seed*nr_seeds))
 
         MC.set_detector_function(d)
-        MC.run(label.format(nr_seeds, qubits[0], qubits[1]),
-               exp_metadata={'bins': sweep_points})
+        with programs:
+            MC.run(label.format(nr_seeds, qubits[0], qubits[1]),
+                   exp_metadata={'bins': sweep_points})
         # N.B. if interleaving cliffords are used, this won't work
         ma2.RandomizedBenchmarking_TwoQubit_Analysis()
 
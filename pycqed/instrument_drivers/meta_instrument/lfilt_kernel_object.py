@@ -5,6 +5,7 @@ using linear filtering (scipy.signal.lfilter).
 It is based on the kernel_object.DistortionsKernel
 """
 import numpy as np
+from collections import OrderedDict
 from scipy import signal
 from qcodes.instrument.base import Instrument
 from qcodes.utils import validators as vals
@@ -45,6 +46,11 @@ class LinDistortionKernel(Instrument):
                                initial_value={},
                                vals=vals.Dict())
 
+        # Cached result of self.compile_filters and the real-time filter
+        # settings last sent to the AWG.
+        self._compiled_chain = None
+        self._pushed_realtime_settings = {}
+
     def reset_kernels(self):
         """
         Resets all kernels to an empty dict so no distortion is applied.
@@ -66,49 +72,91 @@ class LinDistortionKernel(Instrument):
         Turns off all used real-time distortion filters by setting their
         amplitude to zero. This method of disabling is used so as not to
         change the latency that is introduced.
+
+        This also forgets which real-time settings were sent before, use it
+        if the AWG settings were changed outside of this kernel object.
         """
-        max_exp_filters = 5
-        AWG = self.instr_AWG.get_instr()
+        self._pushed_realtime_settings = {}
+        self._set_realtime_settings(self._realtime_settings_zero(),
+                                    only_changed=False)
 
+    def _realtime_settings_zero(self):
+        """
+        Returns the AWG settings that disable the real-time filters.
+        """
+        max_exp_filters = 5
+        ch = self.cfg_awg_channel()-1
+        settings = OrderedDict()
         # set exp_filters to 0
         for i in range(max_exp_filters):
-            AWG.set(
-                'sigouts_{}_precompensation_exponentials_{}_amplitude'.format(
-                    self.cfg_awg_channel()-1, i), 0)
+            settings['sigouts_{}_precompensation_exponentials_{}_amplitude'
+                     .format(ch, i)] = 0
         # set bounce filters to 0
-        AWG.set(
-            'sigouts_{}_precompensation_bounces_{}_enable'.format(
-                self.cfg_awg_channel()-1, 0), 0)
-
+        settings['sigouts_{}_precompensation_bounces_{}_enable'.format(
+            ch, 0)] = 0
         # set bias-tee filters to 0
         pass  # Currently broken
+        return settings
 
-    def distort_waveform(self, waveform, length_samples: int=None,
-                         inverse: bool=False):
+    def _set_realtime_settings(self, settings: dict,
+                               only_changed: bool=True):
         """
-        Distorts a waveform using the models specified in the Kernel Object.
+        Sets the real-time filter settings on the AWG.
+
         Args:
-            waveform (array)    : waveform to be distorted
-            lenght_samples (int): number of samples after which to cut of wf
-            inverse (bool)      : if True apply the inverse of the waveform.
+            settings (dict)     : {AWG parameter name: value}
+            only_changed (bool) : if True, only settings that differ from
+                the values last set by this kernel object are sent.
+        """
+        AWG = self.instr_AWG.get_instr()
+        pushed = self._pushed_realtime_settings
+        if pushed.get('instr') != (AWG.name, self.cfg_awg_channel()):
+            # the cached values only apply to the same AWG channel
+            pushed.clear()
+            pushed['instr'] = (AWG.name, self.cfg_awg_channel())
+        for par, val in settings.items():
+            if only_changed and par in pushed and pushed[par] == val:
+                continue
+            AWG.set(par, val)
+            pushed[par] = val
 
-        Returns:
-            y_sig (array)       : waveform with distortion filters applied
+    def _filter_models_key(self, inverse: bool):
+        """
+        Returns a hashable representation of all active filter models
+        and the settings that determine the compiled distortion chain.
+        """
+        filters = tuple(
+            _freeze(self.get('filter_model_{:02}'.format(filt_id)))
+            for filt_id in range(self._num_models))
+        return (filters, self.cfg_sampling_rate(), self.cfg_awg_channel(),
+                bool(inverse))
 
-        N.B. the bounce correction does not have an inverse implemented
-            (June 2018) MAR
+    def compile_filters(self, inverse: bool=False):
         """
-        if length_samples is not None:
-            extra_samples = length_samples - len(waveform)
-            if extra_samples >= 0:
-                y_sig = np.concatenate([waveform, np.zeros(extra_samples)])
-            else:
-                y_sig = waveform[:extra_samples]
-        else:
-            y_sig = waveform
+        Combines the active filter models into a single distortion chain.
 
-        # Specific real-time filters are turned on below
-        self.set_realtime_distortions_zero()
+        All software filters are linear and time invariant. The IIR filters
+        are therefore combined into one second-order-sections array and the
+        FIR filters (including the bounce correction) into one FIR kernel.
+        The result is cached and only recompiled if a filter model or
+        relevant setting changes.
+
+        Returns:
+            chain (dict) with keys
+                'sos'      : array of shape (n, 6) or None
+                'fir'      : array of FIR coefficients or None
+                'realtime' : {AWG parameter name: value} for the
+                             real-time filters.
+        """
+        key = self._filter_models_key(inverse=inverse)
+        if self._compiled_chain is not None and \
+                self._compiled_chain['key'] == key:
+            return self._compiled_chain
+
+        sampling_rate = self.cfg_sampling_rate()
+        iir_sections = []
+        fir = np.ones(1)
+        realtime = self._realtime_settings_zero()
         nr_real_time_exp_models = 0
         nr_real_time_hp_models = 0
         nr_real_time_bounce_models = 0
@@ -119,84 +167,152 @@ class LinDistortionKernel(Instrument):
                 pass  # dict is empty
             else:
                 model = filt['model']
+                real_time = 'real-time' in filt.keys() and filt['real-time']
                 if model == 'high-pass':
-                    if ('real-time' in filt.keys() and filt['real-time']):
+                    if real_time:
                         # Implementation tested and found not working -MAR
                         raise NotImplementedError()
                         nr_real_time_hp_models += 1
                         if nr_real_time_hp_models > 1:
                             raise ValueError()
                     else:
-                        y_sig = kf.bias_tee_correction(
-                            y_sig, sampling_rate=self.cfg_sampling_rate(),
-                            inverse=inverse,
-                            **filt['params'])
+                        iir_sections.append(kf.bias_tee_correction_coeffs(
+                            sampling_rate=sampling_rate, inverse=inverse,
+                            **filt['params']))
                 elif model == 'exponential':
-                    if ('real-time' in filt.keys() and filt['real-time']):
-                        AWG = self.instr_AWG.get_instr()
-
-                        AWG.set('sigouts_{}_precompensation_exponentials'
-                                '_{}_timeconstant'.format(
-                                    self.cfg_awg_channel()-1, nr_real_time_exp_models),
-                                filt['params']['tau'])
-                        AWG.set('sigouts_{}_precompensation_exponentials'
-                                '_{}_amplitude'.format(
-                                    self.cfg_awg_channel()-1, nr_real_time_exp_models),
-                                filt['params']['amp'])
-                        AWG.set('sigouts_{}_precompensation_exponentials'
-                                '_{}_enable'.format(self.cfg_awg_channel()-1,
-                                                    nr_real_time_exp_models),
-                                1)
-
-                        nr_real_time_exp_models += 1
-                        if nr_real_time_exp_models > 5:
+                    if real_time:
+                        if nr_real_time_exp_models >= 5:
                             raise ValueError()
+                        par = 'sigouts_{}_precompensation_exponentials_{}_'\
+                            .format(self.cfg_awg_channel()-1,
+                                    nr_real_time_exp_models)
+                        realtime[par+'timeconstant'] = filt['params']['tau']
+                        realtime[par+'amplitude'] = filt['params']['amp']
+                        realtime[par+'enable'] = 1
+                        nr_real_time_exp_models += 1
                     else:
-                        y_sig = kf.exponential_decay_correction(
-                            y_sig, sampling_rate=self.cfg_sampling_rate(),
-                            inverse=inverse,
-                            **filt['params'])
+                        iir_sections.append(
+                            kf.exponential_decay_correction_coeffs(
+                                sampling_rate=sampling_rate, inverse=inverse,
+                                **filt['params']))
                 elif model == 'bounce':
-                    if ('real-time' in filt.keys() and filt['real-time']):
-                        AWG = self.instr_AWG.get_instr()
-
-                        AWG.set('sigouts_{}_precompensation_bounces'
-                                '_{}_delay'.format(
-                                    self.cfg_awg_channel()-1, nr_real_time_bounce_models),
-                                filt['params']['tau'])
-                        AWG.set('sigouts_{}_precompensation_bounces'
-                                '_{}_amplitude'.format(
-                                    self.cfg_awg_channel()-1, nr_real_time_bounce_models),
-                                filt['params']['amp'])
-                        AWG.set('sigouts_{}_precompensation_bounces'
-                                '_{}_enable'.format(self.cfg_awg_channel()-1,
-                                                    nr_real_time_bounce_models),
-                                1)
-
-                        nr_real_time_bounce_models += 1
-                        if nr_real_time_bounce_models > 1:
+                    if real_time:
+                        if nr_real_time_bounce_models >= 1:
                             raise ValueError()
+                        par = 'sigouts_{}_precompensation_bounces_{}_'.format(
+                            self.cfg_awg_channel()-1,
+                            nr_real_time_bounce_models)
+                        realtime[par+'delay'] = filt['params']['tau']
+                        realtime[par+'amplitude'] = filt['params']['amp']
+                        realtime[par+'enable'] = 1
+                        nr_real_time_bounce_models += 1
                     else:
-                        y_sig = kf.first_order_bounce_corr(
-                            sig=y_sig, delay=filt['params']['tau'],
-                            amp=filt['params']['amp'], awg_sample_rate=2.4e9)
+                        # The hardware model of the bounce correction is
+                        # an FIR filter, its impulse response is the kernel.
+                        delay_n_samples = int(round(
+                            2.4e9*filt['params']['tau']))
+                        impulse = np.zeros(delay_n_samples+1)
+                        impulse[0] = 1
+                        fir = np.convolve(fir, kf.first_order_bounce_corr(
+                            sig=impulse, delay=filt['params']['tau'],
+                            amp=filt['params']['amp'],
+                            awg_sample_rate=2.4e9))
 
                 elif model == 'FIR':
-                    if ('real-time' in filt.keys() and filt['real-time']):
-                        raise KeyError('Real-time for {} model implemented'.format(model))
+                    if real_time:
+                        raise KeyError(
+                            'Real-time for {} model implemented'.format(model))
                     else:
-                        fir_filter_coeffs = filt['params']['weights']
-                        y_sig = signal.lfilter(fir_filter_coeffs,1,y_sig)
+                        fir = np.convolve(fir, filt['params']['weights'])
 
                 else:
                     raise KeyError('Model {} not recognized'.format(model))
 
+        sos = None
+        if len(iir_sections) > 0:
+            sos = np.zeros((len(iir_sections), 6))
+            for i, (b, a) in enumerate(iir_sections):
+                sos[i, :2] = np.divide(b, a[0])
+                sos[i, 3:5] = np.divide(a, a[0])
+        if len(fir) == 1 and fir[0] == 1:
+            fir = None
+
+        self._compiled_chain = {'key': key, 'sos': sos, 'fir': fir,
+                                'realtime': realtime}
+        return self._compiled_chain
+
+    def _pad_waveform(self, waveform, length_samples: int=None):
+        waveform = np.asarray(waveform, dtype=float)
+        if length_samples is not None:
+            extra_samples = length_samples - len(waveform)
+            if extra_samples >= 0:
+                return np.concatenate([waveform, np.zeros(extra_samples)])
+            else:
+                return waveform[:extra_samples]
+        return waveform
+
+    def _apply_filters(self, y_sig, inverse: bool=False):
+        """
+        Applies the compiled distortion chain along the last axis of y_sig
+        and sets the real-time filters on the AWG if they changed.
+        """
+        chain = self.compile_filters(inverse=inverse)
+        self._set_realtime_settings(chain['realtime'])
+
+        if chain['sos'] is not None:
+            y_sig = signal.sosfilt(chain['sos'], y_sig, axis=-1)
+        if chain['fir'] is not None:
+            y_sig = signal.lfilter(chain['fir'], 1, y_sig, axis=-1)
+
         if inverse:
-            y_sig /= self.cfg_gain_correction()
+            y_sig = y_sig / self.cfg_gain_correction()
         else:
-            y_sig *= self.cfg_gain_correction()
+            y_sig = y_sig * self.cfg_gain_correction()
         return y_sig
 
+    def distort_waveform(self, waveform, length_samples: int=None,
+                         inverse: bool=False):
+        """
+        Distorts a waveform using the models specified in the Kernel Object.
+        Args:
+            waveform (array)    : waveform to be distorted
+            lenght_samples (int): number of samples after which to cut of wf
+            inverse (bool)      : if True apply the inverse of the waveform.
+
+        Returns:
+            y_sig (array)       : waveform with distortion filters applied
+
+        N.B. the bounce correction does not have an inverse implemented
+            (June 2018) MAR
+        """
+        y_sig = self._pad_waveform(waveform, length_samples=length_samples)
+        return self._apply_filters(y_sig, inverse=inverse)
+
+    def distort_waveforms(self, waveforms, length_samples: int=None,
+                          inverse: bool=False):
+        """
+        Distorts a list of waveforms in a single pass through the filters.
+        Args:
+            waveforms (list)    : waveforms to be distorted
+            lenght_samples (int): number of samples after which to cut of wfs
+            inverse (bool)      : if True apply the inverse of the waveform.
+
+        Returns:
+            y_sigs (list)       : waveforms with distortion filters applied
+        """
+        y_sigs = [self._pad_waveform(wf, length_samples=length_samples)
+                  for wf in waveforms]
+        if len(y_sigs) == 0:
+            return []
+        # All filters are causal, so zero padding at the end does not change
+        # the samples that are kept.
+        lengths = [len(y) for y in y_sigs]
+        y_arr = np.zeros((len(y_sigs), max(lengths)))
+        for i, y in enumerate(y_sigs):
+            y_arr[i, :len(y)] = y
+        y_arr = self._apply_filters(y_arr, inverse=inverse)
+        return [y_arr[i, :l] for i, l in enumerate(lengths)]
+
     def print_overview(self):
         print("*"*80)
         print("Overview of {}".format(self.name))
@@ -214,3 +330,16 @@ class LinDistortionKernel(Instrument):
                     print('\treal-time : False')
 
         print("*"*80)
+
+
+def _freeze(value):
+    """
+    Converts (nested) dicts, lists and arrays to hashable tuples.
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    elif isinstance(value, np.ndarray):
+        return (value.dtype.str, value.shape, value.tobytes())
+    elif isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
@@ -2948,7 +2948,7 @@ class CCLight_Transmon(Qubit):
             self, nr_cliffords=2**np.arange(12), nr_seeds=100,
             MC=None,
             recompile: bool ='as needed', prepare_for_timedomain: bool=True,
-            ignore_f_cal_pts: bool=False):
+            ignore_f_cal_pts: bool=False, seed_offset: int=0):
         """
         Measures randomized benchmarking decay including second excited state
         population.
@@ -2959,6 +2959,13 @@ class CCLight_Transmon(Qubit):
             - performs RB both with and without an extra pi-pulse
             - Includes calibration poitns for 0, 1, and 2 (g,e, and f)
             - analysis extracts fidelity and leakage/seepage
+
+        The Clifford sequences are generated with the random seeds
+        seed_offset, ..., seed_offset+nr_seeds-1. The sequences are therefore
+        reproducible: repeating the measurement with the same seed_offset
+        measures the same sequences (and reuses the compiled programs from
+        the program cache), use a different seed_offset to measure new
+        random sequences.
         """
 
         # because only 1 seed is uploaded each time
@@ -2987,24 +2994,22 @@ class CCLight_Transmon(Qubit):
         mw_lutman = self.instr_LutMan_MW.get_instr()
         mw_lutman.load_ef_rabi_pulses_to_AWG_lookuptable()
 
-        t0 = time.time()
         net_cliffords = [0, 3]  # always measure double sided
         print('Generating {} RB programs'.format(nr_seeds))
-        for i in range(nr_seeds):
-            p = cl_oql.randomized_benchmarking(
-                qubits=[self.cfg_qubit_nr()],
-                nr_cliffords=nr_cliffords,
-                net_cliffords=net_cliffords,  # always measure double sided
-                nr_seeds=1,
-                platf_cfg=self.cfg_openql_platform_fn(),
-                program_name='RB_s{}_ncl{}_net{}_{}'.format(
-                    i, nr_cliffords, net_cliffords, self.name),
-                recompile=recompile)
-            programs.append(p)
-            print('Generated {} RB programs in {:.1f}s'.format(
-                i+1, time.time()-t0), end='\r')
-        print('Succesfully generated {} RB programs in {:.1f}s'.format(
-            nr_seeds, time.time()-t0))
+        # Programs are compiled in parallel (or taken from the program
+        # cache), the measurement starts while later seeds are compiling.
+        seeds = range(seed_offset, seed_offset+nr_seeds)
+        programs = oqh.compile_programs(
+            cl_oql.randomized_benchmarking,
+            [dict(qubits=[self.cfg_qubit_nr()],
+                  nr_cliffords=nr_cliffords,
+                  net_cliffords=net_cliffords,
+                  nr_seeds=1,
+                  seed=seed,
+                  platf_cfg=self.cfg_openql_platform_fn(),
+                  program_name='RB_s{}_ncl{}_net{}_{}'.format(
+                      seed, nr_cliffords, net_cliffords, self.name),
+                  recompile=recompile) for seed in seeds])
         prepare_function_kwargs = {
             'counter_param': counter_param,
             'programs': programs,
@@ -3029,8 +3034,9 @@ class CCLight_Transmon(Qubit):
         MC.set_sweep_function(s)
         MC.set_sweep_points(np.tile(sweep_points, reps_per_seed*nr_seeds))
         MC.set_detector_function(d)
-        MC.run('RB_{}seeds'.format(nr_seeds)+self.msmt_suffix,
-               exp_metadata={'bins': sweep_points})
+        with programs:
+            MC.run('RB_{}seeds'.format(nr_seeds)+self.msmt_suffix,
+                   exp_metadata={'bins': sweep_points})
 
         a = ma2.RandomizedBenchmarking_SingleQubit_Analysis(
             label='RB_', ignore_f_cal_pts=ignore_f_cal_pts)
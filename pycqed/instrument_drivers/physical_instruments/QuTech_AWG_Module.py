@@ -64,6 +64,10 @@ class QuTech_AWG_Module(SCPI):
         self.device_descriptor.mvals_trigger_level = vals.Numbers(0, 5.0)
         # FIXME: not in [V]
 
+        # codeword assignments collected by set_waveforms, None if the
+        # codewords are assigned directly
+        self._cw_cmds = None
+
         self.add_parameters()
         self.connect_message()
 
@@ -330,12 +334,43 @@ class QuTech_AWG_Module(SCPI):
         wf_name = 'wave_ch{}_cw{:03}'.format(ch, cw)
         cw_cmd = 'sequence:element{:d}:waveform{:d}'.format(cw, ch)
         self.createWaveformReal(wf_name, waveform)
-        self.write(cw_cmd + ' "{:s}"'.format(wf_name))
+        if self._cw_cmds is not None:
+            # set_waveforms assigns all codewords in a single command
+            self._cw_cmds.append(cw_cmd + ' "{:s}"'.format(wf_name))
+        else:
+            self.write(cw_cmd + ' "{:s}"'.format(wf_name))
 
     def _get_cw_waveform(self, ch: int, cw: int):
         wf_name = 'wave_ch{}_cw{:03}'.format(ch, cw)
         return self.getWaveformDataFloat(wf_name)
 
+    def set_waveforms(self, waveforms: dict, upload_program: bool=False):
+        """
+        Sets the waveforms of many codeword parameters at once.
+
+        The data of all waveforms is sent first, after which all codewords
+        are assigned in a single (compound) command.
+
+        Args:
+            waveforms (dict): maps codeword parameter names
+                (e.g., "wave_ch1_cw001") to waveform arrays.
+            upload_program (bool): ignored, the QWG does not require
+                a program upload for new codeword waveforms. Present for
+                compatibility with the ZI_HDAWG8.
+        Returns:
+            changed (list): names of the parameters that were written.
+        """
+        self._cw_cmds = []
+        try:
+            for wf_name, waveform in waveforms.items():
+                self.set(wf_name, waveform)
+        finally:
+            # also assigns the waveforms that were set before an error
+            cw_cmds, self._cw_cmds = self._cw_cmds, None
+            if len(cw_cmds) > 0:
+                self.write(';:'.join(cw_cmds))
+        return list(waveforms.keys())
+
     def start(self):
         '''
         Activates output on channels with the current settings. When started this function will check for possible warnings
@@ -503,43 +503,54 @@ class UHFQC(Instrument):
             acquisition_time (float): time in sec between polls? # TODO check with Niels H
             timeout (float): time in seconds before timeout Error is raised.
 
+        Returns:
+            data (dict): the data of every channel, labeled by the index of
+                the channel in acquisition_initialize.
         """
-        data = {k: [] for k, dummy in enumerate(self.acquisition_paths)}
+        data = self.acquisition_poll_array(samples, arm=arm,
+                                           acquisition_time=acquisition_time)
+        return {n: d for n, d in enumerate(data)}
+
+    def acquisition_poll_array(self, samples, arm=True,
+                               acquisition_time=0.010):
+        """
+        Polls the UHFQC for data, see acquisition_poll.
+
+        The polled vectors are written in place into a preallocated array.
+
+        Returns:
+            data (array): (channels x samples) array with the data of the
+                channels in the order of acquisition_initialize.
+        """
+        nr_paths = len(self.acquisition_paths)
+        data = np.empty((nr_paths, samples))
+        # number of samples received per channel
+        nr_received = np.zeros(nr_paths, dtype=int)
 
         # Start acquisition
         if arm:
             self.acquisition_arm()
 
         # Acquire data
-        gotem = [False]*len(self.acquisition_paths)
         accumulated_time = 0
-
-        while accumulated_time < self.timeout() and not all(gotem):
+        while (accumulated_time < self.timeout() and
+               np.any(nr_received < samples)):
             dataset = self._daq.poll(acquisition_time, 1, 4, True)
 
             for n, p in enumerate(self.acquisition_paths):
                 if p in dataset:
                     for v in dataset[p]:
-                        data[n] = np.concatenate((data[n], v['vector']))
-                        if len(data[n]) >= samples:
-                            gotem[n] = True
-                
-                #if p in dataset:
-                #    for v in dataset[p]:
-                #        if n in data:
-                #            data[n] = np.concatenate((data[n], v['vector']))
-                #        else:
-                #            data[n] = v['vector']
-                #        if len(data[n]) >= samples:
-                #            gotem[n] = True
+                        start = nr_received[n]
+                        vector = v['vector'][:samples-start]
+                        data[n, start:start+len(vector)] = vector
+                        nr_received[n] += len(vector)
             accumulated_time += acquisition_time
 
-        if not all(gotem):
+        if np.any(nr_received < samples):
             self.acquisition_finalize()
-            for n, c in enumerate(self.acquisition_paths):
-                if n in data:
-                    print("\t: Channel {}: Got {} of {} samples".format(
-                          n, len(data[n]), samples))
+            for n in range(nr_paths):
+                print("\t: Channel {}: Got {} of {} samples".format(
+                      n, nr_received[n], samples))
             raise TimeoutError("Error: Didn't get all results!")
 
         return data
@@ -733,16 +744,16 @@ class UHFQC(Instrument):
         else:
             return '/' + self._device + '/' + path
 
-    def seti(self, path, value, async=False):
-        if async:
+    def seti(self, path, value, asynchronous=False):
+        if asynchronous:
             func = self._daq.asyncSetInt
         else:
             func = self._daq.setInt
 
         func(self._make_full_path(path), int(value))
 
-    def setd(self, path, value, async=False):
-        if async:
+    def setd(self, path, value, asynchronous=False):
+        if asynchronous:
             func = self._daq.asyncSetDouble
         else:
             func = self._daq.setDouble
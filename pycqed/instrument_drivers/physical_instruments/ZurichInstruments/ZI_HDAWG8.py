@@ -5,6 +5,7 @@ import numpy as np
 from . import zishell_NH as zs
 from qcodes.utils import validators as vals
 from .ZI_base_instrument import ZI_base_instrument
+from .codeword_waveforms import CodewordWaveformsMixin
 from qcodes.instrument.parameter import ManualParameter
 from zlib import crc32
 
@@ -12,7 +13,7 @@ import ctypes
 from ctypes.wintypes import MAX_PATH
 
 
-class ZI_HDAWG8(ZI_base_instrument):
+class ZI_HDAWG8(CodewordWaveformsMixin, ZI_base_instrument):
     """
     This is PycQED/QCoDeS driver driver for the Zurich Instruments HD AWG-8.
 
@@ -74,6 +75,12 @@ class ZI_HDAWG8(ZI_base_instrument):
             self._num_channels = 8
             logging.warning('Unknown device type. Assuming eight channels.')
 
+        # Last waveform written for each codeword parameter, used to skip
+        # unchanged uploads and to serve reads without touching the disk.
+        self._waveform_cache = {}
+        # Last waveforms uploaded in realtime {(awg_nr, wf_nr): data},
+        # these are overwritten when a new program is uploaded.
+        self._realtime_waveform_cache = {}
         self._add_codeword_parameters()
         self._add_extra_parameters()
         self.connect_message(begin_time=t0)
@@ -134,6 +141,9 @@ class ZI_HDAWG8(ZI_base_instrument):
         self._dev.configure_awg_from_string(awg_nr=awg_nr,
                                             program_string=program_string,
                                             timeout=timeout)
+        for key in list(self._realtime_waveform_cache.keys()):
+            if key[0] == awg_nr:
+                del self._realtime_waveform_cache[key]
         hash = crc32(program_string.encode('utf-8'))
         self.set('awgs_{}_sequencer_program_crc32_hash'.format(awg_nr),
                  hash)
@@ -344,41 +354,6 @@ class ZI_HDAWG8(ZI_base_instrument):
                     docstring=docst)
                 self._params_to_skip_update.append(parname)
 
-    def _gen_write_csv(self, wf_name):
-        def write_func(waveform):
-            # The lenght of AWG8 waveforms should be a multiple of 8 samples.
-            if (len(waveform) % 8) != 0:
-                extra_zeros = 8-(len(waveform) % 8)
-                waveform = np.concatenate([waveform, np.zeros(extra_zeros)])
-            return self._write_csv_waveform(
-                wf_name=wf_name, waveform=waveform)
-        return write_func
-
-    def _gen_read_csv(self, wf_name):
-        def read_func():
-            return self._read_csv_waveform(
-                wf_name=wf_name)
-        return read_func
-
-    def _write_csv_waveform(self, wf_name: str, waveform):
-        filename = os.path.join(
-            self.lab_one_webserver_path, 'awg', 'waves',
-            self._devname+'_'+wf_name+'.csv')
-        with open(filename, 'w') as f:
-            np.savetxt(filename, waveform, delimiter=",")
-
-    def _read_csv_waveform(self, wf_name: str):
-        filename = os.path.join(
-            self.lab_one_webserver_path, 'awg', 'waves',
-            self._devname+'_'+wf_name+'.csv')
-        try:
-            return np.genfromtxt(filename, delimiter=',')
-        except OSError as e:
-            # if the waveform does not exist yet dont raise exception
-            logging.warning(e)
-            print(e)
-            return None
-
     # Note: This was added for debugging by NielsH.
     # If we do not need it for a few days we should remove it. (2/10/2017)
     # def stop_awg(self):
@@ -417,10 +392,9 @@ class ZI_HDAWG8(ZI_base_instrument):
         """
         t0 = time.time()
         wf = np.zeros(32)
-        waveform_params = [value for key, value in self.parameters.items()
-                           if 'wave_ch' in key.lower()]
-        for par in waveform_params:
-            par(wf)
+        waveforms = {key: wf for key in self.parameters.keys()
+                     if 'wave_ch' in key.lower()}
+        self.set_waveforms(waveforms)
         t1 = time.time()
         print('Set all zeros waveforms in {:.1f} s'.format(t1-t0))
 
@@ -440,7 +414,11 @@ class ZI_HDAWG8(ZI_base_instrument):
         - w0 and w1 must be of the same length
         - any parts of a waveform longer than w0/w1 will not be overwritten.
         - loading speed depends on the size of w0 and w1 and is ~80ms for 20us.
+        - the upload is skipped if the same waveforms were uploaded since
+          the last program upload.
 
+        Returns:
+            uploaded (bool): False if the upload was skipped.
         """
         # these two attributes are added for debugging purposes.
         # they allow checking what the realtime loaded waveforms are.
@@ -448,9 +426,14 @@ class ZI_HDAWG8(ZI_base_instrument):
         self._realtime_w1 = w1
 
         c = np.vstack((w0, w1)).reshape((-2,), order='F')
-        self._dev.seti('awgs/{}/waveform/index'.format(awg_nr), wf_nr)
-        self._dev.setv('awgs/{}/waveform/data'.format(awg_nr), c)
+        cached_c = self._realtime_waveform_cache.get((awg_nr, wf_nr), None)
+        uploaded = cached_c is None or not np.array_equal(cached_c, c)
+        if uploaded:
+            self._dev.seti('awgs/{}/waveform/index'.format(awg_nr), wf_nr)
+            self._dev.setv('awgs/{}/waveform/data'.format(awg_nr), c)
+            self._realtime_waveform_cache[(awg_nr, wf_nr)] = c
         self._dev.seti('awgs/{}/enable'.format(awg_nr), wf_nr)
+        return uploaded
 
     def upload_codeword_program(self, awgs=np.arange(4)):
         """
@@ -0,0 +1,135 @@
+import re
+import os
+import logging
+import numpy as np
+
+# matches the names of the codeword parameters, e.g., "wave_ch1_cw001"
+_codeword_par_name = re.compile(r'^wave_ch(?P<ch>\d+)_cw(?P<cw>\d+)$')
+
+
+class CodewordWaveformsMixin(object):
+    """
+    Codeword waveform handling shared by the ZI_HDAWG8 driver and the
+    VirtualAWG8.
+
+    The waveforms of the codeword parameters are stored as CSV files in the
+    "awg/waves" folder of the LabOne webserver directory. The last written
+    waveform of every codeword is kept in memory, unchanged waveforms are
+    not rewritten and reads are served from memory.
+
+    The instrument is expected to define the attributes
+    "lab_one_webserver_path", "_devname", "_waveform_cache" and
+    "_realtime_waveform_cache" and the method "upload_codeword_program".
+    """
+
+    def _gen_write_csv(self, wf_name):
+        def write_func(waveform):
+            waveform = self._pad_waveform(waveform)
+            if self._waveform_is_cached(wf_name, waveform):
+                return
+            self._write_csv_waveform(wf_name=wf_name, waveform=waveform)
+            self._waveform_cache[wf_name] = waveform
+        return write_func
+
+    def _gen_read_csv(self, wf_name):
+        def read_func():
+            if wf_name in self._waveform_cache:
+                return self._waveform_cache[wf_name].copy()
+            waveform = self._read_csv_waveform(wf_name=wf_name)
+            if waveform is not None:
+                self._waveform_cache[wf_name] = np.atleast_1d(waveform)
+            return waveform
+        return read_func
+
+    @staticmethod
+    def _pad_waveform(waveform):
+        """
+        Returns a float copy of the waveform padded with zeros to a
+        multiple of 8 samples (required length of AWG8 waveforms).
+        """
+        waveform = np.array(waveform, dtype=float).ravel()
+        if (len(waveform) % 8) != 0:
+            extra_zeros = 8-(len(waveform) % 8)
+            waveform = np.concatenate([waveform, np.zeros(extra_zeros)])
+        return waveform
+
+    def _waveform_is_cached(self, wf_name: str, waveform):
+        cached_wf = self._waveform_cache.get(wf_name, None)
+        return cached_wf is not None and np.array_equal(cached_wf, waveform)
+
+    def clear_waveform_cache(self):
+        """
+        Forgets the waveforms that were last written for each codeword.
+        Use this if the wave files have been modified outside of this
+        driver, the next set will then always be written to disk.
+        This also forgets the waveforms uploaded in realtime.
+        """
+        self._waveform_cache = {}
+        self._realtime_waveform_cache = {}
+
+    def _waveform_filename(self, wf_name: str):
+        return os.path.join(
+            self.lab_one_webserver_path, 'awg', 'waves',
+            self._devname+'_'+wf_name+'.csv')
+
+    def _write_csv_waveform(self, wf_name: str, waveform):
+        # ndarray.tofile formats the values in C, this is much faster than
+        # np.savetxt which formats every sample in a python loop.
+        filename = self._waveform_filename(wf_name)
+        with open(filename, 'w') as f:
+            np.asarray(waveform, dtype=float).tofile(
+                f, sep='\n', format='%.18e')
+            f.write('\n')
+
+    def _read_csv_waveform(self, wf_name: str):
+        filename = self._waveform_filename(wf_name)
+        try:
+            return np.genfromtxt(filename, delimiter=',')
+        except OSError as e:
+            # if the waveform does not exist yet dont raise exception
+            logging.warning(e)
+            print(e)
+            return None
+
+    @staticmethod
+    def _codeword_awg_nr(wf_name: str):
+        """
+        Returns the number of the AWG that plays a codeword parameter.
+        Channels are numbered from 1 and coupled in pairs of 2.
+        """
+        match = _codeword_par_name.match(wf_name)
+        if match is None:
+            raise ValueError(
+                '"{}" is not a codeword parameter'.format(wf_name))
+        return (int(match.group('ch'))-1)//2
+
+    def set_waveforms(self, waveforms: dict, upload_program: bool=False):
+        """
+        Sets the waveforms of many codeword parameters at once.
+
+        Waveforms that are identical to the last written waveform of a
+        codeword are skipped, only the changed ones are written to the
+        LabOne webserver directory.
+
+        Args:
+            waveforms (dict): maps codeword parameter names
+                (e.g., "wave_ch1_cw001") to waveform arrays.
+            upload_program (bool): if True, recompiles the codeword program
+                of the AWGs that have changed waveforms. The waveforms only
+                take effect on the device after the program is uploaded.
+        Returns:
+            changed (list): names of the parameters that were written.
+        """
+        changed = []
+        for wf_name, waveform in waveforms.items():
+            if not self._waveform_is_cached(wf_name,
+                                            self._pad_waveform(waveform)):
+                changed.append(wf_name)
+            # the set command of the parameter skips unchanged waveforms
+            self.set(wf_name, waveform)
+
+        if upload_program and len(changed) > 0:
+            awgs = sorted({self._codeword_awg_nr(wf_name)
+                           for wf_name in changed})
+            self.upload_codeword_program(awgs=awgs)
+        return changed
@@ -327,13 +327,16 @@ class dummy_UHFQC(Instrument):
         """
         Dummy version of UHFQC acquisiton poll
         """
-        data = dict()
+        data = self.acquisition_poll_array(samples, arm, acquisition_time)
+        return {n: d for n, d in enumerate(data)}
+
+    def acquisition_poll_array(self, samples, arm=True,
+                               acquisition_time=0.010):
+        """
+        Dummy version of UHFQC acquisition_poll_array
+        """
         # puts dummy data in all channels of the expected length
-        # channels are labeled as integers
-        channels = self._acquisition_channels
-        for ch in channels:
-            data[ch] = np.random.rand(samples)
-        return data
+        return np.random.rand(len(self._acquisition_channels), samples)
 
     def acquisition(self, samples, acquisition_time=0.010, timeout=0,
                     channels=set([0, 1]), mode='rl'):
@@ -395,16 +398,16 @@ class dummy_UHFQC(Instrument):
         else:
             return '/' + self._device + '/' + path
 
-    def seti(self, path, value, async=False):
-        if async:
+    def seti(self, path, value, asynchronous=False):
+        if asynchronous:
             func = self._daq.asyncSetInt
         else:
             func = self._daq.setInt
 
         func(self._make_full_path(path), int(value))
 
-    def setd(self, path, value, async=False):
-        if async:
+    def setd(self, path, value, asynchronous=False):
+        if asynchronous:
             func = self._daq.asyncSetDouble
         else:
             func = self._daq.setDouble
@@ -89,6 +89,11 @@ class NoiseParametersCZ(Instrument):
                            label='scaling factor for T2_q0_amplitude_dependent',
                            parameter_class=ManualParameter,
                            vals=vals.Numbers())
+        self.add_parameter('propagator_engine',
+                           label='"numpy" uses czf.time_evolution_numpy, "qutip" uses czf.time_evolution_new to compute the propagator',
+                           parameter_class=ManualParameter,
+                           vals=vals.Enum('numpy', 'qutip'),
+                           initial_value='qutip')
 
 
         
@@ -4,20 +4,26 @@ from qcodes.instrument.base import Instrument
 from qcodes.instrument.parameter import ManualParameter
 from qcodes.utils import validators as vals
 from zlib import crc32
+from pycqed.instrument_drivers.physical_instruments.ZurichInstruments.\
+    codeword_waveforms import CodewordWaveformsMixin
 
 
-class VirtualAWG8(Instrument):
+class VirtualAWG8(CodewordWaveformsMixin, Instrument):
     """
     Dummy instrument that implements some of the interface of the AWG8.
     Most notably the codewords.
 
+    If a "lab_one_webserver_path" is specified the codeword waveforms are
+    written to and read from CSV files in the same way as in the ZI_HDAWG8.
+
     We could also code generate a dummy interface from the json files and
     have an abstract ZI virtual instrument. This is right now beyond
     the scope.
     """
 
-    def __init__(self, name):
+    def __init__(self, name, lab_one_webserver_path: str=None):
         super().__init__(name)
+        self.lab_one_webserver_path = lab_one_webserver_path
         self.add_parameter('timeout', unit='s', initial_value=5,
                            parameter_class=ManualParameter,
                            vals=vals.MultiType(vals.Numbers(min_value=0),
@@ -26,6 +32,10 @@ class VirtualAWG8(Instrument):
         self._num_codewords = 256
 
         self._devname = 'dev{}'.format(name)
+        # Last waveform written for each codeword parameter
+        self._waveform_cache = {}
+        # Last waveforms uploaded in realtime {(awg_nr, wf_nr): data}
+        self._realtime_waveform_cache = {}
 
         self._add_codeword_parameters()
         self.add_dummy_parameters()
@@ -49,7 +59,7 @@ class VirtualAWG8(Instrument):
             # Adding precompensation pars
             for j in range(8):
                 self.add_parameter('sigouts_{}_precompensation_exponentials'
-                                   '_{}_timecofnstant'.format(i, j),
+                                   '_{}_timeconstant'.format(i, j),
                                    parameter_class=ManualParameter)
                 self.add_parameter('sigouts_{}_precompensation_exponentials'
                                    '_{}_amplitude'.format(i, j),
@@ -100,13 +110,17 @@ class VirtualAWG8(Instrument):
         for ch in range(self._num_channels):
             for cw in range(self._num_codewords):
                 parname = 'wave_ch{}_cw{:03}'.format(ch+1, cw)
+                if self.lab_one_webserver_path is None:
+                    par_kw = {'parameter_class': ManualParameter}
+                else:
+                    par_kw = {'set_cmd': self._gen_write_csv(parname),
+                              'get_cmd': self._gen_read_csv(parname)}
                 self.add_parameter(
                     parname,
                     label='Waveform channel {} codeword {:03}'.format(
                         ch+1, cw),
                     vals=vals.Arrays(),  # min_value, max_value = unknown
-                    parameter_class=ManualParameter,
-                    docstring=docst)
+                    docstring=docst, **par_kw)
                 self._params_to_skip_update.append(parname)
 
     def upload_codeword_program(self, awgs=np.arange(4)):
@@ -119,6 +133,9 @@ class VirtualAWG8(Instrument):
     def configure_awg_from_string(self, awg_nr: int, program_string: str,
                                   timeout: float=15):
         # Actual uploading does not exist in the dummy AWG8
+        for key in list(self._realtime_waveform_cache.keys()):
+            if key[0] == awg_nr:
+                del self._realtime_waveform_cache[key]
         hash = crc32(program_string.encode('utf-8'))
         self.set('awgs_{}_sequencer_program_crc32_hash'.format(awg_nr),
                  hash)
@@ -144,7 +161,11 @@ class VirtualAWG8(Instrument):
         - w0 and w1 must be of the same length
         - any parts of a waveform longer than w0/w1 will not be overwritten.
         - loading speed depends on the size of w0 and w1 and is ~80ms for 20us.
+        - the upload is skipped if the same waveforms were uploaded since
+          the last program upload.
 
+        Returns:
+            uploaded (bool): False if the upload was skipped.
         """
         # these two attributes are added for debugging purposes.
         # they allow checking what the realtime loaded waveforms are.
@@ -153,3 +174,8 @@ class VirtualAWG8(Instrument):
         # stacking is here to mimic the full realtime loading
         c = np.vstack((w0, w1)).reshape((-2,), order='F')
         self._realtime_wf_c = c
+        cached_c = self._realtime_waveform_cache.get((awg_nr, wf_nr), None)
+        if cached_c is not None and np.array_equal(cached_c, c):
+            return False
+        self._realtime_waveform_cache[(awg_nr, wf_nr)] = c
+        return True
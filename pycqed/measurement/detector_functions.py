@@ -6,12 +6,13 @@ import numpy as np
 import logging
 import time
 from string import ascii_uppercase
+from concurrent.futures import ThreadPoolExecutor
 from pycqed.analysis import analysis_toolbox as a_tools
 from pycqed.analysis.fit_toolbox import functions as fn
 from pycqed.measurement.waveform_control import pulse
 from pycqed.measurement.waveform_control import element
 from pycqed.measurement.waveform_control import sequence
-from qcodes.instrument.parameter import _BaseParameter
+from qcodes.instrument.parameter import _BaseParameter, ManualParameter
 from pycqed.instrument_drivers.virtual_instruments.pyqx import qasm_loader as ql
 
 
@@ -1425,10 +1426,8 @@ class UHFQC_input_average_detector(Hard_Detector):
         if self.AWG is not None:
             self.AWG.start()
 
-        data_raw = self.UHFQC.acquisition_poll(samples=self.nr_sweep_points,
-                                               arm=False, acquisition_time=0.01)
-        data = np.array([data_raw[key]
-                         for key in sorted(data_raw.keys())])
+        data = self.UHFQC.acquisition_poll_array(
+            samples=self.nr_sweep_points, arm=False, acquisition_time=0.01)
         # IMPORTANT: No re-scaling factor needed for input average mode as the UHFQC returns volts
         # Verified January 2018 by Xavi
 
@@ -1482,6 +1481,17 @@ class UHFQC_demodulated_input_avg_det(UHFQC_input_average_detector):
         return ret_data
 
 
+def _get_trans_offsets(UHFQC, channels):
+    """
+    Returns the offsets of the linear transformation (crosstalk suppression)
+    of the channels as a column vector, to be subtracted from the
+    (channels x samples) data.
+    """
+    return np.array([[UHFQC.get(
+        'quex_trans_offset_weightfunction_{}'.format(channel))]
+        for channel in channels])
+
+
 class UHFQC_integrated_average_detector(Hard_Detector):
 
     '''
@@ -1651,24 +1661,23 @@ class UHFQC_integrated_average_detector(Hard_Detector):
         if self.AWG is not None:
             self.AWG.start()
 
-        data_raw = self.UHFQC.acquisition_poll(
+        # (channels x samples) array, the processing below is done in place
+        data = self.UHFQC.acquisition_poll_array(
             samples=self.nr_sweep_points, arm=False, acquisition_time=0.01)
-
-        data = np.array([data_raw[key]
-                         for key in sorted(data_raw.keys())])*self.scaling_factor
+        data *= self.scaling_factor
 
         # Corrects offsets after crosstalk suppression matrix in UFHQC
         if self.result_logging_mode == 'lin_trans':
-            for i, channel in enumerate(self.channels):
-                data[i] = data[i]-self.UHFQC.get(
-                    'quex_trans_offset_weightfunction_{}'.format(channel))
+            data -= _get_trans_offsets(self.UHFQC, self.channels)
         if not self.real_imag:
             data = self.convert_to_polar(data)
 
         no_virtual_channels = len(self.value_names)//len(self.channels)
-
-        data = np.reshape(data.T,
-                          (-1, no_virtual_channels, len(self.channels))).T
+        if no_virtual_channels == 1:
+            return data
+        # samples are ordered as (point, virtual channel)
+        data = data.reshape(
+            (len(self.channels), -1, no_virtual_channels)).transpose(0, 2, 1)
         data = data.reshape((len(self.value_names), -1))
         return data
 
@@ -1680,11 +1689,9 @@ class UHFQC_integrated_average_detector(Hard_Detector):
         if len(data)%2 != 0:
             raise ValueError('Expect even number of channels for rotation. Got {}'.format(
                              len(data)))
-        for i in range(len(data)//2):
-            I, Q = data[2*i], data[2*i+1]
-            S21 = I + 1j*Q
-            data[2*i] = np.abs(S21)
-            data[2*i+1] = np.angle(S21)/(2*np.pi)*360
+        S21 = data[0::2] + 1j*data[1::2]
+        data[0::2] = np.abs(S21)
+        data[1::2] = np.angle(S21, deg=True)
         return data
 
     def acquire_data_point(self):
@@ -1999,6 +2006,13 @@ class UHFQC_integration_logging_det(Hard_Detector):
     def get_values(self):
         if self.always_prepare:
             self.prepare()
+        self.arm()
+        return self.transfer()
+
+    def arm(self):
+        """
+        Arms the UHFQC and starts the AWG.
+        """
         if self.AWG is not None:
             self.AWG.stop()
         self.UHFQC.quex_rl_readout(self._get_readout())  # resets UHFQC internal readout counters
@@ -2007,16 +2021,17 @@ class UHFQC_integration_logging_det(Hard_Detector):
         if self.AWG is not None:
             self.AWG.start()
 
-        data_raw = self.UHFQC.acquisition_poll(
+    def transfer(self):
+        """
+        Polls the UHFQC for the data of the armed acquisition.
+        """
+        data = self.UHFQC.acquisition_poll_array(
             samples=self.nr_shots, arm=False, acquisition_time=0.01)
-        data = np.array([data_raw[key]
-                         for key in sorted(data_raw.keys())])*self.scaling_factor
+        data *= self.scaling_factor
 
         # Corrects offsets after crosstalk suppression matrix in UFHQC
         if self.result_logging_mode == 'lin_trans':
-            for i, channel in enumerate(self.channels):
-                data[i] = data[i]-self.UHFQC.get(
-                    'quex_trans_offset_weightfunction_{}'.format(channel))
+            data -= _get_trans_offsets(self.UHFQC, self.channels)
         return data
 
     def prepare(self, sweep_points):
@@ -2051,6 +2066,148 @@ class UHFQC_integration_logging_det(Hard_Detector):
             self.AWG.stop()
 
 
+class Pipelined_multi_program_det(Hard_Detector):
+    """
+    Detector for experiments that are spread over multiple OpenQL programs
+    (e.g., the seeds of RB), wrapping a UHFQC_integration_logging_det.
+    It replaces using "load_range_of_oql_programs" as prepare_function.
+
+    Every call of get_values measures the next program. As soon as the
+    UHFQC has finished the acquisition of a program, the next program (if
+    any) is uploaded to the CC on a background thread. The upload overlaps
+    with the data transfer from the UHFQC and with the processing of the
+    data by the MC, prepare only waits for the upload to be finished.
+
+    The duration of every phase of every call is stored in self.timings:
+        upload      : time prepare waited for the program upload
+        arm         : arming the UHFQC and starting the CC
+        acquisition : waiting for the UHFQC to finish the acquisition
+        transfer    : polling the data from the UHFQC
+    """
+
+    def __init__(self, detector, programs: list, CC, counter_param=None,
+                 varying_nr_shots: bool=False,
+                 acquisition_poll_interval: float=0.001, **kw):
+        """
+        Args:
+            detector (Detector) : UHFQC_integration_logging_det (or other
+                detector with arm and transfer methods) used to acquire the
+                data. Its prepare_function is not used.
+            programs (list)     : OpenQL programs (or PendingPrograms) to run
+            CC (instrument)     : central controller to upload programs to
+            counter_param (Parameter): index of the next program to run,
+                if None an internal counter is used.
+            varying_nr_shots (bool): if True sets the nr_shots of the
+                detector to the number of sweep points of every program,
+                see "load_range_of_oql_programs_varying_nr_shots".
+            acquisition_poll_interval (float): time in s between checks
+                whether the UHFQC has finished the acquisition.
+        """
+        super().__init__(**kw)
+        self.detector = detector
+        self.programs = programs
+        self.CC = CC
+        if counter_param is None:
+            counter_param = ManualParameter('program_counter',
+                                            initial_value=0)
+        self.counter_param = counter_param
+        self.varying_nr_shots = varying_nr_shots
+        self.acquisition_poll_interval = acquisition_poll_interval
+
+        self.name = detector.name
+        self.value_names = detector.value_names
+        self.value_units = detector.value_units
+
+        self._executor = None
+        self._upload = None
+        self.reset_timings()
+
+    def reset_timings(self):
+        self.timings = {'upload': [], 'arm': [], 'acquisition': [],
+                        'transfer': []}
+
+    def _upload_program(self, idx: int):
+        program = self.programs[idx]
+        self.CC.stop()
+        self.CC.eqasm_program(program.filename)
+        return idx
+
+    def _start_upload(self, idx: int):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+        self._upload = self._executor.submit(self._upload_program, idx)
+
+    def prepare(self, sweep_points=None):
+        t0 = time.time()
+        idx = self.counter_param()
+        # the upload of this program was started at the end of the
+        # acquisition of the previous program
+        if self._upload is None:
+            self._start_upload(idx)
+        uploaded_idx = self._upload.result()
+        self._upload = None
+        if uploaded_idx != idx:
+            # the counter was changed in between
+            self._upload_program(idx)
+        self.timings['upload'].append(time.time()-t0)
+
+        if self.varying_nr_shots:
+            self.detector.nr_shots = len(self.programs[idx].sweep_points)
+        prepare_function = self.detector.prepare_function
+        self.detector.prepare_function = None
+        try:
+            self.detector.prepare(sweep_points=sweep_points)
+        finally:
+            self.detector.prepare_function = prepare_function
+
+    def _wait_for_acquisition(self):
+        """
+        Waits until the UHFQC AWG has finished running the acquisition.
+        """
+        UHFQC = self.detector.UHFQC
+        t_end = time.time() + UHFQC.timeout()
+        while UHFQC.awgs_0_enable():
+            if time.time() > t_end:
+                logging.warning('UHFQC acquisition did not finish within '
+                                'the timeout.')
+                return
+            time.sleep(self.acquisition_poll_interval)
+
+    def get_values(self):
+        t0 = time.time()
+        self.detector.arm()
+        t1 = time.time()
+        self._wait_for_acquisition()
+        t2 = time.time()
+
+        # the CC is no longer needed for this program, the next program is
+        # uploaded unless this was the last one
+        counter = self.counter_param()
+        idx = (counter+1) % len(self.programs)
+        self.counter_param(idx)
+        if counter < len(self.programs)-1:
+            self._start_upload(idx)
+
+        data = self.detector.transfer()
+        t3 = time.time()
+        self.timings['arm'].append(t1-t0)
+        self.timings['acquisition'].append(t2-t1)
+        self.timings['transfer'].append(t3-t2)
+        return data
+
+    def finish(self):
+        if self._upload is not None:
+            try:
+                self._upload.result()
+            except Exception as e:
+                logging.warning('Uploading program failed: {}'.format(e))
+            self._upload = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self.detector.finish()
+
+
 class UHFQC_statistics_logging_det(Soft_Detector):
     """
     Detector used for the statistics logging mode of the UHFQC
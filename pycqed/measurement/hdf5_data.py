@@ -15,6 +15,7 @@ import time
 import h5py
 import numpy as np
 import logging
+from pycqed.utilities import data_index
 
 
 class DateTimeGenerator:
@@ -116,10 +117,281 @@ class Data(h5py.File):
         self.folder, self._filename = os.path.split(self.filepath)
         if not os.path.isdir(self.folder):
             os.makedirs(self.folder)
+        data_index.register_folder(self.folder, datadir=datadir)
         super(Data, self).__init__(self.filepath, 'a')
         self.flush()
 
 
+class BufferedDataset:
+    """
+    Wrapper around an extendable 2D h5py dataset that keeps the data in an
+    in-memory numpy buffer.
+
+    Reading, writing and resizing only act on the buffer. The rows that
+    were modified since the last flush are written to the hdf5 dataset by
+    "flush", which is called automatically when more than "flush_interval"
+    seconds have passed since the last flush.
+    Supports the subset of the h5py.Dataset interface used by
+    MeasurementControl (indexing, "shape", "resize" and "attrs").
+    """
+
+    def __init__(self, dset, flush_interval: float=5,
+                 expected_nr_rows: int=None):
+        """
+        Args:
+            dset (h5py.Dataset): 2D dataset that is resizable along the
+                first axis.
+            flush_interval (float): time in seconds after which changes
+                are written to disk, if 0 every change is written directly.
+            expected_nr_rows (int): used to preallocate the buffer.
+        """
+        self.dset = dset
+        self.flush_interval = flush_interval
+        self._nr_rows, self._nr_cols = dset.shape
+        self._buffer = np.zeros((max(self._nr_rows, expected_nr_rows or 0, 1),
+                                 self._nr_cols), dtype=dset.dtype)
+        self._buffer[:self._nr_rows] = dset[()]
+        self._dirty_rows = None  # range of rows changed since last flush
+        self._last_flush = time.time()
+
+    @property
+    def shape(self):
+        return (self._nr_rows, self._nr_cols)
+
+    @property
+    def attrs(self):
+        return self.dset.attrs
+
+    @property
+    def name(self):
+        return self.dset.name
+
+    def __len__(self):
+        return self._nr_rows
+
+    def __getitem__(self, key):
+        # h5py returns copies, the same is done here so that the returned
+        # arrays are not affected by later writes to the buffer.
+        return np.array(self._buffer[:self._nr_rows][key])
+
+    def __setitem__(self, key, value):
+        self._buffer[:self._nr_rows][key] = value
+        row_key = key[0] if isinstance(key, tuple) else key
+        if isinstance(row_key, slice):
+            start, stop, _ = row_key.indices(self._nr_rows)
+        elif isinstance(row_key, (int, np.integer)):
+            start = row_key % self._nr_rows
+            stop = start + 1
+        else:
+            start, stop = 0, self._nr_rows
+        self._mark_dirty(start, stop)
+        self.flush_if_needed()
+
+    def resize(self, shape):
+        nr_rows = shape[0]
+        if shape[1] != self._nr_cols:
+            raise ValueError('Only resizing along the first axis is '
+                             'supported.')
+        if nr_rows > len(self._buffer):
+            # grow geometrically to avoid copying on every resize
+            new_buffer = np.zeros((max(nr_rows, 2*len(self._buffer)),
+                                   self._nr_cols), dtype=self._buffer.dtype)
+            new_buffer[:self._nr_rows] = self._buffer[:self._nr_rows]
+            self._buffer = new_buffer
+        elif nr_rows < self._nr_rows:
+            self._buffer[nr_rows:self._nr_rows] = 0
+        if nr_rows != self._nr_rows:
+            self._mark_dirty(min(nr_rows, self._nr_rows), nr_rows)
+            self._nr_rows = nr_rows
+        self.flush_if_needed()
+
+    def _mark_dirty(self, start, stop):
+        if self._dirty_rows is None:
+            self._dirty_rows = (start, stop)
+        else:
+            self._dirty_rows = (min(start, self._dirty_rows[0]),
+                                max(stop, self._dirty_rows[1]))
+
+    def flush_if_needed(self):
+        if time.time() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes all changes in the buffer to the hdf5 dataset.
+        """
+        if self._dirty_rows is not None:
+            if self.dset.shape[0] != self._nr_rows:
+                self.dset.resize((self._nr_rows, self._nr_cols))
+            start, stop = self._dirty_rows
+            stop = min(stop, self._nr_rows)
+            if stop > start:
+                self.dset[start:stop] = self._buffer[start:stop]
+            self.dset.file.flush()
+            self._dirty_rows = None
+        self._last_flush = time.time()
+
+
+class LazyDataView:
+    """
+    Read-only, lazy view on the columns of a 2D "Data" dataset as saved by
+    MeasurementControl (Version 2 datasaving format).
+
+    The view is indexed like the transposed data (as used by
+    MeasurementAnalysis), i.e. view[i] is column i of the dataset. Columns
+    are only read from the file when they are indexed, slicing the columns
+    (e.g. view[2:]) returns a new view without reading data.
+    If the dataset is stored contiguously (not chunked or compressed) the
+    file is memory-mapped, otherwise the columns are read using hdf5
+    hyperslab selections.
+    """
+
+    def __init__(self, dset, columns=None, mmap: bool=True,
+                 dtype=np.float64):
+        """
+        Args:
+            dset (h5py.Dataset): 2D dataset with the data in its columns
+            columns (list): indices of the columns of dset in this view,
+                defaults to all columns
+            mmap (bool): whether to memory-map contiguous datasets
+            dtype: data type of the returned arrays
+        """
+        self.dset = dset
+        self.columns = (list(range(dset.shape[1])) if columns is None
+                        else list(columns))
+        self.dtype = dtype
+        self._mmap = mmap if isinstance(mmap, np.memmap) else None
+        if mmap is True:
+            self._mmap = self._memory_map(dset)
+
+    @staticmethod
+    def _memory_map(dset):
+        """
+        Returns a read-only memory map of a contiguous dataset or None.
+        """
+        try:
+            offset = dset.id.get_offset()
+        except Exception:
+            offset = None
+        if (offset is None or dset.chunks is not None or
+                dset.size == 0 or dset.dtype.kind not in 'fiu'):
+            return None
+        return np.memmap(dset.file.filename, dtype=dset.dtype, mode='r',
+                         offset=offset, shape=dset.shape)
+
+    @property
+    def shape(self):
+        return (len(self.columns), self.dset.shape[0])
+
+    @property
+    def nr_rows(self):
+        return self.dset.shape[0]
+
+    def __len__(self):
+        return len(self.columns)
+
+    def __iter__(self):
+        for idx in range(len(self.columns)):
+            yield self.column(idx)
+
+    def __array__(self, dtype=None):
+        data = np.array([self.column(idx) for idx in range(len(self))],
+                        dtype=dtype or self.dtype)
+        return data.reshape(self.shape)
+
+    def column(self, idx: int, rows=slice(None)):
+        """
+        Reads (rows of) column idx of this view.
+        """
+        col = self.columns[idx]
+        if self._mmap is not None:
+            values = self._mmap[rows, col]
+        else:
+            values = self.dset[rows, col]
+        return np.array(values, dtype=self.dtype)
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            col_key, row_key = key
+        else:
+            col_key, row_key = key, slice(None)
+        if isinstance(col_key, (int, np.integer)):
+            return self.column(int(col_key), row_key)
+        columns = np.array(self.columns)[col_key]
+        view = LazyDataView(self.dset, columns=columns, mmap=self._mmap,
+                            dtype=self.dtype)
+        if isinstance(row_key, slice) and row_key == slice(None):
+            return view
+        return np.asarray(view)[:, row_key]
+
+    def iter_blocks(self, block_size: int=2**16):
+        """
+        Iterates over the data in blocks of rows.
+
+        Yields:
+            start (int): index of the first row in the block
+            block (array): shape (len(view), nr of rows in the block)
+        """
+        # datasets chunked per column are read per column
+        column_chunks = (self._mmap is None and self.dset.chunks is not None
+                         and self.dset.chunks[1] < self.dset.shape[1])
+        for start in range(0, self.nr_rows, block_size):
+            stop = min(start + block_size, self.nr_rows)
+            if column_chunks:
+                yield start, np.array([self.dset[start:stop, col]
+                                       for col in self.columns],
+                                      dtype=self.dtype).reshape(
+                                          len(self.columns), stop-start)
+                continue
+            if self._mmap is not None:
+                block = self._mmap[start:stop]
+            else:
+                block = self.dset[start:stop]
+            yield start, np.array(block[:, self.columns].T, dtype=self.dtype)
+
+
+def create_data_dataset(group, nr_cols: int, expected_nr_rows: int=None,
+                        layout: str='rows', compression: str=None,
+                        dtype: str='float64'):
+    """
+    Creates the extendable "Data" dataset of shape (0, nr_cols) in which
+    MeasurementControl stores the sweep points and measured values.
+
+    Args:
+        group (h5py.Group): group in which the dataset is created
+        nr_cols (int): number of sweep parameters + number of values
+        expected_nr_rows (int): used to determine the chunk size
+        layout (str): chunk layout of the dataset
+            'rows':     chunks span all columns, fastest to write point by
+                        point and to read all data at once.
+            'columns':  chunks contain a single column, such that reading
+                        one column (e.g. a single channel of single-shot
+                        data) only reads that column from disk.
+        compression (str): None, 'gzip' or 'lzf'. Compressed datasets are
+            stored with the shuffle filter.
+        dtype (str): 'float64' or 'float32'. Note that with float32 also
+            the sweep points are stored with ~7 significant digits.
+
+    In all layouts the data is a single 2D dataset, so it is read in the
+    same way by the analysis.
+    """
+    if layout == 'rows':
+        # chunks of at most 1 MB along the rows
+        chunk_rows = int(np.clip(expected_nr_rows or 1024, 1,
+                                 2**17//nr_cols))
+        chunks = (chunk_rows, nr_cols)
+    elif layout == 'columns':
+        # chunks of at most 1 MB of a single column
+        chunks = (int(np.clip(expected_nr_rows or 2**14, 1, 2**17)), 1)
+    else:
+        raise ValueError('Layout "{}" not recognized, use "rows" or '
+                         '"columns".'.format(layout))
+    return group.create_dataset(
+        'Data', (0, nr_cols), maxshape=(None, nr_cols), chunks=chunks,
+        dtype=dtype, compression=compression,
+        shuffle=compression is not None)
+
+
 def encode_to_utf8(s):
     '''
     Required because h5py does not support python3 strings
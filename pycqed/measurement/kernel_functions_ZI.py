@@ -24,16 +24,27 @@ def bias_tee_correction(ysig, tau: float, sampling_rate: float=1,
     Corrects for a bias tee correction using a linear IIR filter with time
     constant tau.
     """
+    b, a = bias_tee_correction_coeffs(tau=tau, sampling_rate=sampling_rate,
+                                      inverse=inverse)
+    filtered_signal = signal.lfilter(b, a, ysig)
+    return filtered_signal
+
+
+def bias_tee_correction_coeffs(tau: float, sampling_rate: float=1,
+                               inverse: bool=False):
+    """
+    Returns the (numerator, denominator) coefficients of the filter used
+    in "bias_tee_correction", to be used in signal.lfilter.
+    """
     # factor 2 comes from bilinear transform
     k = 2*tau*sampling_rate
     b = [1, -1]
     a = [(k+1)/k, -(k-1)/k]
 
     if inverse:
-        filtered_signal = signal.lfilter(b, a, ysig)
+        return b, a
     else:
-        filtered_signal = signal.lfilter(a, b, ysig)
-    return filtered_signal
+        return a, b
 
 
 def exponential_decay_correction(ysig, tau: float, amp: float,
@@ -46,7 +57,19 @@ def exponential_decay_correction(ysig, tau: float, amp: float,
         y = gc*(1 + amp *exp(-t/tau))
     where gc is a gain correction factor that is ignored in the corrections.
     """
+    b, a = exponential_decay_correction_coeffs(
+        tau=tau, amp=amp, sampling_rate=sampling_rate, inverse=inverse)
+    filtered_signal = signal.lfilter(b, a, ysig)
+    return filtered_signal
 
+
+def exponential_decay_correction_coeffs(tau: float, amp: float,
+                                        sampling_rate: float=1,
+                                        inverse: bool=False):
+    """
+    Returns the (numerator, denominator) coefficients of the filter used
+    in "exponential_decay_correction", to be used in signal.lfilter.
+    """
     # alpha ~1/8 is like averaging 8 samples, sets the timescale for averaging
     # larger alphas break the approximation of the low pass filter
     # numerical instability occurs if alpha > .03
@@ -72,10 +95,9 @@ def exponential_decay_correction(ysig, tau: float, amp: float,
     # if alpha > 0.03 the filter can be unstable.
 
     if inverse:
-        filtered_signal = signal.lfilter(b, a, ysig)
+        return b, a
     else:
-        filtered_signal = signal.lfilter(a, b, ysig)
-    return filtered_signal
+        return a, b
 
 
 def bounce_correction(ysig, tau: float, amp: float,
@@ -189,17 +211,52 @@ def coef_round(value, force_bshift=None):
     return new_value
 
 
+def _path_averages(sig, paths):
+    """
+    Returns the mean of every consecutive block of "paths" samples.
+    A last incomplete block is averaged over the samples it contains.
+
+    Uses the same numpy reductions as np.mean on the individual blocks, so
+    the result is bit-exact with averaging the blocks one at a time.
+    """
+    nr_full = sig.size // paths
+    du = sig[:nr_full*paths].reshape(nr_full, paths).sum(axis=1) / paths
+    if sig.size % paths:
+        du = np.append(du, np.mean(sig[nr_full*paths:]))
+    return du
+
+
+def _moving_average_recursion(x, alpha):
+    """
+    Returns the state of the first order filter
+        acc[n] = acc[n-1] + alpha*(x[n] - acc[n-1]),  acc[-1] = 0
+    for every input sample.
+
+    The recursion is evaluated sample by sample with the exact operation
+    order of the hardware model (a scipy.signal.lfilter implementation
+    rounds differently). Only one iteration per path-block is needed,
+    so this is not the bottleneck of the filters below.
+    """
+    out = np.empty(len(x))
+    acc = 0
+    for n, xn in enumerate(x.tolist()):
+        acc = acc + alpha*(xn - acc)
+        out[n] = acc
+    return out
+
+
 def multipath_bias_tee(sig, k, paths):
     """
     hardware friendly
     hardware friendly bias-tee (or any other AC coupling) compensation filter
     """
-    tpl = np.ones((paths, ))
-    cs = 0
-    acc = []
-    for i in np.arange(0, sig.size, paths):
-        cs = cs + np.sum(sig[i:(i+paths)])
-        acc = np.append(acc, tpl*cs)
+    sig = np.asarray(sig)
+    nr_full = sig.size // paths
+    block_sums = sig[:nr_full*paths].reshape(nr_full, paths).sum(axis=1)
+    if sig.size % paths:
+        block_sums = np.append(block_sums, np.sum(sig[nr_full*paths:]))
+    # np.cumsum accumulates sequentially, identical to a running sum
+    acc = np.repeat(np.cumsum(block_sums), paths)[:sig.size]
     return sig + 1./k * (2*acc - sig)
 
 
@@ -208,28 +265,23 @@ def multipath_filter(sig, alpha, k, paths):
     hardware friendly
     exponential moving average correction filter
     """
-    tpl = np.ones((paths, ))
+    sig = np.asarray(sig)
     hw_alpha = alpha*float(paths)
 
-    duf = tpl * 0.
-    acc = 0
-
-    for i in np.arange(0, sig.size, paths):
-        acc = acc + hw_alpha*(np.mean(sig[i:(i+paths)]) - acc)
-        duf = np.append(duf, tpl * acc)
+    acc = _moving_average_recursion(_path_averages(sig, paths), hw_alpha)
+    # the filter output is applied one path-block later
+    duf = np.concatenate([np.zeros(paths), np.repeat(acc, paths)])
     duf = duf[0:sig.size]
     return sig + k * (duf - sig)
 
 
-
 def multipath_filter2(sig, alpha, k, paths, ppl,
                       hw_rounding: bool=True):
     """
     hardware friendly
     exponential moving average correction filter with pipeline simulation
     """
-
-    tpl = np.ones((paths, ))
+    sig = np.asarray(sig)
     hw_alpha = alpha*float(paths*ppl)
     hw_k = k
 
@@ -237,36 +289,28 @@ def multipath_filter2(sig, alpha, k, paths, ppl,
         hw_alpha = coef_round(hw_alpha)
         hw_k = coef_round(hw_k)
 
-    duf = tpl * 0.
-    # due to the pipelining, there are actually ppl interleaved filters
-    acc = np.zeros((ppl, ))
-
     # make sure our vector has a length that is a multiple of ppl*paths
     extra = int(ppl*paths*np.ceil(sig.size/ppl/paths)-sig.size)
     if extra > 0:
         sig = np.append(sig, extra*[sig[-1]])
 
     # first create an array of averaged path values
-    du = []
-    for i in np.arange(0, sig.size, paths):
-        du = np.append(du, np.mean(sig[i:(i+paths)]))
-
-    # loop through the average bases
-    for i in np.arange(0, du.size, ppl):
-        # loop through the individual sub-filters
-        for j in np.arange(0, ppl):
-            # first calculate the filter input as an average of the previous
-            # path averages
-            ss = 0
-            for l in np.arange(0, ppl):
-                if i+j-l >= 0:
-                    ss = ss + du[i+j-l]
-
-            ss = ss / float(ppl)
-            # then process it by the filter
-            acc[j] = acc[j] + hw_alpha*(ss - acc[j])
-            # and add the filter output to the signal correction vector
-            duf = np.append(duf, tpl * acc[j])
+    du = _path_averages(sig, paths)
+
+    # the filter input is the average of the last ppl path averages,
+    # summed in the same order as the hardware model (most recent first)
+    ss = np.zeros(du.size)
+    for l in range(ppl):
+        ss[l:] = ss[l:] + du[:du.size-l]
+    ss = ss / float(ppl)
+
+    # due to the pipelining, there are actually ppl interleaved filters
+    acc = np.empty(du.size)
+    for j in range(ppl):
+        acc[j::ppl] = _moving_average_recursion(ss[j::ppl], hw_alpha)
+
+    # the filter output is applied one path-block later
+    duf = np.concatenate([np.zeros(paths), np.repeat(acc, paths)])
     duf = duf[0:sig.size]
     return sig + hw_k * (duf - sig)
 
@@ -300,29 +344,28 @@ def first_order_bounce_corr(sig, delay, amp, awg_sample_rate,
     if scope_sample_rate is None:
         scope_sample_rate = awg_sample_rate
 
-    # Reserve buffer space for bounce compensation
-    shift_reg = np.zeros(delay_n_samples)
-
+    sig = np.asarray(sig, dtype=float)
     awg_sample_incr = awg_sample_rate/scope_sample_rate
 
-    previous_awg_sample_cnt = 0
-    present_awg_sample_cnt = 0
-
     amp_hw = coef_round(amp, force_bshift=0)
 
-    sigout = np.zeros(len(sig))
-
-    for i, s in enumerate(sig):
-        # Compute output signal
-        sigout[i] = s + amp_hw*shift_reg[-1]
-
-        present_awg_sample_cnt += awg_sample_incr
-        awg_sample_diff = int(present_awg_sample_cnt) - previous_awg_sample_cnt
-        if awg_sample_diff >= 1:
-            # Update shift register with present scope sample
-            shift_reg[awg_sample_diff:] = shift_reg[:-awg_sample_diff]
-            shift_reg[:awg_sample_diff] = s*np.ones(awg_sample_diff)
-            previous_awg_sample_cnt = int(present_awg_sample_cnt)
+    # Number of AWG samples that have been shifted into the delay buffer
+    # after each scope sample. A scope sample is shifted in once for every
+    # AWG sample that elapses while it is present.
+    awg_sample_cnt = np.floor(
+        np.cumsum(np.full(sig.size, awg_sample_incr))).astype(int)
+    # The output uses the buffer content from before the present sample,
+    # where the oldest entry is the AWG sample delay_n_samples ago.
+    delayed_awg_sample = np.concatenate(
+        [[0], awg_sample_cnt[:-1]]) - delay_n_samples
+    in_buffer = delayed_awg_sample >= 0
+    # scope sample that was present when that AWG sample was shifted in
+    src_idx = np.searchsorted(awg_sample_cnt,
+                              delayed_awg_sample[in_buffer], side='right')
+    shift_reg_out = np.zeros(sig.size)
+    shift_reg_out[in_buffer] = sig[src_idx]
+
+    sigout = sig + amp_hw*shift_reg_out
 
     if sim_hw_delay:
         sigout = sigdelay(sigout, int(round(8*(4+5)/awg_sample_incr)))
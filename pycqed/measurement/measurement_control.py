@@ -1,6 +1,8 @@
 import types
 import logging
 import time
+import queue
+import threading
 import numpy as np
 from scipy.optimize import fmin_powell
 from pycqed.measurement import hdf5_data as h5d
@@ -13,6 +15,7 @@ from pycqed.measurement import sweep_functions as swf
 from pycqed.measurement.mc_parameter_wrapper import wrap_par_to_swf
 from pycqed.measurement.mc_parameter_wrapper import wrap_par_to_det
 from pycqed.analysis.tools.data_manipulation import get_generation_means
+from pycqed.analysis.tools.data_manipulation import BinnedStatistics
 
 from pycqed.analysis.tools.plot_interpolation import interpolate_heatmap
 
@@ -67,6 +70,9 @@ class MeasurementControl(Instrument):
 
         self.add_parameter('plotting_max_pts',
                            label='Maximum number of live plotting points',
+                           docstring='Datasets with more points are '
+                           'decimated (every n-th point is plotted) in '
+                           'the live plot.',
                            parameter_class=ManualParameter,
                            vals=vals.Ints(1),
                            initial_value=4000)
@@ -95,6 +101,52 @@ class MeasurementControl(Instrument):
             parameter_class=ManualParameter,
             initial_value=False)
 
+        self.add_parameter(
+            'cfg_datasaving_flush_interval', unit='s',
+            vals=vals.Numbers(min_value=0),
+            docstring='Data is kept in an in-memory buffer during a '
+            'measurement and written to disk when this time has passed since '
+            'the last write and at the end of the measurement. '
+            'If 0, every change is written to disk directly.',
+            parameter_class=ManualParameter,
+            initial_value=5)
+        self.add_parameter(
+            'cfg_datasaving_layout', vals=vals.Enum('rows', 'columns'),
+            docstring='Chunk layout of the "Data" dataset. "rows" is '
+            'fastest for writing and reading all data, "columns" stores '
+            'every column in separate chunks so that a single channel can '
+            'be read without reading the other channels '
+            '(e.g. for large single-shot datasets).',
+            parameter_class=ManualParameter,
+            initial_value='rows')
+        self.add_parameter(
+            'cfg_datasaving_compression',
+            vals=vals.Enum(None, 'gzip', 'lzf'),
+            docstring='Compression filter of the "Data" dataset.',
+            parameter_class=ManualParameter,
+            initial_value=None)
+        self.add_parameter(
+            'cfg_datasaving_dtype', vals=vals.Enum('float64', 'float32'),
+            docstring='Data type of the "Data" dataset. float32 halves the '
+            'file size (e.g. for raw ADC values), but also stores the sweep '
+            'points with only ~7 significant digits.',
+            parameter_class=ManualParameter,
+            initial_value='float64')
+
+        self.add_parameter(
+            'cfg_pipelined_hard_sweeps', vals=vals.Bool(),
+            docstring='If True, data storing, live plotting and instrument '
+            'monitor updates of hard sweeps are done in a background thread '
+            'while the next chunk of data is being acquired.',
+            parameter_class=ManualParameter,
+            initial_value=False)
+        self.add_parameter(
+            'cfg_pipeline_queue_size', vals=vals.Ints(1),
+            docstring='Maximum number of acquired chunks that wait for '
+            'processing in pipelined mode before acquisition is blocked.',
+            parameter_class=ManualParameter,
+            initial_value=4)
+
         self.add_parameter('instrument_monitor',
                            parameter_class=ManualParameter,
                            initial_value=None,
@@ -106,6 +158,8 @@ class MeasurementControl(Instrument):
         self.plotting_interval(plotting_interval)
 
         self.soft_iteration = 0  # used as a counter for soft_avg
+        self._pipeline = None  # used for pipelined hard sweeps
+        self.timings = {}
         self._persist_dat = None
         self._persist_xlabs = None
         self._persist_ylabs = None
@@ -159,6 +213,9 @@ class MeasurementControl(Instrument):
         # used for determining data writing indices and soft averages
         self.total_nr_acquired_values = 0
 
+        # total time spent in each stage of the measurement loop
+        self.timings = {}
+
         # needs to be defined here because of the with statement below
         return_dict = {}
         self.last_sweep_pts = None  # used to prevent resetting same value
@@ -174,10 +231,17 @@ class MeasurementControl(Instrument):
                 self.create_experimentaldata_dataset()
 
                 self.plotting_bins = None
+                self.binned_statistics = None
+                self._plotted_stats_version = None
                 if exp_metadata is not None:
                     self.save_exp_metadata(exp_metadata, self.data_object)
                     if 'bins' in exp_metadata.keys():
                         self.plotting_bins = exp_metadata['bins']
+                        # updated as the data arrives, used for plotting
+                        self.binned_statistics = BinnedStatistics(
+                            nr_bins=len(self.plotting_bins),
+                            nr_channels=len(
+                                self.detector_function.value_names))
 
                 if mode is not 'adaptive':
                     try:
@@ -198,6 +262,12 @@ class MeasurementControl(Instrument):
                                      .format(self.mode))
             except KeyboardFinish as e:
                 print(e)
+            finally:
+                # ensures buffered data is written to disk, also if the
+                # measurement is interrupted by an exception.
+                if isinstance(getattr(self, 'dset', None),
+                              h5d.BufferedDataset):
+                    self.dset.flush()
             result = self.dset[()]
             self.get_measurement_endtime()
             self.save_MC_metadata(self.data_object)  # timing labels etc
@@ -224,23 +294,42 @@ class MeasurementControl(Instrument):
             self.get_measurement_preparetime()
             sweep_points = self.get_sweep_points()
 
-            while self.get_percdone() < 100:
-                start_idx = self.get_datawriting_start_idx()
-                if len(self.sweep_functions) == 1:
-                    self.sweep_functions[0].set_parameter(
-                        sweep_points[start_idx])
-                    self.detector_function.prepare(
-                        sweep_points=self.get_sweep_points())
-                    self.measure_hard()
-                else:  # If mode is 2D
-                    for i, sweep_function in enumerate(self.sweep_functions):
-                        swf_sweep_points = sweep_points[:, i]
-                        val = swf_sweep_points[start_idx]
-                        sweep_function.set_parameter(val)
-                    self.detector_function.prepare(
-                        sweep_points=sweep_points[
-                            start_idx:start_idx+self.xlen, 0])
-                    self.measure_hard()
+            if self.cfg_pipelined_hard_sweeps():
+                self.start_pipeline()
+            try:
+                while self.get_percdone() < 100:
+                    start_idx = self.get_datawriting_start_idx()
+                    if len(self.sweep_functions) == 1:
+                        t0 = time.time()
+                        self.sweep_functions[0].set_parameter(
+                            sweep_points[start_idx])
+                        self.add_timing('set_parameter', t0)
+                        t0 = time.time()
+                        self.detector_function.prepare(
+                            sweep_points=self.get_sweep_points())
+                        self.add_timing('prepare', t0)
+                        self.measure_hard()
+                    else:  # If mode is 2D
+                        t0 = time.time()
+                        for i, sweep_function in enumerate(
+                                self.sweep_functions):
+                            swf_sweep_points = sweep_points[:, i]
+                            val = swf_sweep_points[start_idx]
+                            sweep_function.set_parameter(val)
+                        self.add_timing('set_parameter', t0)
+                        t0 = time.time()
+                        self.detector_function.prepare(
+                            sweep_points=sweep_points[
+                                start_idx:start_idx+self.xlen, 0])
+                        self.add_timing('prepare', t0)
+                        self.measure_hard()
+            except BaseException:
+                # an exception raised during acquisition takes precedence
+                # over one raised in the pipeline thread
+                self.stop_pipeline(reraise=False)
+                raise
+            # waits for all acquired data to be processed
+            self.stop_pipeline()
         else:
             raise Exception('Sweep and Detector functions not '
                             + 'of the same type. \nAborting measurement')
@@ -281,7 +370,8 @@ class MeasurementControl(Instrument):
 
         if self.adaptive_function == 'Powell':
             self.adaptive_function = fmin_powell
-        if issubclass(self.adaptive_function, BaseLearner):
+        if (isinstance(self.adaptive_function, type) and
+                issubclass(self.adaptive_function, BaseLearner)):
             Learner = self.adaptive_function
             self.learner = Learner(self.optimization_function,
                                    bounds=self.af_pars['bounds'])
@@ -294,12 +384,17 @@ class MeasurementControl(Instrument):
 
         elif (isinstance(self.adaptive_function, types.FunctionType) or
                 isinstance(self.adaptive_function, np.ufunc)):
+            if getattr(self.adaptive_function, 'batch_evaluation', False):
+                # the optimizer proposes batches of points that are
+                # measured together
+                objective = self.optimization_function_batch
+            else:
+                objective = self.optimization_function
             try:
                 # exists so it is possible to extract the result
                 # of an optimization post experiment
                 self.adaptive_result = \
-                    self.adaptive_function(self.optimization_function,
-                                           **self.af_pars)
+                    self.adaptive_function(objective, **self.af_pars)
             except StopIteration:
                 print('Reached f_termination: %s' % (self.f_termination))
             self.save_optimization_results(self.adaptive_function,
@@ -318,15 +413,50 @@ class MeasurementControl(Instrument):
         return
 
     def measure_hard(self):
+        t0 = time.time()
         new_data = np.array(self.detector_function.get_values()).T
+        self.add_timing('get_values', t0)
+
+        # N.B. this also updates the soft_iteration and the counters used to
+        # determine if the measurement is complete.
+        start_idx, stop_idx = self.get_datawriting_indices_update_ctr(new_data)
+        chunk = (new_data, start_idx, stop_idx,
+                 self.soft_iteration, self.iteration)
+        if self._pipeline is not None:
+            self._pipeline_put(chunk)
+            self._update_pipeline_plots()
+        else:
+            self.process_hard_data(*chunk)
 
+        self.check_keyboard_interrupt()
+        self.iteration += 1
+        self.print_progress(stop_idx)
+        return new_data
+
+    def process_hard_data(self, new_data, start_idx, stop_idx,
+                          soft_iteration, iteration):
+        """
+        Stores a chunk of data acquired in a hard sweep and updates the
+        live plotting and instrument monitor.
+        """
+        self.store_hard_data(new_data, start_idx, stop_idx, soft_iteration)
+        self.update_hard_plots(iteration)
+
+    def store_hard_data(self, new_data, start_idx, stop_idx,
+                        soft_iteration):
+        """
+        Stores a chunk of data acquired in a hard sweep.
+
+        The arguments are passed explicitly instead of using the attributes
+        of MC so that this can run in the pipeline thread while the next
+        chunk is being acquired.
+        """
+        t0 = time.time()
         ###########################
         # Shape determining block #
         ###########################
 
         datasetshape = self.dset.shape
-        start_idx, stop_idx = self.get_datawriting_indices_update_ctr(new_data)
-
         new_datasetshape = (np.max([datasetshape[0], stop_idx]),
                             datasetshape[1])
         self.dset.resize(new_datasetshape)
@@ -334,19 +464,21 @@ class MeasurementControl(Instrument):
         if len(np.shape(new_data)) == 1:
             old_vals = self.dset[start_idx:stop_idx,
                                  len(self.sweep_functions)]
-            new_vals = ((new_data + old_vals*self.soft_iteration) /
-                        (1+self.soft_iteration))
+            new_vals = ((new_data + old_vals*soft_iteration) /
+                        (1+soft_iteration))
 
             self.dset[start_idx:stop_idx,
                       len(self.sweep_functions)] = new_vals
+            self.update_binned_statistics(start_idx, new_vals, old_vals)
         else:
             old_vals = self.dset[start_idx:stop_idx,
                                  len(self.sweep_functions):]
-            new_vals = ((new_data + old_vals*self.soft_iteration) /
-                        (1+self.soft_iteration))
+            new_vals = ((new_data + old_vals*soft_iteration) /
+                        (1+soft_iteration))
 
             self.dset[start_idx:stop_idx,
                       len(self.sweep_functions):] = new_vals
+            self.update_binned_statistics(start_idx, new_vals, old_vals)
         sweep_len = len(self.get_sweep_points().T)
 
         ######################
@@ -368,15 +500,130 @@ class MeasurementControl(Instrument):
                 # There are some cases where the sweep points are not
                 # specified that you don't want to crash (e.g. on -off seq)
                 pass
+        self.add_timing('data_storing', t0)
 
-        self.check_keyboard_interrupt()
+    def update_hard_plots(self, iteration):
+        """
+        Updates the instrument monitor and live plotting after a chunk of
+        data of a hard sweep is stored.
+
+        N.B. this has to run in the main thread as Qt does not support
+        updating plots from other threads.
+        """
+        t0 = time.time()
         self.update_instrument_monitor()
+        self.add_timing('instrument_monitor', t0)
+        t0 = time.time()
         self.update_plotmon()
         if self.mode == '2D':
-            self.update_plotmon_2D_hard()
-        self.iteration += 1
-        self.print_progress(stop_idx)
-        return new_data
+            self.update_plotmon_2D_hard(iteration=iteration)
+        self.add_timing('plotting', t0)
+
+    ############################################
+    # Pipeline used for processing hard sweeps #
+    ############################################
+
+    def start_pipeline(self):
+        """
+        Starts a background thread that stores the chunks of data acquired
+        in a hard sweep. The queue is bounded by "cfg_pipeline_queue_size"
+        so that acquisition can not run arbitrarily far ahead of the data
+        storing.
+
+        Stored chunks are put in a second queue, the live plotting and
+        instrument monitor are updated from the main thread (see
+        _update_pipeline_plots).
+        """
+        self._pipeline = queue.Queue(maxsize=self.cfg_pipeline_queue_size())
+        self._pipeline_stored = queue.Queue()
+        # prevents plotting data while it is being written
+        self._pipeline_lock = threading.Lock()
+        self._pipeline_exception = None
+        self._pipeline_thread = threading.Thread(
+            target=self._pipeline_worker, name='{}_pipeline'.format(self.name),
+            daemon=True)
+        self._pipeline_thread.start()
+
+    def stop_pipeline(self, reraise: bool=True):
+        """
+        Waits until all queued chunks are processed and stops the pipeline
+        thread.
+
+        Args:
+            reraise (bool): if True, reraises an exception that occurred in
+                the pipeline thread. Otherwise the exception is only logged,
+                this is used when the acquisition itself raised an
+                exception.
+        """
+        if self._pipeline is None:
+            return
+        t0 = time.time()
+        self._pipeline.put(None)  # signals the worker to stop
+        self._pipeline_thread.join()
+        self.add_timing('pipeline_finish', t0)
+        if reraise:
+            self._update_pipeline_plots()
+        self._pipeline = None
+        if reraise:
+            self._raise_pipeline_exception()
+        elif self._pipeline_exception is not None:
+            logging.warning('Exception in pipeline thread: {}'.format(
+                self._pipeline_exception))
+            self._pipeline_exception = None
+
+    def _pipeline_put(self, chunk):
+        self._raise_pipeline_exception()
+        t0 = time.time()
+        self._pipeline.put(chunk)
+        # time that acquisition is blocked because the queue is full
+        self.add_timing('pipeline_wait', t0)
+
+    def _pipeline_worker(self):
+        while True:
+            chunk = self._pipeline.get()
+            if chunk is None:
+                break
+            if self._pipeline_exception is not None:
+                # drop remaining data, the exception is raised in the
+                # main thread
+                continue
+            new_data, start_idx, stop_idx, soft_iteration, iteration = chunk
+            try:
+                with self._pipeline_lock:
+                    self.store_hard_data(new_data, start_idx, stop_idx,
+                                         soft_iteration)
+            except Exception as e:
+                self._pipeline_exception = e
+            else:
+                self._pipeline_stored.put(iteration)
+
+    def _update_pipeline_plots(self):
+        """
+        Updates the plots for all chunks stored by the pipeline thread
+        since the last call. Runs in the main thread.
+        """
+        while True:
+            try:
+                iteration = self._pipeline_stored.get_nowait()
+            except queue.Empty:
+                break
+            with self._pipeline_lock:
+                self.update_hard_plots(iteration)
+
+    def _raise_pipeline_exception(self):
+        if self._pipeline_exception is not None:
+            e = self._pipeline_exception
+            self._pipeline_exception = None
+            raise e
+
+    def add_timing(self, stage: str, start_time: float):
+        """
+        Adds the time elapsed since "start_time" to the timing counter of
+        a stage of the measurement loop. Timings are saved in the
+        "MC settings" group of the data file.
+        """
+        self.timings[stage] = (self.timings.get(stage, 0) +
+                               time.time() - start_time)
 
     def measurement_function(self, x):
         '''
@@ -387,6 +634,7 @@ class MeasurementControl(Instrument):
         if np.size(x) != len(self.sweep_functions):
             raise ValueError(
                 'size of x "%s" not equal to # sweep functions' % x)
+        t0 = time.time()
         for i, sweep_function in enumerate(self.sweep_functions[::-1]):
             # If statement below tests if the value is different from the
             # last value that was set, if it is the same the sweep function
@@ -429,11 +677,15 @@ class MeasurementControl(Instrument):
 
         # used for next iteration
         self.last_sweep_pts = x
+        self.add_timing('set_parameter', t0)
 
         datasetshape = self.dset.shape
         # self.iteration = datasetshape[0] + 1
 
+        t0 = time.time()
         vals = self.detector_function.acquire_data_point()
+        self.add_timing('get_values', t0)
+        t0 = time.time()
         start_idx, stop_idx = self.get_datawriting_indices_update_ctr(vals)
         # Resizing dataset and saving
         new_datasetshape = (np.max([datasetshape[0], stop_idx]),
@@ -446,14 +698,22 @@ class MeasurementControl(Instrument):
                     (1+self.soft_iteration))
 
         self.dset[start_idx:stop_idx, :] = new_vals
+        nr_sweep_funcs = len(self.sweep_functions)
+        self.update_binned_statistics(start_idx, new_vals[:, nr_sweep_funcs:],
+                                      old_vals[:, nr_sweep_funcs:])
+        self.add_timing('data_storing', t0)
         # update plotmon
         self.check_keyboard_interrupt()
+        t0 = time.time()
         self.update_instrument_monitor()
+        self.add_timing('instrument_monitor', t0)
+        t0 = time.time()
         self.update_plotmon()
         if self.mode == '2D':
             self.update_plotmon_2D()
         elif self.mode == 'adaptive':
             self.update_plotmon_adaptive()
+        self.add_timing('plotting', t0)
         self.iteration += 1
         if self.mode != 'adaptive':
             self.print_progress(stop_idx)
@@ -504,6 +764,116 @@ class MeasurementControl(Instrument):
 
         return vals
 
+    def measurement_function_batch(self, sweep_points):
+        """
+        Measures a batch of points in an adaptive measurement.
+
+        Args:
+            sweep_points (array): shape (nr_points, nr_sweep_functions)
+
+        Returns:
+            array of shape (nr_points, nr_values)
+
+        For a hard detector the sweep points are set on the (hard) sweep
+        functions and passed to the detector, and all points are acquired
+        in a single acquisition. For a soft detector the points are
+        measured one by one using the measurement_function.
+        """
+        sweep_points = np.array(sweep_points, dtype=float)
+        if sweep_points.ndim == 1:
+            sweep_points = sweep_points.reshape(-1, 1)
+        if np.shape(sweep_points)[1] != len(self.sweep_functions):
+            raise ValueError(
+                'shape of sweep points "{}" does not match # sweep '
+                'functions'.format(np.shape(sweep_points)))
+        nr_points = len(sweep_points)
+
+        if self.detector_function.detector_control == 'soft':
+            vals = [np.ravel(self.measurement_function(x))
+                    for x in sweep_points]
+            return np.array(vals)
+
+        for sweep_function in self.sweep_functions:
+            if sweep_function.sweep_control != 'hard':
+                raise Exception('Sweep and Detector functions not '
+                                'of the same type. \nAborting measurement')
+        t0 = time.time()
+        for i, sweep_function in enumerate(self.sweep_functions):
+            sweep_function.sweep_points = sweep_points[:, i]
+            sweep_function.prepare()
+        self.add_timing('set_parameter', t0)
+        t0 = time.time()
+        if len(self.sweep_functions) == 1:
+            self.detector_function.prepare(sweep_points=sweep_points[:, 0])
+        else:
+            self.detector_function.prepare(sweep_points=sweep_points)
+        self.add_timing('prepare', t0)
+        t0 = time.time()
+        vals = np.reshape(self.detector_function.get_values(),
+                          (-1, nr_points)).T
+        self.add_timing('get_values', t0)
+
+        t0 = time.time()
+        start_idx = self.get_datawriting_start_idx()
+        stop_idx = start_idx + nr_points
+        self.total_nr_acquired_values += nr_points
+        self.dset.resize((stop_idx, self.dset.shape[1]))
+        self.dset[start_idx:stop_idx, :] = np.concatenate(
+            [sweep_points, vals], axis=1)
+        self.last_sweep_pts = sweep_points[-1]
+        self.add_timing('data_storing', t0)
+
+        self.check_keyboard_interrupt()
+        t0 = time.time()
+        self.update_instrument_monitor()
+        self.add_timing('instrument_monitor', t0)
+        t0 = time.time()
+        self.update_plotmon()
+        self.update_plotmon_adaptive()
+        self.add_timing('plotting', t0)
+        self.iteration += 1
+        self.print_progress_adaptive()
+        return vals
+
+    def optimization_function_batch(self, x):
+        """
+        Batched version of the optimization_function, used for adaptive
+        functions that are marked with
+        pycqed.measurement.optimization.batch_evaluation.
+
+        Args:
+            x (array): shape (nr_points, nr_sweep_functions), the points
+                proposed by the optimizer.
+
+        Returns:
+            array of nr_points scores.
+
+        Applies "x_scale", "minimize", "f_termination" and "par_idx" in
+        the same way as the optimization_function. Every batch is appended
+        to the "batch_optimization_result" dataset.
+        "f_termination" is compared with every value in the batch, this
+        includes points that the optimizer evaluates speculatively and
+        does not accept.
+        """
+        x = np.array(x, dtype=float)
+        if x.ndim == 1:
+            x = x.reshape(-1, 1)
+        if self.x_scale is not None:
+            x = x/np.array(self.x_scale, dtype=float)
+
+        vals = self.measurement_function_batch(x)[:, self.par_idx]
+        self.save_batch_optimization_results(x, vals)
+
+        if self.f_termination is not None:
+            if self.minimize_optimization:
+                if np.any(vals < self.f_termination):
+                    raise StopIteration()
+            elif np.any(vals > self.f_termination):
+                raise StopIteration()
+        if not self.minimize_optimization:
+            vals = np.multiply(-1, vals)
+        return vals
+
     def finish(self, result):
         '''
         Deletes arrays to clean up memory and avoid memory related mistakes
@@ -521,7 +891,8 @@ class MeasurementControl(Instrument):
                      'xlen',
                      'ylen',
                      'iteration',
-                     'soft_iteration']:
+                     'soft_iteration',
+                     'opt_res_dset']:
             try:
                 delattr(self, attr)
             except AttributeError:
@@ -651,11 +1022,16 @@ class MeasurementControl(Instrument):
                 j += 1
             self.main_QtPlot.win.nextRow()
 
+    def update_binned_statistics(self, start_idx, new_vals, old_vals):
+        """
+        Updates the running per-bin statistics (if exp_metadata['bins'] is
+        specified) with the values written to rows start_idx onwards.
+        """
+        if getattr(self, 'binned_statistics', None) is not None:
+            self.binned_statistics.update(start_idx, new_vals, old_vals)
+
     def update_plotmon(self, force_update=False):
-        # Note: plotting_max_pts takes precendence over force update
-        if (self.live_plot_enabled() and (self.dset.shape[0] <
-                                          self.plotting_max_pts() or
-                                          (self.plotting_bins is not None))):
+        if self.live_plot_enabled():
             i = 0
             try:
                 time_since_last_mon_update = time.time() - self._mon_upd_time
@@ -666,29 +1042,31 @@ class MeasurementControl(Instrument):
             try:
                 if (time_since_last_mon_update > self.plotting_interval() or
                         force_update):
+                    # used to average e.g., single shot measuremnts
+                    # can be specified in MC.run(exp_metadata['bins'])
+                    if self.plotting_bins is not None:
+                        stats = self.binned_statistics
+                        if stats.version == self._plotted_stats_version:
+                            # nothing changed since the last update
+                            return
+                        self._plotted_stats_version = stats.version
+                        binned_means = stats.mean()
+                    else:
+                        # above plotting_max_pts only every n-th point
+                        # is plotted
+                        step = int(np.ceil(self.dset.shape[0] /
+                                           self.plotting_max_pts()))
+                        step = max(step, 1)
 
                     nr_sweep_funcs = len(self.sweep_function_names)
                     for y_ind in range(len(self.detector_function.value_names)):
                         for x_ind in range(nr_sweep_funcs):
-                            x = self.dset[:, x_ind]
-                            y = self.dset[:, nr_sweep_funcs+y_ind]
-
-                            # used to average e.g., single shot measuremnts
-                            # can be specified in MC.run(exp_metadata['bins'])
                             if self.plotting_bins is not None:
                                 x = self.plotting_bins
-                                if len(y) % len(x) != 0:
-                                    # nan's are appended if shapes do not match
-                                    missing_vals = missing_vals = \
-                                        int(len(x)-len(y) % len(x))
-                                    y_ext = np.concatenate([
-                                        y, np.ones(missing_vals)*np.nan])
-                                else:
-                                    y_ext = y
-
-                                y = np.nanmean(y_ext.reshape(
-                                    (len(self.plotting_bins), -1),
-                                    order='F'), axis=1)
+                                y = binned_means[y_ind]
+                            else:
+                                x = self.dset[::step, x_ind]
+                                y = self.dset[::step, nr_sweep_funcs+y_ind]
 
                             self.curves[i]['config']['x'] = x
                             self.curves[i]['config']['y'] = y
@@ -1089,15 +1467,21 @@ class MeasurementControl(Instrument):
             except Exception as e:
                 logging.warning(e)
 
-    def update_plotmon_2D_hard(self):
+    def update_plotmon_2D_hard(self, iteration: int=None):
         '''
         Adds latest datarow to the TwoD_array and send it
         to the QC_QtPlot.
         Note that the plotmon only supports evenly spaced lattices.
+
+        Args:
+            iteration (int): iteration of the data row, defaults to
+                the current iteration of MC.
         '''
+        if iteration is None:
+            iteration = self.iteration
         try:
             if self.live_plot_enabled():
-                i = int((self.iteration) % self.ylen)
+                i = int((iteration) % self.ylen)
                 y_ind = i
                 for j in range(len(self.detector_function.value_names)):
                     z_ind = len(self.sweep_functions) + j
@@ -1108,7 +1492,7 @@ class MeasurementControl(Instrument):
 
                 if (time.time() - self.time_last_2Dplot_update >
                         self.plotting_interval()
-                        or self.iteration == len(self.sweep_points)/self.xlen):
+                        or iteration == len(self.sweep_points)/self.xlen):
                     self.time_last_2Dplot_update = time.time()
                     self.secondary_QtPlot.update_plot()
         except Exception as e:
@@ -1164,12 +1548,26 @@ class MeasurementControl(Instrument):
 
     def create_experimentaldata_dataset(self):
         data_group = self.data_object.create_group('Experimental Data')
-        self.dset = data_group.create_dataset(
-            'Data', (0, len(self.sweep_functions) +
-                     len(self.detector_function.value_names)),
-            maxshape=(None, len(self.sweep_functions) +
-                      len(self.detector_function.value_names)),
-            dtype='float64')
+        nr_cols = (len(self.sweep_functions) +
+                   len(self.detector_function.value_names))
+        expected_nr_rows = None
+        if self.mode != 'adaptive':
+            try:
+                expected_nr_rows = len(self.get_sweep_points())
+            except Exception:
+                # some sweep functions only set the sweep points in the
+                # prepare statement.
+                pass
+        self.dset = h5d.create_data_dataset(
+            data_group, nr_cols=nr_cols, expected_nr_rows=expected_nr_rows,
+            layout=self.cfg_datasaving_layout(),
+            compression=self.cfg_datasaving_compression(),
+            dtype=self.cfg_datasaving_dtype())
+        if self.cfg_datasaving_flush_interval() > 0:
+            self.dset = h5d.BufferedDataset(
+                self.dset,
+                flush_interval=self.cfg_datasaving_flush_interval(),
+                expected_nr_rows=expected_nr_rows)
         self.get_column_names()
         self.dset.attrs['column_names'] = h5d.encode_to_utf8(self.column_names)
         # Added to tell analysis how to extract the data
@@ -1254,6 +1652,35 @@ class MeasurementControl(Instrument):
         self.opt_res_dset.resize(new_shape)
         self.opt_res_dset[-1, :] = results_array
 
+    def save_batch_optimization_results(self, x, vals):
+        """
+        Appends the result of a batch in a batched adaptive measurement
+        (see optimization_function_batch) to the hdf5 file.
+
+        Args:
+            x (array): the (rescaled) points of the batch
+            vals (array): the measured values of the batch
+        """
+        idx_best = np.argmin(vals) if self.minimize_optimization \
+            else np.argmax(vals)
+        if (not 'batch_optimization_result'
+                in self.data_object['Experimental Data'].keys()):
+            opt_res_grp = self.data_object['Experimental Data']
+            self.opt_res_dset = opt_res_grp.create_dataset(
+                'batch_optimization_result', (0, 3 + len(x[idx_best])),
+                maxshape=(None, 3 + len(x[idx_best])),
+                dtype='float64')
+            self.opt_res_dset.attrs['column_names'] = h5d.encode_to_utf8(
+                'batch, ' + 'evaluations, ' + 'fbest, ' +
+                'xbest, '*len(x[idx_best]))
+
+        old_shape = self.opt_res_dset.shape
+        new_shape = (old_shape[0]+1, old_shape[1])
+        self.opt_res_dset.resize(new_shape)
+        self.opt_res_dset[-1, :] = np.concatenate(
+            [[old_shape[0], self.total_nr_acquired_values, vals[idx_best]],
+             x[idx_best]])
+
     def save_optimization_results(self, adaptive_function, result):
         """
         Saves the result of an adaptive measurement (optimization) to
@@ -1331,6 +1758,13 @@ class MeasurementControl(Instrument):
         set_grp.attrs['mode'] = self.mode
         set_grp.attrs['measurement_name'] = self.measurement_name
         set_grp.attrs['live_plot_enabled'] = self.live_plot_enabled()
+        set_grp.attrs['pipelined_hard_sweeps'] = \
+            self.cfg_pipelined_hard_sweeps()
+
+        # total time in seconds spent in each stage of the measurement loop
+        timings_grp = set_grp.create_group('timings')
+        h5d.write_dict_to_hdf5(getattr(self, 'timings', {}),
+                               entry_point=timings_grp)
 
     @classmethod
     def save_exp_metadata(self, metadata: dict, data_object):
@@ -1610,6 +2044,12 @@ class MeasurementControl(Instrument):
             "par_idx": 0            If a parameter returns multiple values,
                                     specifies which one to use.
 
+        Adaptive functions marked with
+        pycqed.measurement.optimization.batch_evaluation (e.g.,
+        "SPSA_batch" and "cma_es_batch") propose batches of points. A batch
+        is measured in a single acquisition if the detector is a hard
+        detector, see "measurement_function_batch".
+
         Common keywords (used in python nelder_mead implementation):
             "x0":                   list of initial values
             "initial_step"
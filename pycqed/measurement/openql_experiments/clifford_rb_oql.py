@@ -3,6 +3,7 @@ This file reads in a pygsti dataset file and converts it to a valid
 OpenQL sequence.
 """
 
+import numpy as np
 from os.path import join
 
 from pycqed.measurement.randomized_benchmarking import \
@@ -22,7 +23,8 @@ def randomized_benchmarking(qubits: list, platf_cfg: str,
                             program_name: str='randomized_benchmarking',
                             cal_points: bool=True,
                             f_state_cal_pts: bool=True,
-                            recompile: bool=True):
+                            recompile: bool=True,
+                            seed: int=None):
     '''
     Input pars:
         qubits:         list of ints specifying qubit indices.
@@ -53,6 +55,11 @@ def randomized_benchmarking(qubits: list, platf_cfg: str,
         cal_points:     bool whether to replace the last two elements with
                         calibration points, set to False if you want
                         to measure a single element (for e.g. optimization)
+        seed:           int used to seed the generation of the random
+                        sequences. If None new random sequences are
+                        generated. Programs with a seed are reproducible,
+                        which allows reusing them from the program cache
+                        (see openql_helpers.compile_cached).
 
         recompile:      True -> compiles the program,
                         'as needed' -> compares program to timestamp of config
@@ -129,52 +136,63 @@ def randomized_benchmarking(qubits: list, platf_cfg: str,
     else:
         raise NotImplementedError()
 
-    for seed in range(nr_seeds):
+    if seed is None:
+        seeds = [None]*nr_seeds
+    else:
+        # one seed for every random sequence
+        seed_rng = np.random.RandomState(seed)
+        seeds = list(seed_rng.randint(2**31, size=nr_seeds))
+
+    if not simultaneous_single_qubit_RB:
+        # All sequences are generated at once. The recovery clifford is
+        # added per net clifford as the sequences are shared.
+        cl_seqs, seq_lengths = rb.randomized_benchmarking_sequences(
+            nr_cliffords, seeds=seeds,
+            desired_net_cl=None,
+            number_of_qubits=number_of_qubits,
+            max_clifford_idx=max_clifford_idx,
+            interleaving_cls=interleaving_cliffords)
+        cl_seqs_decomposed = rb.decompose_clifford_sequences(
+            cl_seqs, seq_lengths, Cl)
+        recovery_cls = {net_clifford: rb.calculate_recovery_cliffords(
+            cl_seqs, seq_lengths, desired_net_cl=net_clifford, Clifford=Cl)
+            for net_clifford in net_cliffords}
+        seq_idx = 0
+
+    for seed_idx in range(nr_seeds):
         for j, n_cl in enumerate(nr_cliffords):
             for interleaving_cl in interleaving_cliffords:
                 if not simultaneous_single_qubit_RB:
-                    cl_seq = rb.randomized_benchmarking_sequence(
-                            n_cl, number_of_qubits=number_of_qubits,
-                            desired_net_cl=None,#net_clifford,
-                            max_clifford_idx=max_clifford_idx,
-                            interleaving_cl=interleaving_cl
-                            )
-                    net_cl_seq = rb.calculate_net_clifford(cl_seq,Cl)
-                    cl_seq_decomposed = []
-                    for cl in cl_seq:
-                        # hacking in exception for benchmarking only CZ
-                        # (not as a member of CNOT group)
-                        if cl == -4368:
-                            cl_seq_decomposed.append([('CZ', ['q0', 'q1'])])
-                        else:
-                            cl_seq_decomposed.append(Cl(cl).gate_decomposition)
+                    cl_seq_decomposed = cl_seqs_decomposed[seq_idx]
                     for net_clifford in net_cliffords:
-                        recovery_to_idx_clifford = net_cl_seq.get_inverse()
-                        recovery_clifford = Cl(net_clifford)*recovery_to_idx_clifford
-                        cl_seq_decomposed_with_net = cl_seq_decomposed+[recovery_clifford.gate_decomposition]
+                        recovery_clifford = Cl(
+                            recovery_cls[net_clifford][seq_idx])
+                        cl_seq_decomposed_with_net = (
+                            cl_seq_decomposed +
+                            recovery_clifford.gate_decomposition)
                         k = oqh.create_kernel('RB_{}Cl_s{}_net{}_inter{}'.format(
-                            n_cl, seed, net_clifford, interleaving_cl), p)
+                            n_cl, seed_idx, net_clifford, interleaving_cl), p)
                         if initialize:
                             for qubit_idx in qubit_map.values():
                                 k.prepz(qubit_idx)
 
-                        for gates in cl_seq_decomposed_with_net:
-                            for g, q in gates:
-                                if isinstance(q, str):
-                                    k.gate(g, [qubit_map[q]])
-                                elif isinstance(q, list):
-                                    # proper codeword
-                                    k.gate(g, [qubit_map[q[0]], qubit_map[q[1]]])
+                        for g, q in cl_seq_decomposed_with_net:
+                            if isinstance(q, str):
+                                k.gate(g, [qubit_map[q]])
+                            elif isinstance(q, list):
+                                # proper codeword
+                                k.gate(g, [qubit_map[q[0]], qubit_map[q[1]]])
                         # This hack is required to align multiplexed RO in openQL..
                         k.gate("wait",  list(qubit_map.values()), 0)
                         for qubit_idx in qubit_map.values():
                             k.measure(qubit_idx)
                         k.gate("wait",  list(qubit_map.values()), 0)
                         p.add_kernel(k)
+                    seq_idx += 1
                 elif simultaneous_single_qubit_RB: 
                     for net_clifford in net_cliffords:
                         k = oqh.create_kernel('RB_{}Cl_s{}_net{}_inter{}'.format(
-                            n_cl, seed, net_clifford, interleaving_cl), p)
+                            n_cl, seed_idx, net_clifford, interleaving_cl), p)
                         if initialize:
                             for qubit_idx in qubit_map.values():
                                 k.prepz(qubit_idx)
@@ -185,7 +203,9 @@ def randomized_benchmarking(qubits: list, platf_cfg: str,
                             cl_seq = rb.randomized_benchmarking_sequence(
                                 n_cl, number_of_qubits=1,
                                 desired_net_cl=net_clifford,
-                                interleaving_cl=interleaving_cl)
+                                interleaving_cl=interleaving_cl,
+                                seed=None if seed is None else
+                                seed_rng.randint(2**31))
                             for cl in cl_seq:
                                 gates = Cl(cl).gate_decomposition
                                 # for g, q in gates:
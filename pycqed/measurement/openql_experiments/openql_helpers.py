@@ -1,12 +1,19 @@
+import os
 import re
+import json
+import shutil
+import inspect
+import hashlib
 import numpy as np
 from os.path import join, dirname
+from collections import namedtuple
+from concurrent.futures import Future, ProcessPoolExecutor
 from pycqed.utilities.general import suppress_stdout
 import matplotlib.pyplot as plt
 from pycqed.analysis.tools.plotting import set_xlabel, set_ylabel
 from matplotlib.ticker import MaxNLocator
 import matplotlib.patches as mpatches
-from pycqed.utilities.general import is_more_rencent
+from pycqed.utilities.general import is_more_rencent, NumpyJsonEncoder
 import openql.openql as ql
 from openql.openql import Program, Kernel, Platform
 
@@ -14,6 +21,9 @@ from openql.openql import Program, Kernel, Platform
 output_dir = join(dirname(__file__), 'output')
 ql.set_option('output_dir', output_dir)
 
+# compiled programs are stored in this directory, named by their hash
+program_cache_dir = join(output_dir, 'program_cache')
+
 
 def create_program(pname: str, platf_cfg: str, nregisters: int=0):
     """
@@ -503,6 +513,209 @@ def check_recompilation_needed(program_fn: str, platf_cfg: str,
             'recompile should be True, False or "as needed"')
 
 
+#############################################################################
+# Program cache and parallel compilation
+#############################################################################
+
+CompiledProgram = namedtuple('CompiledProgram', ['name', 'filename'])
+
+
+def program_hash(generator, platf_cfg: str, **kw):
+    """
+    Returns a hash identifying the program generated by "generator" with
+    arguments "kw" for the platform configuration "platf_cfg".
+
+    The hash contains the source of the generator function, the arguments
+    and the contents of the platform configuration file. The program name
+    and the recompile argument are not part of the hash, such that programs
+    with identical content (e.g. for qubits with the same index) share
+    the hash. Changes to functions called by the generator are not
+    detected, use clear_program_cache if these change.
+    """
+    kw = {key: val for key, val in kw.items()
+          if key not in ('program_name', 'recompile')}
+    h = hashlib.sha1()
+    h.update('{}.{}'.format(generator.__module__,
+                            generator.__qualname__).encode())
+    h.update(inspect.getsource(generator).encode())
+    h.update(json.dumps(kw, sort_keys=True, cls=NumpyJsonEncoder).encode())
+    with open(platf_cfg, 'rb') as f:
+        h.update(f.read())
+    return h.hexdigest()
+
+
+def cached_program_filename(generator, platf_cfg: str, **kw):
+    """
+    Returns the filename of the program in the program cache (which need
+    not exist).
+    """
+    return join(program_cache_dir, program_hash(
+        generator, platf_cfg=platf_cfg, **kw) + '.qisa')
+
+
+def clear_program_cache():
+    """
+    Removes all programs from the program cache.
+    """
+    if os.path.isdir(program_cache_dir):
+        shutil.rmtree(program_cache_dir)
+
+
+def compile_cached(generator, platf_cfg: str, program_name: str,
+                   recompile='as needed', **kw):
+    """
+    Generates and compiles a program, reusing the compiled program from the
+    program cache if the same program was compiled before.
+
+    Args:
+        generator       : function that generates and compiles an OpenQL
+            program, e.g. clifford_rb_oql.randomized_benchmarking. It is
+            called with the arguments "platf_cfg", "program_name",
+            "recompile" and kw and should return the compiled program.
+        platf_cfg (str) : location of the platform configuration
+        program_name (str): name of the program
+        recompile       : True -> compiles the program and updates the cache
+                          'as needed' -> uses the cached program if it exists
+                          False -> uses the cached program, if it does not
+                            exist raises a ValueError
+        kw              : other arguments of the generator, these should
+            be JSON serializable (numpy arrays are allowed).
+
+    Returns:
+        CompiledProgram (name, filename), the .qisa file is located in the
+        OpenQL output_dir as for programs compiled directly.
+    """
+    cache_fn = cached_program_filename(generator, platf_cfg=platf_cfg, **kw)
+    filename = join(ql.get_option('output_dir'), program_name + '.qisa')
+    if recompile is not True and os.path.exists(cache_fn):
+        shutil.copyfile(cache_fn, filename)
+        return CompiledProgram(program_name, filename)
+    elif recompile is False:
+        raise ValueError('Program "{}" is not in the program cache.'.format(
+            program_name))
+
+    p = generator(platf_cfg=platf_cfg, program_name=program_name,
+                  recompile=True, **kw)
+    os.makedirs(program_cache_dir, exist_ok=True)
+    # The program is first copied to a temporary file, such that other
+    # processes never read a partially written program.
+    tmp_fn = '{}.{}.tmp'.format(cache_fn, os.getpid())
+    shutil.copyfile(p.filename, tmp_fn)
+    os.replace(tmp_fn, cache_fn)
+    return CompiledProgram(p.name, p.filename)
+
+
+def _compile_cached_worker(output_dir: str, cache_dir: str, generator,
+                           kw: dict):
+    # The worker processes need not inherit the options and the program
+    # cache location of the parent process (e.g. when processes are spawned)
+    global program_cache_dir
+    ql.set_option('output_dir', output_dir)
+    program_cache_dir = cache_dir
+    return compile_cached(generator, **kw)
+
+
+class PendingProgram:
+    """
+    Program that is being compiled by "compile_programs".
+
+    Can be used instead of a compiled program in e.g.
+    "load_range_of_oql_programs": getting the filename waits until the
+    program is compiled.
+    """
+
+    def __init__(self, name: str, future):
+        self.name = name
+        self.future = future
+
+    def done(self):
+        return self.future.done()
+
+    @property
+    def filename(self):
+        return self.future.result().filename
+
+
+class PendingPrograms(list):
+    """
+    List of PendingProgram returned by "compile_programs", holds the pool
+    of processes compiling the programs.
+
+    Call "close" (or use it as a context manager) when the programs are
+    no longer needed to shut down the pool.
+    """
+
+    def __init__(self, programs, executor=None):
+        super().__init__(programs)
+        self.executor = executor
+
+    def done(self):
+        return all(p.done() for p in self)
+
+    def close(self, cancel: bool=False):
+        """
+        Shuts down the pool of processes, waiting for the programs that
+        are being compiled.
+
+        Args:
+            cancel (bool): if True, the programs that have not started
+                compiling yet are cancelled, otherwise these are compiled
+                before the pool is shut down.
+        """
+        if self.executor is None:
+            return
+        if cancel:
+            for p in self:
+                p.future.cancel()
+        self.executor.shutdown(wait=True)
+        self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close(cancel=exc_type is not None)
+
+
+def compile_programs(generator, kw_list: list, processes: int=None):
+    """
+    Compiles many programs in parallel using a pool of processes and the
+    program cache.
+
+    Args:
+        generator       : see compile_cached
+        kw_list (list)  : for every program a dict with the arguments of
+            compile_cached (e.g. "platf_cfg", "program_name", "recompile"
+            and the arguments of the generator).
+        processes (int) : number of processes used for compiling, defaults
+            to the number of CPUs
+
+    Returns:
+        programs (PendingPrograms) : a PendingProgram for every entry in
+            kw_list. The function returns directly, the programs are
+            compiled in the order of kw_list such that a measurement can
+            start on the first programs while the others are still being
+            compiled. Cached programs are ready immediately.
+            Call programs.close() when done to shut down the pool.
+    """
+    programs = []
+    executor = None
+    for kw in kw_list:
+        if (kw.get('recompile', 'as needed') is not True and
+                os.path.exists(cached_program_filename(generator, **kw))):
+            future = Future()
+            future.set_result(compile_cached(generator, **kw))
+            programs.append(PendingProgram(kw['program_name'], future))
+            continue
+        if executor is None:
+            executor = ProcessPoolExecutor(max_workers=processes)
+        future = executor.submit(_compile_cached_worker,
+                                 ql.get_option('output_dir'),
+                                 program_cache_dir, generator, kw)
+        programs.append(PendingProgram(kw['program_name'], future))
+    return PendingPrograms(programs, executor)
+
+
 def load_range_of_oql_programs(programs, counter_param, CC):
     """
     This is a helper function for running an experiment that is spread over
@@ -236,3 +236,240 @@ def SPSA(fun, x0,
     # verification
     fun(res[0][0])
     return res[0]
+
+
+def batch_evaluation(optimizer):
+    '''
+    Marks an optimizer whose objective function evaluates a batch of points
+    at once. The objective is called with an array of shape
+    (nr_points, dim) and must return an array of nr_points scores.
+
+    MeasurementControl passes such optimizers an objective that measures
+    all points of a batch together (see
+    MeasurementControl.optimization_function_batch).
+    '''
+    optimizer.batch_evaluation = True
+    return optimizer
+
+
+@batch_evaluation
+def nelder_mead_batch(fun_batch, x0,
+                      initial_step=0.1,
+                      no_improve_thr=10e-6, no_improv_break=10,
+                      maxiter=0,
+                      alpha=1., gamma=2., rho=-0.5, sigma=0.5,
+                      verbose=False):
+    '''
+    Batched version of the Nelder-Mead algorithm, see "nelder_mead" for
+    a description of the parameters.
+
+    fun_batch (function): function to optimize, takes an array of shape
+        (nr_points, dim) and returns an array of nr_points scores.
+
+    The initial simplex and the shrink steps are evaluated as a single
+    batch. In every iteration the reflection, expansion and contraction
+    points are evaluated together (speculatively), this costs up to two
+    extra evaluations but only a single round-trip per iteration.
+    The accepted points are the same as those of "nelder_mead", but a
+    termination condition of the function (e.g., "f_termination" of the
+    MeasurementControl) can be met by a speculative point that
+    "nelder_mead" would not have evaluated.
+
+    return: tuple (best parameter array, best score)
+    '''
+    # init
+    x0 = np.array(x0, dtype=float)  # ensures algorithm also accepts lists
+    dim = len(x0)
+    if type(initial_step) is float:
+        initial_step_matrix = np.eye(dim)*initial_step
+    elif (type(initial_step) is list) or (type(initial_step) is np.ndarray):
+        if len(initial_step) != dim:
+            raise ValueError('initial_step array must be same lenght as x0')
+        initial_step_matrix = np.diag(initial_step)
+    else:
+        raise TypeError('initial_step ({})must be list or np.array'.format(
+                        type(initial_step)))
+
+    simplex = np.concatenate([[x0], x0 + initial_step_matrix])
+    scores = fun_batch(simplex)
+    res = [[x, score] for x, score in zip(simplex, scores)]
+    prev_best = res[0][1]
+    no_improv = 0
+
+    # simplex iter
+    iters = 0
+    while 1:
+        # order
+        res.sort(key=lambda x: x[1])
+        best = res[0][1]
+
+        # break after maxiter
+        if maxiter and iters >= maxiter:
+            # Conclude failure break the loop
+            if verbose:
+                print('max iterations exceeded, optimization failed')
+            break
+        iters += 1
+
+        if best < prev_best - no_improve_thr:
+            no_improv = 0
+            prev_best = best
+        else:
+            no_improv += 1
+
+        if no_improv >= no_improv_break:
+            # Conclude success, break the loop
+            if verbose:
+                print('No improvement registered for {} rounds,'.format(
+                      no_improv_break) + 'concluding succesful convergence')
+            break
+
+        # centroid
+        x0 = np.mean([tup[0] for tup in res[:-1]], axis=0)
+
+        # reflection, expansion and contraction in a single batch
+        xr = x0 + alpha*(x0 - res[-1][0])
+        xe = x0 + gamma*(x0 - res[-1][0])
+        xc = x0 + rho*(x0 - res[-1][0])
+        rscore, escore, cscore = fun_batch(np.array([xr, xe, xc]))
+
+        if res[0][1] <= rscore < res[-2][1]:
+            del res[-1]
+            res.append([xr, rscore])
+            continue
+
+        # expansion
+        if rscore < res[0][1]:
+            del res[-1]
+            if escore < rscore:
+                res.append([xe, escore])
+            else:
+                res.append([xr, rscore])
+            continue
+
+        # contraction
+        if cscore < res[-1][1]:
+            del res[-1]
+            res.append([xc, cscore])
+            continue
+
+        # reduction
+        x1 = res[0][0]
+        redx = np.array([x1 + sigma*(tup[0] - x1) for tup in res])
+        res = [[x, score] for x, score in zip(redx, fun_batch(redx))]
+
+    # once the loop is broken evaluate the final value one more time as
+    # verification
+    fun_batch(np.array([res[0][0]]))
+    return res[0]
+
+
+@batch_evaluation
+def SPSA_batch(fun_batch, x0,
+               initial_step=0.1,
+               no_improve_thr=10e-6, no_improv_break=10,
+               maxiter=0,
+               gamma=0.101, alpha=0.602, a=0.2, c=0.3, A=300,
+               p=0.5, ctrl_min=0., ctrl_max=np.pi,
+               verbose=False):
+    '''
+    Batched version of the SPSA algorithm, see "SPSA" for a description
+    of the parameters.
+
+    fun_batch (function): function to optimize, takes an array of shape
+        (nr_points, dim) and returns an array of nr_points scores.
+
+    Every iteration evaluates the current position and the two perturbed
+    positions used to estimate the gradient as a single batch of 3 points,
+    instead of 3 separate evaluations.
+
+    return: tuple (best parameter array, best score)
+    '''
+    # init
+    x = np.array(x0, dtype=float)  # ensures algorithm also accepts lists
+    dim = len(x)
+    prev_best = np.inf
+    no_improv = 0
+    res = []
+
+    # SPSA iter
+    iters = 0
+    while 1:
+        iters += 1
+        # step 1
+        a_k = a/(iters+A)**alpha
+        c_k = c/iters**gamma
+        # step 2
+        delta = np.where(np.random.rand(dim) > p, 1, -1)
+        # step 3, the score of the current position is measured together
+        # with the perturbations
+        x_plus = x+c_k*delta
+        x_minus = x-c_k*delta
+        score, y_plus, y_minus = fun_batch(np.array([x, x_plus, x_minus]))
+        res.append([x, score])
+
+        # order
+        res.sort(key=lambda x: x[1])
+        best = res[0][1]
+
+        if best < prev_best - no_improve_thr:
+            no_improv = 0
+            prev_best = best
+        else:
+            no_improv += 1
+
+        if no_improv >= no_improv_break:
+            # Conclude success, break the loop
+            if verbose:
+                print('No improvement registered for {} rounds,'.format(
+                      no_improv_break) + 'concluding succesful convergence')
+            break
+
+        # break after maxiter
+        if maxiter and iters >= maxiter:
+            # Conclude failure break the loop
+            if verbose:
+                print('max iterations exceeded, optimization failed')
+            break
+
+        # step 4
+        gradient = (y_plus-y_minus)/(2.*c_k*delta)
+        # step 5
+        x = x-a_k*gradient
+        x = np.where(x < ctrl_min, ctrl_min, x)
+        x = np.where(x > ctrl_max, ctrl_max, x)
+
+    # once the loop is broken evaluate the final value one more time as
+    # verification
+    fun_batch(np.array([res[0][0]]))
+    return res[0]
+
+
+@batch_evaluation
+def cma_es_batch(fun_batch, x0, sigma0, options=None, callback=None):
+    '''
+    CMA-ES optimization using the ask and tell interface of the "cma"
+    package. Every generation (population) is evaluated as a single batch.
+
+    parameters:
+        fun_batch (function): function to optimize, takes an array of shape
+            (nr_points, dim) and returns an array of nr_points scores.
+        x0 (numpy array): initial position
+        sigma0 (float): initial standard deviation
+        options (dict): options for the CMA algorithm, can be found using
+            "cma.CMAOptions()"
+        callback (function): called with the CMAEvolutionStrategy after
+            every generation, e.g. MC.save_cma_optimization_results
+
+    return: tuple (best parameter array, best score)
+    '''
+    # import here because cma is an optional dependency
+    import cma
+    es = cma.CMAEvolutionStrategy(x0, sigma0, options)
+    while not es.stop():
+        X = es.ask()
+        scores = fun_batch(np.array(X))
+        es.tell(X, list(scores))
+        if callback is not None:
+            callback(es)
+    return [es.result.xbest, es.result.fbest]
@@ -1,5 +1,6 @@
 from pycqed.measurement.randomized_benchmarking.two_qubit_clifford_group \
     import SingleQubitClifford, TwoQubitClifford
+import os
 from os.path import join, dirname, abspath
 from os import mkdir
 import numpy as np
@@ -11,6 +12,22 @@ try:
 except FileExistsError:
     pass
 
+def _write_table(filename: str, write_func, mode: str='w'):
+    """
+    Writes a table using write_func(file) to a temporary file that is then
+    moved to filename, such that an interrupted or concurrent generation
+    never leaves a truncated table behind.
+    """
+    tmp_fn = '{}.{}.tmp'.format(filename, os.getpid())
+    try:
+        with open(tmp_fn, mode) as f:
+            write_func(f)
+        os.replace(tmp_fn, filename)
+    finally:
+        if os.path.exists(tmp_fn):
+            os.remove(tmp_fn)
+
+
 def construct_clifford_lookuptable(generator, indices):
     """
     """
@@ -26,15 +43,45 @@ def generate_hash_tables():
     print("Generating Clifford hash tables.")
     single_qubit_hash_lut = construct_clifford_lookuptable(
         SingleQubitClifford, np.arange(24))
-    with open(join(output_dir, 'single_qubit_hash_lut.txt'), 'w') as f:
-        for h in single_qubit_hash_lut:
-            f.write(str(h)+'\n')
+    _write_table(join(output_dir, 'single_qubit_hash_lut.txt'),
+                 lambda f: f.writelines(str(h)+'\n'
+                                        for h in single_qubit_hash_lut))
     two_qubit_hash_lut = construct_clifford_lookuptable(
         TwoQubitClifford, np.arange(11520))
-    with open(join(output_dir, 'two_qubit_hash_lut.txt'), 'w') as f:
-        for h in two_qubit_hash_lut:
-            f.write(str(h)+'\n')
+    _write_table(join(output_dir, 'two_qubit_hash_lut.txt'),
+                 lambda f: f.writelines(str(h)+'\n'
+                                        for h in two_qubit_hash_lut))
     print("Successfully generated Clifford hash tables.")
 
+
+def construct_signed_permutation_table(generator, indices):
+    """
+    Returns an int8 array of shape (2, len(indices), d) containing the
+    signed permutation representation (perm, sign) of the Cliffords.
+    """
+    # imported here as this module is imported by two_qubit_clifford_group
+    # (to generate the hash tables) before ptm_to_signed_permutation is
+    # defined
+    from pycqed.measurement.randomized_benchmarking.two_qubit_clifford_group \
+        import ptm_to_signed_permutation
+    ptms = np.array([generator(idx=idx).pauli_transfer_matrix
+                     for idx in indices])
+    perm, sign = ptm_to_signed_permutation(ptms)
+    return np.array([perm, sign], dtype=np.int8)
+
+
+def generate_signed_permutation_tables():
+    print("Generating Clifford product tables.")
+    single_qubit_table = construct_signed_permutation_table(
+        SingleQubitClifford, np.arange(24))
+    _write_table(join(output_dir, 'single_qubit_signed_perm.npy'),
+                 lambda f: np.save(f, single_qubit_table), mode='wb')
+    two_qubit_table = construct_signed_permutation_table(
+        TwoQubitClifford, np.arange(11520))
+    _write_table(join(output_dir, 'two_qubit_signed_perm.npy'),
+                 lambda f: np.save(f, two_qubit_table), mode='wb')
+    print("Successfully generated Clifford product tables.")
+
 if __name__ == '__main__':
     generate_hash_tables()
+    generate_signed_permutation_tables()
@@ -26,20 +26,30 @@ def calculate_net_clifford(rb_clifford_indices,
     Note: the order corresponds to the order in a pulse sequence but is
         the reverse of what it would be in a chained dot product.
     '''
+    net_idx = calculate_net_clifford_idx(rb_clifford_indices, Clifford)
+    return Clifford(int(net_idx))
 
-    # Calculate the net clifford
-    net_clifford = Clifford(0)  # assumes element 0 is the Identity
-    for idx in rb_clifford_indices:
-        # hacking in exception for benchmarking only CZ
-        # (not as a member of CNOT group)
-        # abs is to remove the sign that is used to treat CZ ac CZ
-        # and not member of CNOT-like set of gates
-        cliff = Clifford(abs(idx))
-        # order of operators applied in is right to left, therefore
-        # the new operator is applied on the left side.
-        net_clifford = cliff*net_clifford
-    return net_clifford
 
+def calculate_net_clifford_idx(rb_clifford_indices,
+                               Clifford=tqc.SingleQubitClifford):
+    '''
+    Vectorized version of "calculate_net_clifford" that uses the product
+    tables of the Clifford group and does not instantiate Clifford objects.
+
+    Args:
+        rb_clifford_indices: array of integers of shape (..., n_cl)
+            specifying the cliffords, the last axis is the sequence.
+        Clifford : Clifford object used to determine the Clifford group.
+
+    Returns:
+        array of shape (...) containing the indices of the net-cliffords.
+    '''
+    # hacking in exception for benchmarking only CZ
+    # (not as a member of CNOT group)
+    # abs is to remove the sign that is used to treat CZ ac CZ
+    # and not member of CNOT-like set of gates
+    rb_clifford_indices = np.abs(np.asarray(rb_clifford_indices, dtype=int))
+    return Clifford.get_table().net_clifford(rb_clifford_indices)
 
 
 def calculate_recovery_clifford(cl_in, desired_cl=0):
@@ -183,13 +193,172 @@ def randomized_benchmarking_sequence(
 
     if desired_net_cl is not None:
         # Calculate the net clifford
-        net_clifford = calculate_net_clifford(rb_clifford_indices, Cl)
+        table = Cl.get_table()
+        net_clifford = calculate_net_clifford_idx(rb_clifford_indices, Cl)
 
         # determine the inverse of the sequence
-        recovery_to_idx_clifford = net_clifford.get_inverse()
-        recovery_clifford = Cl(desired_net_cl)*recovery_to_idx_clifford
+        recovery_to_idx_clifford = table.inverse[net_clifford]
+        recovery_clifford = table.multiply(desired_net_cl,
+                                           recovery_to_idx_clifford)
         rb_clifford_indices = np.append(rb_clifford_indices,
-                                        recovery_clifford.idx)
+                                        recovery_clifford)
     return rb_clifford_indices
 
 
+##############################################################################
+# Batched RB sequences
+##############################################################################
+
+
+def calculate_recovery_cliffords(rb_clifford_indices,
+                                 seq_lengths=None,
+                                 desired_net_cl: int = 0,
+                                 Clifford=tqc.SingleQubitClifford):
+    """
+    Calculates the recovery Cliffords for an array of sequences.
+
+    Args:
+        rb_clifford_indices (array): shape (nr_seqs, max_len) containing
+            the clifford indices of the sequences.
+        seq_lengths (array): length of each sequence, entries beyond the
+            length of a sequence are ignored. If None, all sequences are
+            assumed to be of length max_len.
+        desired_net_cl (int): idx of the desired net clifford
+        Clifford : Clifford object used to determine the Clifford group.
+    Returns:
+        array of shape (nr_seqs) containing the recovery cliffords.
+    """
+    rb_clifford_indices = np.asarray(rb_clifford_indices)
+    if seq_lengths is not None:
+        # padding is replaced by the identity
+        mask = (np.arange(rb_clifford_indices.shape[-1]) <
+                np.asarray(seq_lengths)[:, np.newaxis])
+        rb_clifford_indices = np.where(mask, rb_clifford_indices, 0)
+    table = Clifford.get_table()
+    net_clifford = calculate_net_clifford_idx(rb_clifford_indices, Clifford)
+    return table.multiply(desired_net_cl, table.inverse[net_clifford])
+
+
+def randomized_benchmarking_sequences(
+        nr_cliffords,
+        seeds,
+        desired_net_cl: int = 0,
+        number_of_qubits: int = 1,
+        max_clifford_idx: int = 11520,
+        interleaving_cls: list = [None],
+        padding: int = -1):
+    """
+    Generates randomized benchmarking sequences for many seeds, lengths and
+    interleaving cliffords at once.
+
+    Args:
+        nr_cliffords (list): number of Cliffords for which to generate
+            sequences.
+        seeds (list): seeds used to initialize the random number generator.
+            For every seed a sequence is generated for every number of
+            Cliffords. If a seed is None a new random sequence is drawn.
+        desired_net_cl (int): idx of the desired net clifford, if None is
+            specified no recovery Clifford is calculated
+        number_of_qubits (int): used to determine if Cliffords are drawn
+            from the single qubit or two qubit clifford group.
+        max_clifford_idx (int): used to set the index of the highest random
+            clifford generated.
+        interleaving_cls (list): interleaving cliffords, None corresponds
+            to no interleaving.
+        padding (int): value used to pad the sequences to equal length.
+
+    Returns:
+        sequences (array): shape (nr_seqs, max_len), containing the
+            clifford indices of all sequences padded with "padding".
+            The rows are ordered as (seed, nr_cliffords, interleaving_cl)
+            with the last index varying fastest.
+        seq_lengths (array): shape (nr_seqs) the length of each sequence.
+
+    For seeded sequences each row is identical to the output of
+    "randomized_benchmarking_sequence" with the same arguments.
+    """
+    if number_of_qubits == 1:
+        Cl = tqc.SingleQubitClifford
+        group_size = np.min([24, max_clifford_idx])
+    elif number_of_qubits == 2:
+        Cl = tqc.TwoQubitClifford
+        group_size = np.min([11520, max_clifford_idx])
+    else:
+        raise NotImplementedError()
+
+    nr_cliffords = np.asarray(nr_cliffords, dtype=int)
+    max_n_cl = np.max(nr_cliffords)
+    nr_seqs = len(seeds)*len(nr_cliffords)*len(interleaving_cls)
+
+    # Generate the random cliffords, a seeded random number generator
+    # gives the same sequence for every length up to the number of Cliffords
+    rand_cls = np.empty((nr_seqs, max_n_cl), dtype=int)
+    rows = np.arange(nr_seqs).reshape(
+        len(seeds), len(nr_cliffords), len(interleaving_cls))
+    for i, seed in enumerate(seeds):
+        if seed is None:
+            rand_cls[rows[i].ravel()] = np.random.randint(
+                0, group_size, (rows[i].size, max_n_cl))
+        else:
+            rand_cls[rows[i].ravel()] = np.random.RandomState(seed).randint(
+                0, group_size, max_n_cl)
+
+    n_cls = np.broadcast_to(nr_cliffords[np.newaxis, :, np.newaxis],
+                            rows.shape).ravel()
+    intl_cls = np.broadcast_to(
+        np.array(interleaving_cls, dtype=object)[np.newaxis, np.newaxis, :],
+        rows.shape).ravel()
+    intl = np.array([cl is not None for cl in intl_cls])
+    seq_lengths = np.where(intl, 2*n_cls, n_cls)
+
+    max_len = np.max(seq_lengths) + (desired_net_cl is not None)
+    sequences = np.full((nr_seqs, max_len), padding, dtype=int)
+    sequences[~intl, :max_n_cl] = rand_cls[~intl]
+    # Add interleaving cliffords if applicable
+    if np.any(intl):
+        sequences[intl, 0:2*max_n_cl:2] = rand_cls[intl]
+        sequences[intl, 1:2*max_n_cl:2] = np.array(
+            list(intl_cls[intl]), dtype=int)[:, np.newaxis]
+    # Remove the cliffords beyond the length of each sequence
+    sequences[np.arange(max_len) >= seq_lengths[:, np.newaxis]] = padding
+
+    if desired_net_cl is not None:
+        recovery_cls = calculate_recovery_cliffords(
+            sequences, seq_lengths=seq_lengths,
+            desired_net_cl=desired_net_cl, Clifford=Cl)
+        sequences[np.arange(nr_seqs), seq_lengths] = recovery_cls
+        seq_lengths = seq_lengths + 1
+
+    return sequences, seq_lengths
+
+
+def decompose_clifford_sequences(sequences, seq_lengths,
+                                 Clifford=tqc.SingleQubitClifford):
+    """
+    Expands padded clifford sequences into lists of gates.
+
+    Args:
+        sequences (array): shape (nr_seqs, max_len) as returned by
+            "randomized_benchmarking_sequences".
+        seq_lengths (array): length of each sequence.
+        Clifford : Clifford object used for the gate decomposition.
+    Returns:
+        list containing a list of (gate, qubits) tuples for every sequence.
+
+    The decomposition of every Clifford is only constructed once.
+    """
+    decompositions = {}
+    decomposed_seqs = []
+    for seq, seq_len in zip(sequences, seq_lengths):
+        decomposed_seq = []
+        for cl in seq[:seq_len]:
+            if cl not in decompositions:
+                # hacking in exception for benchmarking only CZ
+                # (not as a member of CNOT group)
+                if cl == -4368:
+                    decompositions[cl] = [('CZ', ['q0', 'q1'])]
+                else:
+                    decompositions[cl] = Clifford(cl).gate_decomposition
+            decomposed_seq.extend(decompositions[cl])
+        decomposed_seqs.append(decomposed_seq)
+    return decomposed_seqs
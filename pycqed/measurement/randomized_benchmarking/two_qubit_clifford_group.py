@@ -90,10 +90,8 @@ class Clifford(object):
         returns a new Clifford object that performs the net operation
         that is the product of both operations.
         """
-        net_op = np.dot(self.pauli_transfer_matrix,
-                        other.pauli_transfer_matrix)
-        idx = get_clifford_id(net_op)
-        return self.__class__(idx)
+        idx = self.get_table().multiply(self.idx, other.idx)
+        return self.__class__(int(idx))
 
     def __repr__(self):
         return '{}(idx={})'.format(self.__class__.__name__, self.idx)
@@ -104,9 +102,8 @@ class Clifford(object):
                                                 )
 
     def get_inverse(self):
-        inverse_ptm = np.linalg.inv(self.pauli_transfer_matrix).astype(int)
-        idx = get_clifford_id(inverse_ptm)
-        return self.__class__(idx)
+        idx = self.get_table().inverse[self.idx]
+        return self.__class__(int(idx))
 
 
 class SingleQubitClifford(Clifford):
@@ -116,6 +113,10 @@ class SingleQubitClifford(Clifford):
         self.idx = idx
         self.pauli_transfer_matrix = C1[idx]
 
+    @staticmethod
+    def get_table():
+        return get_clifford_table(number_of_qubits=1)
+
     @property
     def gate_decomposition(self):
         """
@@ -130,18 +131,39 @@ class SingleQubitClifford(Clifford):
 
 class TwoQubitClifford(Clifford):
 
+    # gate decompositions are shared between all instances so that they
+    # only have to be constructed once per Clifford idx.
+    _gate_decompositions = {}
+
     def __init__(self, idx: int):
         assert(idx < 11520)
         self.idx = idx
 
-        if idx < 576:
-            self.pauli_transfer_matrix = single_qubit_like_PTM(idx)
-        elif idx < 576 + 5184:
-            self.pauli_transfer_matrix = CNOT_like_PTM(idx-576)
-        elif idx < 576 + 2*5184:
-            self.pauli_transfer_matrix = iSWAP_like_PTM(idx-(576+5184))
-        elif idx < 11520:
-            self.pauli_transfer_matrix = SWAP_like_PTM(idx-(576+2*5184))
+    @staticmethod
+    def get_table():
+        return get_clifford_table(number_of_qubits=2)
+
+    @property
+    def pauli_transfer_matrix(self):
+        """
+        Returns the pauli transfer matrix of the Clifford.
+
+        Using the method to get this avoids expensive function calls
+        whenever the Clifford is instantiated
+        """
+        if not hasattr(self, '_pauli_transfer_matrix'):
+            idx = self.idx
+            if idx < 576:
+                self._pauli_transfer_matrix = single_qubit_like_PTM(idx)
+            elif idx < 576 + 5184:
+                self._pauli_transfer_matrix = CNOT_like_PTM(idx-576)
+            elif idx < 576 + 2*5184:
+                self._pauli_transfer_matrix = iSWAP_like_PTM(
+                    idx-(576+5184))
+            elif idx < 11520:
+                self._pauli_transfer_matrix = SWAP_like_PTM(
+                    idx-(576+2*5184))
+        return self._pauli_transfer_matrix
 
     @property
     def gate_decomposition(self):
@@ -153,19 +175,19 @@ class TwoQubitClifford(Clifford):
         Using the method to get this avoids expensive function calls
         whenever the Clifford is instantiated
         """
-        if not hasattr(self, '_gate_decomposition'):
-            if self.idx < 576:
-                self._gate_decomposition = single_qubit_like_gates(self.idx)
-            elif self.idx < 576 + 5184:
-                self._gate_decomposition = CNOT_like_gates(self.idx-576)
-            elif self.idx < 576 + 2*5184:
-                self._gate_decomposition = iSWAP_like_gates(
-                    self.idx-(576+5184))
-            elif self.idx < 11520:
-                self._gate_decomposition = SWAP_like_gates(
-                    self.idx-(576+2*5184))
+        idx = int(self.idx)
+        if idx not in self._gate_decompositions:
+            if idx < 576:
+                gates = single_qubit_like_gates(idx)
+            elif idx < 576 + 5184:
+                gates = CNOT_like_gates(idx-576)
+            elif idx < 576 + 2*5184:
+                gates = iSWAP_like_gates(idx-(576+5184))
+            elif idx < 11520:
+                gates = SWAP_like_gates(idx-(576+2*5184))
+            self._gate_decompositions[idx] = gates
 
-        return self._gate_decomposition
+        return self._gate_decompositions[idx]
 
 
 def single_qubit_like_PTM(idx):
@@ -399,16 +421,190 @@ def get_two_qubit_clifford_hash_table():
     return hash_table
 
 
+# the hash tables are read from disk only once and then kept in memory as
+# a dict mapping hash -> clifford idx
+_hash_to_idx = {}
+
+
 def get_clifford_id(pauli_transfer_matrix):
     """
     returns the unique Id of a Clifford.
     """
     unique_hash = crc32(pauli_transfer_matrix.astype(int))
-    if np.array_equal(np.shape(pauli_transfer_matrix), (4, 4)):
-        hash_table = get_single_qubit_clifford_hash_table()
-    elif np.array_equal(np.shape(pauli_transfer_matrix), (16, 16)):
-        hash_table = get_two_qubit_clifford_hash_table()
-    else:
-        raise NotImplementedError()
-    idx = hash_table.index(unique_hash)
-    return idx
+    dim = np.shape(pauli_transfer_matrix)
+    if dim not in _hash_to_idx:
+        if np.array_equal(dim, (4, 4)):
+            hash_table = get_single_qubit_clifford_hash_table()
+        elif np.array_equal(dim, (16, 16)):
+            hash_table = get_two_qubit_clifford_hash_table()
+        else:
+            raise NotImplementedError()
+        _hash_to_idx[dim] = {h: i for i, h in enumerate(hash_table)}
+    try:
+        return _hash_to_idx[dim][unique_hash]
+    except KeyError:
+        raise ValueError('Pauli transfer matrix is not an element of '
+                         'the Clifford group.')
+
+
+##############################################################################
+# Product and inverse tables
+##############################################################################
+"""
+The pauli transfer matrix (PTM) of a Clifford is a signed permutation matrix.
+Instead of multiplying 16x16 matrices and hashing the result, Cliffords are
+represented by this signed permutation. For every column "j" of the PTM,
+"perm[j]" is the row of the non-zero element and "sign[j]" its sign.
+The product A.B of two Cliffords is then given by
+    perm_AB[j] = perm_A[perm_B[j]]
+    sign_AB[j] = sign_A[perm_B[j]] * sign_B[j]
+
+A Clifford is uniquely specified by how it maps the generators (X and Z on
+each qubit) of the Pauli group. The images of the generators are used as a
+key to map a signed permutation back to a Clifford idx.
+
+The signed permutations are stored as binary files next to the hash tables
+and memory-mapped when loaded.
+"""
+
+# Pauli basis is (I, X, Y, Z) per qubit, index = 4*q1 + q0
+generator_columns = {4: [1, 3], 16: [1, 3, 4, 12]}
+
+_clifford_tables = {}
+
+
+def ptm_to_signed_permutation(pauli_transfer_matrices):
+    """
+    Converts a (stack of) Clifford PTM(s) to the signed permutation
+    representation.
+
+    Args:
+        pauli_transfer_matrices (array): shape (..., d, d)
+    Returns:
+        perm (array of int8): shape (..., d), row of the non-zero element
+            in every column.
+        sign (array of int8): shape (..., d), sign of that element.
+    """
+    ptms = np.rint(pauli_transfer_matrices).astype(np.int8)
+    perm = np.argmax(np.abs(ptms), axis=-2)
+    sign = np.take_along_axis(ptms, perm[..., np.newaxis, :], axis=-2)
+    return perm.astype(np.int8), sign[..., 0, :]
+
+
+def signed_permutation_key(perm, sign):
+    """
+    Returns an integer key that uniquely identifies a Clifford based on the
+    images of the generators of the Pauli group.
+
+    Only the generator columns of perm and sign are used, these can be
+    passed directly as arrays of shape (..., nr_generators).
+    """
+    nr_gens = np.shape(perm)[-1]
+    # every generator maps to one of d=2**nr_gens Paulis with one of two signs
+    base = 2 * 2**nr_gens
+    code = 2*np.asarray(perm, dtype=np.int64) + (np.asarray(sign) > 0)
+    return np.dot(code, base**np.arange(nr_gens))
+
+
+class CliffordTable(object):
+    """
+    Product and inverse tables for a Clifford group.
+
+    Operates on arrays of Clifford indices without instantiating any
+    Clifford objects, products are evaluated element-wise.
+    """
+
+    def __init__(self, perm, sign):
+        self.perm = perm
+        self.sign = sign
+        self.group_size, self.dim = np.shape(perm)
+        self._gens = generator_columns[self.dim]
+
+        keys = signed_permutation_key(perm[:, self._gens],
+                                      sign[:, self._gens])
+        self._key_lut = np.full(np.max(keys)+1, -1, dtype=np.int16)
+        self._key_lut[keys] = np.arange(self.group_size)
+        if len(np.unique(keys)) != self.group_size:
+            raise ValueError('Clifford table keys are not unique.')
+
+        # The PTM is orthogonal, the inverse is the transpose.
+        rows = np.arange(self.group_size)[:, np.newaxis]
+        inv_perm = np.empty_like(perm)
+        inv_sign = np.empty_like(sign)
+        inv_perm[rows, perm] = np.arange(self.dim, dtype=perm.dtype)
+        inv_sign[rows, perm] = sign
+        self.inverse = self.lookup(inv_perm[:, self._gens],
+                                   inv_sign[:, self._gens])
+
+    def lookup(self, perm, sign):
+        """
+        Returns the Clifford idx corresponding to the generator columns of
+        a signed permutation.
+        """
+        idx = self._key_lut[signed_permutation_key(perm, sign)]
+        if np.any(idx < 0):
+            raise ValueError('Signed permutation is not an element of '
+                             'the Clifford group.')
+        return idx
+
+    def multiply(self, idx_a, idx_b):
+        """
+        Returns the idx of the product of Cliffords "idx_a" and "idx_b".
+        The order is that of np.dot(PTM_a, PTM_b), i.e., b is applied first.
+
+        Broadcasts over arrays of indices.
+        """
+        idx_a = np.asarray(idx_a)[..., np.newaxis]
+        idx_b = np.asarray(idx_b)[..., np.newaxis]
+        perm_b = self.perm[idx_b, self._gens]
+        perm = self.perm[idx_a, perm_b]
+        sign = self.sign[idx_a, perm_b] * self.sign[idx_b, self._gens]
+        return self.lookup(perm, sign)
+
+    def net_clifford(self, clifford_indices):
+        """
+        Calculates the idx of the net Clifford of (an array of) sequences.
+
+        Args:
+            clifford_indices (array): shape (..., n_cl), the last axis
+                contains the order of the cliffords in the sequence.
+        Returns:
+            array of shape (...) with the net Clifford indices.
+
+        The product is reduced pairwise, requiring only log2(n_cl)
+        vectorized multiplications.
+        """
+        idx = np.asarray(clifford_indices)
+        if idx.shape[-1] == 0:
+            return np.zeros(idx.shape[:-1], dtype=np.int16)
+        while idx.shape[-1] > 1:
+            if idx.shape[-1] % 2:
+                # pad with the identity (element 0)
+                pad = np.zeros(idx.shape[:-1] + (1,), dtype=idx.dtype)
+                idx = np.concatenate([idx, pad], axis=-1)
+            # later cliffords act on the left
+            idx = self.multiply(idx[..., 1::2], idx[..., 0::2])
+        return idx[..., 0]
+
+
+def get_clifford_table(number_of_qubits: int):
+    """
+    Returns the (lazily loaded) CliffordTable for the one or two qubit
+    Clifford group. If the binary tables do not exist they are generated.
+    """
+    if number_of_qubits not in _clifford_tables:
+        fn = {1: 'single_qubit_signed_perm.npy',
+              2: 'two_qubit_signed_perm.npy'}[number_of_qubits]
+        fp = join(hash_dir, fn)
+        try:
+            table = np.load(fp, mmap_mode='r')
+        except FileNotFoundError:
+            from pycqed.measurement.randomized_benchmarking.\
+                generate_clifford_hash_tables import \
+                generate_signed_permutation_tables
+            generate_signed_permutation_tables()
+            table = np.load(fp, mmap_mode='r')
+        # stored as one array of shape (2, group_size, d)
+        _clifford_tables[number_of_qubits] = CliffordTable(
+            perm=table[0], sign=table[1])
+    return _clifford_tables[number_of_qubits]
@@ -1,7 +1,9 @@
 import logging
 import time
 import os
+import hashlib
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from pycqed.utilities.general import setInDict
 from pycqed.measurement.waveform_control_CC import qasm_compiler as qcx
 from pycqed.instrument_drivers.virtual_instruments.pyqx import qasm_loader as ql
@@ -1167,6 +1169,158 @@ class FLsweep_QWG(Soft_Sweep):
         awg.start()
 
 
+class FLsweep_chunks(Soft_Sweep):
+    """
+    Sweep function for flux LutMans (AWG8 and QWG) that divides the sweep
+    points into chunks. Every chunk is loaded onto consecutive codewords
+    and measured with a single (hardware) sweep over these codewords.
+
+    The waveforms of a chunk are generated at once, either by a vectorized
+    wave_func or by setting par and regenerating waveform_name for every
+    point, and are uploaded in a single call to the set_waveforms method
+    of the AWG. Codewords of which the waveform did not change since the
+    previous upload are not uploaded again.
+
+    If prefetch is True, the waveforms of the next chunk are generated on
+    a background thread while the current chunk is being measured.
+    N.B. when using par, the parameter is changed (and restored) on this
+    thread, it should not be used elsewhere during the sweep.
+
+    The sweep points that are set by the MC are the first sweep point of
+    every chunk, i.e., sweep_points[::chunk_size]. If the number of sweep
+    points is not a multiple of chunk_size, the last chunk is padded by
+    repeating its final waveform, such that no codeword keeps a waveform
+    of the previous chunk.
+    """
+
+    def __init__(self, lm, sweep_points, chunk_size: int,
+                 codewords=None, wave_func=None, par=None,
+                 waveform_name: str=None, prefetch: bool=True,
+                 param_name: str='flux pulse parameter',
+                 param_unit: str='a.u.', **kw):
+        """
+        Args:
+            lm (Instrument)      : flux LutMan used to process the waveforms
+            sweep_points (array) : all sweep points
+            chunk_size (int)     : number of sweep points per chunk
+            codewords (array)    : codewords to load the chunk onto,
+                defaults to the first chunk_size codewords
+            wave_func (callable) : takes an array of sweep points and
+                returns an array (or list) of waveforms, one per point.
+                The waveforms are without compensation or distortion, these
+                are added by the LutMan.
+            par (Parameter)      : LutMan parameter to sweep, only used if
+                wave_func is None
+            waveform_name (str)  : waveform to regenerate for every value
+                of par, only used if wave_func is None
+            prefetch (bool)      : if True generates the waveforms of the
+                next chunk on a background thread
+        """
+        super().__init__(**kw)
+        if wave_func is None and (par is None or waveform_name is None):
+            raise ValueError('Specify either "wave_func" or "par" and '
+                             '"waveform_name".')
+        self.lm = lm
+        self.chunk_size = chunk_size
+        if codewords is None:
+            codewords = np.arange(chunk_size)
+        self.codewords = codewords
+        self.wave_func = wave_func
+        self.par = par
+        self.waveform_name = waveform_name
+        self.prefetch = prefetch
+        if wave_func is None:
+            param_name = par.name
+            param_unit = par.unit
+        self.name = param_name
+        self.parameter_name = param_name
+        self.unit = param_unit
+        # Setting self.custom_swp_pts because self.sweep_points is overwritten
+        # by the MC.
+        self.custom_swp_pts = np.asarray(sweep_points)
+
+        self._executor = None
+        self._pending = None
+        self._uploaded_hashes = {}
+
+    def prepare(self, **kw):
+        # The AWG may have been changed since the last sweep
+        self._uploaded_hashes = {}
+        if self.prefetch and self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+            self._pending = (0, self._executor.submit(
+                self.generate_chunk, 0))
+
+    def finish(self, **kw):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._pending = None
+
+    def generate_chunk(self, ind: int):
+        """
+        Returns the processed waveforms of the chunk starting at sweep
+        point index ind.
+        """
+        points = self.custom_swp_pts[ind:ind+self.chunk_size]
+        if self.wave_func is not None:
+            waveforms = list(self.wave_func(points))
+        else:
+            gen_wf_func = getattr(self.lm, '_gen_{}'.format(
+                self.waveform_name))
+            old_val = self.par()
+            waveforms = []
+            try:
+                for val in points:
+                    self.par(val)
+                    waveforms.append(gen_wf_func())
+            finally:
+                self.par(old_val)
+        return self.lm.process_waveforms(waveforms)
+
+    def _get_chunk(self, ind: int):
+        if self._pending is not None and self._pending[0] == ind:
+            waveforms = self._pending[1].result()
+        else:
+            waveforms = self.generate_chunk(ind)
+        self._pending = None
+
+        next_ind = ind + self.chunk_size
+        if self._executor is not None and next_ind < len(
+                self.custom_swp_pts):
+            self._pending = (next_ind, self._executor.submit(
+                self.generate_chunk, next_ind))
+        return waveforms
+
+    def set_parameter(self, val):
+        # Find index of val in sweep_points
+        ind = np.where(np.isclose(self.custom_swp_pts, val, atol=1e-10))[0]
+        if len(ind) == 0:
+            # val was not found in the sweep points
+            raise ValueError('Value {} is not in the sweep points'.format(val))
+        ind = ind[0]  # set index to the first occurence of val in sweep points
+
+        chunk = list(self._get_chunk(ind))
+        chunk += chunk[-1:]*(len(self.codewords)-len(chunk))
+
+        waveforms = {}
+        for cw, waveform in zip(self.codewords, chunk):
+            wf_name = 'wave_ch{}_cw{:03}'.format(self.lm.cfg_awg_channel(),
+                                                 int(cw))
+            wf_hash = hashlib.sha1(np.ascontiguousarray(
+                waveform, dtype=float).tobytes()).hexdigest()
+            if self._uploaded_hashes.get(wf_name) != wf_hash:
+                waveforms[wf_name] = waveform
+                self._uploaded_hashes[wf_name] = wf_hash
+
+        if len(waveforms) == 0:
+            return
+        awg = self.lm.AWG.get_instr()
+        awg.stop()
+        awg.set_waveforms(waveforms, upload_program=True)
+        awg.start()
+
+
 class Nested_resonator_tracker(Soft_Sweep):
     """
     For resonator tr.
@@ -21,13 +21,13 @@ Read the class doc string for the usage.
 import logging
 import json
 import os
-import bisect
 import copy
 from pycqed.utilities.general import int_to_bin
 from pycqed.measurement.waveform_control_CC.qasm_compiler_helpers import (
     is_number, is_int, is_positive_number, is_natural, is_integer_array,
     bitfield, min_non_zero, raw_print, config_is_valid,
-    EventType, time_point, qasm_event, qumis_event, prog_line, lower_dict_key)
+    EventType, time_point, TimingGrid, qasm_event, qumis_event, prog_line,
+    lower_dict_key)
 
 
 MAX_TRIG_BITS = 7
@@ -796,45 +796,51 @@ class QASM_QuMIS_Compiler():
             self.print_timing_grid()
 
     def compensate_channel_latency(self):
+        """
+        Moves every event to an earlier time by the difference between the
+        latency of its channel and the minimum channel latency.
+
+        The events are moved on a TimingGrid, such that moving an event
+        takes constant time instead of inserting into the sorted list.
+        """
         min_latency = self.get_min_channel_latency()
         if self.verbosity_level > 4:
             print("Min latency is:", min_latency)
-        ti = 0
-        while ti < len(self.timing_grid):
-            tp = self.timing_grid[ti]
-            idx = 0
-            while idx < len(tp.parallel_events):
-                event = tp.parallel_events[idx]
+        new_tp_list = TimingGrid(self.timing_grid)
+        for tp in self.timing_grid:
+            events = tp.parallel_events
+            tp.parallel_events = []
+            for event in events:
                 compensate_time = event.channel_latency - min_latency
                 if compensate_time != 0:
-                    tp.parallel_events.pop(idx)
-
-                    new_absolute_time = tp.absolute_time - compensate_time
-                    tp_index, match = self.search_time_point(self.timing_grid,
-                                                             new_absolute_time)
-                    if match is False:
-                        new_tp = time_point(absolute_time=new_absolute_time)
-                        self.timing_grid.insert(tp_index, new_tp)
-                        ti = ti + 1
-                        self.timing_grid[tp_index].\
-                            parallel_events.append(event)
-                    else:
-                        self.timing_grid[tp_index-1].\
-                            parallel_events.append(event)
+                    new_tp_list.add_event(tp.absolute_time - compensate_time,
+                                          event)
                 else:
-                    idx = idx + 1
-            ti = ti + 1
+                    tp.parallel_events.append(event)
+        self.timing_grid = new_tp_list.to_list()
 
         if self.verbosity_level > 4:
             print("End of compensting channel latency:")
             self.print_timing_grid()
 
     def search_time_point(self, timing_grid, target_absolute_time):
-        absolute_time_list = [tp.absolute_time for tp in timing_grid]
-        idx = bisect.bisect(absolute_time_list, target_absolute_time)
-        if len(absolute_time_list) == 0 or (idx == 0):
+        '''
+        Returns the index at which a time point with target_absolute_time
+        should be inserted into the (sorted) timing grid and whether the
+        time point before this index has this absolute time.
+        '''
+        # bisection on the absolute times, equivalent to bisect.bisect
+        lo, hi = 0, len(timing_grid)
+        while lo < hi:
+            mid = (lo + hi)//2
+            if target_absolute_time < timing_grid[mid].absolute_time:
+                hi = mid
+            else:
+                lo = mid + 1
+        idx = lo
+        if idx == 0:
             return (idx, False)
-        elif absolute_time_list[idx-1] == target_absolute_time:
+        elif timing_grid[idx-1].absolute_time == target_absolute_time:
             return (idx, True)
         else:
             return (idx, False)
@@ -930,7 +936,7 @@ class QASM_QuMIS_Compiler():
 
         NOTE: trigger bits starts counting from 1, instead of 0.
         """
-        new_tp_list = []
+        new_tp_list = TimingGrid()
         for tp in self.hw_timing_grid:
             absolute_time = tp.absolute_time
             for hw_event in tp.parallel_events:
@@ -964,6 +970,7 @@ class QASM_QuMIS_Compiler():
 
         # at each processing step, add the last timing point back.
         # this is required as it is not added in the lines above as it is empty.
+        new_tp_list = new_tp_list.to_list()
         new_tp_list.append(self.hw_timing_grid[-1])
 
         self.hw_timing_grid = new_tp_list
@@ -998,7 +1005,8 @@ class QASM_QuMIS_Compiler():
         generates equivalent sequential trigger instructions.
         '''
         trigger_bit_duration = [0]*8
-        new_tp_list = []
+        new_tp_list = TimingGrid()
+        next_trigger_times = self.get_next_trigger_instr_times()
         for ti, tp in enumerate(self.hw_timing_grid):
             absolute_time = tp.absolute_time
             for hw_event in tp.parallel_events:
@@ -1019,7 +1027,7 @@ class QASM_QuMIS_Compiler():
 
             min_duration = min_non_zero(trigger_bit_duration)
             next_trig_ending_time = min_duration + absolute_time
-            next_trig_starting_time = self.get_next_trigger_instr_time(ti)
+            next_trig_starting_time = next_trigger_times[ti]
 
             # find the next stop time, insert current trigger instruction.
             # stage 1: next_trig_starting_time < next_trig_ending_time, so the
@@ -1061,6 +1069,7 @@ class QASM_QuMIS_Compiler():
 
         # at each processing step, add the last timing point back.
         # this is required as it is not added in the lines above as it is empty.
+        new_tp_list = new_tp_list.to_list()
         new_tp_list.append(self.hw_timing_grid[-1])
         self.hw_timing_grid = new_tp_list
         # if self.verbosity_level > 4:
@@ -1080,6 +1089,22 @@ class QASM_QuMIS_Compiler():
             i += 1
         return -1
 
+    def get_next_trigger_instr_times(self):
+        '''
+        Returns for every time point in the hw_timing_grid the time of the
+        next time point containing a trigger instruction (-1 if there is
+        none), i.e. get_next_trigger_instr_time for all time points at once.
+        '''
+        next_trigger_times = [-1]*len(self.hw_timing_grid)
+        next_time = -1
+        for i in range(len(self.hw_timing_grid)-1, -1, -1):
+            next_trigger_times[i] = next_time
+            tp = self.hw_timing_grid[i]
+            if any(hw_event.qumis_name == "trigger"
+                   for hw_event in tp.parallel_events):
+                next_time = tp.absolute_time
+        return next_trigger_times
+
     def split_trigger_codeword(self):
         '''
         Each trigger instruction contains two stages:
@@ -1088,7 +1113,7 @@ class QASM_QuMIS_Compiler():
         This function remove the original trigger instruction and for each
         stage generates a new trigger instruction.
         '''
-        new_tp_list = []
+        new_tp_list = TimingGrid()
         for tp in self.hw_timing_grid:
             absolute_time = tp.absolute_time
             for hw_event in tp.parallel_events:
@@ -1133,6 +1158,7 @@ class QASM_QuMIS_Compiler():
 
         # at each processing step, add the last timing point back.
         # this is required as it is not added in the lines above as it is empty.
+        new_tp_list = new_tp_list.to_list()
         new_tp_list.append(self.hw_timing_grid[-1])
         self.hw_timing_grid = new_tp_list
         if self.verbosity_level > 4:
@@ -1140,6 +1166,16 @@ class QASM_QuMIS_Compiler():
             self.print_hw_timing_grid()
 
     def add_new_tp_event(self, timing_grid, absolute_time, event):
+        '''
+        Adds an event to the time point at absolute_time in timing_grid,
+        which is either a sorted list of time points or a TimingGrid.
+        '''
+        if isinstance(timing_grid, TimingGrid):
+            if event is not None and 0 in event.set_bits:
+                raise ValueError('Bits start counting at 1 instead of 0')
+            timing_grid.add_event(absolute_time, event)
+            return timing_grid
+
         tp_index, match = self.search_time_point(timing_grid, absolute_time)
         if match is False:
             new_tp = time_point(absolute_time=absolute_time)
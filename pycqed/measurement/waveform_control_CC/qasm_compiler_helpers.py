@@ -257,6 +257,59 @@ class time_point():
         return rep
 
 
+class TimingGrid():
+    '''
+    Used to build a timing grid (a list of time_points sorted by absolute
+    time) by adding events at arbitrary absolute times.
+
+    The time points are stored in a dict indexed by their absolute time,
+    so adding an event takes constant time, independent of the size of
+    the grid. The sorted list is only created by "to_list".
+    '''
+
+    def __init__(self, time_points: list=None):
+        '''
+        Args:
+            time_points (list): time points (sorted by absolute time) that
+                the grid starts from. Time points with the same absolute
+                time are all kept, events added at this time are added to
+                the last of these (as for a sorted list).
+        '''
+        self.time_points = {}  # absolute_time -> time_point
+        # time points followed by another one with the same absolute time
+        self._shadowed_time_points = []
+        if time_points is not None:
+            for tp in time_points:
+                if tp.absolute_time in self.time_points:
+                    self._shadowed_time_points.append(
+                        self.time_points[tp.absolute_time])
+                self.time_points[tp.absolute_time] = tp
+
+    def __len__(self):
+        return len(self.time_points) + len(self._shadowed_time_points)
+
+    def add_event(self, absolute_time, event=None):
+        '''
+        Adds an event to the time point at absolute_time, the time point
+        is created if it does not exist. If event is None only the (empty)
+        time point is created.
+        '''
+        tp = self.time_points.get(absolute_time, None)
+        if tp is None:
+            tp = time_point(absolute_time=absolute_time)
+            self.time_points[absolute_time] = tp
+        if event is not None:
+            tp.parallel_events.append(event)
+        return tp
+
+    def to_list(self):
+        # the sort is stable, shadowed time points stay before the time
+        # point with the same absolute time in the dict
+        return sorted(self._shadowed_time_points +
+                      list(self.time_points.values()),
+                      key=lambda tp: tp.absolute_time)
+
+
 class qasm_event():
 
     def __init__(self):
@@ -0,0 +1,100 @@
+qubit q1 
+
+init_all
+RO q1  
+
+init_all
+X180 q1
+X180 q1
+RO q1  
+
+init_all
+Y180 q1
+Y180 q1
+RO q1  
+
+init_all
+X180 q1
+Y180 q1
+RO q1  
+
+init_all
+Y180 q1
+X180 q1
+RO q1  
+
+init_all
+X90 q1
+RO q1  
+
+init_all
+Y90 q1
+RO q1  
+
+init_all
+X90 q1
+Y90 q1
+RO q1  
+
+init_all
+Y90 q1
+X90 q1
+RO q1  
+
+init_all
+X90 q1
+Y180 q1
+RO q1  
+
+init_all
+Y90 q1
+X180 q1
+RO q1  
+
+init_all
+X180 q1
+Y90 q1
+RO q1  
+
+init_all
+Y180 q1
+X90 q1
+RO q1  
+
+init_all
+X90 q1
+X180 q1
+RO q1  
+
+init_all
+X180 q1
+X90 q1
+RO q1  
+
+init_all
+Y90 q1
+Y180 q1
+RO q1  
+
+init_all
+Y180 q1
+Y90 q1
+RO q1  
+
+init_all
+X180 q1
+RO q1  
+
+init_all
+Y180 q1
+RO q1  
+
+init_all
+X90 q1
+X90 q1
+RO q1  
+
+init_all
+Y90 q1
+Y90 q1
+RO q1  
@@ -0,0 +1,11 @@
+qubit q1 
+
+init_all
+Y90 q1 
+X180 q1 
+RO q1  
+
+init_all
+X90 q1 
+Y180 q1 
+RO q1  
@@ -0,0 +1,141 @@
+qubit q1 
+
+init_all
+X90 q1     
+Idx 100 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 300 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 500 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 700 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 900 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 1100 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 1300 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 1500 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 1700 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 1900 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 2100 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 2300 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 2500 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 2700 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 2900 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 3100 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 3300 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 3500 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 3700 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 3900 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 4100 
+X90 q1     
+RO q1  
+
+init_all
+RO q1  
+
+init_all
+RO q1  
+
+init_all
+X180 q1 
+RO q1  
+
+init_all
+X180 q1 
+RO q1  
@@ -0,0 +1,120 @@
+qubit q1 
+
+init_all
+X180 q1     # exciting pi pulse
+Idx 100 
+RO q1  
+
+init_all
+X180 q1     # exciting pi pulse
+Idx 300 
+RO q1  
+
+init_all
+X180 q1     # exciting pi pulse
+Idx 500 
+RO q1  
+
+init_all
+X180 q1     # exciting pi pulse
+Idx 700 
+RO q1  
+
+init_all
+X180 q1     # exciting pi pulse
+Idx 900 
+RO q1  
+
+init_all
+X180 q1     # exciting pi pulse
+Idx 1100 
+RO q1  
+
+init_all
+X180 q1     # exciting pi pulse
+Idx 1300 
+RO q1  
+
+init_all
+X180 q1     # exciting pi pulse
+Idx 1500 
+RO q1  
+
+init_all
+X180 q1     # exciting pi pulse
+Idx 1700 
+RO q1  
+
+init_all
+X180 q1     # exciting pi pulse
+Idx 1900 
+RO q1  
+
+init_all
+X180 q1     # exciting pi pulse
+Idx 2100 
+RO q1  
+
+init_all
+X180 q1     # exciting pi pulse
+Idx 2300 
+RO q1  
+
+init_all
+X180 q1     # exciting pi pulse
+Idx 2500 
+RO q1  
+
+init_all
+X180 q1     # exciting pi pulse
+Idx 2700 
+RO q1  
+
+init_all
+X180 q1     # exciting pi pulse
+Idx 2900 
+RO q1  
+
+init_all
+X180 q1     # exciting pi pulse
+Idx 3100 
+RO q1  
+
+init_all
+X180 q1     # exciting pi pulse
+Idx 3300 
+RO q1  
+
+init_all
+X180 q1     # exciting pi pulse
+Idx 3500 
+RO q1  
+
+init_all
+X180 q1     # exciting pi pulse
+Idx 3700 
+RO q1  
+
+init_all
+X180 q1     # exciting pi pulse
+Idx 3900 
+RO q1  
+
+init_all
+X180 q1     # exciting pi pulse
+Idx 4100 
+RO q1  
+
+init_all
+RO q1  
+
+init_all
+RO q1  
+
+init_all
+X180 q1 
+RO q1  
+
+init_all
+X180 q1 
+RO q1  
@@ -0,0 +1,12 @@
+qubit q1 
+
+init_all
+RO q1  
+RO q1  
+RO q1  
+
+init_all
+RO q1  
+X180 q1  
+RO q1  
+RO q1  
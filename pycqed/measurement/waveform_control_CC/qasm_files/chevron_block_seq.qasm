@@ -0,0 +1,32 @@
+qubit q0 
+qubit q1 
+
+init_all
+QWG_trigger_0 q0
+X180 q0
+CZ q0 q1
+RO q0 
+
+init_all
+QWG_trigger_1 q0
+X180 q0
+CZ q0 q1
+RO q0 
+
+init_all
+QWG_trigger_2 q0
+X180 q0
+CZ q0 q1
+RO q0 
+
+init_all
+QWG_trigger_3 q0
+X180 q0
+CZ q0 q1
+RO q0 
+
+init_all
+QWG_trigger_4 q0
+X180 q0
+CZ q0 q1
+RO q0 
@@ -0,0 +1,183 @@
+qubit q1 
+
+init_all
+X90 q1     
+Idx 50 
+X180 q1     
+Idx 50 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 150 
+X180 q1     
+Idx 150 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 250 
+X180 q1     
+Idx 250 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 350 
+X180 q1     
+Idx 350 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 450 
+X180 q1     
+Idx 450 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 550 
+X180 q1     
+Idx 550 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 650 
+X180 q1     
+Idx 650 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 750 
+X180 q1     
+Idx 750 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 850 
+X180 q1     
+Idx 850 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 950 
+X180 q1     
+Idx 950 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 1050 
+X180 q1     
+Idx 1050 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 1150 
+X180 q1     
+Idx 1150 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 1250 
+X180 q1     
+Idx 1250 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 1350 
+X180 q1     
+Idx 1350 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 1450 
+X180 q1     
+Idx 1450 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 1550 
+X180 q1     
+Idx 1550 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 1650 
+X180 q1     
+Idx 1650 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 1750 
+X180 q1     
+Idx 1750 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 1850 
+X180 q1     
+Idx 1850 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 1950 
+X180 q1     
+Idx 1950 
+X90 q1     
+RO q1  
+
+init_all
+X90 q1     
+Idx 2050 
+X180 q1     
+Idx 2050 
+X90 q1     
+RO q1  
+
+init_all
+RO q1  
+
+init_all
+RO q1  
+
+init_all
+X180 q1 
+RO q1  
+
+init_all
+X180 q1 
+RO q1  
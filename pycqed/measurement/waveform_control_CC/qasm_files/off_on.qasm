@@ -0,0 +1,8 @@
+qubit q1 
+
+init_all
+RO q1  
+
+init_all
+X180 q1     # On 
+RO q1  
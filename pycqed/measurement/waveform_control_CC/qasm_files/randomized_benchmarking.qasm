@@ -0,0 +1,319 @@
+qubit q1 
+X90 q1
+Y180 q1
+mY90 q1
+X90 q1
+X180 q1
+mY90 q1
+X90 q1
+mX90 q1
+X90 q1
+mY90 q1
+X90 q1
+X90 q1
+Y180 q1
+Y90 q1
+X90 q1
+mX90 q1
+Y90 q1
+RO q1  
+mX90 q1
+mY90 q1
+Y90 q1
+X90 q1
+Y90 q1
+X90 q1
+X90 q1
+Y90 q1
+mX90 q1
+X90 q1
+mY90 q1
+mX90 q1
+Y180 q1
+X90 q1
+Y180 q1
+mY90 q1
+RO q1  
+Y90 q1
+X90 q1
+X90 q1
+Y90 q1
+X90 q1
+Y90 q1
+X90 q1
+X90 q1
+mY90 q1
+mY90 q1
+X90 q1
+Y90 q1
+mX90 q1
+mX90 q1
+Y90 q1
+Y90 q1
+mX90 q1
+mX90 q1
+mY90 q1
+X180 q1
+X90 q1
+mY90 q1
+X90 q1
+RO q1  
+Y90 q1
+X90 q1
+mY90 q1
+X90 q1
+Y90 q1
+mX90 q1
+X90 q1
+Y90 q1
+mX90 q1
+mY90 q1
+X90 q1
+mY90 q1
+mY90 q1
+mX90 q1
+mY90 q1
+X90 q1
+Y180 q1
+Y90 q1
+X90 q1
+Y180 q1
+RO q1  
+mX90 q1
+mY90 q1
+Y90 q1
+X90 q1
+mX90 q1
+mY90 q1
+X90 q1
+Y90 q1
+mX90 q1
+X90 q1
+Y90 q1
+mX90 q1
+mX90 q1
+Y90 q1
+mX90 q1
+mY90 q1
+Y180 q1
+Y180 q1
+X90 q1
+mY90 q1
+Y90 q1
+mX90 q1
+RO q1  
+X180 q1
+X180 q1
+Y180 q1
+X90 q1
+mY90 q1
+Y90 q1
+X90 q1
+Y90 q1
+mX90 q1
+mY90 q1
+X180 q1
+mY90 q1
+mX90 q1
+Y180 q1
+mY90 q1
+mX90 q1
+mX90 q1
+RO q1  
+mX90 q1
+Y180 q1
+X90 q1
+Y180 q1
+mX90 q1
+Y90 q1
+mX90 q1
+Y180 q1
+mX90 q1
+mY90 q1
+Y90 q1
+X90 q1
+Y90 q1
+X90 q1
+X90 q1
+Y90 q1
+mX90 q1
+mX90 q1
+X90 q1
+mY90 q1
+X90 q1
+RO q1  
+Y90 q1
+X180 q1
+mY90 q1
+X90 q1
+X90 q1
+mX90 q1
+Y180 q1
+X90 q1
+Y90 q1
+mX90 q1
+mX90 q1
+Y180 q1
+X180 q1
+mY90 q1
+mX90 q1
+X90 q1
+Y180 q1
+X90 q1
+Y90 q1
+X90 q1
+X90 q1
+Y90 q1
+mX90 q1
+RO q1  
+mX90 q1
+Y90 q1
+mY90 q1
+mX90 q1
+X90 q1
+Y90 q1
+X90 q1
+X90 q1
+mY90 q1
+X90 q1
+mY90 q1
+X180 q1
+Y180 q1
+X90 q1
+mY90 q1
+mX90 q1
+X180 q1
+Y180 q1
+X90 q1
+X90 q1
+Y90 q1
+mX90 q1
+RO q1  
+Y90 q1
+X180 q1
+mX90 q1
+Y90 q1
+Y180 q1
+X90 q1
+mY90 q1
+X180 q1
+X90 q1
+mY90 q1
+mX90 q1
+mX90 q1
+Y90 q1
+mY90 q1
+X90 q1
+X90 q1
+Y180 q1
+Y90 q1
+X180 q1
+RO q1  
+X180 q1
+X90 q1
+mY90 q1
+X90 q1
+mY90 q1
+X90 q1
+X90 q1
+Y90 q1
+Y90 q1
+X90 q1
+X90 q1
+mY90 q1
+mX90 q1
+mY90 q1
+X90 q1
+mY90 q1
+mX90 q1
+mY90 q1
+mX90 q1
+mX90 q1
+mY90 q1
+X90 q1
+Y90 q1
+RO q1  
+X90 q1
+mY90 q1
+X90 q1
+X180 q1
+Y180 q1
+mX90 q1
+mY90 q1
+X90 q1
+mY90 q1
+X180 q1
+mX90 q1
+Y90 q1
+X180 q1
+Y90 q1
+mY90 q1
+X90 q1
+mY90 q1
+X90 q1
+Y180 q1
+RO q1  
+mX90 q1
+mY90 q1
+mX90 q1
+Y90 q1
+Y180 q1
+X90 q1
+Y90 q1
+X90 q1
+mY90 q1
+X90 q1
+mY90 q1
+X90 q1
+mY90 q1
+mX90 q1
+Y90 q1
+mY90 q1
+mX90 q1
+RO q1  
+Y180 q1
+X90 q1
+Y90 q1
+mX90 q1
+Y90 q1
+X90 q1
+X90 q1
+Y180 q1
+X180 q1
+Y180 q1
+X90 q1
+mY90 q1
+mY90 q1
+X90 q1
+X180 q1
+Y180 q1
+X90 q1
+Y90 q1
+X90 q1
+X90 q1
+Y180 q1
+RO q1  
+X90 q1
+mY90 q1
+X90 q1
+mY90 q1
+mX90 q1
+mY90 q1
+X90 q1
+mX90 q1
+X90 q1
+mY90 q1
+X90 q1
+X90 q1
+mY90 q1
+mX90 q1
+X90 q1
+Y90 q1
+X90 q1
+mY90 q1
+Y90 q1
+X180 q1
+X90 q1
+Y90 q1
+X90 q1
+RO q1  
@@ -10,7 +10,6 @@
 For more basic waveforms see e.g., waveforms.py
 '''
 import logging
-import scipy.interpolate
 import numpy as np
 
 
@@ -40,13 +39,57 @@ def martinis_flux_pulse(length: float,
         2. Generate θ(τ) using eqs 15 and 16
         3. Transform from proper time "τ" to real time "t" using interpolation
 
+    See also martinis_flux_pulse_batch to generate many pulses at once.
     """
-    if theta_f < theta_i:
+    return martinis_flux_pulse_batch(
+        length, theta_i=theta_i, theta_f=theta_f, lambda_2=lambda_2,
+        lambda_3=lambda_3, lambda_4=lambda_4, sampling_rate=sampling_rate)[0]
+
+
+def martinis_flux_pulse_batch(length, theta_i, theta_f, lambda_2,
+                              lambda_3=0, lambda_4=0,
+                              sampling_rate: float =2.4e9):
+    """
+    Returns the pulses specified by Martinis and Geller for arrays of
+    parameters, see martinis_flux_pulse.
+
+    All arguments except sampling_rate can be floats or arrays, these are
+    broadcast against each other. The pulses with the same length are
+    generated in a single vectorized step, such that e.g., the pulses of
+    a sweep of theta_f and the lambdas are generated quickly.
+
+    Returns:
+        waveforms (list): θ(t) of every pulse (rad), in the (flattened)
+            order of the broadcast arguments.
+    """
+    length, theta_i, theta_f, lambda_2, lambda_3, lambda_4 = [
+        np.ravel(a) for a in np.broadcast_arrays(
+            length, theta_i, theta_f, lambda_2, lambda_3, lambda_4)]
+    if np.any(theta_f < theta_i):
+        idx = np.argmax(theta_f < theta_i)
         raise ValueError(
             'theta_f ({:.2f} deg) < theta_i ({:.2f} deg):'.format(
-                np.rad2deg(theta_f), np.rad2deg(theta_i))
+                np.rad2deg(theta_f[idx]), np.rad2deg(theta_i[idx]))
             + 'final coupling weaker than initial coupling')
 
+    waveforms = [None]*len(length)
+    for l in np.unique(length):
+        idx = np.where(length == l)[0]
+        waves = _martinis_flux_pulses_same_length(
+            l, theta_i[idx, None], theta_f[idx, None], lambda_2[idx, None],
+            lambda_3[idx, None], lambda_4[idx, None], sampling_rate)
+        for i, wave in zip(idx, waves):
+            waveforms[i] = wave
+    return waveforms
+
+
+def _martinis_flux_pulses_same_length(length, theta_i, theta_f,
+                                      lambda_2, lambda_3, lambda_4,
+                                      sampling_rate):
+    """
+    Generates the pulses of martinis_flux_pulse_batch that have the same
+    length, the parameters are column vectors.
+    """
     # 1. Generate a time grid, may include fine sampling.
 
     # Pulse is generated at a denser grid to allow for good interpolation
@@ -64,34 +107,50 @@ def martinis_flux_pulse(length: float,
     lambda_1 = (theta_f - theta_i) / (2) - lambda_3
 
     # 2. Generate θ(τ) using eqs 15 and 16
-    theta_wave = np.ones(nr_samples) * theta_i
-    theta_wave += lambda_1 * (1 - np.cos(2 * np.pi * taus / rounded_length))
-    theta_wave += lambda_2 * (1 - np.cos(4 * np.pi * taus / rounded_length))
-    theta_wave += lambda_3 * (1 - np.cos(6 * np.pi * taus / rounded_length))
-    theta_wave += lambda_4 * (1 - np.cos(8 * np.pi * taus / rounded_length))
+    # The harmonics are shared by all pulses, the lambdas weigh them
+    harmonics = 1 - np.cos(
+        2 * np.pi * np.arange(1, 5)[:, None] * taus / rounded_length)
+    lambdas = np.hstack([lambda_1, lambda_2, lambda_3, lambda_4])
+    theta_wave = np.dot(lambdas, harmonics)
+    theta_wave += theta_i
 
     # Clip wave to [theta_i, pi] to avoid poles in the wave expressed in freq
     theta_wave_clipped = np.clip(theta_wave, theta_i, np.pi-.01)
     if not np.array_equal(theta_wave, theta_wave_clipped):
         logging.warning(
             'Martinis flux wave form has been clipped to [{}, 180 deg]'
-            .format(np.rad2deg(theta_i)))
+            .format(np.rad2deg(theta_i[0, 0])))
 
     # 3. Transform from proper time τ to real time t using interpolation
-    t = np.array([np.trapz(np.sin(theta_wave_clipped)[:i+1],
-                           dx=1/(fine_sampling_factor*sampling_rate))
-                  for i in range(len(theta_wave_clipped))])
+    # t is the cumulative (trapezoidal) integral of sin(θ) over τ
+    sin_theta = np.sin(theta_wave_clipped)
+    t = np.zeros(theta_wave_clipped.shape)
+    np.cumsum((sin_theta[:, 1:] + sin_theta[:, :-1])/2, axis=1,
+              out=t[:, 1:])
+    t *= 1/(fine_sampling_factor*sampling_rate)
 
     # Interpolate pulse at physical sampling distance
     t_samples = np.arange(0, length, 1/sampling_rate)
-    # Scaling factor for time-axis to get correct pulse length again
-    scale = t[-1]/t_samples[-1]
-    interp_wave = scipy.interpolate.interp1d(
-        t/scale, theta_wave_clipped, bounds_error=False,
-        fill_value='extrapolate')(t_samples)
-
+    waves = np.empty((len(t), len(t_samples)))
+    for i, (t_row, theta_row) in enumerate(zip(t, theta_wave_clipped)):
+        # Scaling factor for time-axis to get correct pulse length again
+        scale = t_row[-1]/t_samples[-1]
+        waves[i] = _interp_extrapolate(t_samples, t_row/scale, theta_row)
     # Theta is returned in radians here
-    return np.nan_to_num(interp_wave)
+    return list(np.nan_to_num(waves, copy=False))
+
+
+def _interp_extrapolate(x_new, x, y):
+    """
+    Linear interpolation that extrapolates using the first and last
+    intervals, as scipy.interpolate.interp1d(fill_value='extrapolate').
+    """
+    y_new = np.interp(x_new, x, y)
+    below = x_new < x[0]
+    y_new[below] = y[0] + (x_new[below]-x[0])*(y[1]-y[0])/(x[1]-x[0])
+    above = x_new > x[-1]
+    y_new[above] = y[-1] + (x_new[above]-x[-1])*(y[-1]-y[-2])/(x[-1]-x[-2])
+    return y_new
 
 
 def eps_to_theta(eps: float, g: float):
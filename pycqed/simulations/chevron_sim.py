@@ -12,6 +12,67 @@ def ham(e, g): return np.array([[0.5*e, g], [g, -0.5*e]])
 def evol(e, g, dt): return expm(dt*1j*ham(e, g))
 
 
+def evol_batch(e, g, dt):
+    """
+    Closed form of evol for an array of energies.
+
+    For H = 0.5 e sigma_z + g sigma_x, H^2 = (e^2/4 + g^2) I such that
+            expm(i dt H) = cos(W dt) I + i sin(W dt)/W H,
+    with W = sqrt(e^2/4 + g^2).
+
+    Inputs:
+            e,      array of energies
+            g,      Coupling parameter
+            dt,     Stepsize of the time evolution
+    Outputs:
+            U,      array of propagators, shape e.shape + (2, 2)
+    """
+    e = np.asarray(e, dtype=float)
+    omega = np.sqrt(0.25*e**2 + g**2)
+    cos = np.cos(omega*dt)
+    # sin(W dt)/W, which equals dt for W = 0
+    sin_w = dt*np.sinc(omega*dt/np.pi)
+    U = np.empty(e.shape + (2, 2), dtype=np.complex128)
+    U[..., 0, 0] = cos + 0.5j*sin_w*e
+    U[..., 0, 1] = 1j*sin_w*g
+    U[..., 1, 0] = U[..., 0, 1]
+    U[..., 1, 1] = cos - 0.5j*sin_w*e
+    return U
+
+
+def rabisim_batch(energies, g, dt):
+    """
+    Vectorized version of rabisim for many energy trajectories at once.
+
+    Inputs:
+            energies, array of shape (n, len(ts)), the energy parameter of
+                    every trajectory at the times ts of rabisim.
+            g,      Coupling parameter
+            dt,     Stepsize of the time evolution
+    Outputs:
+            f_vec,  array of shape (n, len(ts), 2), the evolution of every
+                    trajectory.
+
+    The propagators of all steps are calculated in closed form
+    (see evol_batch) and multiplied cumulatively using a parallel prefix
+    scan, which takes log2(len(ts)) batched matrix multiplications.
+    """
+    energies = np.atleast_2d(energies)
+    n, nr_ts = energies.shape
+    # The state at ts[i+1] is given by the propagators of ts[0] ... ts[i]
+    props = evol_batch(energies[:, :-1], g, dt)
+    shift = 1
+    while shift < nr_ts-1:
+        props[:, shift:] = np.matmul(props[:, shift:], props[:, :-shift])
+        shift *= 2
+
+    f_vec = np.zeros((n, nr_ts, 2), dtype=np.complex128)
+    f_vec[:, 0, 0] = 1
+    # starting from s0 = [1, 0], the state is the first column
+    f_vec[:, 1:, :] = props[..., 0]
+    return f_vec
+
+
 def rabisim(efun, g, t, dt):
     """
     This function returns the evolution of a system described by the hamiltonian:
@@ -24,18 +85,15 @@ def rabisim(efun, g, t, dt):
     Outputs:
             f_vec,  Evolution for times (1, 1+dt, ..., t)
     """
-    s0 = np.array([1, 0])
-    ts = np.arange(1., t+0.5*dt, dt)
-
-    def f(st, ti): return np.dot(evol(efun(ti), g, dt), st)
-    f_vec = np.zeros((len(ts), 2), dtype=np.complex128)
-    f_vec[0, :] = s0
-    for i, t in enumerate(ts[:-1]):
-        f_vec[i+1, :] = f(f_vec[i], t)
-    return f_vec
+    ts = _time_vec(t, dt)
+    energies = np.array([efun(ti) for ti in ts], dtype=float)
+    return rabisim_batch(energies[None, :], g, dt)[0]
 
 
-def qamp(vec): return np.abs(vec[:, 1])**2
+def _time_vec(t, dt): return np.arange(1., t+0.5*dt, dt)
+
+
+def qamp(vec): return np.abs(vec[..., 1])**2
 
 
 def chevron(e0, emin, emax, n, g, t, dt, sf):
@@ -50,13 +108,11 @@ def chevron(e0, emin, emax, n, g, t, dt, sf):
             dt,     Stepsize of the time evolution.
             sf,     Step function of the distortion kernel.
     """
-    def energy_func(energy, t): return e0*(1.-(energy*sf(t))**2)
     energy_vec = np.arange(1+emin, 1+emax, (emax-emin)/(n-1))
-    chevron_vec = []
-    for ee in energy_vec:
-        chevron_vec.append(
-            qamp(rabisim(lambda t: energy_func(ee, t), g, t, dt)))
-    return np.array(chevron_vec)
+    # The step function is evaluated once for all energies
+    sf_vec = np.array([sf(ti) for ti in _time_vec(t, dt)], dtype=float)
+    energies = e0*(1.-(energy_vec[:, None]*sf_vec[None, :])**2)
+    return qamp(rabisim_batch(energies, g, dt))
 
 
 def chevron_slice(e0, energy, g, t, dt, sf):
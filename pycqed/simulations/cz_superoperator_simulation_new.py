@@ -9,10 +9,16 @@ Needs to be copied into notebook to work
 """
 
 from pycqed.simulations import cz_superoperator_simulation_new_functions as czf
+import os
+import json
+import hashlib
+import multiprocessing
+import h5py
 import numpy as np
 from pycqed.measurement import detector_functions as det
 import matplotlib.pyplot as plt
 from pycqed.measurement.waveform_control_CC import waveforms_flux as wfl
+from pycqed.instrument_drivers.virtual_instruments import noise_parameters_CZ_new as npCZ
 from scipy.interpolate import interp1d
 import qutip as qtp
 #np.set_printoptions(threshold=np.inf)
@@ -35,6 +41,10 @@ def compute_propagator_parallelizable(arglist):
         number = arglist['number']
 
 
+        # imported here because the flux_lutman imports OpenQL, which is not
+        # needed for the rest of the simulation
+        from pycqed.instrument_drivers.meta_instrument.LutMans import \
+            flux_lutman as flm
         fluxlutman = flm.AWG8_Flux_LutMan('fluxlutman_'+'{}'.format(number))
         noise_parameters_CZ = npCZ.NoiseParametersCZ('noise_parameters_CZ_'+'{}'.format(number))
 
@@ -65,6 +75,7 @@ def compute_propagator_parallelizable(arglist):
         noise_parameters_CZ.sigma_q0(noise_parameters_CZ_args['sigma_q0'])
         noise_parameters_CZ.sigma_q1(noise_parameters_CZ_args['sigma_q1'])
         noise_parameters_CZ.T2_scaling(noise_parameters_CZ_args['T2_scaling'])
+        noise_parameters_CZ.propagator_engine(noise_parameters_CZ_args['propagator_engine'])
     else:
         fluxlutman = arglist['fluxlutman']
         noise_parameters_CZ = arglist['noise_parameters_CZ']
@@ -159,16 +170,23 @@ def compute_propagator_parallelizable(arglist):
 
 
     ### Compute propagator
-    U_final = czf.time_evolution_new(c_ops=c_ops, noise_parameters_CZ=noise_parameters_CZ, 
+    if noise_parameters_CZ.propagator_engine() == 'numpy':
+        time_evolution = czf.time_evolution_numpy
+    else:
+        time_evolution = czf.time_evolution_new
+    U_final = time_evolution(c_ops=c_ops, noise_parameters_CZ=noise_parameters_CZ, 
                                  fluxlutman=fluxlutman, fluxbias_q1=fluxbias_q1, amp=amp_final, sim_step=sim_step_new)
     #print(czf.verify_CPTP(U_superop_average))
 
 
+    # needed to compute phases in the rotating frame
+    w_q0, w_q1 = czf.dressed_frequencies(fluxlutman, noise_parameters_CZ)
+
     if arglist['cluster']:
         fluxlutman.close()
         noise_parameters_CZ.close()
 
-    return [U_final, t_final]
+    return [U_final, t_final, w_q0, w_q1]
 
 
 
@@ -208,6 +226,118 @@ def get_f_pulse_double_sided(fluxlutman,theta_i):
 
 
 
+qoi_value_names = ['Cost func', 'Cond phase', 'L1', 'L2', 'avgatefid_pc', 'avgatefid_compsubspace_pc',
+                   'phase_q0', 'phase_q1', 'avgatefid_compsubspace', 'avgatefid_compsubspace_pc_onlystaticqubit', 'population_02_state']
+qoi_value_units = ['a.u.', 'deg', '%', '%', '%', '%', 'deg', 'deg', '%', '%', '%']
+
+
+def fluxlutman_args_from_instr(fluxlutman):
+    """
+    Extracts the parameters needed to recreate the fluxlutman locally
+    (necessary for parallelization since intruments cannot be pickled)
+    """
+    return {'sampling_rate': fluxlutman.sampling_rate(),
+            'cz_length': fluxlutman.cz_length(),
+            'q_J2': fluxlutman.q_J2(),
+            'czd_double_sided': fluxlutman.czd_double_sided(),
+            'cz_lambda_2': fluxlutman.cz_lambda_2(),
+            'cz_lambda_3': fluxlutman.cz_lambda_3(),
+            'cz_theta_f': fluxlutman.cz_theta_f(),
+            'czd_length_ratio': fluxlutman.czd_length_ratio(),
+            'q_polycoeffs_freq_01_det': fluxlutman.q_polycoeffs_freq_01_det(),
+            'q_polycoeffs_anharm': fluxlutman.q_polycoeffs_anharm(),
+            'q_freq_01': fluxlutman.q_freq_01(),
+            'q_freq_10': fluxlutman.q_freq_10()}
+
+
+def noise_parameters_CZ_args_from_instr(noise_parameters_CZ):
+    """
+    Extracts the parameters needed to recreate noise_parameters_CZ locally
+    (necessary for parallelization since intruments cannot be pickled)
+    """
+    return {'Z_rotations_length': noise_parameters_CZ.Z_rotations_length(),
+            'voltage_scaling_factor': noise_parameters_CZ.voltage_scaling_factor(),
+            'distortions': noise_parameters_CZ.distortions(),
+            'T1_q0': noise_parameters_CZ.T1_q0(),
+            'T1_q1': noise_parameters_CZ.T1_q1(),
+            'T2_q0_amplitude_dependent': noise_parameters_CZ.T2_q0_amplitude_dependent(),
+            'T2_q1': noise_parameters_CZ.T2_q1(),
+            'w_q1_sweetspot': noise_parameters_CZ.w_q1_sweetspot(),
+            'alpha_q1': noise_parameters_CZ.alpha_q1(),
+            'w_bus': noise_parameters_CZ.w_bus(),
+            'dressed_compsub': noise_parameters_CZ.dressed_compsub(),
+            'sigma_q0': noise_parameters_CZ.sigma_q0(),
+            'sigma_q1': noise_parameters_CZ.sigma_q1(),
+            'T2_scaling': noise_parameters_CZ.T2_scaling(),
+            'propagator_engine': noise_parameters_CZ.propagator_engine(),
+            'n_sampling_gaussian_vec': noise_parameters_CZ.n_sampling_gaussian_vec(),
+            'look_for_minimum': noise_parameters_CZ.look_for_minimum()}
+
+
+def fluxbias_samples(sigma_q0, sigma_q1, n_sampling_gaussian):
+    """
+    Discretizes the average (integral) over a Gaussian distribution of the
+    quasi-static fluxbias on both qubits.
+
+    Returns:
+        samples (list): tuples (fluxbias_q0, fluxbias_q1, weight)
+    """
+    mean = 0
+    # If sigma=0 there's no need for sampling
+    if sigma_q0 != 0:
+        samplingpoints_gaussian_q0 = np.linspace(-5*sigma_q0,5*sigma_q0,n_sampling_gaussian)    # after 5 sigmas we cut the integral
+        delta_x_q0 = samplingpoints_gaussian_q0[1]-samplingpoints_gaussian_q0[0]
+        values_gaussian_q0 = czf.gaussian(samplingpoints_gaussian_q0,mean,sigma_q0)
+    else:
+        samplingpoints_gaussian_q0 = np.array([0])
+        delta_x_q0 = 1
+        values_gaussian_q0 = np.array([1])
+    if sigma_q1 != 0:
+        samplingpoints_gaussian_q1 = np.linspace(-5*sigma_q1,5*sigma_q1,n_sampling_gaussian)    # after 5 sigmas we cut the integral
+        delta_x_q1 = samplingpoints_gaussian_q1[1]-samplingpoints_gaussian_q1[0]
+        values_gaussian_q1 = czf.gaussian(samplingpoints_gaussian_q1,mean,sigma_q1)
+    else:
+        samplingpoints_gaussian_q1 = np.array([0])
+        delta_x_q1 = 1
+        values_gaussian_q1 = np.array([1])
+
+    samples = []
+    for j_q0 in range(len(samplingpoints_gaussian_q0)):
+        fluxbias_q0 = samplingpoints_gaussian_q0[j_q0]                     # q0 fluxing qubit
+        for j_q1 in range(len(samplingpoints_gaussian_q1)):
+            fluxbias_q1 = samplingpoints_gaussian_q1[j_q1]                 # q1 spectator qubit
+            weight = values_gaussian_q0[j_q0]*delta_x_q0 * values_gaussian_q1[j_q1]*delta_x_q1
+            samples.append((fluxbias_q0, fluxbias_q1, weight))
+    return samples
+
+
+def quantities_of_interest_from_propagators(U_final_vec, weights, t_final,
+                                            w_q0, w_q1, look_for_minimum):
+    """
+    Averages the propagators of the fluxbias samples and computes the
+    quantities of interest, in the order of qoi_value_names.
+    """
+    U_final_vec = list(U_final_vec)
+    for i in range(len(U_final_vec)):
+        if U_final_vec[i].type == 'oper':
+            U_final_vec[i] = qtp.to_super(U_final_vec[i])           # weighted averaging needs to be done for superoperators
+        U_final_vec[i] = U_final_vec[i] * weights[i]
+    U_superop_average = sum(U_final_vec[1:], U_final_vec[0])        # computing resulting average propagator
+    #print(czf.verify_CPTP(U_superop_average))
+
+    qoi = czf.simulate_quantities_of_interest_superoperator_new(U=U_superop_average,t_final=t_final,w_q0=w_q0,w_q1=w_q1)
+    if look_for_minimum:                             # if we look only for the minimum avgatefid_pc in the heat maps,
+                                                                                # then we optimize the search via higher-order cost function
+        cost_func_val = (-np.log10(1-qoi['avgatefid_compsubspace_pc']))**4
+    else:
+        cost_func_val = (-np.log10(1-qoi['avgatefid_compsubspace_pc']))
+
+    quantities_of_interest = [cost_func_val, qoi['phi_cond'], qoi['L1']*100, qoi['L2']*100, qoi['avgatefid_pc']*100,
+                     qoi['avgatefid_compsubspace_pc']*100, qoi['phase_q0'], qoi['phase_q1'],
+                     qoi['avgatefid_compsubspace']*100, qoi['avgatefid_compsubspace_pc_onlystaticqubit']*100, qoi['population_02_state']*100]
+    return np.array(quantities_of_interest)
+
+
 class CZ_trajectory_superoperator(det.Soft_Detector):
     def __init__(self, fluxlutman, noise_parameters_CZ, fitted_stepresponse_ty):
         """
@@ -222,9 +352,8 @@ class CZ_trajectory_superoperator(det.Soft_Detector):
         Returns: quantites of interest
         """
         super().__init__()
-        self.value_names = ['Cost func', 'Cond phase', 'L1', 'L2', 'avgatefid_pc', 'avgatefid_compsubspace_pc',
-                            'phase_q0', 'phase_q1', 'avgatefid_compsubspace', 'avgatefid_compsubspace_pc_onlystaticqubit', 'population_02_state']
-        self.value_units = ['a.u.', 'deg', '%', '%', '%', '%', 'deg', 'deg', '%', '%', '%']
+        self.value_names = qoi_value_names
+        self.value_units = qoi_value_units
         self.fluxlutman = fluxlutman
         self.noise_parameters_CZ = noise_parameters_CZ
         self.fitted_stepresponse_ty=fitted_stepresponse_ty      # list of 2 elements: stepresponse (=y)
@@ -233,38 +362,10 @@ class CZ_trajectory_superoperator(det.Soft_Detector):
     def acquire_data_point(self, **kw):
 
         ### Extract relevant parameters to recreate the instrument locally (necessary for parallelization since intruments cannot be pickled)
-        fluxlutman_args = {'sampling_rate': self.fluxlutman.sampling_rate(),
-                           'cz_length': self.fluxlutman.cz_length(),
-                           'q_J2': self.fluxlutman.q_J2(),
-                           'czd_double_sided': self.fluxlutman.czd_double_sided(),
-                           'cz_lambda_2': self.fluxlutman.cz_lambda_2(),
-                           'cz_lambda_3': self.fluxlutman.cz_lambda_3(),
-                           'cz_theta_f': self.fluxlutman.cz_theta_f(),
-                           'czd_length_ratio': self.fluxlutman.czd_length_ratio(),
-                           'q_polycoeffs_freq_01_det': self.fluxlutman.q_polycoeffs_freq_01_det(),
-                           'q_polycoeffs_anharm': self.fluxlutman.q_polycoeffs_anharm(),
-                           'q_freq_01': self.fluxlutman.q_freq_01(),
-                           'q_freq_10': self.fluxlutman.q_freq_10()}
-
-        noise_parameters_CZ_args = {'Z_rotations_length': self.noise_parameters_CZ.Z_rotations_length(),
-                                    'voltage_scaling_factor': self.noise_parameters_CZ.voltage_scaling_factor(),
-                                    'distortions': self.noise_parameters_CZ.distortions(),
-                                    'T1_q0': self.noise_parameters_CZ.T1_q0(),
-                                    'T1_q1': self.noise_parameters_CZ.T1_q1(),
-                                    'T2_q0_amplitude_dependent': self.noise_parameters_CZ.T2_q0_amplitude_dependent(),
-                                    'T2_q1': self.noise_parameters_CZ.T2_q1(),
-                                    'w_q1_sweetspot': self.noise_parameters_CZ.w_q1_sweetspot(),
-                                    'alpha_q1': self.noise_parameters_CZ.alpha_q1(),
-                                    'w_bus': self.noise_parameters_CZ.w_bus(),
-                                    'dressed_compsub': self.noise_parameters_CZ.dressed_compsub(),
-                                    'sigma_q0': self.noise_parameters_CZ.sigma_q0(),
-                                    'sigma_q1': self.noise_parameters_CZ.sigma_q1(),
-                                    'T2_scaling': self.noise_parameters_CZ.T2_scaling()}
-
-
+        fluxlutman_args = fluxlutman_args_from_instr(self.fluxlutman)
+        noise_parameters_CZ_args = noise_parameters_CZ_args_from_instr(self.noise_parameters_CZ)
 
         ### Discretize average (integral) over a Gaussian distribution
-        mean = 0
         sigma_q0 = self.noise_parameters_CZ.sigma_q0()
         sigma_q1 = self.noise_parameters_CZ.sigma_q1()          # one for each qubit, in units of Phi_0
                  # 4e-6 is the same value as in the surface-17 paper of tom&brian. We see that 25 reproduces the T_phi^quasi-static for a Ramsey exp.
@@ -274,35 +375,13 @@ class CZ_trajectory_superoperator(det.Soft_Detector):
                                                                                           # We choose it odd so that the central point of the Gaussian is included.
                                                                                           # ALWAYS choose it odd
         for n_sampling_gaussian in n_sampling_gaussian_vec:
-            # If sigma=0 there's no need for sampling
-            if sigma_q0 != 0:
-                samplingpoints_gaussian_q0 = np.linspace(-5*sigma_q0,5*sigma_q0,n_sampling_gaussian)    # after 5 sigmas we cut the integral
-                delta_x_q0 = samplingpoints_gaussian_q0[1]-samplingpoints_gaussian_q0[0]
-                values_gaussian_q0 = czf.gaussian(samplingpoints_gaussian_q0,mean,sigma_q0)
-            else:
-                samplingpoints_gaussian_q0 = np.array([0])
-                delta_x_q0 = 1
-                values_gaussian_q0 = np.array([1])
-            if sigma_q1 != 0:
-                samplingpoints_gaussian_q1 = np.linspace(-5*sigma_q1,5*sigma_q1,n_sampling_gaussian)    # after 5 sigmas we cut the integral
-                delta_x_q1 = samplingpoints_gaussian_q1[1]-samplingpoints_gaussian_q1[0]
-                values_gaussian_q1 = czf.gaussian(samplingpoints_gaussian_q1,mean,sigma_q1)
-            else:
-                samplingpoints_gaussian_q1 = np.array([0])
-                delta_x_q1 = 1
-                values_gaussian_q1 = np.array([1])
-
-
 
             input_to_parallelize = []
             weights=[]
             number=-1           # used to number instruments that are created in the parallelization, to avoid conflicts
 
-            
-            for j_q0 in range(len(samplingpoints_gaussian_q0)):
-                fluxbias_q0 = samplingpoints_gaussian_q0[j_q0]                     # q0 fluxing qubit
-                for j_q1 in range(len(samplingpoints_gaussian_q1)): 
-                    fluxbias_q1 = samplingpoints_gaussian_q1[j_q1]                 # q1 spectator qubit
+            for fluxbias_q0, fluxbias_q1, weight in fluxbias_samples(
+                    sigma_q0, sigma_q1, n_sampling_gaussian):
 
                     number=number+1
 
@@ -323,7 +402,6 @@ class CZ_trajectory_superoperator(det.Soft_Detector):
                                        'number': number,
                                        'cluster': self.noise_parameters_CZ.cluster()}
 
-                    weight = values_gaussian_q0[j_q0]*delta_x_q0 * values_gaussian_q1[j_q1]*delta_x_q1
                     weights.append(weight)
 
                     input_to_parallelize.append(input_point)
@@ -344,28 +422,12 @@ class CZ_trajectory_superoperator(det.Soft_Detector):
                     t_final_vec.append(result_list[1])
 
 
-            for i in range(len(U_final_vec)):
-                if U_final_vec[i].type == 'oper':
-                    U_final_vec[i] = qtp.to_super(U_final_vec[i])           # weighted averaging needs to be done for superoperators
-                U_final_vec[i] = U_final_vec[i] * weights[i]
-            U_superop_average = np.sum(np.array(U_final_vec))               # computing resulting average propagator
-            #print(czf.verify_CPTP(U_superop_average))
-
-
             t_final = t_final_vec[0]                                        # equal for all entries, we need it to compute phases in the rotating frame
             w_q0, w_q1 = czf.dressed_frequencies(self.fluxlutman, self.noise_parameters_CZ)     # needed to compute phases in the rotating frame
 
-            qoi = czf.simulate_quantities_of_interest_superoperator_new(U=U_superop_average,t_final=t_final,w_q0=w_q0,w_q1=w_q1)
-            if self.noise_parameters_CZ.look_for_minimum():                             # if we look only for the minimum avgatefid_pc in the heat maps,
-                                                                                        # then we optimize the search via higher-order cost function
-                cost_func_val = (-np.log10(1-qoi['avgatefid_compsubspace_pc']))**4
-            else:
-                cost_func_val = (-np.log10(1-qoi['avgatefid_compsubspace_pc']))
-
-            quantities_of_interest = [cost_func_val, qoi['phi_cond'], qoi['L1']*100, qoi['L2']*100, qoi['avgatefid_pc']*100, 
-                             qoi['avgatefid_compsubspace_pc']*100, qoi['phase_q0'], qoi['phase_q1'], 
-                             qoi['avgatefid_compsubspace']*100, qoi['avgatefid_compsubspace_pc_onlystaticqubit']*100, qoi['population_02_state']*100]
-            qoi_vec=np.array(quantities_of_interest)
+            qoi_vec = quantities_of_interest_from_propagators(
+                U_final_vec, weights, t_final, w_q0, w_q1,
+                look_for_minimum=self.noise_parameters_CZ.look_for_minimum())
             qoi_plot.append(qoi_vec)
 
 
@@ -382,4 +444,238 @@ class CZ_trajectory_superoperator(det.Soft_Detector):
         return qoi_plot[0,0], qoi_plot[0,1], qoi_plot[0,2], qoi_plot[0,3], qoi_plot[0,4], qoi_plot[0,5], qoi_plot[0,6], \
                qoi_plot[0,7], qoi_plot[0,8], qoi_plot[0,9], qoi_plot[0,10]
 
-           
\ No newline at end of file
+
+##### Parallel parameter sweeps
+
+# read-only inputs shared by all tasks of a sweep, set once per worker process
+_sweep_shared_inputs = None
+
+
+def _init_sweep_worker(shared_inputs):
+    global _sweep_shared_inputs
+    _sweep_shared_inputs = shared_inputs
+
+
+def _sweep_task_seed(seed, point_idx, sample_idx):
+    """
+    Seed of a single task, independent of the order in which tasks are
+    executed and of the number of processes.
+    """
+    return (seed*1000003 + point_idx*1009 + sample_idx) % 2**32
+
+
+def _compute_sweep_task(task):
+    point_idx, sample_idx, fluxbias_q0, fluxbias_q1 = task
+    shared = _sweep_shared_inputs
+    np.random.seed(_sweep_task_seed(shared['seed'], point_idx, sample_idx))
+
+    fluxlutman_args, noise_parameters_CZ_args = shared['points_args'][point_idx]
+    arglist = {'fluxbias_q0': fluxbias_q0,
+               'fluxbias_q1': fluxbias_q1,
+               'fluxlutman_args': fluxlutman_args,
+               'noise_parameters_CZ_args': noise_parameters_CZ_args,
+               'fitted_stepresponse_ty': shared['fitted_stepresponse_ty'],
+               # unique instrument names within a worker process
+               'number': '{}_{}_{}'.format(os.getpid(), point_idx, sample_idx),
+               'cluster': True}
+    U_final, t_final, w_q0, w_q1 = compute_propagator_parallelizable(arglist)
+    return point_idx, sample_idx, U_final, t_final, w_q0, w_q1
+
+
+def _json_default(obj):
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError('{} is not JSON serializable'.format(type(obj)))
+
+
+def _sweep_hash(points_args, fitted_stepresponse_ty, seed):
+    """
+    Identifies a sweep by all of its inputs, used to resume a sweep.
+
+    The hash is computed from a canonical JSON form of the inputs (sorted
+    keys, arrays as lists, floats in their shortest round-trip repr), so it
+    does not depend on the python or numpy version.
+    """
+    canonical = {
+        'points': [[fl, noise] for fl, noise in points_args],
+        'fitted_stepresponse_ty': (
+            [np.asarray(a).tolist() for a in fitted_stepresponse_ty]
+            if fitted_stepresponse_ty is not None else None),
+        'seed': seed}
+    canonical = json.dumps(canonical, sort_keys=True, default=_json_default)
+    return hashlib.md5(canonical.encode('utf-8')).hexdigest()
+
+
+def run_cz_sweep(fluxlutman_args: dict, noise_parameters_CZ_args: dict,
+                 fitted_stepresponse_ty, sweep_points: list,
+                 processes: int=None, datafile: str=None, seed: int=0):
+    """
+    Evaluates the CZ simulation for a list of parameter points on a
+    process pool. Every (point, fluxbias sample) combination is a separate
+    task, the propagators of the samples are averaged per point.
+
+    Args:
+        fluxlutman_args (dict): see fluxlutman_args_from_instr
+        noise_parameters_CZ_args (dict): see
+            noise_parameters_CZ_args_from_instr
+        fitted_stepresponse_ty: see CZ_trajectory_superoperator
+        sweep_points (list of dicts): every point overrides values in
+            fluxlutman_args or noise_parameters_CZ_args, e.g.
+            [{'cz_theta_f': 80, 'cz_length': 40e-9}, ...]
+        processes (int): number of worker processes, defaults to the
+            number of cores. If 1, all tasks are run in this process.
+        datafile (str): path of an HDF5 file in which the results are
+            stored as soon as a point is done. If the same sweep (identical
+            inputs) is found in the file, only the missing points are
+            computed.
+        seed (int): seed of the random number generator, every task is
+            seeded based on this seed and its point and sample index.
+
+    Returns:
+        quantities_of_interest (array): shape (len(sweep_points), 11), in
+            the order of qoi_value_names.
+    """
+    points_args = []
+    for point in sweep_points:
+        fl_args = dict(fluxlutman_args)
+        noise_args = dict(noise_parameters_CZ_args)
+        for par, val in point.items():
+            if par in fl_args:
+                fl_args[par] = val
+            elif par in noise_args:
+                noise_args[par] = val
+            else:
+                raise KeyError('Sweep parameter "{}" not recognized'.format(par))
+        points_args.append((fl_args, noise_args))
+    nr_points = len(points_args)
+
+    qoi = np.full((nr_points, len(qoi_value_names)), np.nan)
+    done = np.zeros(nr_points, dtype=bool)
+
+    data_file = None
+    try:
+        if datafile is not None:
+            data_file = h5py.File(datafile, 'a')
+            grp_name = _sweep_hash(points_args, fitted_stepresponse_ty, seed)
+            if grp_name not in data_file:
+                grp = data_file.create_group(grp_name)
+                grp.attrs['sweep_points'] = json.dumps(
+                    sweep_points, default=lambda o: np.asarray(o).tolist())
+                grp.attrs['value_names'] = json.dumps(qoi_value_names)
+                grp.attrs['value_units'] = json.dumps(qoi_value_units)
+                grp.create_dataset('quantities_of_interest', data=qoi)
+                grp.create_dataset('done', data=done)
+            grp = data_file[grp_name]
+            qoi = grp['quantities_of_interest'][()]
+            done = grp['done'][()]
+
+        # one task for every (point, fluxbias sample)
+        tasks = []
+        weights = {}
+        for point_idx, (fl_args, noise_args) in enumerate(points_args):
+            if done[point_idx]:
+                continue
+            samples = fluxbias_samples(
+                noise_args['sigma_q0'], noise_args['sigma_q1'],
+                noise_args['n_sampling_gaussian_vec'][0])
+            weights[point_idx] = [w for _, _, w in samples]
+            for sample_idx, (fb_q0, fb_q1, _) in enumerate(samples):
+                tasks.append((point_idx, sample_idx, fb_q0, fb_q1))
+
+        shared_inputs = {'points_args': points_args,
+                         'fitted_stepresponse_ty': fitted_stepresponse_ty,
+                         'seed': seed}
+        if processes == 1:
+            _init_sweep_worker(shared_inputs)
+            pool = None
+            results = map(_compute_sweep_task, tasks)
+        else:
+            pool = multiprocessing.Pool(
+                processes, initializer=_init_sweep_worker,
+                initargs=(shared_inputs,))
+            results = pool.imap_unordered(_compute_sweep_task, tasks)
+
+        try:
+            pending = {}
+            for point_idx, sample_idx, U_final, t_final, w_q0, w_q1 in results:
+                pending.setdefault(point_idx, {})[sample_idx] = (
+                    U_final, t_final, w_q0, w_q1)
+                if len(pending[point_idx]) < len(weights[point_idx]):
+                    continue
+                # all samples of this point are done
+                point_results = pending.pop(point_idx)
+                U_final_vec = [point_results[i][0]
+                               for i in range(len(point_results))]
+                _, t_final, w_q0, w_q1 = point_results[0]
+                qoi[point_idx] = quantities_of_interest_from_propagators(
+                    U_final_vec, weights[point_idx], t_final, w_q0, w_q1,
+                    points_args[point_idx][1]['look_for_minimum'])
+                done[point_idx] = True
+                if data_file is not None:
+                    grp['quantities_of_interest'][point_idx] = qoi[point_idx]
+                    grp['done'][point_idx] = True
+                    data_file.flush()
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+    finally:
+        if data_file is not None:
+            data_file.close()
+    return qoi
+
+
+class CZ_trajectory_superoperator_parallel(det.Hard_Detector):
+    def __init__(self, fluxlutman, noise_parameters_CZ, fitted_stepresponse_ty,
+                 sweep_parameter: str, processes: int=None,
+                 datafile: str=None, seed: int=0):
+        """
+        Hard detector version of CZ_trajectory_superoperator, all sweep
+        points of a hard sweep are simulated in parallel using run_cz_sweep.
+
+        Args:
+            fluxlutman, noise_parameters_CZ, fitted_stepresponse_ty: see
+                CZ_trajectory_superoperator
+            sweep_parameter (str): name of the fluxlutman or
+                noise_parameters_CZ parameter that is swept in the hard
+                sweep, e.g. 'cz_theta_f' or 'cz_length'. All other
+                parameters are taken from the instruments, so these can be
+                swept in an outer (soft) loop.
+            processes, datafile, seed: see run_cz_sweep
+
+        Example:
+            MC.set_sweep_function(swf.None_Sweep(
+                sweep_control='hard', parameter_name='cz_theta_f', unit='deg'))
+            MC.set_sweep_points(np.linspace(60, 180, 25))
+            MC.set_detector_function(CZ_trajectory_superoperator_parallel(
+                fluxlutman, noise_parameters_CZ, fitted_stepresponse_ty,
+                sweep_parameter='cz_theta_f'))
+        """
+        super().__init__()
+        self.name = 'CZ_trajectory_superoperator_parallel'
+        self.value_names = qoi_value_names
+        self.value_units = qoi_value_units
+        self.fluxlutman = fluxlutman
+        self.noise_parameters_CZ = noise_parameters_CZ
+        self.fitted_stepresponse_ty = fitted_stepresponse_ty
+        self.sweep_parameter = sweep_parameter
+        self.processes = processes
+        self.datafile = datafile
+        self.seed = seed
+
+    def prepare(self, sweep_points=None):
+        self.sweep_points = np.array(sweep_points)
+
+    def get_values(self):
+        sweep_points = [{self.sweep_parameter: val}
+                        for val in self.sweep_points]
+        qoi = run_cz_sweep(
+            fluxlutman_args=fluxlutman_args_from_instr(self.fluxlutman),
+            noise_parameters_CZ_args=noise_parameters_CZ_args_from_instr(
+                self.noise_parameters_CZ),
+            fitted_stepresponse_ty=self.fitted_stepresponse_ty,
+            sweep_points=sweep_points, processes=self.processes,
+            datafile=self.datafile, seed=self.seed)
+        return qoi.T
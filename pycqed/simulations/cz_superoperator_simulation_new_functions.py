@@ -87,6 +87,19 @@ def coupled_transmons_hamiltonian_new(w_q0, w_q1, alpha_q0, alpha_q1, J):
 def calc_hamiltonian(amp,fluxlutman,noise_parameters_CZ):
     # all inputs should be given in terms of frequencies, i.e. without the 2*np.pi factor
     # instead, the output includes already that factor
+    w_q0, w_q1, alpha_q0, alpha_q1, J_temp = calc_hamiltonian_coefficients(
+        amp, fluxlutman, noise_parameters_CZ)
+
+    H=coupled_transmons_hamiltonian_new(w_q0=w_q0, w_q1=w_q1, alpha_q0=alpha_q0, alpha_q1=alpha_q1, J=J_temp)
+    return H
+
+
+def calc_hamiltonian_coefficients(amp,fluxlutman,noise_parameters_CZ):
+    """
+    Returns the parameters (w_q0, w_q1, alpha_q0, alpha_q1, J) of
+    coupled_transmons_hamiltonian_new at amplitude amp (float or array).
+    All in terms of frequencies, i.e. without the 2*np.pi factor.
+    """
     w_q0=fluxlutman.calc_amp_to_freq(amp,'01')
     w_q0_sweetspot=fluxlutman.calc_amp_to_freq(0,'01')
     w_q1=fluxlutman.calc_amp_to_freq(amp,'10')
@@ -100,8 +113,7 @@ def calc_hamiltonian(amp,fluxlutman,noise_parameters_CZ):
     delta_q0=(w_q0)-w_bus
     J_temp = J / ((delta_q1+delta_q0_sweetspot)/(delta_q1*delta_q0_sweetspot)) * (delta_q1+delta_q0)/(delta_q1*delta_q0)
 
-    H=coupled_transmons_hamiltonian_new(w_q0=w_q0, w_q1=w_q1, alpha_q0=alpha_q0, alpha_q1=alpha_q1, J=J_temp)
-    return H
+    return w_q0, w_q1, alpha_q0, alpha_q1, J_temp
 
 
 def rotating_frame_transformation_propagator_new(U, t: float, H):
@@ -666,6 +678,41 @@ def time_evolution_new(c_ops, noise_parameters_CZ, fluxlutman,
 
     """
 
+    S, correction_to_H = basis_change_and_fluxbias_correction(
+        noise_parameters_CZ, fluxlutman, fluxbias_q1)
+
+    #t0 = time.time()
+
+    exp_L_total=1
+    for i in range(len(amp)):
+        H=calc_hamiltonian(amp[i],fluxlutman,noise_parameters_CZ) + correction_to_H
+        H=S.dag()*H*S
+        if c_ops != []:
+            c_ops_temp=[]
+            for c in range(len(c_ops)):
+                if isinstance(c_ops[c],list):
+                    c_ops_temp.append(c_ops[c][0]*c_ops[c][1][i])    # c_ops are already in the H_0 basis
+                else:
+                    c_ops_temp.append(c_ops[c])
+            liouville_exp_t=(qtp.liouvillian(H,c_ops_temp)*sim_step).expm()
+        else:
+            liouville_exp_t=(-1j*H*sim_step).expm()
+        exp_L_total=liouville_exp_t*exp_L_total
+
+    #t1 = time.time()
+    #print('\n alternative propagator',t1-t0)
+
+    U_final = exp_L_total    
+    return U_final
+
+
+def basis_change_and_fluxbias_correction(noise_parameters_CZ, fluxlutman,
+                                         fluxbias_q1):
+    """
+    Returns the change of basis S to the (dressed) computational basis and
+    the correction to the hamiltonian due to the fluxbias on the spectator
+    qubit q1, both as Qobj.
+    """
     H_0=calc_hamiltonian(0,fluxlutman,noise_parameters_CZ)   # computed at 0 amplitude
     # NOTE: parameters of H_0 could be not exactly e.g. the bare frequencies
 
@@ -692,31 +739,162 @@ def time_evolution_new(c_ops, noise_parameters_CZ, fluxlutman,
 
     correction_to_H = coupled_transmons_hamiltonian_new(w_q0=0, w_q1=np.real(w_q1_biased-w_q1), alpha_q0=0, alpha_q1=0, J=0)
 
+    return S, correction_to_H
 
-    #t0 = time.time()
 
-    exp_L_total=1
-    for i in range(len(amp)):
-        H=calc_hamiltonian(amp[i],fluxlutman,noise_parameters_CZ) + correction_to_H
-        H=S.dag()*H*S
-        if c_ops != []:
-            c_ops_temp=[]
-            for c in range(len(c_ops)):
-                if isinstance(c_ops[c],list):
-                    c_ops_temp.append(c_ops[c][0]*c_ops[c][1][i])    # c_ops are already in the H_0 basis
-                else:
-                    c_ops_temp.append(c_ops[c])
-            liouville_exp_t=(qtp.liouvillian(H,c_ops_temp)*sim_step).expm()
+##### NumPy propagator engine
+
+def time_evolution_numpy(c_ops, noise_parameters_CZ, fluxlutman,
+                         fluxbias_q1, amp, sim_step):
+    """
+    Calculates the propagator (either unitary or superoperator).
+    Same arguments and result as time_evolution_new, but the evolution is
+    computed with NumPy instead of QuTiP objects for every time step:
+        - the hamiltonian is a linear combination of fixed operators with
+          amplitude dependent coefficients, these are evaluated for all
+          time steps at once
+        - the exponential is computed only once for every unique
+          (amplitude, jump operator rates) combination, e.g. only once for
+          the flat top of a pulse or the single qubit rotations
+        - exponentials are computed for all unique steps at once, using an
+          eigendecomposition for unitaries and a batched Pade
+          approximation for the 81x81 Liouvillians
+
+    Returns
+        U_final(Qobj): propagator
+    """
+    S, correction_to_H = basis_change_and_fluxbias_correction(
+        noise_parameters_CZ, fluxlutman, fluxbias_q1)
+    S = S.full()
+    S_dag = S.conj().T
+    amp = np.asarray(amp, dtype=float)
+
+    # H(amp) = sum_k coeff_k(amp) * op_k, with the ops in the basis of S
+    w_q0, w_q1, alpha_q0, alpha_q1, J = calc_hamiltonian_coefficients(
+        amp, fluxlutman, noise_parameters_CZ)
+    ops = [n_q0, n_q1, 1/2*(a.dag()*a.dag()*a*a), 1/2*(b.dag()*b.dag()*b*b),
+           (a.dag() + a) * (b + b.dag())]
+    ops = np.array([S_dag.dot(op.full()).dot(S) for op in ops])*(2*np.pi)
+    coeffs = np.array([np.broadcast_to(c, amp.shape) for c in
+                       [w_q0, w_q1, alpha_q0, alpha_q1, J]]).T
+    H_const = S_dag.dot(correction_to_H.full()).dot(S)
+
+    # jump operators, the time dependent ones are scaled per time step
+    static_c_ops = []
+    dyn_c_ops = []
+    dyn_rates = []
+    for c in c_ops:
+        if isinstance(c, list):
+            dyn_c_ops.append(c[0].full())    # c_ops are already in the H_0 basis
+            dyn_rates.append(np.broadcast_to(c[1], amp.shape))
         else:
-            liouville_exp_t=(-1j*H*sim_step).expm()
-        exp_L_total=liouville_exp_t*exp_L_total
+            static_c_ops.append(c.full())
+
+    # only compute the exponentials of unique time steps
+    step_params = np.column_stack([coeffs] + [np.abs(r)**2 for r in dyn_rates])
+    unique_params, step_idx = np.unique(step_params, axis=0,
+                                        return_inverse=True)
+    step_idx = np.ravel(step_idx)
+    nr_coeffs = coeffs.shape[1]
+    H = np.einsum('nk,kij->nij', unique_params[:, :nr_coeffs], ops) + H_const
+
+    if len(c_ops) == 0:
+        # unitary evolution, H is hermitian
+        eigvals, eigvecs = np.linalg.eigh(H)
+        exps = np.einsum('nij,nj,nkj->nik', eigvecs,
+                         np.exp(-1j*eigvals*sim_step), eigvecs.conj())
+        dims = [[3, 3], [3, 3]]
+        qobj_kw = {'type': 'oper'}
+    else:
+        L = liouvillian_numpy(H, static_c_ops)
+        for k, c in enumerate(dyn_c_ops):
+            L += np.multiply.outer(unique_params[:, nr_coeffs+k],
+                                   lindblad_dissipator_numpy(c))
+        exps = expm_batched(L*sim_step)
+        dims = [[[3, 3], [3, 3]], [[3, 3], [3, 3]]]
+        qobj_kw = {'type': 'super', 'superrep': 'super'}
 
-    #t1 = time.time()
-    #print('\n alternative propagator',t1-t0)
+    U_final = np.eye(exps.shape[-1], dtype=complex)
+    for idx in step_idx:
+        U_final = exps[idx].dot(U_final)
+    return qtp.Qobj(U_final, dims=dims, **qobj_kw)
+
+
+def liouvillian_numpy(H, c_ops=[]):
+    """
+    Liouvillian superoperator of (a stack of) hamiltonians H with the
+    constant jump operators c_ops. Uses the same column stacking
+    convention as qutip.liouvillian.
+    """
+    H = np.asarray(H)
+    eye = np.eye(H.shape[-1])
+    L = -1j*(_kron_batched(eye, H) - _kron_batched(np.swapaxes(H, -1, -2), eye))
+    for c in c_ops:
+        L = L + lindblad_dissipator_numpy(c)
+    return L
+
+
+def lindblad_dissipator_numpy(c):
+    """
+    Lindblad dissipator superoperator of the jump operator c, using the
+    same column stacking convention as qutip.lindblad_dissipator.
+    """
+    c = np.asarray(c)
+    eye = np.eye(c.shape[-1])
+    cdc = c.conj().T.dot(c)
+    return np.kron(c.conj(), c) - 0.5*np.kron(eye, cdc) - 0.5*np.kron(cdc.T, eye)
+
+
+def _kron_batched(A, B):
+    """
+    Kronecker product of the last two axes of A and B, broadcasting over
+    the leading axes.
+    """
+    A = np.asarray(A)
+    B = np.asarray(B)
+    out = A[..., :, None, :, None] * B[..., None, :, None, :]
+    shape = out.shape[:-4] + (A.shape[-2]*B.shape[-2], A.shape[-1]*B.shape[-1])
+    return out.reshape(shape)
+
+
+# coefficients of the [13/13] Pade approximant (Higham 2005)
+_pade13_b = (64764752532480000., 32382376266240000., 7771770303897600.,
+             1187353796428800., 129060195264000., 10559470521600.,
+             670442572800., 33522128640., 1323241920., 40840800., 960960.,
+             16380., 182., 1.)
+_pade13_theta = 5.371920351148152
+
+
+def expm_batched(A):
+    """
+    Matrix exponential of a stack of matrices A with shape (n, d, d).
+
+    Uses the scaling and squaring algorithm with a [13/13] Pade
+    approximant, the same approach as scipy.linalg.expm. All matrices are
+    scaled by the same power of 2 so that the squaring can be done on the
+    whole stack at once.
+    """
+    A = np.asarray(A, dtype=complex)
+    if A.shape[0] == 0:
+        return A.copy()
+    norm = np.max(np.sum(np.abs(A), axis=-2))    # largest 1-norm
+    s = max(0, int(np.ceil(np.log2(norm/_pade13_theta)))) if norm > 0 else 0
+    A = A / 2**s
+
+    b = _pade13_b
+    ident = np.eye(A.shape[-1])
+    A2 = A @ A
+    A4 = A2 @ A2
+    A6 = A2 @ A4
+    U = A @ (A6 @ (b[13]*A6 + b[11]*A4 + b[9]*A2) +
+             b[7]*A6 + b[5]*A4 + b[3]*A2 + b[1]*ident)
+    V = A6 @ (b[12]*A6 + b[10]*A4 + b[8]*A2) + \
+        b[6]*A6 + b[4]*A4 + b[2]*A2 + b[0]*ident
+    R = np.linalg.solve(V - U, V + U)
+    for _ in range(s):
+        R = R @ R
+    return R
 
-    U_final = exp_L_total    
-    return U_final
-    
 
 def simulate_quantities_of_interest_superoperator_new(U, t_final, w_q0, w_q1):
     """
@@ -0,0 +1,231 @@
+import unittest
+from unittest import mock
+import pycqed as pq
+import os
+import shutil
+import tempfile
+import h5py
+import numpy as np
+from pycqed.analysis import analysis_toolbox as a_tools
+from pycqed.utilities import extraction_cache
+
+
+class Test_get_data_from_timestamp_list(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+        self.datadir = os.path.join(pq.__path__[0], 'tests', 'test_data')
+        a_tools.datadir = self.datadir
+        self.timestamps = a_tools.get_timestamps_in_range(
+            '20170607_000000', '20170607_235959', label='')
+        self.params_dict = {'T1': 'QL.T1',
+                            'sweep_points': 'sweep_points',
+                            'measured_values': 'measured_values',
+                            'value_names': 'value_names',
+                            'value_units': 'value_units',
+                            'measurementstring': 'measurementstring',
+                            'folder': 'folder',
+                            'I': 'I'}
+
+    def test_extract_data(self):
+        data = a_tools.get_data_from_timestamp_list(
+            self.timestamps, self.params_dict)
+        self.assertEqual(list(data.keys()),
+                         list(self.params_dict.keys()) + ['timestamps'])
+        self.assertEqual(data['timestamps'], self.timestamps)
+
+        for i, timestamp in enumerate(self.timestamps):
+            folder = a_tools.data_from_time(timestamp)
+            self.assertEqual(data['folder'][i], folder)
+            self.assertEqual(data['measurementstring'][i],
+                             os.path.split(folder)[1][7:])
+            with h5py.File(a_tools.measurement_filename(folder), 'r') as f:
+                self.assertEqual(
+                    data['T1'][i], f['Instrument settings']['QL'].attrs['T1'])
+                raw_data = f['Experimental Data']['Data'][()]
+                nr_values = len(f['Experimental Data'].attrs['value_names'])
+                value_units = [u.decode('utf-8') for u in
+                               f['Experimental Data'].attrs['value_units']]
+            np.testing.assert_array_equal(data['sweep_points'][i],
+                                          raw_data[:, 0])
+            np.testing.assert_array_equal(data['measured_values'][i],
+                                          raw_data[:, -nr_values:].T)
+            np.testing.assert_array_equal(data['I'][i],
+                                          raw_data[:, -nr_values])
+            self.assertEqual(len(data['value_names'][i]), nr_values)
+            self.assertEqual(data['value_units'][i], value_units)
+
+    def test_serial_by_default(self):
+        old_min_files = a_tools.min_files_parallel_extraction
+        a_tools.min_files_parallel_extraction = 0
+        try:
+            with mock.patch('multiprocessing.Pool') as pool:
+                a_tools.get_data_from_timestamp_list(
+                    self.timestamps, self.params_dict)
+        finally:
+            a_tools.min_files_parallel_extraction = old_min_files
+        pool.assert_not_called()
+
+    def test_parallel_extraction(self):
+        data = a_tools.get_data_from_timestamp_list(
+            self.timestamps, self.params_dict, n_workers=1)
+        old_min_files = a_tools.min_files_parallel_extraction
+        a_tools.min_files_parallel_extraction = 0
+        try:
+            data_parallel = a_tools.get_data_from_timestamp_list(
+                self.timestamps, self.params_dict, n_workers=2)
+        finally:
+            a_tools.min_files_parallel_extraction = old_min_files
+        self.assertEqual(data_parallel['timestamps'], data['timestamps'])
+        for key, vals in data.items():
+            for val, val_parallel in zip(vals, data_parallel[key]):
+                np.testing.assert_array_equal(val_parallel, val)
+
+    def test_numeric_params_and_filtering(self):
+        timestamps = self.timestamps[:3] + ['20170607_000001']
+        data = a_tools.get_data_from_timestamp_list(
+            timestamps, {'T1': 'QL.T1'}, numeric_params=['T1'])
+        self.assertEqual(data['timestamps'], self.timestamps[:3])
+        np.testing.assert_array_almost_equal(
+            data['T1'], [3.50787948422e-05, 3.57627288941e-05,
+                         3.50787948422e-05])
+        self.assertEqual(data['T1'].dtype, np.float64)
+
+    def test_single_timestamp(self):
+        data = a_tools.get_data_from_timestamp_list(
+            self.timestamps[1], {'T1': 'QL.T1', 'name': 'measurementstring'})
+        self.assertEqual(data['T1'], '3.57627288941e-05')
+        self.assertEqual(data['name'], 'T1_QL')
+        self.assertEqual(data['timestamps'], [self.timestamps[1]])
+
+
+class Test_extraction_cache(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.old_cache_path = extraction_cache.cache_path
+        extraction_cache.cache_path = os.path.join(self.tmpdir, 'cache.sqlite')
+        # copy of the test data such that files can be modified
+        self.datadir = os.path.join(self.tmpdir, 'data')
+        shutil.copytree(os.path.join(pq.__path__[0], 'tests', 'test_data',
+                                     '20170607'),
+                        os.path.join(self.datadir, '20170607'))
+        self.old_datadir = a_tools.datadir
+        a_tools.datadir = self.datadir
+        self.timestamps = a_tools.get_timestamps_in_range(
+            '20170607_000000', '20170607_235959', label='')
+        self.params_dict = {'T1': 'QL.T1',
+                            'sweep_points': 'sweep_points',
+                            'measurementstring': 'measurementstring'}
+
+    @classmethod
+    def tearDownClass(self):
+        a_tools.datadir = self.old_datadir
+        extraction_cache.get_extraction_cache().close()
+        extraction_cache._cache = None
+        extraction_cache.cache_path = self.old_cache_path
+        shutil.rmtree(self.tmpdir)
+
+    def setUp(self):
+        extraction_cache.get_extraction_cache().clear()
+        self.extracted_timestamps = []
+        self._extract_data_from_folder = a_tools._extract_data_from_folder
+
+        def counting_extract(args):
+            self.extracted_timestamps.append(args[0])
+            return self._extract_data_from_folder(args)
+        a_tools._extract_data_from_folder = counting_extract
+
+    def tearDown(self):
+        a_tools._extract_data_from_folder = self._extract_data_from_folder
+
+    def test_second_run_from_cache(self):
+        data = a_tools.get_data_from_timestamp_list(
+            self.timestamps, self.params_dict, use_cache=True)
+        self.assertEqual(self.extracted_timestamps, self.timestamps)
+
+        self.extracted_timestamps.clear()
+        data_cached = a_tools.get_data_from_timestamp_list(
+            self.timestamps, self.params_dict, use_cache=True)
+        self.assertEqual(self.extracted_timestamps, [])
+        self.assertEqual(list(data_cached.keys()), list(data.keys()))
+        for key, vals in data.items():
+            for val, val_cached in zip(vals, data_cached[key]):
+                np.testing.assert_array_equal(val_cached, val)
+
+        # only the new parameter is extracted
+        self.extracted_timestamps.clear()
+        data = a_tools.get_data_from_timestamp_list(
+            self.timestamps[:2], {'T1': 'QL.T1', 'names': 'value_names'},
+            use_cache=True)
+        self.assertEqual(self.extracted_timestamps, self.timestamps[:2])
+        self.assertEqual(data['T1'], data_cached['T1'][:2])
+
+    def test_changed_file_is_extracted(self):
+        a_tools.get_data_from_timestamp_list(
+            self.timestamps, self.params_dict, use_cache=True)
+        filepath = a_tools.measurement_filename(
+            a_tools.data_from_time(self.timestamps[1]))
+        with h5py.File(filepath, 'r+') as f:
+            f['Instrument settings']['QL'].attrs['T1'] = '1e-05'
+
+        self.extracted_timestamps.clear()
+        data = a_tools.get_data_from_timestamp_list(
+            self.timestamps, self.params_dict, use_cache=True)
+        self.assertEqual(self.extracted_timestamps, [self.timestamps[1]])
+        self.assertEqual(data['T1'][1], '1e-05')
+
+    def test_filter_no_analysis(self):
+        data = a_tools.get_data_from_timestamp_list(
+            self.timestamps, self.params_dict, use_cache=True,
+            filter_no_analysis=True)
+        self.extracted_timestamps.clear()
+        data_cached = a_tools.get_data_from_timestamp_list(
+            self.timestamps, self.params_dict, use_cache=True,
+            filter_no_analysis=True)
+        self.assertEqual(self.extracted_timestamps, [])
+        self.assertEqual(data_cached['timestamps'], data['timestamps'])
+
+    def test_cache_not_in_datadir(self):
+        cache = extraction_cache.get_extraction_cache()
+        self.assertEqual(cache.path, os.path.join(self.tmpdir, 'cache.sqlite'))
+        self.assertTrue(os.path.isfile(cache.path))
+        self.assertFalse(os.path.exists(
+            os.path.join(self.datadir, '.extraction_cache')))
+        # the default location is private to the user
+        self.assertEqual(
+            os.path.dirname(self.old_cache_path),
+            os.path.join(os.path.expanduser('~'), '.pycqed'))
+        if os.name == 'posix':
+            cache = extraction_cache.ExtractionCache(
+                os.path.join(self.tmpdir, 'private', 'cache.sqlite'))
+            cache.close()
+            mode = os.stat(os.path.join(self.tmpdir, 'private')).st_mode
+            self.assertEqual(mode & 0o077, 0)
+
+    def test_lru_eviction(self):
+        cache = extraction_cache.ExtractionCache(
+            os.path.join(self.tmpdir, 'small_cache.sqlite'),
+            max_size=50000, max_entry_size=20000)
+        for i in range(10):
+            cache.put(('file_{}'.format(i), 0, 0),
+                      {'small': i, 'array': np.zeros(1000)})
+            # file_0 is used most recently
+            self.assertEqual(
+                cache.get(('file_0', 0, 0), ['small', 'array'])['small'], 0)
+            # the running total matches the size of the table
+            self.assertEqual(cache._total_size, cache.size())
+        self.assertLessEqual(cache.size(), 50000)
+        self.assertIn('array', cache.get(('file_0', 0, 0), ['array']))
+        self.assertEqual(cache.get(('file_1', 0, 0), ['small', 'array']), {})
+        # large values are not cached
+        cache.put(('file_0', 0, 0), {'large': np.zeros(10000)})
+        self.assertEqual(cache.get(('file_0', 0, 0), ['large']), {})
+        # a new version of a file replaces the old entries
+        cache.put(('file_0', 1, 0), {'small': 1})
+        self.assertEqual(cache.get(('file_0', 0, 0), ['small']), {})
+        self.assertEqual(cache._total_size, cache.size())
+        cache.clear()
+        self.assertEqual(cache._total_size, 0)
+        cache.close()
@@ -0,0 +1,118 @@
+import unittest
+import os
+import shutil
+import tempfile
+import h5py
+import numpy as np
+from pycqed.analysis import measurement_analysis as ma
+from pycqed.analysis_v2 import randomized_benchmarking_analysis as rba
+from pycqed.measurement import hdf5_data as h5d
+
+
+def write_test_file(folder, data, chunks=None, nr_sweep_pars=1):
+    """
+    Writes data in the Version 2 datasaving format. Names are stored as
+    fixed length strings as in files written with h5py 2.
+    """
+    os.makedirs(folder)
+    filepath = os.path.join(folder, os.path.split(folder)[1] + '.hdf5')
+    nr_values = data.shape[1] - nr_sweep_pars
+    with h5py.File(filepath, 'w') as f:
+        g = f.create_group('Experimental Data')
+        g.create_dataset('Data', data=data, chunks=chunks)
+        g.attrs['datasaving_format'] = h5d.encode_to_utf8('Version 2')
+        g.attrs['sweep_parameter_names'] = np.array(h5d.encode_to_utf8(
+            ['x{}'.format(i) for i in range(nr_sweep_pars)]))
+        g.attrs['sweep_parameter_units'] = np.array(h5d.encode_to_utf8(
+            ['s']*nr_sweep_pars))
+        g.attrs['value_names'] = np.array(h5d.encode_to_utf8(
+            ['ch{}'.format(i) for i in range(nr_values)]))
+        g.attrs['value_units'] = np.array(h5d.encode_to_utf8(['V']*nr_values))
+    return filepath
+
+
+class Test_LazyDataView(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.data = np.random.RandomState(0).rand(10000, 5)
+        self.folders = {}
+        for layout, chunks in [('contiguous', None), ('chunked', (100, 5))]:
+            folder = os.path.join(self.tmpdir, '20180101',
+                                  '120000_{}'.format(layout))
+            write_test_file(folder, self.data, chunks=chunks,
+                            nr_sweep_pars=2)
+            self.folders[layout] = folder
+
+    @classmethod
+    def tearDownClass(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_memory_map(self):
+        for layout, folder in self.folders.items():
+            a = ma.MeasurementAnalysis(folder=folder, auto=False,
+                                       lazy_data=True)
+            a.get_naming_and_values()
+            self.assertIsInstance(a.data, h5d.LazyDataView)
+            self.assertEqual(a.data._mmap is not None,
+                             layout == 'contiguous')
+            a.finish()
+
+    def test_lazy_naming_and_values(self):
+        for folder in self.folders.values():
+            a = ma.MeasurementAnalysis(folder=folder, auto=False,
+                                       lazy_data=True)
+            a.get_naming_and_values()
+            self.assertEqual(a.measured_values.shape, (3, 10000))
+            self.assertEqual(len(a.measured_values), 3)
+            np.testing.assert_array_equal(a.sweep_points[0],
+                                          self.data[:, 0])
+            np.testing.assert_array_equal(np.asarray(a.sweep_points),
+                                          self.data[:, :2].T)
+            for i, vals in enumerate(a.measured_values):
+                np.testing.assert_array_equal(vals, self.data[:, 2+i])
+            np.testing.assert_array_equal(a.measured_values[1, 10:20],
+                                          self.data[10:20, 3])
+            np.testing.assert_array_equal(a.measured_values[1:, 5:7],
+                                          self.data[5:7, 3:].T)
+            np.testing.assert_array_equal(a.data[-1], self.data[:, -1])
+            # returned columns are copies
+            vals = a.measured_values[0]
+            vals[:] = 0
+            np.testing.assert_array_equal(a.measured_values[0],
+                                          self.data[:, 2])
+            a.finish()
+
+    def test_iter_blocks(self):
+        for folder in self.folders.values():
+            a = ma.MeasurementAnalysis(folder=folder, auto=False,
+                                       lazy_data=True)
+            a.get_naming_and_values()
+            blocks = list(a.measured_values[::2].iter_blocks(block_size=3000))
+            self.assertEqual([start for start, _ in blocks],
+                             [0, 3000, 6000, 9000])
+            np.testing.assert_array_equal(
+                np.concatenate([block for _, block in blocks], axis=1),
+                self.data[:, 2::2].T)
+            a.finish()
+
+    def test_binned_shots(self):
+        nr_bins = 20
+        data = np.random.RandomState(1).rand(nr_bins*50, 3)
+        # invalid acquisitions
+        data[[3, 20, 500], 1:] = 0
+        folder = os.path.join(self.tmpdir, '20180102', '120000_RB')
+        write_test_file(folder, data, chunks=(64, 3))
+        a = ma.MeasurementAnalysis(folder=folder, auto=False, lazy_data=True)
+        a.get_naming_and_values()
+        binned = dict(rba.binned_shots(a, nr_bins=nr_bins,
+                                       nr_channels_checked=2))
+        a.finish()
+
+        expected_vals = data[:, 1:].T.copy()
+        expected_vals[:, [3, 20, 500]] = np.nan
+        for i, val_name in enumerate(['ch0', 'ch1']):
+            np.testing.assert_array_equal(
+                binned[val_name],
+                np.reshape(expected_vals[i], (nr_bins, -1), order='F'))
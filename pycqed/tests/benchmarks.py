@@ -0,0 +1,353 @@
+"""
+Benchmarks of the optimized functions against their reference
+implementations. The reference implementations are defined in the test
+modules, where they are used to check that the optimized functions give
+the same results.
+
+These are not collected by the test suite, run this file as a script from
+the tests directory:
+    python benchmarks.py
+"""
+import os
+import time
+import types
+import timeit
+import tempfile
+import h5py
+import numpy as np
+
+import pycqed as pq
+import pycqed.measurement.kernel_functions_ZI as ZI_kf
+from pycqed.measurement import hdf5_data as h5d
+from pycqed.measurement.waveform_control_CC import qasm_compiler as qcx
+from pycqed.measurement.waveform_control_CC import waveforms_flux as wfl
+from pycqed.simulations import chevron_sim as chs
+import pycqed.measurement.detector_functions as det
+from pycqed.instrument_drivers.physical_instruments.ZurichInstruments.\
+    dummy_UHFQC import dummy_UHFQC
+
+import test_kernel_distortions_ZI as zi_ref
+import test_flux_lutman
+import test_waveforms_flux as wfl_ref
+import test_chevron_sim as chevron_ref
+from test_qasm_compiler_XFU import write_repeated_qasm_program
+
+
+def benchmark_hw_friendly_filters(nr_samples=int(40e-6*2.4e9), repeats=1):
+    """
+    Compares the execution time of the loop based reference filters with
+    the vectorized filters in kernel_functions_ZI.
+
+    Returns:
+        timings (dict): {filter name: (t_loop, t_vectorized)} in seconds.
+    """
+    sig = np.random.RandomState(0).randn(nr_samples)
+    cases = {
+        'multipath_bias_tee': (
+            zi_ref.multipath_bias_tee_loop, ZI_kf.multipath_bias_tee,
+            dict(k=1e4, paths=8)),
+        'multipath_filter': (
+            zi_ref.multipath_filter_loop, ZI_kf.multipath_filter,
+            dict(alpha=1e-3, k=0.1, paths=8)),
+        'multipath_filter2': (
+            zi_ref.multipath_filter2_loop, ZI_kf.multipath_filter2,
+            dict(alpha=1e-3, k=0.1, paths=8, ppl=2)),
+        'first_order_bounce_corr': (
+            zi_ref.first_order_bounce_corr_loop,
+            ZI_kf.first_order_bounce_corr,
+            dict(delay=10e-9, amp=0.1, awg_sample_rate=2.4e9)),
+    }
+    timings = {}
+    for name, (f_loop, f_vec, kw) in cases.items():
+        t_loop = timeit.timeit(lambda: f_loop(sig, **kw), number=repeats)
+        t_vec = timeit.timeit(lambda: f_vec(sig, **kw), number=repeats)
+        timings[name] = (t_loop/repeats, t_vec/repeats)
+    return timings
+
+
+def benchmark_storage_layouts(nr_rows=2**20, nr_values=4,
+                              block_size=4096, datadir=None):
+    """
+    Compares the storage layouts of the "Data" dataset of MC for single-shot
+    like data (integer ADC values, one sweep column).
+
+    The data is written in blocks of block_size rows as in a hard sweep.
+
+    Returns:
+        results (dict): {layout name: {'write (MB/s)', 'read channel (s)',
+            'file size (MB)'}}
+    """
+    layouts = {
+        'rows': dict(layout='rows'),
+        'columns': dict(layout='columns'),
+        'columns, lzf': dict(layout='columns', compression='lzf'),
+        'columns, gzip': dict(layout='columns', compression='gzip'),
+        'columns, lzf, float32': dict(layout='columns', compression='lzf',
+                                      dtype='float32'),
+    }
+    rng = np.random.RandomState(0)
+    data = np.empty((nr_rows, 1+nr_values))
+    data[:, 0] = np.arange(nr_rows)
+    data[:, 1:] = np.round(rng.randn(nr_rows, nr_values)*200)
+
+    results = {}
+    with tempfile.TemporaryDirectory(dir=datadir) as tmpdir:
+        for name, kw in layouts.items():
+            filepath = os.path.join(tmpdir, name + '.hdf5')
+            t0 = time.perf_counter()
+            with h5py.File(filepath, 'w') as f:
+                dset = h5d.create_data_dataset(
+                    f, nr_cols=data.shape[1], expected_nr_rows=nr_rows, **kw)
+                for start in range(0, nr_rows, block_size):
+                    stop = min(start+block_size, nr_rows)
+                    dset.resize((stop, data.shape[1]))
+                    dset[start:stop] = data[start:stop]
+            t_write = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            with h5py.File(filepath, 'r') as f:
+                channel = f['Data'][:, 2]
+            t_read = time.perf_counter() - t0
+            np.testing.assert_array_equal(channel, data[:, 2])
+            results[name] = {
+                'write (MB/s)': data.nbytes/2**20/t_write,
+                'read channel (s)': t_read,
+                'file size (MB)': os.path.getsize(filepath)/2**20}
+    return results
+
+
+def benchmark_qasm_compiler(nr_repetitions=(10, 40, 160, 640)):
+    """
+    Compiles programs of increasing length (dev_test.qasm of the test
+    files repeated) to show the scaling of the compile time with the length
+    of the program.
+
+    Returns:
+        timings (list): (nr of QASM lines, nr of QuMIS instructions,
+            compile time in s) for every number of repetitions.
+    """
+    test_file_dir = os.path.join(pq.__path__[0], 'tests', 'qasm_files')
+    timings = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for n in nr_repetitions:
+            qasm_fn = write_repeated_qasm_program(
+                os.path.join(test_file_dir, 'dev_test.qasm'), n, tmpdir)
+            with open(qasm_fn) as f:
+                nr_lines = len(f.readlines())
+            compiler = qcx.QASM_QuMIS_Compiler(
+                os.path.join(test_file_dir, 'config.json'),
+                verbosity_level=0)
+            t0 = time.perf_counter()
+            compiler.compile(qasm_fn, os.path.join(tmpdir, 'program.qumis'))
+            timings.append((nr_lines, len(compiler.qumis_instructions),
+                            time.perf_counter()-t0))
+    return timings
+
+
+class FakeDAQServer(object):
+    """
+    Stands in for the ziDAQServer of the UHFQC driver, every poll returns
+    the data of all acquisition paths as vectors.
+    """
+
+    def __init__(self, dataset: dict):
+        self.dataset = dataset
+
+    def poll(self, *args, **kw):
+        return self.dataset
+
+
+def acquisition_poll_concatenate(UHFQC, samples, acquisition_time=0.010):
+    """
+    UHFQC.acquisition_poll as it was before acquisition_poll_array,
+    concatenating every polled vector to the data of its channel.
+    """
+    data = {k: [] for k, dummy in enumerate(UHFQC.acquisition_paths)}
+    gotem = [False]*len(UHFQC.acquisition_paths)
+    accumulated_time = 0
+    while accumulated_time < UHFQC.timeout() and not all(gotem):
+        dataset = UHFQC._daq.poll(acquisition_time, 1, 4, True)
+        for n, p in enumerate(UHFQC.acquisition_paths):
+            if p in dataset:
+                for v in dataset[p]:
+                    data[n] = np.concatenate((data[n], v['vector']))
+                    if len(data[n]) >= samples:
+                        gotem[n] = True
+        accumulated_time += acquisition_time
+    return data
+
+
+def benchmark_UHFQC_acquisition(nr_shots=4094, nr_channels=9,
+                                vector_length=256, repetitions=20):
+    """
+    Compares the time of polling and processing the data of the UHFQC
+    integration logging detector as it was done before (concatenating
+    the polled vectors and processing via a dict) with the detector using
+    UHFQC.acquisition_poll_array of the UHFQC driver.
+
+    The driver polls a FakeDAQServer that returns vectors of vector_length
+    samples per channel, as the UHFQC does. The other methods of the driver
+    are those of the dummy_UHFQC. N.B. the dummy_UHFQC only has offsets for
+    the linear transformation of 5 channels.
+
+    Returns:
+        timings (dict): {(logging mode, nr of channels): (t_old, t_new)}
+            in seconds.
+    """
+    # imported here as the UHFQC driver requires zhinst
+    from pycqed.instrument_drivers.physical_instruments.ZurichInstruments \
+        import UHFQuantumController as ZI_UHFQC
+
+    UHFQC = dummy_UHFQC('UHFQC_benchmark')
+    timings = {}
+    try:
+        UHFQC.acquisition_poll_array = types.MethodType(
+            ZI_UHFQC.UHFQC.acquisition_poll_array, UHFQC)
+        UHFQC.timeout(10)
+        for i in range(5):
+            UHFQC.set('quex_trans_offset_weightfunction_{}'.format(i), 0.1)
+
+        for mode, channels in [('raw', list(range(nr_channels))),
+                               ('lin_trans', list(range(5)))]:
+            d = det.UHFQC_integration_logging_det(
+                UHFQC=UHFQC, channels=channels, nr_shots=nr_shots,
+                result_logging_mode=mode)
+            d.prepare(sweep_points=None)
+            UHFQC.acquisition_paths = [
+                '/dev0/quex/rl/data/{}'.format(c) for c in channels]
+            UHFQC._daq = FakeDAQServer({
+                p: [{'vector': v} for v in np.array_split(
+                    np.random.rand(nr_shots),
+                    int(np.ceil(nr_shots/vector_length)))]
+                for p in UHFQC.acquisition_paths})
+
+            t0 = time.perf_counter()
+            for i in range(repetitions):
+                data_raw = acquisition_poll_concatenate(UHFQC, nr_shots)
+                data = np.array([data_raw[key] for key in sorted(
+                    data_raw.keys())])*d.scaling_factor
+                if mode == 'lin_trans':
+                    for i, channel in enumerate(channels):
+                        data[i] = data[i]-UHFQC.get(
+                            'quex_trans_offset_weightfunction_{}'.format(
+                                channel))
+            t_old = (time.perf_counter()-t0)/repetitions
+
+            t0 = time.perf_counter()
+            for i in range(repetitions):
+                new_data = d.transfer()
+            t_new = (time.perf_counter()-t0)/repetitions
+            np.testing.assert_array_almost_equal(new_data, data)
+            timings[(mode, len(channels))] = (t_old, t_new)
+    finally:
+        UHFQC.close()
+    return timings
+
+
+def benchmark_cz_generation(repeats=3):
+    """
+    Compares the time to generate the CZ waveform using the vectorized
+    amplitude conversions of the flux lutman with solving the roots for
+    every sample. The flux lutman is configured as in test_flux_lutman.
+
+    Returns:
+        timings (dict): {'roots': t, 'vectorized': t} in seconds.
+    """
+    tests = test_flux_lutman.TestFluxLutMan()
+    tests.setup_class()
+    try:
+        tests.setup_method(None)
+        fluxlutman = tests.fluxlutman
+        fluxlutman.czd_double_sided(True)
+        t_vec = timeit.timeit(fluxlutman._gen_cz, number=repeats)
+        fluxlutman.calc_eps_to_amp = \
+            lambda eps, **kw: test_flux_lutman.calc_eps_to_amp_roots(
+                fluxlutman, eps, **kw)
+        t_roots = timeit.timeit(fluxlutman._gen_cz, number=repeats)
+    finally:
+        tests.teardown_class()
+    return {'roots': t_roots/repeats, 'vectorized': t_vec/repeats}
+
+
+def benchmark_martinis_flux_pulse(length=1e-6, nr_pulses=200):
+    """
+    Compares the time to generate a single pulse with the O(n^2) reference,
+    and the time to generate nr_pulses pulses (a sweep of theta_f) one by
+    one and in a single batch.
+
+    Returns:
+        timings (dict): times in seconds.
+    """
+    theta_i = wfl.eps_to_theta(800e6, 25e6)
+    theta_fs = np.deg2rad(np.linspace(40, 140, nr_pulses))
+    timings = {}
+
+    t0 = time.perf_counter()
+    wfl_ref.martinis_flux_pulse_reference(length, theta_i, theta_fs[0], 0.1)
+    timings['reference'] = time.perf_counter()-t0
+
+    t0 = time.perf_counter()
+    wfl.martinis_flux_pulse(length, theta_i, theta_fs[0], 0.1)
+    timings['single'] = time.perf_counter()-t0
+
+    t0 = time.perf_counter()
+    for theta_f in theta_fs:
+        wfl.martinis_flux_pulse(length, theta_i, theta_f, 0.1)
+    timings['loop'] = time.perf_counter()-t0
+
+    t0 = time.perf_counter()
+    wfl.martinis_flux_pulse_batch(length, theta_i, theta_fs, 0.1)
+    timings['batch'] = time.perf_counter()-t0
+    return timings
+
+
+def benchmark_chevron(n=201, nr_time_steps=500):
+    """
+    Compares the time to simulate an n x nr_time_steps chevron with the
+    reference implementation.
+
+    Returns:
+        timings (dict): times in seconds.
+    """
+    e0 = 2.*np.pi*(6.552 - 4.8)
+    g = np.pi*0.0385
+    def sf(t): return 1 - np.exp(-t/50)
+    args = (e0, -0.0322, 0.0322, n, g, float(nr_time_steps), 1., sf)
+
+    timings = {}
+    t0 = time.perf_counter()
+    expected = chevron_ref.chevron_reference(*args)
+    timings['reference'] = time.perf_counter()-t0
+    t0 = time.perf_counter()
+    result = chs.chevron(*args)
+    timings['vectorized'] = time.perf_counter()-t0
+    np.testing.assert_allclose(result, expected, atol=1e-8)
+    return timings
+
+
+if __name__ == '__main__':
+    for name, (t_loop, t_vec) in benchmark_hw_friendly_filters().items():
+        print('{}: loop {:.3f} s, vectorized {:.4f} s'.format(
+            name, t_loop, t_vec))
+
+    for name, result in benchmark_storage_layouts().items():
+        print('{}: {}'.format(name, ', '.join(
+            '{} {:.3g}'.format(k, v) for k, v in result.items())))
+
+    for nr_lines, nr_instr, t in benchmark_qasm_compiler():
+        print('QASM compiler: {} lines, {} QuMIS instructions, '
+              '{:.3f} s'.format(nr_lines, nr_instr, t))
+
+    for (mode, nr_ch), (t_old, t_new) in benchmark_UHFQC_acquisition().items():
+        print('UHFQC {} logging, {} channels: {:.2f} ms -> {:.2f} ms'.format(
+            mode, nr_ch, t_old*1e3, t_new*1e3))
+
+    timings = benchmark_cz_generation()
+    print('CZ waveform: roots {:.1f} ms, vectorized {:.1f} ms'.format(
+        timings['roots']*1e3, timings['vectorized']*1e3))
+
+    for key, t in benchmark_martinis_flux_pulse().items():
+        print('Martinis flux pulse, {}: {:.2f} ms'.format(key, t*1e3))
+
+    for key, t in benchmark_chevron().items():
+        print('Chevron, {}: {:.3f} s'.format(key, t))
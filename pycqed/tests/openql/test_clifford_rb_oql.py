@@ -24,3 +24,15 @@ class Test_cliff_rb_oql(unittest.TestCase):
                                            nr_cliffords=[1, 5], nr_seeds=1,
                                            cal_points=False)
         self.assertEqual(p.name, 'randomized_benchmarking')
+
+    def test_simultaneous_single_qubit_rb_seq(self):
+        p = rb_oql.randomized_benchmarking(
+            [2, 0], platf_cfg=config_fn, nr_cliffords=[1, 5], nr_seeds=2,
+            simultaneous_single_qubit_RB=True, cal_points=False)
+        self.assertEqual(p.name, 'randomized_benchmarking')
+
+    def test_simultaneous_single_qubit_rb_seq_seeded(self):
+        p = rb_oql.randomized_benchmarking(
+            [2, 0], platf_cfg=config_fn, nr_cliffords=[1, 5], nr_seeds=2,
+            simultaneous_single_qubit_RB=True, cal_points=False, seed=42)
+        self.assertEqual(p.name, 'randomized_benchmarking')
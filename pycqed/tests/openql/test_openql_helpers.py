@@ -1,5 +1,9 @@
 import unittest
 import os
+import shutil
+import tempfile
+import time
+import numpy as np
 import pycqed as pq
 import pycqed.measurement.openql_experiments.openql_helpers as oqh
 import openql.openql as ql
@@ -161,3 +165,129 @@ class Test_openql_calibration_point_helpers(unittest.TestCase):
     @unittest.skip('Test not implemented')
     def test_add_multi_q_cal_points(self):
         raise NotImplementedError()
+
+
+def write_test_program(platf_cfg: str, program_name: str, amps,
+                       recompile=True):
+    """
+    Stands in for an OpenQL program generator in the program cache tests,
+    writes the arguments and a random number to the output file.
+    """
+    filename = os.path.join(ql.get_option('output_dir'),
+                            program_name + '.qisa')
+    with open(filename, 'w') as f:
+        f.write('{} {}'.format(list(amps), np.random.rand()))
+    return oqh.CompiledProgram(program_name, filename)
+
+
+def slow_test_program(platf_cfg: str, program_name: str, amps,
+                      recompile=True):
+    """
+    write_test_program that takes a while to compile.
+    """
+    time.sleep(0.2)
+    return write_test_program(platf_cfg, program_name, amps, recompile)
+
+
+class Test_openql_program_cache(unittest.TestCase):
+
+    def setUp(self):
+        self.config_fn = os.path.join(os.path.dirname(__file__),
+                                      'test_cfg_CCL.json')
+        self.old_output_dir = ql.get_option('output_dir')
+        self.old_cache_dir = oqh.program_cache_dir
+        self.tmp_dir = tempfile.mkdtemp()
+        ql.set_option('output_dir', self.tmp_dir)
+        oqh.program_cache_dir = os.path.join(self.tmp_dir, 'program_cache')
+
+    def tearDown(self):
+        ql.set_option('output_dir', self.old_output_dir)
+        oqh.program_cache_dir = self.old_cache_dir
+        shutil.rmtree(self.tmp_dir)
+
+    def read_program(self, program):
+        with open(program.filename) as f:
+            return f.read()
+
+    def test_program_hash(self):
+        h = oqh.program_hash(write_test_program, platf_cfg=self.config_fn,
+                             program_name='a', amps=np.arange(3))
+        self.assertEqual(h, oqh.program_hash(
+            write_test_program, platf_cfg=self.config_fn,
+            program_name='b', amps=[0, 1, 2], recompile=False))
+        self.assertNotEqual(h, oqh.program_hash(
+            write_test_program, platf_cfg=self.config_fn,
+            program_name='a', amps=np.arange(4)))
+
+    def test_compile_cached(self):
+        p0 = oqh.compile_cached(write_test_program, platf_cfg=self.config_fn,
+                                program_name='cache_test_0', amps=[1, 2])
+        # identical program with a different name is taken from the cache
+        p1 = oqh.compile_cached(write_test_program, platf_cfg=self.config_fn,
+                                program_name='cache_test_1', amps=[1, 2])
+        self.assertEqual(p1.name, 'cache_test_1')
+        self.assertEqual(self.read_program(p0), self.read_program(p1))
+        p2 = oqh.compile_cached(write_test_program, platf_cfg=self.config_fn,
+                                program_name='cache_test_1', amps=[1, 2],
+                                recompile=True)
+        self.assertNotEqual(self.read_program(p0), self.read_program(p2))
+        p3 = oqh.compile_cached(write_test_program, platf_cfg=self.config_fn,
+                                program_name='cache_test_3', amps=[1, 3])
+        self.assertNotEqual(self.read_program(p2), self.read_program(p3))
+
+        oqh.clear_program_cache()
+        with self.assertRaises(ValueError):
+            oqh.compile_cached(write_test_program, platf_cfg=self.config_fn,
+                               program_name='cache_test_1', amps=[1, 2],
+                               recompile=False)
+
+    def test_compile_programs(self):
+        cached = oqh.compile_cached(
+            write_test_program, platf_cfg=self.config_fn,
+            program_name='parallel_test_0', amps=[0])
+        kw_list = [dict(platf_cfg=self.config_fn,
+                        program_name='parallel_test_{}'.format(i),
+                        amps=[i]) for i in range(8)]
+        programs = oqh.compile_programs(write_test_program, kw_list,
+                                        processes=2)
+        self.addCleanup(programs.close)
+        self.assertTrue(programs[0].done())
+        self.assertEqual(self.read_program(programs[0]),
+                         self.read_program(cached))
+        for i, p in enumerate(programs):
+            self.assertEqual(p.name, 'parallel_test_{}'.format(i))
+            self.assertTrue(self.read_program(p).startswith(
+                '[{}]'.format(i)))
+        # all programs are now cached
+        programs.close()
+        self.assertIsNone(programs.executor)
+        programs_2 = oqh.compile_programs(write_test_program, kw_list)
+        self.assertIsNone(programs_2.executor)
+        for p, p2 in zip(programs, programs_2):
+            self.assertTrue(p2.done())
+            self.assertEqual(self.read_program(p), self.read_program(p2))
+
+    def test_compile_programs_cache_dir(self):
+        # the worker processes use the cache dir of the calling process,
+        # also if they do not inherit its globals
+        worker_cache_dir = os.path.join(self.tmp_dir, 'worker_cache')
+        oqh._compile_cached_worker(
+            self.tmp_dir, worker_cache_dir, write_test_program,
+            dict(platf_cfg=self.config_fn, program_name='worker_test',
+                 amps=[5]))
+        self.assertTrue(os.path.exists(os.path.join(
+            worker_cache_dir, oqh.program_hash(
+                write_test_program, platf_cfg=self.config_fn,
+                amps=[5]) + '.qisa')))
+
+    def test_compile_programs_cancel(self):
+        kw_list = [dict(platf_cfg=self.config_fn,
+                        program_name='cancel_test_{}'.format(i),
+                        amps=[i]) for i in range(8)]
+        with self.assertRaises(RuntimeError):
+            with oqh.compile_programs(slow_test_program, kw_list,
+                                      processes=1) as programs:
+                raise RuntimeError('measurement failed')
+        self.assertIsNone(programs.executor)
+        self.assertTrue(programs.done())
+        self.assertTrue(any(p.future.cancelled() for p in programs))
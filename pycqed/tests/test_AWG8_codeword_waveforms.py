@@ -0,0 +1,103 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+
+import pycqed.instrument_drivers.virtual_instruments.virtual_AWG8 as v8
+
+
+class Test_AWG8_codeword_waveforms(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+        self.tmpdir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.tmpdir, 'awg', 'waves'))
+        self.AWG = v8.VirtualAWG8('DummyAWG8_csv',
+                                  lab_one_webserver_path=self.tmpdir)
+
+    @classmethod
+    def tearDownClass(self):
+        self.AWG.close()
+        shutil.rmtree(self.tmpdir)
+
+    def setUp(self):
+        self.AWG.clear_waveform_cache()
+        self.uploaded_awgs = []
+
+        def upload_codeword_program(awgs=np.arange(4)):
+            self.uploaded_awgs.append(list(awgs))
+        self.AWG.upload_codeword_program = upload_codeword_program
+
+    def tearDown(self):
+        del self.AWG.upload_codeword_program
+
+    def test_identical_waveform_skipped(self):
+        wf = np.linspace(0, 1, 16)
+        fn = self.AWG._waveform_filename('wave_ch1_cw001')
+        changed = self.AWG.set_waveforms({'wave_ch1_cw001': wf})
+        self.assertEqual(changed, ['wave_ch1_cw001'])
+        # marks the file so that a rewrite can be detected
+        os.utime(fn, ns=(0, 0))
+
+        changed = self.AWG.set_waveforms({'wave_ch1_cw001': wf.copy()})
+        self.assertEqual(changed, [])
+        self.AWG.wave_ch1_cw001(wf)
+        # the file is not rewritten
+        self.assertEqual(os.stat(fn).st_mtime_ns, 0)
+
+    def test_changed_waveform_rewritten(self):
+        wf = np.linspace(0, 1, 16)
+        self.AWG.set_waveforms({'wave_ch2_cw003': wf})
+        changed = self.AWG.set_waveforms({'wave_ch2_cw003': 0.5*wf})
+        self.assertEqual(changed, ['wave_ch2_cw003'])
+        np.testing.assert_array_equal(self.AWG.wave_ch2_cw003(), 0.5*wf)
+
+        # reading back from disk gives the new waveform
+        self.AWG.clear_waveform_cache()
+        np.testing.assert_array_equal(self.AWG.wave_ch2_cw003(), 0.5*wf)
+
+    def test_padding(self):
+        for nr_samples, padded_len in [(1, 8), (8, 8), (9, 16), (20, 24)]:
+            wf = np.ones(nr_samples)
+            self.AWG.set_waveforms({'wave_ch1_cw002': wf})
+            read_wf = self.AWG.wave_ch1_cw002()
+            self.assertEqual(len(read_wf), padded_len)
+            np.testing.assert_array_equal(read_wf[:nr_samples], wf)
+            np.testing.assert_array_equal(read_wf[nr_samples:], 0)
+
+    def test_csv_identical_to_savetxt(self):
+        wf = np.random.randn(64)
+        wf[:3] = [0, -1e-17, 1/3]
+        self.AWG._write_csv_waveform('wave_ch1_cw004', wf)
+        with open(self.AWG._waveform_filename('wave_ch1_cw004')) as f:
+            csv_text = f.read()
+        expected = io.StringIO()
+        np.savetxt(expected, wf)
+        self.assertEqual(csv_text, expected.getvalue())
+
+    def test_upload_program_changed_awgs(self):
+        wf = np.ones(8)
+        self.AWG.set_waveforms({'wave_ch1_cw001': wf,
+                                'wave_ch2_cw001': wf,
+                                'wave_ch6_cw001': wf},
+                               upload_program=True)
+        self.assertEqual(self.uploaded_awgs, [[0, 2]])
+
+        # only the AWG of the changed waveform is recompiled
+        self.AWG.set_waveforms({'wave_ch1_cw001': wf,
+                                'wave_ch8_cw001': wf},
+                               upload_program=True)
+        self.assertEqual(self.uploaded_awgs[-1], [3])
+
+        # nothing changed, nothing to recompile
+        self.AWG.set_waveforms({'wave_ch8_cw001': wf}, upload_program=True)
+        self.assertEqual(len(self.uploaded_awgs), 2)
+
+    def test_codeword_awg_nr(self):
+        self.assertEqual(self.AWG._codeword_awg_nr('wave_ch1_cw000'), 0)
+        self.assertEqual(self.AWG._codeword_awg_nr('wave_ch4_cw255'), 1)
+        self.assertEqual(self.AWG._codeword_awg_nr('wave_ch8_cw010'), 3)
+        with self.assertRaises(ValueError):
+            self.AWG._codeword_awg_nr('sigouts_0_offset')
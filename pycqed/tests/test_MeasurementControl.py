@@ -1,4 +1,5 @@
 import os
+import threading
 import pycqed as pq
 import unittest
 import numpy as np
@@ -10,7 +11,9 @@ from pycqed.measurement.sweep_functions import None_Sweep, None_Sweep_idx, \
 import pycqed.measurement.detector_functions as det
 from pycqed.instrument_drivers.physical_instruments.dummy_instruments \
     import DummyParHolder
-from pycqed.measurement.optimization import nelder_mead, SPSA
+from pycqed.measurement.optimization import nelder_mead, SPSA, \
+    nelder_mead_batch, SPSA_batch, cma_es_batch
+from pycqed.analysis.tools.data_manipulation import BinnedStatistics
 from pycqed.analysis import measurement_analysis as ma
 from pycqed.utilities.get_default_datadir import get_default_datadir
 from pycqed.measurement.hdf5_data import read_dict_from_hdf5
@@ -18,6 +21,26 @@ from qcodes.instrument.parameter import ManualParameter
 from qcodes import station
 
 
+class Parabola_Detector_Hard(det.Hard_Detector):
+    """
+    Simulated hard detector that evaluates a parabola in all sweep points
+    of a batch at once.
+    """
+
+    def __init__(self, **kw):
+        super().__init__(**kw)
+        self.value_names = ['parabola']
+        self.value_units = ['V']
+        self.times_called = 0
+
+    def prepare(self, sweep_points=None):
+        self.sweep_points = sweep_points
+
+    def get_values(self):
+        self.times_called += 1
+        return [np.sum(np.atleast_2d(self.sweep_points)**2, axis=1)]
+
+
 class Test_MeasurementControl(unittest.TestCase):
 
     @classmethod
@@ -362,6 +385,104 @@ class Test_MeasurementControl(unittest.TestCase):
         np.testing.assert_array_almost_equal(y, sweep_pts)
         self.assertEqual(self.MC.total_nr_acquired_values, 10*30)
 
+    def test_pipelined_hard_sweep(self):
+        """
+        Tests that processing the data in a background thread gives the
+        same result as processing it in the measurement loop.
+        """
+        self.MC.soft_avg(4)
+        sweep_pts = np.arange(30)
+        dsets = []
+        for pipelined in [False, True]:
+            counter_param = ManualParameter('counter', initial_value=0)
+
+            def return_variable_size_values():
+                idx = counter_param() % 3
+                counter_param(counter_param()+1)
+                if idx == 0:
+                    return np.arange(0, 7) + counter_param()
+                elif idx == 1:
+                    return np.arange(7, 11) + counter_param()
+                elif idx == 2:
+                    return np.arange(11, 30) + counter_param()
+
+            d = det.Function_Detector(
+                get_function=return_variable_size_values,
+                value_names=['Variable size counter'],
+                detector_control='hard')
+            self.MC.cfg_pipelined_hard_sweeps(pipelined)
+            self.MC.set_sweep_function(None_Sweep(sweep_control='hard'))
+            self.MC.set_sweep_points(sweep_pts)
+            self.MC.set_detector_function(d)
+            dat = self.MC.run('pipelined_hard_sweep')
+            dsets.append(dat['dset'])
+            self.assertEqual(self.MC.total_nr_acquired_values, 4*30)
+        self.MC.cfg_pipelined_hard_sweeps(False)
+
+        np.testing.assert_array_almost_equal(dsets[0], dsets[1])
+        np.testing.assert_array_almost_equal(dsets[1][:, 0], sweep_pts)
+
+        old_a_tools_datadir = a_tools.datadir
+        a_tools.datadir = self.MC.datadir()
+        try:
+            a = ma.MeasurementAnalysis(label='pipelined_hard_sweep',
+                                       auto=False)
+            mc_settings = a.data_file['MC settings']
+            self.assertTrue(mc_settings.attrs['pipelined_hard_sweeps'])
+            timings = mc_settings['timings'].attrs
+            for stage in ['prepare', 'get_values', 'data_storing',
+                          'pipeline_finish']:
+                self.assertGreaterEqual(timings[stage], 0)
+            a.finish()
+        finally:
+            a_tools.datadir = old_a_tools_datadir
+
+    def test_pipelined_hard_sweep_plots_in_main_thread(self):
+        plot_threads = []
+        update_hard_plots = self.MC.update_hard_plots
+
+        def record_thread(iteration):
+            plot_threads.append(threading.current_thread())
+            update_hard_plots(iteration)
+        self.MC.update_hard_plots = record_thread
+        self.MC.cfg_pipelined_hard_sweeps(True)
+        try:
+            self.MC.soft_avg(3)
+            self.MC.set_sweep_function(None_Sweep(sweep_control='hard'))
+            self.MC.set_sweep_points(np.arange(10))
+            self.MC.set_detector_function(det.Dummy_Detector_Hard())
+            self.MC.run('pipelined_hard_sweep_plots')
+        finally:
+            self.MC.cfg_pipelined_hard_sweeps(False)
+            del self.MC.update_hard_plots
+        self.assertEqual(len(plot_threads), 3)
+        for thread in plot_threads:
+            self.assertIs(thread, threading.main_thread())
+
+    def test_pipelined_hard_sweep_acquisition_exception(self):
+        # an exception in the acquisition is not hidden by one in the
+        # pipeline thread
+        class Failing_Detector(det.Dummy_Detector_Hard):
+            def get_values(self):
+                if self.times_called == 1:
+                    raise RuntimeError('acquisition failed')
+                return super().get_values()
+
+        def fail_storing(*args):
+            raise ValueError('storing failed')
+        self.MC.store_hard_data = fail_storing
+        self.MC.cfg_pipelined_hard_sweeps(True)
+        try:
+            self.MC.soft_avg(3)
+            self.MC.set_sweep_function(None_Sweep(sweep_control='hard'))
+            self.MC.set_sweep_points(np.arange(10))
+            self.MC.set_detector_function(Failing_Detector())
+            with self.assertRaisesRegex(RuntimeError, 'acquisition failed'):
+                self.MC.run('pipelined_hard_sweep_exception')
+        finally:
+            self.MC.cfg_pipelined_hard_sweeps(False)
+            del self.MC.store_hard_data
+
     def test_soft_averages_hard_sweep_1D(self):
         sweep_pts = np.arange(50)
         self.MC.soft_avg(1)
@@ -397,6 +518,57 @@ class Test_MeasurementControl(unittest.TestCase):
                                              decimal=2)
         self.assertEqual(d.times_called, 5001)
 
+    def test_binned_statistics_hard_sweep(self):
+        bins = np.arange(5)
+        self.MC.soft_avg(3)
+        self.MC.set_sweep_function(None_Sweep(sweep_control='hard'))
+        self.MC.set_sweep_points(np.arange(50))
+        self.MC.set_detector_function(det.Dummy_Detector_Hard(noise=.4))
+        dat = self.MC.run('binned_dat', exp_metadata={'bins': bins})
+        stats = self.MC.binned_statistics
+        for ch in range(2):
+            binned_vals = np.reshape(dat['dset'][:, 1+ch], (len(bins), -1),
+                                     order='F')
+            np.testing.assert_allclose(stats.mean()[ch],
+                                       np.mean(binned_vals, axis=1))
+            np.testing.assert_allclose(stats.variance()[ch],
+                                       np.var(binned_vals, axis=1),
+                                       atol=1e-12)
+        # the live plot shows the binned averages
+        np.testing.assert_array_equal(self.MC.curves[0]['config']['y'],
+                                      stats.mean()[0])
+
+    def test_plotmon_decimation(self):
+        old_max_pts = self.MC.plotting_max_pts()
+        self.MC.plotting_max_pts(10)
+        sweep_pts = np.linspace(0, 10, 30)
+        self.MC.set_sweep_function(None_Sweep(sweep_control='hard'))
+        self.MC.set_sweep_points(sweep_pts)
+        self.MC.set_detector_function(det.Dummy_Detector_Hard())
+        self.MC.run('decimated_plot')
+        self.MC.plotting_max_pts(old_max_pts)
+        # every 3rd point is plotted
+        np.testing.assert_array_almost_equal(
+            self.MC.curves[0]['config']['x'], sweep_pts[::3])
+
+    def test_binned_statistics(self):
+        data = np.random.RandomState(0).randn(103, 2)
+        data[[5, 17], 1] = np.nan
+        stats = BinnedStatistics(nr_bins=10, nr_channels=2)
+        for start in range(0, 103, 20):
+            stats.update(start, np.zeros((len(data[start:start+20]), 2)))
+        # rows written again replace the previous values
+        for start in range(0, 103, 20):
+            stats.update(start, data[start:start+20],
+                         old_values=np.zeros((len(data[start:start+20]), 2)))
+        self.assertEqual(stats.nr_rows, 103)
+
+        data_ext = np.concatenate([data, np.nan*np.ones((7, 2))])
+        binned = np.reshape(data_ext.T, (2, 10, -1), order='F')
+        np.testing.assert_allclose(stats.mean(), np.nanmean(binned, axis=2))
+        np.testing.assert_allclose(stats.variance(),
+                                   np.nanvar(binned, axis=2), atol=1e-12)
+
     def test_soft_averages_hard_sweep_2D(self):
         self.MC.soft_avg(1)
         self.MC.live_plot_enabled(False)
@@ -583,6 +755,86 @@ class Test_MeasurementControl(unittest.TestCase):
         self.assertLess(yf, 0.7)
         self.assertLess(pf, 0.7)
 
+    def test_nelder_mead_batch(self):
+        # the batched version follows the same path as nelder_mead
+        def fun(x):
+            return np.sum((np.array(x) - [1, -2])**2)
+
+        def fun_batch(X):
+            return np.array([fun(x) for x in X])
+        xopt, fopt = nelder_mead(fun, x0=[-5, 5], initial_step=[1., 1.])
+        xopt_b, fopt_b = nelder_mead_batch(
+            fun_batch, x0=[-5, 5], initial_step=[1., 1.])
+        np.testing.assert_array_almost_equal(xopt_b, xopt)
+        self.assertAlmostEqual(fopt_b, fopt)
+
+    def test_adaptive_measurement_SPSA_batch(self):
+        self.MC.soft_avg(1)
+        self.mock_parabola.noise(0)
+        self.mock_parabola.z(0)
+        self.MC.set_sweep_functions(
+            [self.mock_parabola.x, self.mock_parabola.y])
+        self.MC.set_adaptive_function_parameters(
+            {'adaptive_function': SPSA_batch,
+             'x0': [-50, -50],
+             'a': (0.5)*(1+300)**0.602,
+             'c': 0.2,
+             'alpha': 1.,  # 0.602,
+             'gamma': 1./6.,  # 0.101,
+             'A': 300,
+             'p': 0.5,
+             'maxiter': 330})
+        self.MC.set_detector_function(self.mock_parabola.parabola)
+        dat = self.MC.run('SPSA batch test', mode='adaptive')
+        dset = dat["dset"]
+        # 3 points per iteration and the final verification
+        self.assertEqual(len(dset) % 3, 1)
+        self.assertEqual(len(dat['opt_res_dset']), len(dset)//3 + 1)
+        xf, yf, pf = dset[-1]
+        self.assertLess(abs(xf), 0.7)
+        self.assertLess(abs(yf), 0.7)
+        self.assertLess(pf, 0.7)
+
+    def test_adaptive_measurement_cma_batch_hard(self):
+        # import included in the test to avoid whole suite failing if missing
+        import cma  # noqa
+        self.MC.soft_avg(1)
+        detector = Parabola_Detector_Hard()
+        self.MC.set_sweep_functions(
+            [None_Sweep(sweep_control='hard'),
+             None_Sweep(sweep_control='hard')])
+        self.MC.set_adaptive_function_parameters(
+            {'adaptive_function': cma_es_batch,
+             'x0': [-5, 5], 'sigma0': 1,
+             'options': {'maxfevals': 5000, 'ftarget': 0.005,
+                         'verbose': -9},
+             'minimize': True})
+        self.MC.set_detector_function(detector)
+        dat = self.MC.run('CMA batch test', mode='adaptive')
+        dset = dat["dset"]
+        x_opt = self.MC.adaptive_result[0]
+        for i in range(2):
+            self.assertLess(abs(x_opt[i]), 0.5)
+
+        # every generation is a single acquisition
+        old_a_tools_datadir = a_tools.datadir
+        a_tools.datadir = self.MC.datadir()
+        try:
+            a = ma.MeasurementAnalysis(label='CMA batch test', auto=False)
+            trace = a.data_file['Experimental Data'][
+                'batch_optimization_result'][()]
+            np.testing.assert_array_almost_equal(trace, dat['opt_res_dset'])
+            fopt = a.data_file['Optimization_result'].attrs['fopt']
+            a.finish()
+        finally:
+            a_tools.datadir = old_a_tools_datadir
+
+        self.assertEqual(detector.times_called, len(trace))
+        self.assertEqual(trace[-1, 1], len(dset))
+        np.testing.assert_array_almost_equal(
+            dset[:, 2], np.sum(dset[:, :2]**2, axis=1))
+        self.assertLess(fopt, 0.005)
+
     def test_adaptive_sampling(self):
         self.MC.soft_avg(1)
         self.mock_parabola.noise(0)
@@ -654,15 +906,15 @@ class Test_MeasurementControl(unittest.TestCase):
 
         old_a_tools_datadir = a_tools.datadir
         a_tools.datadir = self.MC.datadir()
-
-        sweep_pts = np.linspace(0, 10, 30)
-        self.MC.set_sweep_function(None_Sweep())
-        self.MC.set_sweep_points(sweep_pts)
-        self.MC.set_detector_function(det.Dummy_Detector_Soft())
-        self.MC.run('test_exp_metadata', exp_metadata=metadata_dict)
-        a = ma.MeasurementAnalysis(label='test_exp_metadata', auto=False)
-
-        a_tools.datadir = old_a_tools_datadir
+        try:
+            sweep_pts = np.linspace(0, 10, 30)
+            self.MC.set_sweep_function(None_Sweep())
+            self.MC.set_sweep_points(sweep_pts)
+            self.MC.set_detector_function(det.Dummy_Detector_Soft())
+            self.MC.run('test_exp_metadata', exp_metadata=metadata_dict)
+            a = ma.MeasurementAnalysis(label='test_exp_metadata', auto=False)
+        finally:
+            a_tools.datadir = old_a_tools_datadir
 
         loaded_dict = read_dict_from_hdf5(
             {}, a.data_file['Experimental Data']['Experimental Metadata'])
@@ -34,3 +34,51 @@ class TestChevronSim:
                              self.time_step,
                              self.distortion)
         assert np.shape(result) == (len(self.freq_vec), len(self.time_vec)+1)
+
+    def test_chevron_reference(self):
+        e0 = 2.*np.pi*(6.552 - 4.8)
+        g = np.pi*0.0385
+        result = chs.chevron(e0, self.e_min, self.e_max, self.e_points, g,
+                             self.time_stop, self.time_step, self.distortion)
+        expected = chevron_reference(e0, self.e_min, self.e_max,
+                                     self.e_points, g, self.time_stop,
+                                     self.time_step, self.distortion)
+        np.testing.assert_allclose(result, expected, atol=1e-10)
+
+        energy = 1+self.e_min
+        result = chs.chevron_slice(e0, energy, g, self.time_stop,
+                                   self.time_step, self.distortion)
+        np.testing.assert_allclose(result, expected[0], atol=1e-10)
+
+    def test_rabisim_reference(self):
+        # includes zero energy and coupling
+        for g in [0, .3]:
+            efun = lambda t: np.sin(t)*(t < 20)
+            result = chs.rabisim(efun, g, 40, .5)
+            expected = rabisim_reference(efun, g, 40, .5)
+            np.testing.assert_allclose(result, expected, atol=1e-10)
+
+
+def rabisim_reference(efun, g, t, dt):
+    """
+    Reference implementation of rabisim that exponentiates the hamiltonian
+    for every time step.
+    """
+    s0 = np.array([1, 0])
+    ts = np.arange(1., t+0.5*dt, dt)
+    f_vec = np.zeros((len(ts), 2), dtype=np.complex128)
+    f_vec[0, :] = s0
+    for i, ti in enumerate(ts[:-1]):
+        f_vec[i+1, :] = np.dot(chs.evol(efun(ti), g, dt), f_vec[i])
+    return f_vec
+
+
+def chevron_reference(e0, emin, emax, n, g, t, dt, sf):
+    """
+    Reference implementation of chevron using rabisim_reference for every
+    energy.
+    """
+    def energy_func(energy, t): return e0*(1.-(energy*sf(t))**2)
+    energy_vec = np.arange(1+emin, 1+emax, (emax-emin)/(n-1))
+    return np.array([chs.qamp(rabisim_reference(
+        lambda t: energy_func(ee, t), g, t, dt)) for ee in energy_vec])
@@ -1,3 +1,5 @@
+import os
+import tempfile
 from zlib import crc32
 import unittest
 import numpy as np
@@ -12,7 +14,7 @@ from pycqed.measurement.randomized_benchmarking.clifford_decompositions \
 from pycqed.measurement.randomized_benchmarking.clifford_group \
     import (clifford_lookuptable, clifford_group_single_qubit)
 from pycqed.measurement.randomized_benchmarking.generate_clifford_hash_tables \
-    import construct_clifford_lookuptable
+    import construct_clifford_lookuptable, _write_table
 
 np.random.seed(0)
 test_indices_2Q = np.random.randint(0, high=11520, size=50)
@@ -360,3 +362,126 @@ class TestCliffordClassRBSeqs(unittest.TestCase):
             # and has components that are all tested.
 
 
+
+
+class TestCliffordTables(unittest.TestCase):
+
+    def test_single_qubit_products(self):
+        table = tqc.get_clifford_table(number_of_qubits=1)
+        for i in range(24):
+            for j in range(24):
+                net_op = np.dot(clifford_group_single_qubit[i],
+                                clifford_group_single_qubit[j])
+                self.assertEqual(table.multiply(i, j),
+                                 tqc.get_clifford_id(net_op))
+
+    def test_two_qubit_products(self):
+        table = tqc.get_clifford_table(number_of_qubits=2)
+        for i, j in zip(test_indices_2Q, test_indices_2Q[::-1]):
+            net_op = np.dot(tqc.TwoQubitClifford(i).pauli_transfer_matrix,
+                            tqc.TwoQubitClifford(j).pauli_transfer_matrix)
+            self.assertEqual(table.multiply(i, j),
+                             tqc.get_clifford_id(net_op))
+        # vectorized products
+        assert_array_equal(
+            table.multiply(test_indices_2Q, test_indices_2Q[::-1]),
+            [table.multiply(i, j) for i, j in
+             zip(test_indices_2Q, test_indices_2Q[::-1])])
+
+    def test_inverse_tables(self):
+        for nr_qubits, Cl in [(1, tqc.SingleQubitClifford),
+                              (2, tqc.TwoQubitClifford)]:
+            table = tqc.get_clifford_table(number_of_qubits=nr_qubits)
+            indices = np.arange(table.group_size)
+            assert_array_equal(table.multiply(table.inverse, indices), 0)
+            assert_array_equal(table.multiply(indices, table.inverse), 0)
+            for i in test_indices_2Q % table.group_size:
+                inv_ptm = np.linalg.inv(Cl(i).pauli_transfer_matrix)
+                self.assertEqual(table.inverse[i],
+                                 tqc.get_clifford_id(inv_ptm.round()))
+
+    def test_vectorized_net_clifford(self):
+        rng = np.random.RandomState(0)
+        seqs = rng.randint(0, 11520, size=(10, 37))
+        net_cls = rb.calculate_net_clifford_idx(seqs, tqc.TwoQubitClifford)
+        self.assertEqual(np.shape(net_cls), (10, ))
+        for seq, net_cl in zip(seqs, net_cls):
+            net_ptm = np.eye(16)
+            for idx in seq:
+                net_ptm = np.dot(tqc.TwoQubitClifford(idx).pauli_transfer_matrix,
+                                 net_ptm)
+            self.assertEqual(net_cl, tqc.get_clifford_id(net_ptm.round()))
+
+    def test_net_clifford_empty_sequence(self):
+        self.assertEqual(rb.calculate_net_clifford([]).idx, 0)
+
+    def test_interrupted_table_write(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fn = os.path.join(tmpdir, 'table.npy')
+            np.save(fn, np.arange(3))
+
+            def interrupted_write(f):
+                f.write(b'partial')
+                raise KeyboardInterrupt()
+            with self.assertRaises(KeyboardInterrupt):
+                _write_table(fn, interrupted_write, mode='wb')
+            # the existing table is intact and no temporary file is left
+            assert_array_equal(np.load(fn), np.arange(3))
+            self.assertEqual(os.listdir(tmpdir), ['table.npy'])
+
+
+class TestBatchedRBSeqs(unittest.TestCase):
+
+    def test_equivalent_to_single_sequences(self):
+        seeds = [0, 100, 200]
+        nr_cliffords = [1, 5, 20]
+        interleaving_cls = [None, 0, 4368]
+        for nr_qubits in [1, 2]:
+            seqs, seq_lengths = rb.randomized_benchmarking_sequences(
+                nr_cliffords, seeds=seeds, desired_net_cl=3,
+                number_of_qubits=nr_qubits,
+                interleaving_cls=interleaving_cls[:nr_qubits+1])
+            i = 0
+            for seed in seeds:
+                for n_cl in nr_cliffords:
+                    for intl_cl in interleaving_cls[:nr_qubits+1]:
+                        seq = rb.randomized_benchmarking_sequence(
+                            n_cl, desired_net_cl=3,
+                            number_of_qubits=nr_qubits,
+                            interleaving_cl=intl_cl, seed=seed)
+                        self.assertEqual(seq_lengths[i], len(seq))
+                        assert_array_equal(seqs[i, :seq_lengths[i]], seq)
+                        assert_array_equal(seqs[i, seq_lengths[i]:], -1)
+                        i += 1
+            self.assertEqual(i, len(seqs))
+
+    def test_recovery_cliffords(self):
+        seqs, seq_lengths = rb.randomized_benchmarking_sequences(
+            [3, 50], seeds=[None]*4, desired_net_cl=None,
+            number_of_qubits=2, interleaving_cls=[None, -4368])
+        assert_array_equal(seq_lengths, [3, 6, 50, 100]*4)
+        for net_cl in [0, 3, 4368]:
+            rec_cls = rb.calculate_recovery_cliffords(
+                seqs, seq_lengths, desired_net_cl=net_cl,
+                Clifford=tqc.TwoQubitClifford)
+            for seq, seq_len, rec_cl in zip(seqs, seq_lengths, rec_cls):
+                net_seq = np.append(seq[:seq_len], rec_cl)
+                self.assertEqual(rb.calculate_net_clifford(
+                    net_seq, tqc.TwoQubitClifford).idx, net_cl)
+
+    def test_decompose_clifford_sequences(self):
+        seqs, seq_lengths = rb.randomized_benchmarking_sequences(
+            [2, 7], seeds=[0, 1], number_of_qubits=2,
+            interleaving_cls=[-4368])
+        decomposed_seqs = rb.decompose_clifford_sequences(
+            seqs, seq_lengths, tqc.TwoQubitClifford)
+        self.assertEqual(len(decomposed_seqs), len(seqs))
+        for seq, seq_len, dec_seq in zip(seqs, seq_lengths,
+                                         decomposed_seqs):
+            expected = []
+            for cl in seq[:seq_len]:
+                if cl == -4368:
+                    expected += [('CZ', ['q0', 'q1'])]
+                else:
+                    expected += tqc.TwoQubitClifford(cl).gate_decomposition
+            self.assertEqual(dec_seq, expected)
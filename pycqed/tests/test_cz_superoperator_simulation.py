@@ -0,0 +1,112 @@
+import numpy as np
+import qutip as qtp
+from scipy.linalg import expm
+
+from pycqed.simulations import cz_superoperator_simulation_new_functions as czf
+from pycqed.instrument_drivers.virtual_instruments import \
+    noise_parameters_CZ_new as npCZ
+
+
+class SimpleFluxLutMan:
+    """
+    Implements the part of the AWG8_Flux_LutMan used in the CZ simulations.
+    """
+
+    def __init__(self):
+        self.q_freq_01 = lambda: 6.8e9
+        self.q_freq_10 = lambda: 5.0e9
+        self.q_J2 = lambda: 41e6
+        self.q_polycoeffs_freq_01_det = lambda: -np.array(
+            [1.95027142e+09, -3.22560292e+08, 5.25834946e+07])
+        self.q_polycoeffs_anharm = lambda: np.array([0, 0, -300e6])
+
+    def calc_amp_to_freq(self, amp, state='01'):
+        polycoeffs = np.zeros(3)
+        if state == '01':
+            polycoeffs += self.q_polycoeffs_freq_01_det()
+            polycoeffs[2] += self.q_freq_01()
+        elif state == '02':
+            polycoeffs += 2*self.q_polycoeffs_freq_01_det()
+            polycoeffs += self.q_polycoeffs_anharm()
+            polycoeffs[2] += 2*self.q_freq_01()
+        elif state == '10':
+            polycoeffs[2] += self.q_freq_10()
+        return np.polyval(polycoeffs, amp)
+
+
+class TestCZPropagatorEngine:
+
+    @classmethod
+    def setup_class(cls):
+        cls.fluxlutman = SimpleFluxLutMan()
+        cls.noise_pars = npCZ.NoiseParametersCZ('noise_parameters_CZ_test')
+        cls.noise_pars.T1_q0(34e-6)
+        cls.noise_pars.T1_q1(42e-6)
+        cls.noise_pars.T2_q1(23e-6)
+        cls.noise_pars.T2_q0_amplitude_dependent(
+            np.array([2.6e-6, 10, 5.5e8]))
+        cls.noise_pars.T2_scaling(1)
+        cls.noise_pars.alpha_q1(-300e6)
+        cls.noise_pars.w_bus(8.5e9)
+        cls.noise_pars.w_q1_sweetspot(5.1e9)
+        cls.noise_pars.dressed_compsub(True)
+
+        # flat-top like trajectory with repeated amplitudes
+        sim_step = 1/2.4e9/4
+        cls.sim_step = sim_step
+        ramp = np.linspace(0, 0.6, 20)
+        cls.amp = np.concatenate([ramp, 0.6*np.ones(30), ramp[::-1],
+                                  np.zeros(10)])
+
+    @classmethod
+    def teardown_class(cls):
+        cls.noise_pars.close()
+
+    def test_liouvillian(self):
+        H = czf.calc_hamiltonian(0.3, self.fluxlutman, self.noise_pars)
+        c_ops = [np.sqrt(1/34e-6)*czf.a, np.sqrt(1/1e-6)*czf.n_q1]
+        L_qtp = qtp.liouvillian(H, c_ops).full()
+        L_np = czf.liouvillian_numpy(H.full(), [c.full() for c in c_ops])
+        np.testing.assert_allclose(L_np, L_qtp, rtol=0, atol=1e-6)
+
+    def test_expm_batched(self):
+        H = czf.calc_hamiltonian(0.3, self.fluxlutman, self.noise_pars)
+        L = qtp.liouvillian(H, [np.sqrt(1/1e-6)*czf.a]).full()
+        A = np.array([L*self.sim_step, 0.5*L*self.sim_step,
+                      L*1e-9, np.zeros(L.shape)])
+        result = czf.expm_batched(A)
+        for a, r in zip(A, result):
+            np.testing.assert_allclose(r, expm(a), rtol=0, atol=1e-10)
+
+    def compare_engines(self, c_ops, fluxbias_q1=0):
+        U_qtp = czf.time_evolution_new(
+            c_ops=c_ops, noise_parameters_CZ=self.noise_pars,
+            fluxlutman=self.fluxlutman, fluxbias_q1=fluxbias_q1,
+            amp=self.amp, sim_step=self.sim_step)
+        U_np = czf.time_evolution_numpy(
+            c_ops=c_ops, noise_parameters_CZ=self.noise_pars,
+            fluxlutman=self.fluxlutman, fluxbias_q1=fluxbias_q1,
+            amp=self.amp, sim_step=self.sim_step)
+        assert U_np.type == U_qtp.type
+        assert U_np.dims == U_qtp.dims
+        np.testing.assert_allclose(U_np.full(), U_qtp.full(),
+                                   rtol=0, atol=1e-9)
+
+        if U_qtp.type == 'oper':
+            # the superoperators used to compute the quantities of interest
+            S_qtp = qtp.to_super(U_qtp)
+            S_np = qtp.to_super(U_np)
+            assert S_np.dims == S_qtp.dims
+            np.testing.assert_allclose(S_np.full(), S_qtp.full(),
+                                       rtol=0, atol=1e-9)
+
+    def test_unitary_evolution(self):
+        self.compare_engines(c_ops=[], fluxbias_q1=1e-3)
+
+    def test_superoperator_evolution(self):
+        f_pulse = self.fluxlutman.calc_amp_to_freq(self.amp, '01')
+        c_ops = czf.return_jump_operators(self.noise_pars, f_pulse)
+        # static and amplitude dependent jump operators
+        assert any(isinstance(c, list) for c in c_ops)
+        assert any(not isinstance(c, list) for c in c_ops)
+        self.compare_engines(c_ops=c_ops)
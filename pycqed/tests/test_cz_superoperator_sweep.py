@@ -0,0 +1,136 @@
+import os
+import sys
+import subprocess
+import tempfile
+import numpy as np
+import qutip as qtp
+
+from pycqed.simulations import cz_superoperator_simulation_new as cz_sim
+from pycqed.simulations import cz_superoperator_simulation_new_functions as czf
+
+
+def qoi_without_fidelities(U_final_vec, weights, t_final, w_q0, w_q1,
+                           look_for_minimum):
+    """
+    Replaces quantities_of_interest_from_propagators, only the conditional
+    phase and the leakage of the averaged superoperator are computed.
+    This keeps the sweep tests independent of the fidelity functions.
+    """
+    U = sum(qtp.to_super(U)*w if U.type == 'oper' else U*w
+            for U, w in zip(U_final_vec, weights))
+    qoi = np.zeros(len(cz_sim.qoi_value_names))
+    qoi[1] = czf.phases_from_superoperator(U)[-1]
+    qoi[2] = czf.leakage_from_superoperator(U)*100
+    return qoi
+
+
+class TestRunCZSweep:
+
+    @classmethod
+    def setup_class(cls):
+        cls.fluxlutman_args = {
+            'sampling_rate': 2.4e9,
+            'cz_length': 40e-9,
+            'q_J2': 41e6,
+            'czd_double_sided': False,
+            'cz_lambda_2': 0,
+            'cz_lambda_3': 0,
+            'cz_theta_f': 80,
+            'czd_length_ratio': 0.5,
+            'q_polycoeffs_freq_01_det': -np.array(
+                [1.95027142e+09, -3.22560292e+08, 5.25834946e+07]),
+            'q_polycoeffs_anharm': np.array([0, 0, -300e6]),
+            'q_freq_01': 6.8e9,
+            'q_freq_10': 5.0e9}
+        cls.noise_parameters_CZ_args = {
+            'Z_rotations_length': 0,
+            'voltage_scaling_factor': 1,
+            'distortions': False,
+            'T1_q0': 34e-6,
+            'T1_q1': 42e-6,
+            'T2_q0_amplitude_dependent': np.array([2.6e-6, 10, 5.5e8]),
+            'T2_q1': 23e-6,
+            'w_q1_sweetspot': 5.1e9,
+            'alpha_q1': -300e6,
+            'w_bus': 8.5e9,
+            'dressed_compsub': True,
+            'sigma_q0': 0,
+            'sigma_q1': 0,
+            'T2_scaling': 1,
+            'propagator_engine': 'numpy',
+            'n_sampling_gaussian_vec': np.array([11]),
+            'look_for_minimum': False}
+        cls.sweep_points = [{'cz_theta_f': 70, 'sigma_q1': 1e-3},
+                            {'cz_theta_f': 90},
+                            {'cz_theta_f': 110}]
+
+    def test_parallel_equals_serial(self, monkeypatch):
+        # the quantities of interest are computed in this process
+        monkeypatch.setattr(cz_sim, 'quantities_of_interest_from_propagators',
+                            qoi_without_fidelities)
+        qoi_serial = cz_sim.run_cz_sweep(
+            self.fluxlutman_args, self.noise_parameters_CZ_args,
+            fitted_stepresponse_ty=None, sweep_points=self.sweep_points,
+            processes=1)
+        qoi_parallel = cz_sim.run_cz_sweep(
+            self.fluxlutman_args, self.noise_parameters_CZ_args,
+            fitted_stepresponse_ty=None, sweep_points=self.sweep_points,
+            processes=2)
+        assert qoi_serial.shape == (len(self.sweep_points),
+                                    len(cz_sim.qoi_value_names))
+        assert np.all(np.isfinite(qoi_serial))
+        np.testing.assert_array_equal(qoi_parallel, qoi_serial)
+        # the conditional phase depends on the swept theta_f
+        assert len(np.unique(qoi_serial[:, 1])) == len(self.sweep_points)
+
+    def test_resume_from_datafile(self, monkeypatch):
+        monkeypatch.setattr(cz_sim, 'quantities_of_interest_from_propagators',
+                            qoi_without_fidelities)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            datafile = os.path.join(tmpdir, 'cz_sweep.hdf5')
+            qoi_first = cz_sim.run_cz_sweep(
+                self.fluxlutman_args, self.noise_parameters_CZ_args,
+                fitted_stepresponse_ty=None,
+                sweep_points=self.sweep_points[:2],
+                processes=1, datafile=datafile)
+
+            # all points are read from the datafile, none is recomputed
+            def not_recomputed(*args):
+                raise AssertionError('Point was recomputed')
+            monkeypatch.setattr(
+                cz_sim, 'quantities_of_interest_from_propagators',
+                not_recomputed)
+            qoi = cz_sim.run_cz_sweep(
+                self.fluxlutman_args, self.noise_parameters_CZ_args,
+                fitted_stepresponse_ty=None,
+                sweep_points=self.sweep_points[:2],
+                processes=1, datafile=datafile)
+            np.testing.assert_array_equal(qoi, qoi_first)
+
+    def test_unknown_sweep_parameter(self):
+        try:
+            cz_sim.run_cz_sweep(
+                self.fluxlutman_args, self.noise_parameters_CZ_args,
+                fitted_stepresponse_ty=None,
+                sweep_points=[{'not_a_parameter': 1}], processes=1)
+        except KeyError:
+            pass
+        else:
+            raise AssertionError('Expected a KeyError')
+
+    def test_sweep_hash_canonical(self):
+        points_args = [(self.fluxlutman_args, self.noise_parameters_CZ_args)]
+        h = cz_sim._sweep_hash(points_args, None, seed=0)
+        # numpy scalars and arrays hash the same as the python values
+        fl_args = dict(self.fluxlutman_args)
+        fl_args['cz_length'] = np.float64(40e-9)
+        fl_args['q_polycoeffs_anharm'] = [0., 0., -300e6]
+        assert cz_sim._sweep_hash(
+            [(fl_args, self.noise_parameters_CZ_args)], None, seed=0) == h
+        assert cz_sim._sweep_hash(points_args, None, seed=1) != h
+
+    def test_import_without_openql(self):
+        # blocks the import of openql in a fresh interpreter
+        code = ('import sys; sys.modules["openql"] = None; '
+                'import pycqed.simulations.cz_superoperator_simulation_new')
+        subprocess.check_call([sys.executable, '-c', code])
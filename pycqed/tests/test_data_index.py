@@ -0,0 +1,150 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from pycqed.analysis import analysis_toolbox as a_tools
+from pycqed.measurement import hdf5_data as h5d
+from pycqed.utilities import data_index
+
+
+class Test_DataIndex(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.old_index_dir = data_index.index_dir
+        # the index is stored in the (temporary) data directory
+        data_index.index_dir = None
+        self.old_use_data_index = a_tools.use_data_index
+        self.datadir = os.path.join(self.tmpdir, 'data')
+        folders = ['20170101/090000_T1_q0', '20170101/100000_Ramsey_q0',
+                   '20170101/100000_Ramsey_q1', '20170103/080000_T1_q1',
+                   '20170103/120000_Echo_q0', '20170104/083000_T1_q0',
+                   '20170104/notes']
+        for folder in folders:
+            os.makedirs(os.path.join(self.datadir, folder))
+        os.makedirs(os.path.join(self.datadir, 'not_a_day'))
+        self.old_datadir = a_tools.datadir
+        a_tools.datadir = self.datadir
+
+    @classmethod
+    def tearDownClass(self):
+        a_tools.datadir = self.old_datadir
+        a_tools.use_data_index = self.old_use_data_index
+        data_index.index_dir = self.old_index_dir
+        for index in data_index._indices.values():
+            index.close()
+        data_index._indices.clear()
+        shutil.rmtree(self.tmpdir)
+
+    def setUp(self):
+        a_tools.use_data_index = True
+
+    def tearDown(self):
+        a_tools.use_data_index = self.old_use_data_index
+
+    def compare_to_listdir(self, func, *args, **kw):
+        a_tools.use_data_index = True
+        result_index = func(*args, **kw)
+        a_tools.use_data_index = False
+        result_listdir = func(*args, **kw)
+        a_tools.use_data_index = True
+        self.assertEqual(result_index, result_listdir)
+        return result_index
+
+    def test_latest_data(self):
+        folder = self.compare_to_listdir(a_tools.latest_data)
+        self.assertEqual(
+            folder, os.path.join(self.datadir, '20170104', '083000_T1_q0'))
+        self.compare_to_listdir(a_tools.latest_data, 'Ramsey')
+        ts, folder = self.compare_to_listdir(
+            a_tools.latest_data, 'T1', older_than='20170104_083000',
+            return_timestamp=True)
+        self.assertEqual(ts, '20170103080000')
+        self.compare_to_listdir(a_tools.latest_data, 'T1',
+                                older_than='20170104_083000', or_equal=True)
+        self.compare_to_listdir(a_tools.latest_data, 'q0',
+                                newer_than='20170101_090000',
+                                older_than='20170103_235959')
+        self.compare_to_listdir(a_tools.latest_data, 'q', return_all=True)
+        self.compare_to_listdir(a_tools.latest_data, 'Ramsey',
+                                return_all=True)
+        self.compare_to_listdir(a_tools.latest_data, 'not_there',
+                                raise_exc=False)
+
+    def test_return_last_n_timestamps(self):
+        timestamps = self.compare_to_listdir(
+            a_tools.return_last_n_timestamps, 4)
+        self.assertEqual(timestamps, ['20170104083000', '20170103120000',
+                                      '20170103080000', '20170101100000'])
+        self.compare_to_listdir(a_tools.return_last_n_timestamps, 2, 'T1')
+        with self.assertRaises(Exception):
+            a_tools.return_last_n_timestamps(3, 'Echo')
+
+    def test_data_from_time(self):
+        folder = self.compare_to_listdir(a_tools.data_from_time,
+                                         '20170103_120000')
+        self.assertEqual(
+            folder, os.path.join(self.datadir, '20170103', '120000_Echo_q0'))
+        with self.assertRaises(NameError):
+            a_tools.data_from_time('20170101_100000')
+        with self.assertRaises(KeyError):
+            a_tools.data_from_time('20170101_110000')
+        with self.assertRaises(KeyError):
+            a_tools.data_from_time('20170102_110000')
+
+    def test_get_timestamps_in_range(self):
+        timestamps = a_tools.get_timestamps_in_range(
+            '20170101_093000', '20170104_083000', label=['q0'])
+        self.assertEqual(timestamps, ['20170101_100000', '20170103_120000',
+                                      '20170104_083000'])
+        timestamps = a_tools.get_timestamps_in_range(
+            '20170101_000000', '20170103_235959', label='T1_q',
+            exact_label_match=True)
+        self.assertEqual(timestamps, ['20170101_090000', '20170103_080000'])
+
+    def test_new_folders(self):
+        index = data_index.get_data_index(self.datadir)
+        index.find()
+        # a new folder created by a measurement
+        dataset = h5d.Data(name='new_msmt', datadir=self.datadir)
+        dataset.close()
+        folder = a_tools.latest_data('new_msmt')
+        self.assertEqual(folder, dataset.folder)
+        # a folder added by hand, found using the modification time
+        os.makedirs(os.path.join(self.datadir, '20170102', '150000_Added'))
+        self.assertEqual(a_tools.latest_data('Added', return_timestamp=True)[0],
+                         '20170102150000')
+        shutil.rmtree(os.path.join(self.datadir, '20170102'))
+        shutil.rmtree(dataset.folder)
+        self.assertFalse(a_tools.latest_data('Added', raise_exc=False))
+
+    def test_index_in_datadir(self):
+        index = data_index.get_data_index(self.datadir)
+        self.assertEqual(index.index_path, os.path.join(
+            self.datadir, '.data_index', 'data_index.sqlite'))
+        self.assertTrue(os.path.isfile(index.index_path))
+
+    def test_rescan(self):
+        index = data_index.get_data_index(self.datadir)
+        index.find()
+        # older day directories are not checked on every query
+        folder = os.path.join(self.datadir, '20170101', '110000_Rescan')
+        os.makedirs(folder)
+        os.utime(os.path.join(self.datadir, '20170101'), (0, 0))
+        index.rescan()
+        self.assertEqual(index.find('Rescan'),
+                         [('20170101110000', '20170101', '110000_Rescan')])
+        shutil.rmtree(folder)
+        os.utime(os.path.join(self.datadir, '20170101'), (1, 1))
+        index.rescan()
+        self.assertEqual(index.find('Rescan'), [])
+
+    def test_index_is_persistent(self):
+        index = data_index.get_data_index(self.datadir)
+        index.find()
+        new_index = data_index.DataIndex(self.datadir,
+                                         index_path=index.index_path)
+        self.assertEqual(new_index.find(), index.find())
+        new_index.close()
@@ -1,3 +1,4 @@
+import time
 import numpy as np
 import pytest
 
@@ -6,10 +7,40 @@ from pycqed.measurement.sweep_functions import None_Sweep
 import pycqed.measurement.detector_functions as det
 from pycqed.instrument_drivers.physical_instruments.dummy_instruments \
     import DummyParHolder
+from pycqed.instrument_drivers.physical_instruments.ZurichInstruments.\
+    dummy_UHFQC import dummy_UHFQC
 
 from qcodes import station
 
 
+class FakeCC:
+    """
+    Implements the part of the CC used to load and run programs, recording
+    when programs are uploaded.
+    """
+
+    def __init__(self, upload_time=0.05):
+        self.upload_time = upload_time
+        self.uploads = []
+
+    def eqasm_program(self, filename):
+        t0 = time.time()
+        time.sleep(self.upload_time)
+        self.uploads.append((filename, t0, time.time()))
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+class FakeProgram:
+
+    def __init__(self, filename):
+        self.filename = filename
+
+
 class TestDetectors:
 
     @classmethod
@@ -22,6 +53,7 @@ class TestDetectors:
 
         cls.mock_parabola = DummyParHolder('mock_parabola')
         cls.station.add_component(cls.mock_parabola)
+        cls.UHFQC = dummy_UHFQC('UHFQC')
 
     def test_function_detector_simple(self):
 
@@ -196,9 +228,98 @@ class TestDetectors:
         np.testing.assert_array_almost_equal(y[0], dset[:, 3])
         np.testing.assert_array_almost_equal(y[1], dset[:, 4])
 
+    def test_pipelined_multi_program_det(self):
+        CC = FakeCC()
+        transfers = []
+        acquisition_poll_array = self.UHFQC.acquisition_poll_array
+
+        def slow_acquisition_poll(samples, arm=True, acquisition_time=0.01):
+            t0 = time.time()
+            time.sleep(0.05)
+            transfers.append((t0, time.time()))
+            return acquisition_poll_array(samples, arm, acquisition_time)
+        self.UHFQC.acquisition_poll_array = slow_acquisition_poll
+
+        try:
+            d = det.UHFQC_integration_logging_det(
+                UHFQC=self.UHFQC, AWG=CC, channels=[0, 1], nr_shots=10)
+            programs = [FakeProgram('prog_{}'.format(i)) for i in range(3)]
+            pd = det.Pipelined_multi_program_det(d, programs=programs, CC=CC)
+            assert pd.value_names == d.value_names
+
+            self.MC.set_sweep_function(None_Sweep(sweep_control='hard'))
+            self.MC.set_sweep_points(np.arange(30))
+            self.MC.set_detector_function(pd)
+            dat = self.MC.run('pipelined_det')
+        finally:
+            del self.UHFQC.acquisition_poll_array
+        assert dat['dset'].shape == (30, 3)
+
+        # 3 chunks of 10 shots, every program is uploaded once, nothing
+        # is uploaded after the last program
+        filenames = [u[0] for u in CC.uploads]
+        assert filenames == ['prog_0', 'prog_1', 'prog_2']
+        assert pd.counter_param() == 0
+        for phase in ['upload', 'arm', 'acquisition', 'transfer']:
+            assert len(pd.timings[phase]) == 3
+        # the upload of the next program overlaps with the data transfer
+        for (_, upload_start, _), (_, transfer_end) in zip(
+                CC.uploads[1:], transfers):
+            assert upload_start < transfer_end
+        # waiting for the upload is shorter than the upload itself
+        assert np.mean(pd.timings['upload'][1:]) < 0.5*CC.upload_time
+
+    def test_UHFQC_integrated_average_processing(self):
+        for i in range(4):
+            self.UHFQC.set('quex_trans_offset_weightfunction_{}'.format(i),
+                           0.1*i)
+        data = np.random.rand(4, 30)
+        self.UHFQC.acquisition_poll_array = lambda *args, **kw: data.copy()
+        try:
+            for mode in ['raw', 'lin_trans']:
+                for real_imag in [True, False]:
+                    for values_per_point in [1, 3]:
+                        d = det.UHFQC_integrated_average_detector(
+                            UHFQC=self.UHFQC, channels=[0, 1, 2, 3],
+                            nr_averages=128, result_logging_mode=mode,
+                            real_imag=real_imag,
+                            values_per_point=values_per_point,
+                            values_per_point_suffex=['A', 'B', 'C'][
+                                :values_per_point])
+                        d.prepare(sweep_points=np.arange(30//values_per_point))
+                        exp_data = _integrated_average_processing_reference(
+                            d, {i: row for i, row in enumerate(data)})
+                        np.testing.assert_allclose(d.get_values(), exp_data)
+        finally:
+            del self.UHFQC.acquisition_poll_array
+
     @classmethod
     def teardown_class(cls):
         cls.MC.close()
+        cls.UHFQC.close()
         cls.mock_parabola.close()
         del cls.station.components['MC']
         del cls.station.components['mock_parabola']
+
+
+def _integrated_average_processing_reference(d, data_raw):
+    """
+    Processing of the polled UHFQC data as done by the
+    UHFQC_integrated_average_detector before it was done in place.
+    """
+    data = np.array([data_raw[key]
+                     for key in sorted(data_raw.keys())])*d.scaling_factor
+    if d.result_logging_mode == 'lin_trans':
+        for i, channel in enumerate(d.channels):
+            data[i] = data[i]-d.UHFQC.get(
+                'quex_trans_offset_weightfunction_{}'.format(channel))
+    if not d.real_imag:
+        for i in range(len(data)//2):
+            I, Q = data[2*i], data[2*i+1]
+            S21 = I + 1j*Q
+            data[2*i] = np.abs(S21)
+            data[2*i+1] = np.angle(S21)/(2*np.pi)*360
+    no_virtual_channels = len(d.value_names)//len(d.channels)
+    data = np.reshape(data.T,
+                      (-1, no_virtual_channels, len(d.channels))).T
+    return data.reshape((len(d.value_names), -1))
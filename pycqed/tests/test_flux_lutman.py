@@ -4,6 +4,7 @@ import pytest
 import pycqed.instrument_drivers.virtual_instruments.virtual_AWG8 as v8
 from pycqed.instrument_drivers.meta_instrument import lfilt_kernel_object as lko
 from pycqed.instrument_drivers.meta_instrument.LutMans import flux_lutman as flm
+from pycqed.measurement import sweep_functions as swf
 
 
 class TestFluxLutMan:
@@ -280,6 +281,49 @@ class TestFluxLutMan:
             freqs_02, state_A=state_A, state_B=state_B, positive_branch=False)
         np.testing.assert_array_almost_equal(amps, amps_inv)
 
+    def test_calc_eps_to_amp_reference(self):
+        eps = np.linspace(-3e9, 3e9, 101)
+        for state_A, state_B in [('11', '02'), ('01', '02'), ('00', '01'),
+                                 ('01', None)]:
+            for positive_branch in [True, False]:
+                amps = self.fluxlutman.calc_eps_to_amp(
+                    eps, state_A=state_A, state_B=state_B,
+                    positive_branch=positive_branch)
+                exp_amps = calc_eps_to_amp_roots(
+                    self.fluxlutman, eps, state_A=state_A, state_B=state_B,
+                    positive_branch=positive_branch)
+                np.testing.assert_allclose(amps, exp_amps, rtol=1e-9,
+                                           atol=1e-12)
+                # scalars are converted as before
+                amp = self.fluxlutman.calc_eps_to_amp(
+                    eps[10], state_A=state_A, state_B=state_B,
+                    positive_branch=positive_branch)
+                assert np.isscalar(amp)
+                np.testing.assert_allclose(amp, exp_amps[10], rtol=1e-9)
+
+        # linear and constant polynomials
+        np.testing.assert_allclose(
+            flm.invert_quadratic([0, 2, 1], [5, 7]), [2, 3])
+        with pytest.raises(ValueError):
+            self.fluxlutman.calc_eps_to_amp(eps, state_A='00', state_B='10')
+
+    def test_gen_cz_reference(self):
+        # the CZ waveform using the vectorized amplitude conversions is
+        # the same as when solving the roots for every sample
+        self.fluxlutman.czd_double_sided(True)
+        try:
+            cz = self.fluxlutman._gen_cz()
+            self.fluxlutman.calc_eps_to_amp = \
+                lambda eps, **kw: calc_eps_to_amp_roots(
+                    self.fluxlutman, eps, **kw)
+            try:
+                cz_ref = self.fluxlutman._gen_cz()
+            finally:
+                del self.fluxlutman.calc_eps_to_amp
+        finally:
+            self.fluxlutman.czd_double_sided(False)
+        np.testing.assert_allclose(cz, cz_ref, rtol=1e-9, atol=1e-12)
+
     def test_custom_wf(self):
         self.fluxlutman.generate_standard_waveforms()
 
@@ -318,6 +362,131 @@ class TestFluxLutMan:
         self.fluxlutman.cfg_distort(False)
         self.fluxlutman.load_waveforms_onto_AWG_lookuptable()
 
+    def test_waveform_cache(self):
+        lm = self.fluxlutman
+        lm.cfg_distort(True)
+        lm.clear_waveform_cache()
+        lm.load_waveforms_onto_AWG_lookuptable()
+        stats = lm.waveform_cache_statistics()
+        assert stats['misses'] > 0
+        cz = lm._wave_dict['cz']
+        cz_z = lm._wave_dict['cz_z']
+
+        # Nothing changed, nothing is regenerated or uploaded again
+        lm.load_waveforms_onto_AWG_lookuptable()
+        stats = lm.waveform_cache_statistics()
+        assert stats['misses'] == 0
+        assert stats['hits'] > 0
+        assert stats['time_saved'] > 0
+        assert stats['uploads'] == 0
+        assert stats['uploads_skipped'] == len(lm.LutMap())
+
+        # Only the waveforms depending on the phase correction change
+        lm.cz_phase_corr_amp(.1)
+        try:
+            lm.load_waveforms_onto_AWG_lookuptable()
+            stats = lm.waveform_cache_statistics()
+            # cz_z, multi_cz, idle_z and multi_idle_z are regenerated and
+            # the two in the LutMap are distorted again
+            assert stats['misses'] == 6
+            assert lm._wave_dict['cz'] is cz
+            assert not np.array_equal(lm._wave_dict['cz_z'], cz_z)
+            np.testing.assert_array_equal(
+                lm._wave_dict['cz_z'], lm._gen_cz_z(regenerate_cz=True))
+            assert stats['uploads'] == 2
+
+            # Changing the distortion kernel only distorts the waveforms
+            self.k0.filter_model_03(
+                {'model': 'exponential', 'params': {'tau': 2e-9,
+                                                    'amp': -0.1}})
+            lm.load_waveforms_onto_AWG_lookuptable()
+            stats = lm.waveform_cache_statistics()
+            assert stats['misses'] == len(lm.LutMap())
+            wfs_dist = dict(lm._wave_dict_dist)
+
+            # The cached waveforms are identical to uncached ones
+            lm.cfg_cache_waveforms(False)
+            lm.load_waveforms_onto_AWG_lookuptable()
+            for name in lm.LutMap().keys():
+                np.testing.assert_array_equal(
+                    lm._wave_dict_dist[name], wfs_dist[name])
+        finally:
+            lm.cz_phase_corr_amp(0)
+            lm.cfg_cache_waveforms(True)
+
+    def test_process_waveforms(self):
+        self.fluxlutman.generate_standard_waveforms()
+        names = ['square', 'cz_z', 'multi_cz']
+        for distort in [True, False]:
+            self.fluxlutman.cfg_distort(distort)
+            for name in names:
+                self.fluxlutman.load_waveform_onto_AWG_lookuptable(name)
+            processed = self.fluxlutman.process_waveforms(
+                [self.fluxlutman._wave_dict[name] for name in names])
+            for name, waveform in zip(names, processed):
+                np.testing.assert_array_almost_equal(
+                    waveform, self.fluxlutman._wave_dict_dist[name])
+
+    def test_chunked_sweep(self, monkeypatch):
+        uploaded = []
+        set_waveforms = self.AWG.set_waveforms
+
+        def counting_set_waveforms(waveforms, upload_program=False):
+            uploaded.append(sorted(waveforms.keys()))
+            return set_waveforms(waveforms, upload_program=upload_program)
+        monkeypatch.setattr(self.AWG, 'set_waveforms', counting_set_waveforms)
+
+        amps = np.linspace(0.1, 0.4, 8)
+        self.fluxlutman.sq_amp(0.3)
+        for prefetch in [False, True]:
+            uploaded.clear()
+            s = swf.FLsweep_chunks(
+                self.fluxlutman, sweep_points=amps, chunk_size=3,
+                codewords=[3, 4, 5], par=self.fluxlutman.sq_amp,
+                waveform_name='square', prefetch=prefetch)
+            s.prepare()
+            for i in [0, 3, 6]:
+                s.set_parameter(amps[i])
+                chunk = amps[i:i+3]
+                # the last chunk is padded with its final waveform
+                chunk = np.append(chunk, [chunk[-1]]*(3-len(chunk)))
+                for cw, amp in zip([3, 4, 5], chunk):
+                    self.fluxlutman.sq_amp(amp)
+                    exp_wf = self.fluxlutman.process_waveforms(
+                        [self.fluxlutman._gen_square()])[0]
+                    np.testing.assert_array_almost_equal(
+                        self.AWG.get('wave_ch1_cw{:03}'.format(cw)), exp_wf)
+                self.fluxlutman.sq_amp(0.3)
+            # the same chunk again is not uploaded
+            s.set_parameter(amps[6])
+            s.finish()
+            assert uploaded == [['wave_ch1_cw003', 'wave_ch1_cw004',
+                                 'wave_ch1_cw005']]*3
+            # the lutman parameter is restored
+            assert self.fluxlutman.sq_amp() == 0.3
+
+    def test_chunked_sweep_wave_func(self):
+        lengths = np.arange(1, 7)*10
+
+        def wave_func(points):
+            return [np.ones(int(p)) for p in points]
+
+        s = swf.FLsweep_chunks(
+            self.fluxlutman, sweep_points=lengths, chunk_size=4,
+            wave_func=wave_func, param_name='length', param_unit='samples')
+        assert s.parameter_name == 'length'
+        s.prepare()
+        s.set_parameter(lengths[4])
+        s.finish()
+        exp_wfs = self.fluxlutman.process_waveforms(wave_func(lengths[4:]))
+        # the codewords not used by the last chunk repeat its final waveform
+        exp_wfs = list(exp_wfs) + [exp_wfs[-1]]*2
+        for cw, exp_wf in enumerate(exp_wfs):
+            np.testing.assert_array_almost_equal(
+                self.AWG.get('wave_ch1_cw{:03}'.format(cw)), exp_wf)
+        with pytest.raises(ValueError):
+            s.set_parameter(25)
+
     def test_generate_composite(self):
         self.fluxlutman.generate_standard_waveforms()
         gen_wf = self.fluxlutman._gen_composite_wf('cz_z', time_tuples=[])
@@ -388,3 +557,24 @@ class TestFluxLutMan:
     def test_render_wave(self):
         self.fluxlutman.render_wave('cz_z', time_units='lut_index')
         self.fluxlutman.render_wave('cz_z', time_units='s')
+
+
+def calc_eps_to_amp_roots(fluxlutman, eps, state_A='01', state_B='02',
+                          positive_branch=True):
+    """
+    Reference implementation of calc_eps_to_amp that solves the roots of
+    the polynomial for every sample.
+    """
+    if isinstance(eps, (list, np.ndarray)):
+        return np.array([calc_eps_to_amp_roots(
+            fluxlutman, e, state_A=state_A, state_B=state_B,
+            positive_branch=positive_branch) for e in eps])
+    polycoeffs = fluxlutman.get_polycoeffs_state(state=state_A)
+    if state_B is not None:
+        polycoeffs = fluxlutman.get_polycoeffs_state(state=state_B)-polycoeffs
+    else:
+        polycoeffs = polycoeffs.copy()
+        polycoeffs[-1] = 0
+    sols = (np.poly1d(polycoeffs)-eps).roots
+    sol = np.max(sols) if positive_branch else np.min(sols)
+    return np.real(sol)
@@ -1,4 +1,5 @@
 import os
+import tempfile
 import pycqed as pq
 import unittest
 import h5py
@@ -11,6 +12,7 @@ from pycqed.instrument_drivers.physical_instruments.dummy_instruments \
 
 from qcodes import station
 from pycqed.analysis import analysis_toolbox as a_tools
+from pycqed.analysis import measurement_analysis as ma
 
 
 class Test_HDF5(unittest.TestCase):
@@ -189,3 +191,117 @@ class Test_HDF5(unittest.TestCase):
         self.assertEqual(self.mock_parabola_2.status(), True)
         self.assertEqual(self.mock_parabola_2.dict_like(),
                          {'a': {'b': [2, 3, 5]}})
+
+    def test_buffered_dataset(self):
+        data_object = h5d.Data(name='test_buffered_dataset',
+                               datadir=self.datadir)
+        raw_dset = data_object.create_dataset(
+            'Data', (0, 3), maxshape=(None, 3), dtype='float64')
+        dset = h5d.BufferedDataset(raw_dset, flush_interval=1e9,
+                                   expected_nr_rows=4)
+        dset.resize((5, 3))
+        dset[:, 0] = np.arange(5)
+        dset[2:4, 1:] = 7
+        dset[4] = [1, 2, 3]
+        self.assertEqual(dset.shape, (5, 3))
+        # nothing is written before flushing
+        self.assertEqual(raw_dset.shape, (0, 3))
+
+        dset.flush()
+        np.testing.assert_array_equal(raw_dset[()], dset[()])
+        np.testing.assert_array_equal(dset[:, 0], [0, 1, 2, 3, 1])
+        np.testing.assert_array_equal(dset[4], [1, 2, 3])
+        np.testing.assert_array_equal(dset[2:4, 1:], 7)
+
+        # only changed rows are written, also after growing the buffer
+        dset.resize((100, 3))
+        dset[50:, 2] = 1
+        dset.flush()
+        np.testing.assert_array_equal(raw_dset[()], dset[()])
+        data_object.close()
+
+    def test_MC_buffered_datasaving(self):
+        old_flush_interval = self.MC.cfg_datasaving_flush_interval()
+        self.MC.soft_avg(3)
+        for flush_interval in [0, 1e9]:
+            self.MC.cfg_datasaving_flush_interval(flush_interval)
+            self.MC.set_sweep_function(self.mock_parabola.x)
+            self.MC.set_sweep_points(np.linspace(0, 10, 11))
+            self.MC.set_detector_function(self.mock_parabola.parabola)
+            dat = self.MC.run('test_MC_buffered_datasaving')
+            a = ma.MeasurementAnalysis(
+                label='test_MC_buffered_datasaving', auto=False)
+            np.testing.assert_array_equal(
+                a.data_file['Experimental Data']['Data'][()], dat['dset'])
+            a.finish()
+        self.MC.soft_avg(1)
+        self.MC.cfg_datasaving_flush_interval(old_flush_interval)
+
+    def test_MC_storage_layouts(self):
+        settings = [('rows', None, 'float64'),
+                    ('columns', None, 'float64'),
+                    ('columns', 'gzip', 'float64'),
+                    ('columns', 'lzf', 'float32')]
+        for layout, compression, dtype in settings:
+            self.MC.cfg_datasaving_layout(layout)
+            self.MC.cfg_datasaving_compression(compression)
+            self.MC.cfg_datasaving_dtype(dtype)
+            self.MC.set_sweep_function(self.mock_parabola.x)
+            self.MC.set_sweep_points(np.linspace(0, 10, 11))
+            self.MC.set_detector_function(self.mock_parabola.parabola)
+            dat = self.MC.run('test_MC_storage_layouts')
+
+            a = ma.MeasurementAnalysis(
+                label='test_MC_storage_layouts', auto=False)
+            dset = a.data_file['Experimental Data']['Data']
+            self.assertEqual(dset.dtype, np.dtype(dtype))
+            self.assertEqual(dset.compression, compression)
+            self.assertEqual(dset.chunks[1], 1 if layout == 'columns' else 2)
+            np.testing.assert_array_equal(
+                a.get_values('parabola'), dat['dset'][:, 1])
+            a.get_naming_and_values()
+            np.testing.assert_array_equal(a.sweep_points, dat['dset'][:, 0])
+            np.testing.assert_array_equal(a.measured_values[0],
+                                          dat['dset'][:, 1])
+            a.finish()
+
+            a = ma.MeasurementAnalysis(
+                label='test_MC_storage_layouts', auto=False, lazy_data=True)
+            a.get_naming_and_values()
+            np.testing.assert_array_equal(np.asarray(a.data),
+                                          dat['dset'].T)
+            blocks = [b for _, b in a.data.iter_blocks(block_size=4)]
+            np.testing.assert_array_equal(np.concatenate(blocks, axis=1),
+                                          dat['dset'].T)
+            a.finish()
+
+            reader = a_tools.MeasurementDataReader(a.folder)
+            np.testing.assert_array_equal(reader.measured_values[0],
+                                          dat['dset'][:, 1])
+            reader.finish()
+        self.MC.cfg_datasaving_layout('rows')
+        self.MC.cfg_datasaving_compression(None)
+        self.MC.cfg_datasaving_dtype('float64')
+
+    def test_compressed_layout_is_smaller(self):
+        data = np.empty((2**12, 5))
+        data[:, 0] = np.arange(len(data))
+        data[:, 1:] = np.round(
+            np.random.RandomState(0).randn(len(data), 4)*200)
+        file_sizes = {}
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for name, kw in [('rows', dict(layout='rows')),
+                             ('compressed', dict(layout='columns',
+                                                 compression='lzf',
+                                                 dtype='float32'))]:
+                filepath = os.path.join(tmpdir, name + '.hdf5')
+                with h5py.File(filepath, 'w') as f:
+                    dset = h5d.create_data_dataset(
+                        f, nr_cols=data.shape[1],
+                        expected_nr_rows=len(data), **kw)
+                    dset.resize(data.shape)
+                    dset[:] = data
+                with h5py.File(filepath, 'r') as f:
+                    np.testing.assert_array_equal(f['Data'][()], data)
+                file_sizes[name] = os.path.getsize(filepath)
+        self.assertLess(file_sizes['compressed'], file_sizes['rows'])
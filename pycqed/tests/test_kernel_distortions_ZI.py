@@ -44,3 +44,128 @@ class Test_Kernel_functions_ZI(unittest.TestCase):
         ideal_corr = signal.lfilter(b_inv, 1.0, self.distorted_waveform)
         np.testing.assert_almost_equal(ideal_corr, self.ideal_waveform, 6)
 
+
+
+#################################################################
+#    Reference (loop based) implementations of the hardware     #
+#    friendly filters, used to check the vectorized versions    #
+#################################################################
+
+def multipath_bias_tee_loop(sig, k, paths):
+    tpl = np.ones((paths, ))
+    cs = 0
+    acc = []
+    for i in np.arange(0, sig.size, paths):
+        cs = cs + np.sum(sig[i:(i+paths)])
+        acc = np.append(acc, tpl*cs)
+    return sig + 1./k * (2*acc - sig)
+
+
+def multipath_filter_loop(sig, alpha, k, paths):
+    tpl = np.ones((paths, ))
+    hw_alpha = alpha*float(paths)
+    duf = tpl * 0.
+    acc = 0
+    for i in np.arange(0, sig.size, paths):
+        acc = acc + hw_alpha*(np.mean(sig[i:(i+paths)]) - acc)
+        duf = np.append(duf, tpl * acc)
+    duf = duf[0:sig.size]
+    return sig + k * (duf - sig)
+
+
+def multipath_filter2_loop(sig, alpha, k, paths, ppl, hw_rounding=True):
+    tpl = np.ones((paths, ))
+    hw_alpha = alpha*float(paths*ppl)
+    hw_k = k
+    if hw_rounding:
+        hw_alpha = ZI_kf.coef_round(hw_alpha)
+        hw_k = ZI_kf.coef_round(hw_k)
+    duf = tpl * 0.
+    acc = np.zeros((ppl, ))
+    extra = int(ppl*paths*np.ceil(sig.size/ppl/paths)-sig.size)
+    if extra > 0:
+        sig = np.append(sig, extra*[sig[-1]])
+    du = []
+    for i in np.arange(0, sig.size, paths):
+        du = np.append(du, np.mean(sig[i:(i+paths)]))
+    for i in np.arange(0, du.size, ppl):
+        for j in np.arange(0, ppl):
+            ss = 0
+            for l in np.arange(0, ppl):
+                if i+j-l >= 0:
+                    ss = ss + du[i+j-l]
+            ss = ss / float(ppl)
+            acc[j] = acc[j] + hw_alpha*(ss - acc[j])
+            duf = np.append(duf, tpl * acc[j])
+    duf = duf[0:sig.size]
+    return sig + hw_k * (duf - sig)
+
+
+def first_order_bounce_corr_loop(sig, delay, amp, awg_sample_rate,
+                                 scope_sample_rate=None):
+    delay_n_samples = int(round(awg_sample_rate*delay))
+    if scope_sample_rate is None:
+        scope_sample_rate = awg_sample_rate
+    shift_reg = np.zeros(delay_n_samples)
+    awg_sample_incr = awg_sample_rate/scope_sample_rate
+    previous_awg_sample_cnt = 0
+    present_awg_sample_cnt = 0
+    amp_hw = ZI_kf.coef_round(amp, force_bshift=0)
+    sigout = np.zeros(len(sig))
+    for i, s in enumerate(sig):
+        sigout[i] = s + amp_hw*shift_reg[-1]
+        present_awg_sample_cnt += awg_sample_incr
+        awg_sample_diff = int(present_awg_sample_cnt) - previous_awg_sample_cnt
+        if awg_sample_diff >= 1:
+            shift_reg[awg_sample_diff:] = shift_reg[:-awg_sample_diff]
+            shift_reg[:awg_sample_diff] = s*np.ones(awg_sample_diff)
+            previous_awg_sample_cnt = int(present_awg_sample_cnt)
+    return sigout
+
+
+class Test_HW_friendly_filters_ZI(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+        self.sig = np.random.RandomState(42).randn(1000)
+        # step waveform, representative of flux pulses
+        self.step = np.concatenate([np.zeros(37), np.ones(963)])
+
+    def test_multipath_bias_tee(self):
+        for sig in [self.sig, self.step]:
+            np.testing.assert_array_equal(
+                ZI_kf.multipath_bias_tee(sig, k=1e4, paths=8),
+                multipath_bias_tee_loop(sig, k=1e4, paths=8))
+
+    def test_multipath_filter(self):
+        for sig in [self.sig, self.step, self.sig[:997]]:
+            np.testing.assert_array_equal(
+                ZI_kf.multipath_filter(sig, alpha=1e-2, k=0.1, paths=8),
+                multipath_filter_loop(sig, alpha=1e-2, k=0.1, paths=8))
+
+    def test_multipath_filter2(self):
+        for sig in [self.sig, self.step, self.sig[:997]]:
+            for ppl in [1, 2, 3]:
+                for hw_rounding in [True, False]:
+                    kw = dict(alpha=1e-2, k=-0.05, paths=8, ppl=ppl,
+                              hw_rounding=hw_rounding)
+                    np.testing.assert_array_equal(
+                        ZI_kf.multipath_filter2(sig, **kw),
+                        multipath_filter2_loop(sig, **kw))
+
+    def test_exponential_decay_correction_hw_friendly(self):
+        for amp in [0.05, -0.05]:
+            corr = ZI_kf.exponential_decay_correction_hw_friendly(
+                self.step, tau=50e-9, amp=amp, sampling_rate=2.4e9)
+            self.assertEqual(len(corr), len(self.step))
+
+    def test_first_order_bounce_corr(self):
+        for scope_sample_rate in [None, 2.4e9/3, 2.4e9/2.5]:
+            for sig in [self.sig, self.step]:
+                np.testing.assert_array_equal(
+                    ZI_kf.first_order_bounce_corr(
+                        sig, delay=10e-9, amp=-0.1, awg_sample_rate=2.4e9,
+                        scope_sample_rate=scope_sample_rate),
+                    first_order_bounce_corr_loop(
+                        sig, delay=10e-9, amp=-0.1, awg_sample_rate=2.4e9,
+                        scope_sample_rate=scope_sample_rate))
@@ -1,5 +1,7 @@
 import unittest
 import numpy as np
+from scipy import signal
+import pycqed.measurement.kernel_functions_ZI as kf
 import pycqed.instrument_drivers.meta_instrument.lfilt_kernel_object as lko
 import pycqed.instrument_drivers.virtual_instruments.virtual_AWG8 as v8
 
@@ -53,3 +55,95 @@ class Test_LinDistortionKernelObject(unittest.TestCase):
         self.AWG.close()
 
 
+
+
+class Test_LinDistortionKernelCompiled(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+        self.k0 = lko.LinDistortionKernel('k_compiled')
+        self.AWG = v8.VirtualAWG8('DummyAWG8_compiled')
+        self.k0.instr_AWG(self.AWG.name)
+        self.k0.cfg_awg_channel(1)
+        self.k0.cfg_sampling_rate(2.4e9)
+
+    def setUp(self):
+        self.k0.reset_kernels()
+        self.k0.filter_model_00(
+            {'model': 'high-pass', 'params': {'tau': 4.071755778296734e-05}})
+        self.k0.filter_model_01(
+            {'model': 'exponential', 'params': {'amp': -0.08, 'tau': 1e-8}})
+        self.k0.filter_model_02(
+            {'model': 'exponential', 'params': {'amp': 0.05, 'tau': 2e-9}})
+        self.k0.filter_model_03(
+            {'model': 'FIR', 'params': {'weights': [1.05, -0.03, -0.02]}})
+        self.k0.filter_model_04(
+            {'model': 'bounce', 'params': {'amp': 0.02, 'tau': 5e-9}})
+        self.wf = np.concatenate([np.zeros(20), np.ones(300), np.zeros(80)])
+
+    def sequential_distortion(self, wf, inverse=False):
+        fs = self.k0.cfg_sampling_rate()
+        y = kf.bias_tee_correction(wf, tau=4.071755778296734e-05,
+                                   sampling_rate=fs, inverse=inverse)
+        y = kf.exponential_decay_correction(
+            y, amp=-0.08, tau=1e-8, sampling_rate=fs, inverse=inverse)
+        y = kf.exponential_decay_correction(
+            y, amp=0.05, tau=2e-9, sampling_rate=fs, inverse=inverse)
+        y = signal.lfilter([1.05, -0.03, -0.02], 1, y)
+        y = kf.first_order_bounce_corr(y, delay=5e-9, amp=0.02,
+                                       awg_sample_rate=2.4e9)
+        return y
+
+    def test_compiled_chain_matches_sequential_filters(self):
+        for inverse in [False, True]:
+            np.testing.assert_allclose(
+                self.k0.distort_waveform(self.wf, inverse=inverse),
+                self.sequential_distortion(self.wf, inverse=inverse),
+                rtol=1e-10, atol=1e-12)
+
+    def test_compiled_chain_is_cached(self):
+        chain = self.k0.compile_filters()
+        self.assertIs(chain, self.k0.compile_filters())
+        self.assertEqual(chain['sos'].shape, (3, 6))
+
+        self.k0.filter_model_02(
+            {'model': 'exponential', 'params': {'amp': 0.04, 'tau': 2e-9}})
+        new_chain = self.k0.compile_filters()
+        self.assertIsNot(chain, new_chain)
+        self.assertIs(new_chain, self.k0.compile_filters())
+
+    def test_distort_waveforms(self):
+        wfs = [self.wf, self.wf[:123], 0.5*self.wf[:301]]
+        distorted = self.k0.distort_waveforms(wfs)
+        for wf, d_wf in zip(wfs, distorted):
+            np.testing.assert_allclose(d_wf, self.k0.distort_waveform(wf))
+
+        distorted = self.k0.distort_waveforms(wfs, length_samples=500)
+        for wf, d_wf in zip(wfs, distorted):
+            self.assertEqual(len(d_wf), 500)
+            np.testing.assert_allclose(
+                d_wf, self.k0.distort_waveform(wf, length_samples=500))
+
+    def test_realtime_settings_only_pushed_on_change(self):
+        self.k0.filter_model_01(
+            {'model': 'exponential', 'params': {'amp': -0.08, 'tau': 1e-8},
+             'real-time': True})
+        par = 'sigouts_0_precompensation_exponentials_0_amplitude'
+        self.k0.distort_waveform(self.wf)
+        self.assertEqual(self.AWG.get(par), -0.08)
+
+        # a value changed on the AWG is not overwritten if the filter
+        # models did not change
+        self.AWG.set(par, 0.1)
+        self.k0.distort_waveform(self.wf)
+        self.assertEqual(self.AWG.get(par), 0.1)
+
+        self.k0.set_realtime_distortions_zero()
+        self.assertEqual(self.AWG.get(par), 0)
+        self.k0.distort_waveform(self.wf)
+        self.assertEqual(self.AWG.get(par), -0.08)
+
+    @classmethod
+    def tearDownClass(self):
+        self.k0.close()
+        self.AWG.close()
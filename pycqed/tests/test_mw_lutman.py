@@ -88,6 +88,34 @@ class Test_MW_LutMan(unittest.TestCase):
         uploaded_wf = self.AWG.get('wave_ch1_cw008')
         np.testing.assert_array_almost_equal(expected_wf_spec, uploaded_wf)
 
+    def test_waveform_cache(self):
+        lm = self.AWG8_MW_LutMan
+        lm.clear_waveform_cache()
+        lm.load_waveforms_onto_AWG_lookuptable()
+        self.assertEqual(lm.waveform_cache_statistics()['misses'], 1)
+        rX180 = lm._wave_dict['rX180']
+
+        # Nothing changed, the waveforms and realtime uploads are skipped
+        lm.load_waveforms_onto_AWG_lookuptable()
+        stats = lm.waveform_cache_statistics()
+        self.assertEqual(stats['misses'], 0)
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['uploads'], 0)
+        self.assertEqual(stats['uploads_skipped'], len(lm.LutMap()))
+        np.testing.assert_array_equal(lm._wave_dict['rX180'], rX180)
+
+        old_amp = lm.mw_amp180()
+        lm.mw_amp180(old_amp/2)
+        try:
+            lm.load_waveforms_onto_AWG_lookuptable()
+            stats = lm.waveform_cache_statistics()
+            self.assertEqual(stats['misses'], 1)
+            self.assertGreater(stats['uploads'], 0)
+            np.testing.assert_array_almost_equal(
+                lm._wave_dict['rX180'], np.array(rX180)/2)
+        finally:
+            lm.mw_amp180(old_amp)
+
     def test_lut_mapping_AWG8(self):
         self.AWG8_MW_LutMan.set_default_lutmap()
         expected_dict = {
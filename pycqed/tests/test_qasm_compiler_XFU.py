@@ -1,8 +1,10 @@
 """
 This module contains tests for the QASM compiler by Xiang Fu
 """
+import os
 import unittest
 import sys
+import tempfile
 import numpy as np
 import pycqed as pq
 from io import StringIO
@@ -23,6 +25,27 @@ from pycqed.measurement.waveform_control_CC.qasm_compiler_helpers import \
     get_timepoints_from_label
 
 
+def write_repeated_qasm_program(qasm_fn: str, nr_repetitions: int,
+                                output_dir: str):
+    """
+    Writes a QASM program that repeats the body of the program qasm_fn
+    (everything after the qubit declarations and mappings).
+
+    Returns:
+        filename of the new program
+    """
+    with open(qasm_fn) as f:
+        lines = f.read().splitlines()
+    header_len = max(i for i, line in enumerate(lines)
+                     if line.startswith(('qubit', 'map'))) + 1
+    filename = join(output_dir, 'repeated_{}x_{}'.format(
+        nr_repetitions, os.path.basename(qasm_fn)))
+    with open(filename, 'w') as f:
+        f.write('\n'.join(lines[:header_len] +
+                          lines[header_len:]*nr_repetitions) + '\n')
+    return filename
+
+
 class Test_compiler(unittest.TestCase):
 
     @classmethod
@@ -57,6 +80,23 @@ class Test_compiler(unittest.TestCase):
         asm = Assembler(qumis_fn)
         asm.convert_to_instructions()
 
+    def test_long_program_reference(self):
+        """
+        Compiles a long program (dev_test.qasm repeated 50 times) and
+        compares the QuMIS to the output of the compiler before the timing
+        grid operations were made linear time.
+        """
+        with tempfile.TemporaryDirectory() as tmpdir:
+            qasm_fn = write_repeated_qasm_program(
+                join(self.test_file_dir, 'dev_test.qasm'), 50, tmpdir)
+            compiler = qcx.QASM_QuMIS_Compiler(self.config_fn,
+                                               verbosity_level=0)
+            compiler.compile(qasm_fn, join(tmpdir, 'long_program.qumis'))
+        with open(join(self.test_file_dir,
+                       'dev_test_x50_reference.qumis')) as f:
+            reference = f.read().splitlines()
+        self.assertEqual(compiler.qumis_instructions, reference)
+
     def test_methods_of_compiler(self):
         compiler = qcx.QASM_QuMIS_Compiler()
 
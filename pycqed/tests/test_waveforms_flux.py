@@ -1,4 +1,5 @@
 import numpy as np
+import scipy.interpolate
 import unittest
 from pycqed.measurement.waveform_control_CC import waveforms_flux as wfl
 
@@ -66,3 +67,69 @@ class Test_waveforms_flux(unittest.TestCase):
             thetas = wfl.martinis_flux_pulse(
                 35e-9, theta_i=theta_i, theta_f=theta_f,
                 lambda_2=lambda_2, lambda_3=lambda_3, sampling_rate=1e9)
+
+    def test_martinis_flux_pulse_reference(self):
+        theta_i = wfl.eps_to_theta(800e6, 25e6)
+        for length in [35e-9, 40.2e-9, 400e-9]:
+            for theta_f in np.deg2rad([40, 90, 170]):
+                for lambda_2 in [-.2, 0, .2]:
+                    thetas = wfl.martinis_flux_pulse(
+                        length, theta_i=theta_i, theta_f=theta_f,
+                        lambda_2=lambda_2, lambda_3=0.05)
+                    thetas_ref = martinis_flux_pulse_reference(
+                        length, theta_i=theta_i, theta_f=theta_f,
+                        lambda_2=lambda_2, lambda_3=0.05)
+                    np.testing.assert_allclose(thetas, thetas_ref,
+                                               rtol=1e-10, atol=1e-12)
+
+    def test_martinis_flux_pulse_batch(self):
+        theta_i = wfl.eps_to_theta(800e6, 25e6)
+        lengths = np.array([[30e-9], [40e-9]])
+        theta_fs = np.deg2rad([60, 80, 90])
+        thetas = wfl.martinis_flux_pulse_batch(
+            lengths, theta_i=theta_i, theta_f=theta_fs, lambda_2=0.1,
+            lambda_3=[0, 0.05, 0.1], sampling_rate=1e9)
+        self.assertEqual(len(thetas), 6)
+        for i, (length, theta_f, lambda_3) in enumerate(zip(
+                np.repeat(lengths, 3), np.tile(theta_fs, 2),
+                np.tile([0, 0.05, 0.1], 2))):
+            np.testing.assert_allclose(thetas[i], wfl.martinis_flux_pulse(
+                length, theta_i=theta_i, theta_f=theta_f, lambda_2=0.1,
+                lambda_3=lambda_3, sampling_rate=1e9))
+
+        with self.assertRaises(ValueError):
+            wfl.martinis_flux_pulse_batch(
+                35e-9, theta_i=np.deg2rad(40), theta_f=np.deg2rad([50, 30]),
+                lambda_2=0, sampling_rate=1e9)
+
+
+def martinis_flux_pulse_reference(length, theta_i, theta_f, lambda_2,
+                                  lambda_3=0, lambda_4=0,
+                                  sampling_rate=2.4e9):
+    """
+    Implementation of martinis_flux_pulse that integrates the proper time
+    for every sample, which is O(n^2) in the number of samples.
+    """
+    fine_sampling_factor = 2
+    nr_samples = int(np.round((length)*sampling_rate * fine_sampling_factor))
+    rounded_length = nr_samples/(fine_sampling_factor * sampling_rate)
+    tau_step = 1/(fine_sampling_factor * sampling_rate)
+    taus = np.arange(0, rounded_length-tau_step/2, tau_step)
+    lambda_1 = (theta_f - theta_i) / (2) - lambda_3
+
+    theta_wave = np.ones(nr_samples) * theta_i
+    theta_wave += lambda_1 * (1 - np.cos(2 * np.pi * taus / rounded_length))
+    theta_wave += lambda_2 * (1 - np.cos(4 * np.pi * taus / rounded_length))
+    theta_wave += lambda_3 * (1 - np.cos(6 * np.pi * taus / rounded_length))
+    theta_wave += lambda_4 * (1 - np.cos(8 * np.pi * taus / rounded_length))
+    theta_wave_clipped = np.clip(theta_wave, theta_i, np.pi-.01)
+
+    t = np.array([np.trapz(np.sin(theta_wave_clipped)[:i+1],
+                           dx=1/(fine_sampling_factor*sampling_rate))
+                  for i in range(len(theta_wave_clipped))])
+    t_samples = np.arange(0, length, 1/sampling_rate)
+    scale = t[-1]/t_samples[-1]
+    interp_wave = scipy.interpolate.interp1d(
+        t/scale, theta_wave_clipped, bounds_error=False,
+        fill_value='extrapolate')(t_samples)
+    return np.nan_to_num(interp_wave)
@@ -0,0 +1,324 @@
+"""
+Persistent index of the measurement folders in a data directory.
+
+The data directory has the structure <datadir>/YYYYMMDD/HHMMSS_name.
+Finding data by timestamp or label requires listing these directories,
+which is slow for large data directories (e.g. on a network share).
+The DataIndex stores the folders in an SQLite database so that range,
+label and newest-n queries do not require listing the directories.
+
+The index is refreshed lazily. The list of day directories is updated
+when the modification time of the data directory changes. Day directories
+are scanned once and afterwards only the newest day (in which new
+measurements are created) is checked for changes, so that a query does
+not require an os.stat per day. New folders are added directly by
+hdf5_data.Data when a measurement is started. Use DataIndex.rescan if
+older day directories were modified by hand.
+
+The index is stored in the data directory itself (see index_dir) and is
+only used by the analysis_toolbox if analysis_toolbox.use_data_index is
+set to True.
+"""
+
+import os
+import time
+import hashlib
+import logging
+import sqlite3
+
+# Directory in which the index databases are stored, one per data directory.
+# If None, the index is stored in the subdirectory index_subdir of the data
+# directory (a subdirectory, as SQLite journal files would otherwise change
+# the modification time of the data directory on every write).
+index_dir = None
+index_subdir = '.data_index'
+
+# Directory modification times closer than this (in s) to the time of the
+# scan are not trusted, as changes within the same clock tick are not
+# reflected in the modification time.
+_mtime_resolution = 2
+
+_indices = {}
+
+
+def get_data_index(datadir: str):
+    """
+    Returns the (cached) DataIndex of a data directory.
+    """
+    datadir = os.path.abspath(datadir)
+    if datadir not in _indices:
+        _indices[datadir] = DataIndex(datadir)
+    return _indices[datadir]
+
+
+def register_folder(folder: str, datadir: str=None):
+    """
+    Adds a newly created measurement folder to the index of its data
+    directory, if this index exists in this session.
+
+    Args:
+        folder (str): path of the measurement folder
+            (<datadir>/YYYYMMDD/HHMMSS_name)
+        datadir (str): data directory, defaults to two levels above folder
+    """
+    if datadir is None:
+        datadir = os.path.dirname(os.path.dirname(os.path.abspath(folder)))
+    index = _indices.get(os.path.abspath(datadir), None)
+    if index is not None:
+        try:
+            index.add_folder(folder)
+        except sqlite3.Error as e:
+            logging.warning('Could not add "{}" to the data index: {}'.format(
+                folder, e))
+
+
+def _is_daystamp(name: str):
+    return len(name) == 8 and name.isdigit()
+
+
+def _is_measdir(name: str):
+    return len(name) >= 6 and name[:6].isdigit()
+
+
+class DataIndex:
+    """
+    Index of the measurement folders in a data directory, mapping the
+    timestamp to the folder and the name of the measurement.
+    """
+
+    def __init__(self, datadir: str, index_path: str=None):
+        """
+        Args:
+            datadir (str): the data directory to index
+            index_path (str): path of the SQLite database. Defaults to
+                "<datadir>/.data_index/data_index.sqlite", or to a file in
+                index_dir named by the hash of the datadir if index_dir is
+                set. If the database cannot be created, an in-memory
+                database is used.
+        """
+        self.datadir = os.path.abspath(datadir)
+        if index_path is None and index_dir is None:
+            index_path = os.path.join(self.datadir, index_subdir,
+                                      'data_index.sqlite')
+        elif index_path is None:
+            index_path = os.path.join(index_dir, '{}.sqlite'.format(
+                hashlib.md5(self.datadir.encode()).hexdigest()))
+        try:
+            os.makedirs(os.path.dirname(index_path), exist_ok=True)
+            self._conn = self._connect(index_path)
+        except (OSError, sqlite3.Error) as e:
+            logging.warning('Could not open data index "{}", using an '
+                            'in-memory index instead: {}'.format(
+                                index_path, e))
+            index_path = ':memory:'
+            self._conn = self._connect(index_path)
+        self.index_path = index_path
+
+    def _connect(self, index_path: str):
+        conn = sqlite3.connect(index_path, timeout=30,
+                               check_same_thread=False)
+        with conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS days ('
+                         'daystamp TEXT PRIMARY KEY, '
+                         'mtime REAL, scan_time REAL)')
+            conn.execute('CREATE TABLE IF NOT EXISTS measurements ('
+                         'timestamp TEXT, daystamp TEXT, dirname TEXT, '
+                         'name TEXT, PRIMARY KEY (daystamp, dirname))')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_timestamp '
+                         'ON measurements (timestamp)')
+            conn.execute('CREATE TABLE IF NOT EXISTS meta ('
+                         'key TEXT PRIMARY KEY, value REAL)')
+        return conn
+
+    def close(self):
+        self._conn.close()
+
+    ##########################################
+    # Refreshing the index
+    ##########################################
+
+    @staticmethod
+    def _is_stale(mtime, stored_mtime, scan_time):
+        return (stored_mtime is None or mtime != stored_mtime or
+                mtime > scan_time - _mtime_resolution)
+
+    def refresh_days(self):
+        """
+        Updates the list of day directories if the modification time of
+        the data directory changed.
+        """
+        try:
+            mtime = os.stat(self.datadir).st_mtime
+        except OSError:
+            mtime = None
+        row = self._conn.execute(
+            "SELECT value FROM meta WHERE key='mtime'").fetchone()
+        scan = self._conn.execute(
+            "SELECT value FROM meta WHERE key='scan_time'").fetchone()
+        if (mtime is not None and row is not None and
+                not self._is_stale(mtime, row[0], scan[0])):
+            return
+        scan_time = time.time()
+        if mtime is None:
+            daystamps = set()
+        else:
+            daystamps = {d for d in os.listdir(self.datadir)
+                         if _is_daystamp(d)}
+        indexed = {r[0] for r in self._conn.execute(
+            'SELECT daystamp FROM days')}
+        with self._conn:
+            for d in indexed - daystamps:
+                self._conn.execute('DELETE FROM days WHERE daystamp=?', (d,))
+                self._conn.execute(
+                    'DELETE FROM measurements WHERE daystamp=?', (d,))
+            self._conn.executemany(
+                'INSERT INTO days (daystamp, mtime, scan_time) '
+                'VALUES (?, NULL, NULL)',
+                [(d, ) for d in daystamps - indexed])
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+                [('mtime', mtime), ('scan_time', scan_time)])
+
+    def refresh_day(self, daystamp: str):
+        """
+        Rescans a day directory if its modification time changed since
+        the last scan.
+        """
+        row = self._conn.execute(
+            'SELECT mtime, scan_time FROM days WHERE daystamp=?',
+            (daystamp, )).fetchone()
+        path = os.path.join(self.datadir, daystamp)
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            mtime = None
+        if (mtime is not None and row is not None and
+                not self._is_stale(mtime, row[0], row[1])):
+            return
+
+        scan_time = time.time()
+        if mtime is None:
+            dirnames = []
+        else:
+            with os.scandir(path) as entries:
+                dirnames = [e.name for e in entries
+                            if _is_measdir(e.name) and e.is_dir()]
+        with self._conn:
+            self._conn.execute(
+                'DELETE FROM measurements WHERE daystamp=?', (daystamp, ))
+            if mtime is None:
+                self._conn.execute(
+                    'DELETE FROM days WHERE daystamp=?', (daystamp, ))
+                return
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO measurements '
+                '(timestamp, daystamp, dirname, name) VALUES (?, ?, ?, ?)',
+                [(daystamp + d[:6], daystamp, d, d[7:]) for d in dirnames])
+            self._conn.execute(
+                'INSERT OR REPLACE INTO days (daystamp, mtime, scan_time) '
+                'VALUES (?, ?, ?)', (daystamp, mtime, scan_time))
+
+    def add_folder(self, folder: str):
+        """
+        Adds a single measurement folder to the index without rescanning
+        its day directory.
+        """
+        daystamp_dir, dirname = os.path.split(os.path.abspath(folder))
+        daystamp = os.path.basename(daystamp_dir)
+        if not (_is_daystamp(daystamp) and _is_measdir(dirname)):
+            return
+        with self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO measurements '
+                '(timestamp, daystamp, dirname, name) VALUES (?, ?, ?, ?)',
+                (daystamp + dirname[:6], daystamp, dirname, dirname[7:]))
+
+    def _refresh_unsettled_days(self, first: str, last: str):
+        """
+        Refreshes the day directories between first and last that were
+        never scanned or whose last scan may have missed changes, as well
+        as the newest day directory.
+        """
+        self.refresh_days()
+        rows = self._conn.execute(
+            'SELECT daystamp, mtime, scan_time FROM days '
+            'WHERE daystamp >= ? AND daystamp <= ? ORDER BY daystamp DESC',
+            (first, last)).fetchall()
+        newest = self._conn.execute(
+            'SELECT MAX(daystamp) FROM days').fetchone()[0]
+        for daystamp, mtime, scan_time in rows:
+            if (daystamp == newest or mtime is None or
+                    mtime > scan_time - _mtime_resolution):
+                self.refresh_day(daystamp)
+
+    def rescan(self):
+        """
+        Checks all day directories for changes. Only needed if folders
+        were added to or removed from day directories other than the
+        newest one outside of PycQED.
+        """
+        for daystamp in self.daystamps():
+            self.refresh_day(daystamp)
+
+    ##########################################
+    # Queries
+    ##########################################
+
+    def daystamps(self, first: str=None, last: str=None):
+        """
+        Returns the daystamps (YYYYMMDD) in the index between first and
+        last (inclusive) in descending order.
+        """
+        self.refresh_days()
+        return [r[0] for r in self._conn.execute(
+            'SELECT daystamp FROM days WHERE daystamp >= ? AND daystamp <= ? '
+            'ORDER BY daystamp DESC', (first or '', last or '99999999'))]
+
+    def find(self, contains='', older_than: str=None, newer_than: str=None,
+             or_equal: bool=False, limit: int=None,
+             distinct_timestamps: bool=False, daystamp: str=None):
+        """
+        Returns the measurement folders, newest first, as a list of tuples
+        (timestamp, daystamp, dirname). Timestamps are of the form
+        YYYYMMDDHHMMSS.
+
+        Args:
+            contains (str): only folders whose name contains this string
+            older_than (str): only folders older than this timestamp
+            newer_than (str): only folders newer than this timestamp
+            or_equal (bool): whether older_than and newer_than include
+                the timestamps themselves
+            limit (int): maximum number of folders returned
+            distinct_timestamps (bool): return only the first folder (in
+                descending order of names) for each timestamp
+            daystamp (str): only folders of this day (YYYYMMDD)
+        """
+        where = ['daystamp >= ?', 'daystamp <= ?', "instr(dirname, ?) > 0"]
+        if daystamp is not None:
+            first = last = daystamp
+        else:
+            first = newer_than[:8] if newer_than is not None else ''
+            last = older_than[:8] if older_than is not None else '99999999'
+        args = [first, last, contains]
+        if older_than is not None:
+            where.append('timestamp {} ?'.format('<=' if or_equal else '<'))
+            args.append(older_than)
+        if newer_than is not None:
+            where.append('timestamp {} ?'.format('>=' if or_equal else '>'))
+            args.append(newer_than)
+        query = ('SELECT timestamp, daystamp, dirname FROM measurements '
+                 'WHERE {} ORDER BY timestamp DESC, dirname DESC'.format(
+                     ' AND '.join(where)))
+
+        self._refresh_unsettled_days(first, last)
+        results = []
+        seen = set()
+        for row in self._conn.execute(query, args):
+            if distinct_timestamps:
+                if row[0] in seen:
+                    continue
+                seen.add(row[0])
+            results.append(row)
+            if limit is not None and len(results) >= limit:
+                break
+        return results
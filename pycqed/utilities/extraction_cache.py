@@ -0,0 +1,199 @@
+"""
+Persistent cache of parameters extracted from data files.
+
+Analyses that extract the same parameters from the same (many) files
+every time they are run, e.g. trend analyses in analysis_v2, can read
+these from the cache instead of opening every file.
+
+Entries are keyed on the path, modification time and size of the file and
+on the parameter path, so entries of files that changed are not used.
+Only values that are small when pickled are stored, the least recently
+used entries are removed when the cache exceeds its maximum size.
+
+By default the cache is stored in the home directory of the user
+(~/.pycqed/extraction_cache.sqlite), not in the data directory, which is
+often a drive shared with other users. The values are stored pickled and
+are unpickled when read, a cache database must therefore never be shared
+with or be writable by untrusted users: unpickling a crafted entry can
+execute arbitrary code.
+"""
+
+import os
+import time
+import pickle
+import logging
+import sqlite3
+
+# Location of the default cache. As entries are keyed on the absolute path
+# of the data files, a single cache serves all data directories.
+cache_path = os.path.join(os.path.expanduser('~'), '.pycqed',
+                          'extraction_cache.sqlite')
+
+_cache = None
+
+
+def get_extraction_cache():
+    """
+    Returns the (shared) ExtractionCache at cache_path.
+    """
+    global _cache
+    if _cache is None or _cache.path != cache_path:
+        if _cache is not None:
+            _cache.close()
+        _cache = ExtractionCache(cache_path)
+    return _cache
+
+
+class ExtractionCache:
+    """
+    SQLite based cache of extracted parameters with least recently used
+    eviction. Do not open caches from untrusted sources, see the module
+    docstring.
+    """
+
+    def __init__(self, path: str, max_size: int=200*2**20,
+                 max_entry_size: int=2**20):
+        """
+        Args:
+            path (str): path of the SQLite database. If it cannot be
+                created, an in-memory database is used.
+            max_size (int): maximum total size of the cached values in bytes
+            max_entry_size (int): values larger than this (in bytes, when
+                pickled) are not cached
+        """
+        self.max_size = max_size
+        self.max_entry_size = max_entry_size
+        try:
+            if os.path.dirname(path):
+                # only accessible by the user, see the module docstring
+                os.makedirs(os.path.dirname(path), mode=0o700,
+                            exist_ok=True)
+            self._conn = self._connect(path)
+        except (OSError, sqlite3.Error) as e:
+            logging.warning('Could not open extraction cache "{}", using an '
+                            'in-memory cache instead: {}'.format(path, e))
+            self._conn = self._connect(':memory:')
+        self.path = path
+        # running total of the size of the cached values, such that a put
+        # does not need to sum over the whole table
+        self._total_size = self.size()
+
+    def _connect(self, path: str):
+        conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS entries ('
+                         'filepath TEXT, mtime REAL, size INTEGER, '
+                         'param TEXT, value BLOB, nbytes INTEGER, '
+                         'last_access REAL, '
+                         'PRIMARY KEY (filepath, param))')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_last_access '
+                         'ON entries (last_access)')
+        return conn
+
+    def close(self):
+        self._conn.close()
+
+    @staticmethod
+    def file_key(filepath: str):
+        """
+        Returns the key (path, mtime, size) identifying the current
+        version of a file.
+        """
+        st = os.stat(filepath)
+        return os.path.abspath(filepath), st.st_mtime, st.st_size
+
+    def get(self, file_key: tuple, params: list):
+        """
+        Returns a dict with the cached values of params for the file
+        version file_key. Params that are not cached are not in the dict.
+        """
+        filepath, mtime, size = file_key
+        values = {}
+        try:
+            rows = self._conn.execute(
+                'SELECT param, value FROM entries WHERE filepath=? AND '
+                'mtime=? AND size=?', (filepath, mtime, size)).fetchall()
+            params = set(params)
+            for param, value in rows:
+                if param in params:
+                    values[param] = pickle.loads(value)
+            if values:
+                with self._conn:
+                    self._conn.executemany(
+                        'UPDATE entries SET last_access=? '
+                        'WHERE filepath=? AND param=?',
+                        [(time.time(), filepath, p) for p in values])
+        except (sqlite3.Error, pickle.UnpicklingError) as e:
+            logging.warning('Could not read extraction cache: {}'.format(e))
+        return values
+
+    def put(self, file_key: tuple, values: dict):
+        """
+        Stores the extracted values (dict of param: value) of the file
+        version file_key.
+        """
+        filepath, mtime, size = file_key
+        entries = []
+        now = time.time()
+        for param, value in values.items():
+            try:
+                blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            except Exception:
+                continue
+            if len(blob) <= self.max_entry_size:
+                entries.append((filepath, mtime, size, param,
+                                sqlite3.Binary(blob), len(blob), now))
+        try:
+            old_size = self._file_size(filepath)
+            with self._conn:
+                # entries of other versions of the file are outdated
+                self._conn.execute(
+                    'DELETE FROM entries WHERE filepath=? AND '
+                    '(mtime!=? OR size!=?)', (filepath, mtime, size))
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO entries (filepath, mtime, size, '
+                    'param, value, nbytes, last_access) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)', entries)
+            self._total_size += self._file_size(filepath) - old_size
+            self._evict()
+        except sqlite3.Error as e:
+            logging.warning('Could not write extraction cache: {}'.format(e))
+
+    def size(self):
+        """
+        Returns the total size of the cached values in bytes.
+        """
+        return self._conn.execute(
+            'SELECT COALESCE(SUM(nbytes), 0) FROM entries').fetchone()[0]
+
+    def _file_size(self, filepath: str):
+        return self._conn.execute(
+            'SELECT COALESCE(SUM(nbytes), 0) FROM entries WHERE filepath=?',
+            (filepath, )).fetchone()[0]
+
+    def _evict(self):
+        if self._total_size <= self.max_size:
+            return
+        # the running total drifts if another process uses the same cache
+        total = self._total_size = self.size()
+        if total <= self.max_size:
+            return
+        # remove the least recently used entries down to 90% of max_size
+        to_remove = total - 0.9*self.max_size
+        removed = 0
+        rowids = []
+        for rowid, nbytes in self._conn.execute(
+                'SELECT rowid, nbytes FROM entries ORDER BY last_access'):
+            rowids.append((rowid, ))
+            removed += nbytes
+            if removed >= to_remove:
+                break
+        with self._conn:
+            self._conn.executemany('DELETE FROM entries WHERE rowid=?',
+                                   rowids)
+        self._total_size -= removed
+
+    def clear(self):
+        with self._conn:
+            self._conn.execute('DELETE FROM entries')
+        self._total_size = 0